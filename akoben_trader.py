@@ -8,6 +8,7 @@ import time
 import json
 import logging
 import argparse
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -15,9 +16,24 @@ from typing import Dict, List, Any, Optional
 
 # Importation des composants Akoben
 from src.agents.execution.mt5_connector import MT5FileConnector
+from src.agents.execution.cached_connector import CachedMT5Connector
 from src.agents.chaka.oba import Oba
 from src.agents.chaka.iklwa import Iklwa  # Gestionnaire de risque à intégrer ultérieurement
 from src.learning.imitation_learning_manager import ImitationLearningManager
+from src.tools import indicators as indicator_engine
+from src.tools.signal_scanner import scan_setups
+from src.tools.backtester import BarReplayBacktester
+from src.tools.walk_forward import run_model_walk_forward, summarize_folds
+from src.tools.monte_carlo import analyze_ledger, load_trade_ledger
+from src.tools.bar_store import BarStore
+from src.tools.history_fetcher import HistoryFetcher
+from src.tools.candle_cache import TIMEFRAME_SECONDS, CandleCache
+from src.tools.resampler import can_resample, resample_records
+from src.tools.market_snapshot import CandleArrays, MarketSnapshot
+from src.tools.mt5_csv import load_mt5_csv
+
+# Indicateurs de _calculate_indicators mis à jour bougie par bougie (ATR simplifié: moyenne simple du True Range)
+LIVE_INDICATORS = {'ma20': ('sma', 20), 'ma50': ('sma', 50), 'atr14': ('atr', 14, False), 'roc14': ('roc', 14)}
 
 # Configuration du logging
 log_dir = "logs/trading"
@@ -64,6 +80,14 @@ class AkobenTrader:
         self.instrument = self.config.get("instrument", "US30")
         self.timeframes = self.config.get("timeframes", ["M1", "M5", "M15"])
         self.main_timeframe = self.config.get("main_timeframe", "M1")
+        # Seul le timeframe de base est demandé à MT5, les timeframes supérieurs sont reconstruits localement
+        self.base_timeframe = self.config.get("base_timeframe", "M1")
+        self.local_resampling = self.config.get("local_resampling", True)
+        self.candle_window = self.config.get("candle_window", 100)  # Bougies fournies par timeframe
+        # Indicateurs streaming par timeframe principal (seules les nouvelles bougies sont ajoutées)
+        self.live_indicators = {}
+        # Requêtes d'un cycle (prix, bougies, positions, compte) envoyées en un seul lot à MT5
+        self.batch_requests = self.config.get("batch_requests", True)
         self.check_interval = self.config.get("check_interval", 60)  # Secondes
         self.confidence_threshold = self.config.get("confidence_threshold", 0.7)
         self.max_daily_trades = self.config.get("max_daily_trades", 3)
@@ -84,6 +108,9 @@ class AkobenTrader:
                         self.predictions_dir, self.trades_dir, self.stats_dir]:
             dir_path.mkdir(parents=True, exist_ok=True)
         
+        # Stockage colonnaire des bougies (symbole / timeframe / jour)
+        self.bar_store = BarStore(self.config.get("bar_store_dir", self.data_dir / "bars"))
+        
         # État interne
         self.start_time = datetime.now()
         self.last_check_time = None
@@ -119,8 +146,11 @@ class AkobenTrader:
         
         # Initialiser le connecteur MT5
         try:
-            self.mt5 = MT5FileConnector()
+            # Lectures (compte, positions, prix) gardées en cache le temps d'un cycle
+            self.mt5 = CachedMT5Connector(MT5FileConnector(self.config.get("mt5_config")), self.config.get("mt5_cache_ttls"))
             self.logger.info("Connecteur MT5 initialisé")
+            # Cache des bougies récentes: seules les nouvelles bougies sont demandées à MT5
+            self.candle_cache = CandleCache(self.mt5, window=self.candle_window, windows=self._candle_windows())
         except Exception as e:
             self.logger.error(f"Erreur lors de l'initialisation du connecteur MT5: {e}")
             raise
@@ -188,6 +218,10 @@ class AkobenTrader:
                     time.sleep(300)  # 5 minutes
                     continue
                 
+                # Obtenir en un seul aller-retour les réponses MT5 du cycle
+                if self.batch_requests:
+                    self._prefetch_cycle()
+                
                 # Effectuer une vérification du marché
                 self._check_market()
                 
@@ -209,6 +243,7 @@ class AkobenTrader:
             # Nettoyage
             self.mt5.disconnect()
             self._save_statistics()
+            self._analyze_trade_risk()
             self.logger.info("Système de trading arrêté")
     
     def _is_trading_time(self):
@@ -279,17 +314,11 @@ class AkobenTrader:
         Collecte les données de marché pour l'analyse
         
         Returns:
-            dict: Données de marché ou None en cas d'erreur
+            MarketSnapshot: Données de marché (bougies en colonnes NumPy) ou None en cas d'erreur
         """
         self.logger.info(f"Collecte des données de marché pour {self.instrument}...")
         
-        market_data = {
-            "timestamp": datetime.now().isoformat(),
-            "instrument": self.instrument,
-            "current_price": None,
-            "candles": {},
-            "indicators": {}
-        }
+        market_data = MarketSnapshot(self.instrument, timestamp=datetime.now().isoformat())
         
         try:
             # Récupérer le prix actuel
@@ -305,10 +334,20 @@ class AkobenTrader:
                 return None
             
             # Récupérer les données historiques pour chaque timeframe
+            # (timeframes supérieurs reconstruits à partir du timeframe de base, sans requête MT5)
+            resampled = self._resampled_timeframes()
+            base_ok = bool(resampled) and self.candle_cache.update(self.instrument, self.base_timeframe)
             for tf in self.timeframes:
-                candles = self.mt5.get_data(self.instrument, tf, 100)
-                if candles is not None:
-                    market_data["candles"][tf] = candles.to_dict('records')
+                if tf in resampled:
+                    candles = self._resampled_candles(tf) if base_ok else None
+                elif resampled and tf == self.base_timeframe:
+                    candles = self.candle_cache.records(self.instrument, tf, self.candle_window) if base_ok else None
+                elif self.candle_cache.update(self.instrument, tf):
+                    candles = self.candle_cache.records(self.instrument, tf, self.candle_window)
+                else:
+                    candles = None
+                if candles is not None and len(candles):
+                    market_data.set_candles(tf, candles)
                 else:
                     self.logger.warning(f"Impossible d'obtenir les données {tf} pour {self.instrument}")
             
@@ -321,12 +360,12 @@ class AkobenTrader:
             # TODO: Implémenter la capture d'écran du graphique
             
             # Calculer quelques indicateurs de base
-            market_data["indicators"] = self._calculate_indicators(market_data["candles"])
+            market_data.indicators = self._calculate_indicators(market_data.candles)
             
             self.logger.info(f"Données de marché collectées avec succès pour {self.instrument}")
             
-            # Sauvegarder les données pour réentraînement
-            self._save_market_data(market_data)
+            # Sauvegarder les bougies pour réentraînement
+            self._save_market_data(market_data.candles)
             
             return market_data
             
@@ -335,12 +374,84 @@ class AkobenTrader:
             self.stats["connection_errors"] += 1
             return None
     
+    def _resampled_timeframes(self):
+        """
+        Timeframes construits localement à partir du timeframe de base
+        
+        Returns:
+            list: Timeframes surveillés multiples du timeframe de base (vide si désactivé)
+        """
+        if not self.local_resampling:
+            return []
+        return [tf for tf in self.timeframes if can_resample(self.base_timeframe, tf)]
+    
+    def _candle_windows(self):
+        """
+        Taille du cache du timeframe de base: assez de bougies pour reconstruire
+        candle_window bougies du plus grand timeframe
+        
+        Returns:
+            dict: {timeframe: nombre de bougies conservées}
+        """
+        ratios = [TIMEFRAME_SECONDS[tf] // TIMEFRAME_SECONDS[self.base_timeframe]
+                  for tf in self._resampled_timeframes()]
+        if not ratios:
+            return {}
+        return {self.base_timeframe: (self.candle_window + 1) * max(ratios)}
+    
+    def _resampled_candles(self, timeframe):
+        """
+        Bougies d'un timeframe supérieur reconstruites à partir du cache du timeframe de base
+        (alignées sur les bornes MT5, dernière bougie en formation)
+        
+        Args:
+            timeframe: Timeframe cible
+            
+        Returns:
+            numpy.ndarray: Dernières bougies (enregistrements BAR_DTYPE)
+        """
+        base = self.candle_cache.ring(self.instrument, self.base_timeframe).records
+        return resample_records(base, timeframe, self.base_timeframe)[-self.candle_window:]
+    
+    def _cycle_commands(self):
+        """
+        Commandes MT5 d'un cycle de trading, dans le format des appels du connecteur
+        (prix, bougies des timeframes demandés à MT5, positions et compte en mode réel)
+        
+        Returns:
+            list: Commandes
+        """
+        symbol = self.mt5.mt5_symbol(self.instrument)
+        commands = [f"PRICE {symbol}"]
+        
+        resampled = self._resampled_timeframes()
+        fetched = ([self.base_timeframe] if resampled else []) + [tf for tf in self.timeframes if tf not in resampled]
+        for tf in dict.fromkeys(fetched):
+            commands.append(self.mt5.data_command(self.instrument, tf, self.candle_cache.request_count(self.instrument, tf)))
+        
+        if not self.dry_run:
+            if self.active_trades:
+                commands.append(f"POSITIONS {symbol}")
+                commands.append("HISTORY_ORDERS 1")
+            commands.append("ACCOUNT_INFO")
+        return commands
+    
+    def _prefetch_cycle(self):
+        """
+        Envoie les commandes du cycle en un seul lot: les appels suivants du connecteur
+        (collecte, surveillance des trades, statistiques) utilisent ces réponses
+        """
+        commands = self._cycle_commands()
+        received = self.mt5.prefetch(commands)
+        if received < len(commands):
+            self.logger.warning(f"Lot MT5: {received}/{len(commands)} réponses, les autres commandes seront envoyées une à une")
+    
     def _calculate_indicators(self, candles_data):
         """
         Calcule les indicateurs techniques de base
         
         Args:
-            candles_data: Données des chandelles pour différents timeframes
+            candles_data: Bougies par timeframe (CandleArrays, DataFrame ou liste de dicts)
             
         Returns:
             dict: Indicateurs calculés
@@ -349,59 +460,62 @@ class AkobenTrader:
         
         try:
             # Calculs pour le timeframe principal
-            main_candles = candles_data.get(self.main_timeframe, [])
-            if not main_candles:
+            main_candles = candles_data.get(self.main_timeframe)
+            if main_candles is None or len(main_candles) == 0:
                 return indicators
             
-            # Convertir en DataFrame pour faciliter les calculs
-            df = pd.DataFrame(main_candles)
+            # Colonnes en tableaux NumPy pour le moteur d'indicateurs (pas d'objet par bougie)
+            main_candles = CandleArrays.from_bars(main_candles)
+            close = np.asarray(main_candles.close, dtype=float)
+            open_ = np.asarray(main_candles.open, dtype=float)
+            high = np.asarray(main_candles.high, dtype=float)
+            low = np.asarray(main_candles.low, dtype=float)
+            
+            # Indicateurs streaming: bougies clôturées depuis le cycle précédent ajoutées en O(1),
+            # bougie en formation évaluée sans modifier l'état
+            stream = self.live_indicators.get(self.main_timeframe)
+            if stream is None:
+                stream = self.live_indicators[self.main_timeframe] = indicator_engine.LiveIndicators(LIVE_INDICATORS)
+            values = stream.values(main_candles.time, high, low, close)
             
             # Calculer les moyennes mobiles (exemple)
-            if len(df) >= 20:
-                df['ma20'] = df['close'].rolling(window=20).mean()
-                df['ma50'] = df['close'].rolling(window=50).mean()
+            if len(close) >= 20:
+                ma20 = values['ma20']
+                ma50 = values['ma50']
                 
                 # Tendance basée sur les MM
-                last_values = df.iloc[-1]
-                if last_values['close'] > last_values['ma20'] > last_values['ma50']:
+                if close[-1] > ma20 > ma50:
                     indicators['trend'] = 'UP'
-                elif last_values['close'] < last_values['ma20'] < last_values['ma50']:
+                elif close[-1] < ma20 < ma50:
                     indicators['trend'] = 'DOWN'
                 else:
                     indicators['trend'] = 'NEUTRAL'
                 
                 # Valeurs des moyennes mobiles
-                indicators['ma20'] = last_values['ma20']
-                indicators['ma50'] = last_values['ma50']
+                indicators['ma20'] = ma20
+                indicators['ma50'] = ma50
                 
                 # Positions relatives
-                indicators['price_vs_ma20'] = (last_values['close'] / last_values['ma20'] - 1) * 100  # en %
-                indicators['ma20_vs_ma50'] = (last_values['ma20'] / last_values['ma50'] - 1) * 100  # en %
-            
-            # Calculer la volatilité (ATR simplifié)
-            if len(df) >= 14:
-                df['high_low'] = df['high'] - df['low']
-                df['high_close'] = abs(df['high'] - df['close'].shift(1))
-                df['low_close'] = abs(df['low'] - df['close'].shift(1))
-                df['tr'] = df[['high_low', 'high_close', 'low_close']].max(axis=1)
-                df['atr14'] = df['tr'].rolling(window=14).mean()
-                
+                indicators['price_vs_ma20'] = (close[-1] / ma20 - 1) * 100  # en %
+                indicators['ma20_vs_ma50'] = (ma20 / ma50 - 1) * 100  # en %
+            
+            # Calculer la volatilité (ATR simplifié: moyenne simple du True Range)
+            if len(close) >= 14:
                 # ATR en points
-                indicators['atr14'] = df['atr14'].iloc[-1]
+                indicators['atr14'] = values['atr14']
                 
                 # ATR en % du prix
-                indicators['atr14_percent'] = (indicators['atr14'] / df['close'].iloc[-1]) * 100
+                indicators['atr14_percent'] = (indicators['atr14'] / close[-1]) * 100
             
             # Momentum
-            if len(df) >= 14:
+            if len(close) >= 14:
                 # ROC (Rate of Change)
-                df['roc14'] = (df['close'] / df['close'].shift(14) - 1) * 100
-                indicators['roc14'] = df['roc14'].iloc[-1]
+                indicators['roc14'] = values['roc14']
             
             # Divergence prix-volume (si volume disponible)
-            if 'tick_volume' in df.columns and len(df) >= 10:
-                price_change = df['close'].iloc[-1] - df['close'].iloc[-5]
-                volume_change = df['tick_volume'].iloc[-1] - df['tick_volume'].iloc[-5]
+            if main_candles.tick_volume is not None and len(close) >= 10:
+                price_change = close[-1] - close[-5]
+                volume_change = main_candles.tick_volume[-1] - main_candles.tick_volume[-5]
                 
                 if price_change > 0 and volume_change < 0:
                     indicators['price_volume_divergence'] = 'BEARISH'
@@ -411,15 +525,14 @@ class AkobenTrader:
                     indicators['price_volume_divergence'] = 'NONE'
             
             # Détection de pattern chandelier simplifié
-            if len(df) >= 3:
+            if len(close) >= 3:
                 # Détection de marteau/étoile filante simplifiée
-                last_candle = df.iloc[-1]
-                body_size = abs(last_candle['close'] - last_candle['open'])
-                wick_size = max(last_candle['high'] - max(last_candle['open'], last_candle['close']),
-                               min(last_candle['open'], last_candle['close']) - last_candle['low'])
+                body_size = abs(close[-1] - open_[-1])
+                wick_size = max(high[-1] - max(open_[-1], close[-1]),
+                               min(open_[-1], close[-1]) - low[-1])
                 
                 if body_size > 0 and wick_size / body_size > 2:
-                    if last_candle['close'] > last_candle['open']:
+                    if close[-1] > open_[-1]:
                         indicators['candle_pattern'] = 'POSSIBLE_HAMMER'
                     else:
                         indicators['candle_pattern'] = 'POSSIBLE_SHOOTING_STAR'
@@ -427,9 +540,9 @@ class AkobenTrader:
                     indicators['candle_pattern'] = 'NONE'
             
             # Performance récente
-            if len(df) >= 10:
-                indicators['last_5_candles_direction'] = 'UP' if df['close'].iloc[-1] > df['close'].iloc[-5] else 'DOWN'
-                indicators['last_10_candles_direction'] = 'UP' if df['close'].iloc[-1] > df['close'].iloc[-10] else 'DOWN'
+            if len(close) >= 10:
+                indicators['last_5_candles_direction'] = 'UP' if close[-1] > close[-5] else 'DOWN'
+                indicators['last_10_candles_direction'] = 'UP' if close[-1] > close[-10] else 'DOWN'
             
             return indicators
             
@@ -604,26 +717,8 @@ class AkobenTrader:
         # Déterminer les niveaux de prix
         entry_price = current_price.get("bid") if action == "SELL" else current_price.get("ask")
         
-        # Calculer les niveaux SL et TP (exemple simpliste)
-        atr = market_data.get("indicators", {}).get("atr14", 0)
-        if not atr or atr <= 0:
-            atr = entry_price * 0.005  # Valeur par défaut: 0.5% du prix
-        
-        # Stop Loss: 1.5 x ATR
-        sl_distance = atr * 1.5
-        # Take Profit: 2 x ATR (RR = 1.33)
-        tp_distance = atr * 2.0
-        
-        if action == "BUY":
-            stop_loss = entry_price - sl_distance
-            take_profit = entry_price + tp_distance
-        else:  # SELL
-            stop_loss = entry_price + sl_distance
-            take_profit = entry_price - tp_distance
-        
-        # Arrondir les prix
-        stop_loss = round(stop_loss, 2)
-        take_profit = round(take_profit, 2)
+        # Calculer les niveaux SL et TP
+        stop_loss, take_profit = self._trade_levels(action, entry_price, market_data.get("indicators", {}).get("atr14", 0))
         
         # Calculer la taille de la position
         position_size = self._calculate_position_size(entry_price, stop_loss)
@@ -695,6 +790,36 @@ class AkobenTrader:
             self.logger.error(f"Erreur lors de l'exécution de l'ordre: {e}")
             return None
     
+    def _trade_levels(self, action, entry_price, atr):
+        """
+        Calcule les niveaux SL et TP à partir de l'ATR (exemple simpliste)
+        
+        Args:
+            action: "BUY" ou "SELL"
+            entry_price: Prix d'entrée
+            atr: ATR14 en points (0 ou None: 0.5% du prix)
+            
+        Returns:
+            tuple: (stop_loss, take_profit) arrondis à 2 décimales
+        """
+        if not atr or atr <= 0:
+            atr = entry_price * 0.005  # Valeur par défaut: 0.5% du prix
+        
+        # Stop Loss: 1.5 x ATR
+        sl_distance = atr * 1.5
+        # Take Profit: 2 x ATR (RR = 1.33)
+        tp_distance = atr * 2.0
+        
+        if action == "BUY":
+            stop_loss = entry_price - sl_distance
+            take_profit = entry_price + tp_distance
+        else:  # SELL
+            stop_loss = entry_price + sl_distance
+            take_profit = entry_price - tp_distance
+        
+        # Arrondir les prix
+        return round(stop_loss, 2), round(take_profit, 2)
+    
     def _calculate_position_size(self, entry_price, stop_loss):
         """
         Calcule la taille de position optimale
@@ -712,31 +837,8 @@ class AkobenTrader:
             if not account_info:
                 return 0.01  # Valeur par défaut minimale
             
-            # Récupérer le solde du compte
-            balance = account_info.get('BALANCE', 0)
-            if balance <= 0:
-                return 0.01
-            
-            # Calculer le montant à risquer
-            risk_amount = balance * (self.risk_per_trade / 100.0)
-            
-            # Calculer la distance en points
-            stop_distance = abs(entry_price - stop_loss)
-            if stop_distance <= 0:
-                return 0.01
-            
-            # Pour l'US30, calculer la valeur d'un pip
-            pip_value = 0.1  # Valeur approximative pour 0.01 lot d'US30
-            
-            # Calculer la taille de position
-            position_size = risk_amount / (stop_distance * pip_value)
-            
-            # Arrondir à 0.01 près (taille minimum de lot)
-            position_size = max(round(position_size / 0.01) * 0.01, 0.01)
-            
-            # Limiter la taille de position maximale (par sécurité)
-            max_position = min(balance / 1000, 1.0)  # Maximum 1 lot ou 0.1% du solde
-            position_size = min(position_size, max_position)
+            # Calculer la taille pour le solde du compte
+            position_size = self._position_size_for_balance(account_info.get('BALANCE', 0), entry_price, stop_loss)
             
             self.logger.info(f"Taille de position calculée: {position_size} lot(s)")
             return position_size
@@ -745,6 +847,42 @@ class AkobenTrader:
             self.logger.error(f"Erreur lors du calcul de la taille de position: {e}")
             return 0.01  # Valeur par défaut minimale en cas d'erreur
     
+    def _position_size_for_balance(self, balance, entry_price, stop_loss):
+        """
+        Calcule la taille de position pour un solde donné (trading live et backtest)
+        
+        Args:
+            balance: Solde du compte
+            entry_price: Prix d'entrée
+            stop_loss: Niveau de stop loss
+            
+        Returns:
+            float: Taille de position en lots
+        """
+        if balance <= 0:
+            return 0.01
+        
+        # Calculer le montant à risquer
+        risk_amount = balance * (self.risk_per_trade / 100.0)
+        
+        # Calculer la distance en points
+        stop_distance = abs(entry_price - stop_loss)
+        if stop_distance <= 0:
+            return 0.01
+        
+        # Pour l'US30, calculer la valeur d'un pip
+        pip_value = 0.1  # Valeur approximative pour 0.01 lot d'US30
+        
+        # Calculer la taille de position
+        position_size = risk_amount / (stop_distance * pip_value)
+        
+        # Arrondir à 0.01 près (taille minimum de lot)
+        position_size = max(round(position_size / 0.01) * 0.01, 0.01)
+        
+        # Limiter la taille de position maximale (par sécurité)
+        max_position = min(balance / 1000, 1.0)  # Maximum 1 lot ou 0.1% du solde
+        return min(position_size, max_position)
+    
     def _monitor_active_trades(self):
         """
         Surveille les trades actifs et met à jour leur statut
@@ -1058,24 +1196,19 @@ class AkobenTrader:
         except Exception as e:
             self.logger.error(f"Erreur lors de l'enregistrement du trade fermé: {e}")
     
-    def _save_market_data(self, market_data):
+    def _save_market_data(self, candles):
         """
-        Sauvegarde les données de marché pour analyse ultérieure
+        Ajoute les bougies collectées au stockage des bougies (seules les nouvelles sont écrites)
         
         Args:
-            market_data: Données de marché à sauvegarder
+            candles: Dict {timeframe: CandleArrays ou DataFrame des bougies indexé par le temps}
         """
         try:
-            # Créer un identifiant unique
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            data_id = f"market_{self.instrument}_{timestamp}"
-            
-            # Enregistrer dans un fichier JSON
-            data_file = self.data_dir / "market_data" / f"{data_id}.json"
-            data_file.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(data_file, 'w', encoding='utf-8') as f:
-                json.dump(market_data, f, indent=2)
+            for tf, frame in candles.items():
+                bars = frame.to_records() if isinstance(frame, CandleArrays) else frame
+                written = self.bar_store.write(self.instrument, tf, bars)
+                if written:
+                    self.logger.debug(f"{written} nouvelles bougies {tf} stockées")
             
         except Exception as e:
             self.logger.error(f"Erreur lors de la sauvegarde des données de marché: {e}")
@@ -1100,6 +1233,11 @@ class AkobenTrader:
                 "mode": "simulation" if self.dry_run else "real"
             })
             
+            # Latences et erreurs du pont MT5 par type de commande
+            telemetry = getattr(self.mt5, "telemetry", None)
+            if telemetry is not None:
+                stats["mt5_telemetry"] = telemetry.snapshot()
+            
             # Enregistrer dans un fichier JSON
             stats_file = self.stats_dir / "latest_stats.json"
             with open(stats_file, 'w', encoding='utf-8') as f:
@@ -1116,6 +1254,61 @@ class AkobenTrader:
         except Exception as e:
             self.logger.error(f"Erreur lors de la sauvegarde des statistiques: {e}")
     
+    def _analyze_trade_risk(self, min_trades=10):
+        """
+        Analyse Monte Carlo des trades fermés: drawdown et risque de ruine par niveau de risque
+        
+        Args:
+            min_trades: Nombre minimum de trades fermés pour lancer l'analyse
+            
+        Returns:
+            pandas.DataFrame: Résumé par niveau de risque (voir monte_carlo.analyze_ledger), ou None
+        """
+        try:
+            ledger = load_trade_ledger(self.trades_dir)
+            if len(ledger) < min_trades:
+                self.logger.info(f"Analyse du risque ignorée: {len(ledger)} trades fermés (minimum {min_trades})")
+                return None
+            
+            risk_levels = sorted(set(self.config.get("risk_levels", [0.5, 1.0, 2.0, 3.0])) | {self.risk_per_trade})
+            summary = analyze_ledger(ledger, risk_levels, self.config.get("monte_carlo", {}))
+            
+            # Enregistrer le résumé
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            summary_file = self.stats_dir / f"risk_of_ruin_{timestamp}.csv"
+            summary.to_csv(summary_file, index=False)
+            
+            current = summary[summary["risk_per_trade"] == self.risk_per_trade].iloc[0]
+            self.logger.info(f"Risque de ruine à {self.risk_per_trade}% par trade: {current['ruin_probability']:.2%}, "
+                             f"drawdown p95: {current['drawdown_p95']:.2f}% ({summary_file})")
+            return summary
+            
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'analyse du risque: {e}")
+            return None
+    
+    def _fetch_history(self, days):
+        """
+        Télécharge par tranches les `days` derniers jours du timeframe principal dans le
+        stockage des bougies (reprise après la dernière tranche stockée), puis relit la période
+        
+        Args:
+            days: Nombre de jours d'historique
+            
+        Returns:
+            pandas.DataFrame: Bougies de la période, ou None si le téléchargement est incomplet
+        """
+        fetcher = HistoryFetcher(self.mt5, self.bar_store, **self.config.get("history_fetch", {}))
+        result = fetcher.fetch_recent(self.instrument, self.main_timeframe, days)
+        if not result["complete"]:
+            self.logger.warning(f"Historique incomplet ({result['error']}): {result['chunks']} tranches "
+                                f"stockées, le prochain appel reprendra après la dernière")
+            return None
+        
+        self.logger.info(f"Données récupérées: {result['bars']} bougies en {result['chunks']} tranches, "
+                         f"{result['written']} nouvelles stockées")
+        return self.bar_store.read_frame(self.instrument, self.main_timeframe, start=result["start"], end=result["end"])
+    
     def reprocess_historical_data(self, days=7):
         """
         Retraite les données historiques pour l'entraînement
@@ -1127,30 +1320,18 @@ class AkobenTrader:
         
         # Collecter les candles
         try:
-            # Récupérer les données historiques
-            candles = self.mt5.get_data(self.instrument, self.main_timeframe, 1440 * days // int(self.main_timeframe[1:]))
+            # Télécharger l'historique par tranches dans le stockage, puis relire la période
+            candles = self._fetch_history(days)
             if candles is None or len(candles) == 0:
                 self.logger.warning("Aucune donnée historique disponible")
                 return
             
-            self.logger.info(f"Données récupérées: {len(candles)} bougies")
-            
-            # Convertir en liste de dictionnaires
-            candles_data = candles.to_dict('records')
-            
-            # Créer un dossier pour les données historiques
+            # Créer un dossier pour les résultats
             historical_dir = self.data_dir / "historical" / self.instrument
             historical_dir.mkdir(parents=True, exist_ok=True)
             
-            # Enregistrer les données
-            file_path = historical_dir / f"historical_{self.main_timeframe}_{datetime.now().strftime('%Y%m%d')}.json"
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(candles_data, f, indent=2)
-            
-            self.logger.info(f"Données historiques enregistrées: {file_path}")
-            
             # Traiter les données pour simuler des prédictions
-            results = self._simulate_predictions_on_historical(candles_data)
+            results = self._simulate_predictions_on_historical(candles)
             
             # Enregistrer les résultats
             results_path = historical_dir / f"historical_predictions_{self.main_timeframe}_{datetime.now().strftime('%Y%m%d')}.json"
@@ -1165,12 +1346,309 @@ class AkobenTrader:
             self.logger.error(f"Erreur lors du retraitement des données historiques: {e}")
             return None
     
-    def _simulate_predictions_on_historical(self, candles_data):
+    def scan_historical_setups(self, days=7):
+        """
+        Détecte les setups ZigZag/zone/divergence/englobante sur l'historique MT5
+        
+        Args:
+            days: Nombre de jours d'historique à analyser
+            
+        Returns:
+            pandas.DataFrame: Setups détectés (voir signal_scanner.scan_setups) ou None en cas d'erreur
+        """
+        self.logger.info(f"Scan des setups sur les {days} derniers jours")
+        
+        try:
+            candles = self._fetch_history(days)
+            if candles is None or len(candles) == 0:
+                self.logger.warning("Aucune donnée historique disponible")
+                return None
+            
+            account_info = self.mt5.get_account_info() or {}
+            params = {
+                "risk_percentage": self.risk_per_trade,
+                "account_balance": account_info.get("BALANCE", self.config.get("account_balance", 10000.0)),
+                "symbol_info": self.config.get("symbol_info")
+            }
+            params.update(self.config.get("scan_params", {}))
+            setups = scan_setups(candles, params)
+            
+            # Enregistrer les setups
+            historical_dir = self.data_dir / "historical" / self.instrument
+            historical_dir.mkdir(parents=True, exist_ok=True)
+            setups_path = historical_dir / f"setups_{self.main_timeframe}_{datetime.now().strftime('%Y%m%d')}.csv"
+            setups.to_csv(setups_path, index=False)
+            
+            self.logger.info(f"{len(setups)} setups détectés sur {len(candles)} bougies: {setups_path}")
+            return setups
+            
+        except Exception as e:
+            self.logger.error(f"Erreur lors du scan des setups: {e}")
+            return None
+    
+    def _load_bars(self, csv_path=None, start=None, end=None):
+        """
+        Bougies du timeframe principal pour le backtest et l'entraînement
+        
+        Un export CSV MT5 est d'abord ajouté au stockage des bougies; sans CSV, les bougies
+        sont lues dans le stockage.
+        
+        Args:
+            csv_path: Export CSV MT5 facultatif
+            start: Début de la période (inclus, None: début du CSV ou du stockage)
+            end: Fin de la période (exclue, None: fin du CSV ou du stockage)
+            
+        Returns:
+            pandas.DataFrame: Bougies indexées par le temps (format du connecteur MT5)
+        """
+        if csv_path:
+            # Heure du serveur MT5, comme les bougies du connecteur (voir bar_store)
+            csv_bars = load_mt5_csv(csv_path, server_tz=None)
+            written = self.bar_store.write(self.instrument, self.main_timeframe, csv_bars)
+            self.logger.info(f"{csv_path}: {written} nouvelles bougies stockées")
+            # Par défaut, la période de l'export
+            start = csv_bars.index[0] if start is None else start
+            end = csv_bars.index[-1] + pd.Timedelta(seconds=1) if end is None else end
+        bars = self.bar_store.read_frame(self.instrument, self.main_timeframe, start=start, end=end)
+        if bars.empty:
+            raise ValueError(f"Aucune bougie {self.instrument} {self.main_timeframe} dans le stockage")
+        return bars
+    
+    def run_backtest(self, csv_path=None, window=100, every=1, backtest_config=None, start=None, end=None):
+        """
+        Backteste le chemin prédiction/risque du trader en rejouant les bougies stockées
+        
+        Les indicateurs, les caractéristiques, le modèle d'imitation, le seuil de confiance,
+        les niveaux SL/TP et la taille de position sont ceux du trading live. Les SL/TP
+        sont exécutés intrabar avec le spread des bougies.
+        
+        Args:
+            csv_path: Export CSV MT5 du timeframe principal à ajouter au stockage (None: stockage seul)
+            window: Nombre de bougies fournies à chaque décision (comme _collect_market_data)
+            every: Prendre une décision toutes les N bougies
+            backtest_config: Paramètres du backtester (voir BACKTEST_DEFAULTS)
+            start: Début de la période (None: tout le CSV ou tout le stockage)
+            end: Fin de la période (exclue)
+            
+        Returns:
+            BacktestResult: Registre des trades, courbe d'équité et résumé, ou None en cas d'erreur
+        """
+        self.logger.info(f"Backtest de {self.instrument} sur {csv_path or 'le stockage des bougies'}")
+        
+        try:
+            config = {
+                "initial_balance": self.config.get("account_balance", 10000.0),
+                "risk_percentage": self.risk_per_trade,
+                "symbol_info": self.config.get("symbol_info")
+            }
+            config.update(backtest_config or {})
+            bars = self._load_bars(csv_path, start, end)
+            backtester = BarReplayBacktester(bars, config)
+            
+            def strategy(bt, t, balance):
+                market_data = MarketSnapshot(self.instrument)
+                market_data.set_candles(self.main_timeframe, bt.candles(t, window))
+                market_data.indicators = self._calculate_indicators(market_data.candles)
+                features = self._extract_features(market_data)
+                prediction = self.oba.imitation_manager.predict(features) if features else None
+                if not prediction or prediction.get("action") not in ["BUY", "SELL"]:
+                    return None
+                if max(prediction.get("confidences", {}).values() or [0]) < self.confidence_threshold:
+                    return None
+                
+                # Même prix d'entrée que _execute_trade: Ask pour un achat, Bid pour une vente
+                action = prediction["action"]
+                entry_price = bt.close[t] + bt.spread[t] if action == "BUY" else bt.close[t]
+                stop_loss, take_profit = self._trade_levels(action, entry_price, market_data["indicators"].get("atr14", 0))
+                return {"direction": action, "sl": stop_loss, "tp": take_profit,
+                        "size": self._position_size_for_balance(balance, entry_price, stop_loss)}
+            
+            # Les journaux par bougie (caractéristiques extraites) sont coupés pendant le rejeu
+            previous_level = self.logger.level
+            self.logger.setLevel(logging.WARNING)
+            try:
+                result = backtester.run_strategy(strategy, warmup=window - 1, every=every)
+            finally:
+                self.logger.setLevel(previous_level)
+            
+            # Enregistrer les résultats
+            backtest_dir = self.data_dir / "backtests" / self.instrument
+            period = f"{bars.index[0]:%Y%m%d%H%M}_{bars.index[-1]:%Y%m%d%H%M}"
+            paths = result.save(backtest_dir, prefix=f"{self.main_timeframe}_{period}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+            
+            summary = result.summary
+            self.logger.info(f"Backtest terminé: {summary['trades']} trades, profit net {summary['net_profit']:.2f}, "
+                             f"drawdown max {summary['max_drawdown_percent']:.2f}% ({paths['ledger']})")
+            return result
+            
+        except Exception as e:
+            self.logger.error(f"Erreur lors du backtest: {e}")
+            return None
+    
+    def run_walk_forward(self, csv_path=None, train_bars=20000, test_bars=5000, step=None, horizon=5,
+                         model_type="baseline", workers=None, time_budget=None, start=None, end=None):
+        """
+        Walk-forward du modèle d'imitation sur les bougies stockées
+        
+        Les caractéristiques de _extract_features sont calculées une seule fois sur tout l'historique,
+        l'étiquette d'une bougie est la direction du prix `horizon` bougies plus tard (comme
+        _simulate_predictions_on_historical). Un modèle est entraîné puis testé par fold.
+        
+        Args:
+            csv_path: Export CSV MT5 du timeframe principal à ajouter au stockage (None: stockage seul)
+            train_bars: Taille de la fenêtre d'entraînement (bougies)
+            test_bars: Taille de la fenêtre de test (bougies)
+            step: Décalage entre deux folds (None: test_bars)
+            horizon: Nombre de bougies après lesquelles la direction réelle est mesurée
+            model_type: Type de modèle (voir ImitationLearningManager.build_model)
+            workers: Nombre de processus (None: tous les cœurs)
+            time_budget: Durée maximale de l'étude en secondes
+            start: Début de la période (None: tout le CSV ou tout le stockage)
+            end: Fin de la période (exclue)
+            
+        Returns:
+            pandas.DataFrame: Résultats par fold, ou None en cas d'erreur
+        """
+        self.logger.info(f"Walk-forward du modèle {model_type} sur {csv_path or 'le stockage des bougies'}")
+        
+        try:
+            candles = self._load_bars(csv_path, start, end)
+            columns = self._calculate_indicator_columns(candles)
+            features = self._extract_feature_columns(columns)
+            
+            # Bougies disposant de 50 bougies d'historique et de `horizon` bougies futures
+            positions = np.arange(49, len(candles) - horizon)
+            names = sorted(features)
+            matrix = np.column_stack([features[name][positions] for name in names]).astype(float)
+            close = columns['close']
+            labels = np.where(close[positions + horizon] > close[positions], "BUY", "SELL")
+            
+            walk_forward_dir = self.data_dir / "walk_forward" / self.instrument
+            walk_forward_dir.mkdir(parents=True, exist_ok=True)
+            period = f"{candles.index[0]:%Y%m%d%H%M}_{candles.index[-1]:%Y%m%d%H%M}"
+            output_path = walk_forward_dir / f"{self.main_timeframe}_{period}_{model_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            
+            results = run_model_walk_forward(matrix, labels, train_bars, test_bars, step=step, model_type=model_type,
+                                             workers=workers, time_budget=time_budget, index=candles.index[positions],
+                                             output_path=str(output_path))
+            if not results.empty:
+                summary = summarize_folds(results, ["train_accuracy", "test_accuracy"])
+                self.logger.info(f"Walk-forward terminé: {len(results)} folds, précision test moyenne "
+                                 f"{summary.loc['test_accuracy', 'mean']:.2%} (entraînement: "
+                                 f"{summary.loc['train_accuracy', 'mean']:.2%})")
+            return results
+            
+        except Exception as e:
+            self.logger.error(f"Erreur lors du walk-forward: {e}")
+            return None
+    
+    def _calculate_indicator_columns(self, candles):
+        """
+        Calcule en une passe, pour chaque bougie de l'historique, les indicateurs de _calculate_indicators
+        
+        La valeur à la position t est celle que _calculate_indicators donnerait sur une fenêtre
+        d'au moins 50 bougies se terminant en t.
+        
+        Args:
+            candles: DataFrame des bougies (colonnes open, high, low, close, tick_volume optionnelle)
+            
+        Returns:
+            dict: Colonnes NumPy des indicateurs (une valeur par bougie)
+        """
+        open_ = candles['open'].to_numpy(dtype=float)
+        high = candles['high'].to_numpy(dtype=float)
+        low = candles['low'].to_numpy(dtype=float)
+        close = candles['close'].to_numpy(dtype=float)
+        
+        ma20 = indicator_engine.sma(close, 20)
+        ma50 = indicator_engine.sma(close, 50)
+        atr14 = indicator_engine.atr(high, low, close, 14, wilder=False)
+        columns = {
+            'close': close,
+            'ma20': ma20,
+            'ma50': ma50,
+            'trend_up': (close > ma20) & (ma20 > ma50),
+            'trend_down': (close < ma20) & (ma20 < ma50),
+            'price_vs_ma20': (close / ma20 - 1) * 100,
+            'ma20_vs_ma50': (ma20 / ma50 - 1) * 100,
+            'atr14': atr14,
+            'atr14_percent': atr14 / close * 100,
+            'roc14': indicator_engine.roc(close, 14)
+        }
+        
+        # Variation sur 5 bougies (close[-1] - close[-5] dans _calculate_indicators)
+        price_change = np.full(len(close), np.nan)
+        price_change[4:] = close[4:] - close[:-4]
+        columns['price_change_5'] = price_change
+        
+        if 'tick_volume' in candles.columns:
+            volume = candles['tick_volume'].to_numpy(dtype=float)
+            volume_change = np.full(len(volume), np.nan)
+            volume_change[4:] = volume[4:] - volume[:-4]
+            columns['divergence_bearish'] = (price_change > 0) & (volume_change < 0)
+            columns['divergence_bullish'] = (price_change < 0) & (volume_change < 0)
+        
+        # Marteau / étoile filante simplifiés
+        body_size = np.abs(close - open_)
+        wick_size = np.maximum(high - np.maximum(open_, close), np.minimum(open_, close) - low)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pattern = (body_size > 0) & (wick_size / body_size > 2)
+        columns['pattern_hammer'] = pattern & (close > open_)
+        columns['pattern_shooting_star'] = pattern & ~(close > open_)
+        
+        return columns
+    
+    def _extract_feature_columns(self, columns):
+        """
+        Version colonnes de _extract_features: une colonne 0/1 par caractéristique
+        
+        Args:
+            columns: Colonnes d'indicateurs de _calculate_indicator_columns
+            
+        Returns:
+            dict: {nom de caractéristique: tableau booléen (une valeur par bougie)}
+        """
+        n = len(columns['close'])
+        trend_up, trend_down = columns['trend_up'], columns['trend_down']
+        features = {
+            'trend_up': trend_up,
+            'trend_down': trend_down,
+            'trend_neutral': ~(trend_up | trend_down),
+            'price_above_ma20': columns['price_vs_ma20'] > 0,
+            'price_below_ma20': ~(columns['price_vs_ma20'] > 0),
+            'ma20_above_ma50': columns['ma20_vs_ma50'] > 0,
+            'ma20_below_ma50': ~(columns['ma20_vs_ma50'] > 0),
+            'positive_momentum': columns['roc14'] > 0,
+            'negative_momentum': ~(columns['roc14'] > 0),
+            'high_volatility': columns['atr14_percent'] > 1.0,  # Plus de 1% de volatilité
+            'low_volatility': ~(columns['atr14_percent'] > 1.0),
+            'pattern_possible_hammer': columns['pattern_hammer'],
+            'pattern_possible_shooting_star': columns['pattern_shooting_star'],
+            'recent_trend_up': columns['price_change_5'] > 0,
+            'recent_trend_down': ~(columns['price_change_5'] > 0),
+            f"instrument_{self.instrument.lower()}": np.ones(n, dtype=bool),
+            f"timeframe_{self.main_timeframe.lower()}": np.ones(n, dtype=bool)
+        }
+        
+        if 'divergence_bearish' in columns:
+            bearish, bullish = columns['divergence_bearish'], columns['divergence_bullish']
+            features['divergence_bearish'] = bearish
+            features['divergence_bullish'] = bullish
+            features['divergence_none'] = ~(bearish | bullish)
+        
+        return features
+    
+    def _simulate_predictions_on_historical(self, candles_data, window=50, horizon=5):
         """
         Simule des prédictions sur des données historiques
         
+        Les indicateurs et caractéristiques sont calculés une seule fois sur tout l'historique,
+        puis le modèle est appelé une seule fois sur la matrice des caractéristiques.
+        
         Args:
-            candles_data: Liste des données de bougies historiques
+            candles_data: DataFrame ou liste des données de bougies historiques
+            window: Nombre minimal de bougies d'historique avant la première prédiction
+            horizon: Nombre de bougies après lesquelles la direction réelle est mesurée
             
         Returns:
             dict: Résultats des prédictions
@@ -1183,61 +1661,54 @@ class AkobenTrader:
         }
         
         try:
-            # Parcourir les bougies (sauf les dernières)
-            for i in range(len(candles_data) - 10):
-                # Créer un sous-ensemble de candles pour l'analyse
-                subset = candles_data[i:i+50]  # Prendre 50 bougies
-                
-                # Créer des données de marché simulées
-                market_data = {
-                    "instrument": self.instrument,
-                    "timestamp": subset[-1]["time"],
-                    "current_price": {
-                        "bid": subset[-1]["close"],
-                        "ask": subset[-1]["close"] + (subset[-1]["high"] - subset[-1]["low"]) * 0.1,
-                        "spread": (subset[-1]["high"] - subset[-1]["low"]) * 0.1
-                    },
-                    "candles": {
-                        self.main_timeframe: subset
-                    }
+            candles = candles_data if isinstance(candles_data, pd.DataFrame) else pd.DataFrame(candles_data)
+            
+            # Bougies disposant de `window` bougies d'historique et de `horizon` bougies futures
+            positions = np.arange(window - 1, len(candles) - horizon)
+            if len(positions) == 0:
+                self.logger.warning("Historique trop court pour simuler des prédictions")
+                return results
+            
+            columns = self._calculate_indicator_columns(candles)
+            features = {name: values[positions] for name, values in self._extract_feature_columns(columns).items()}
+            
+            # Une seule prédiction pour toutes les bougies
+            batch = self.oba.imitation_manager.predict_batch(features, len(positions))
+            if batch is None:
+                self.logger.warning("Aucune prédiction générée")
+                return results
+            
+            # Direction réelle: le prix a-t-il monté `horizon` bougies plus tard ?
+            close = columns['close']
+            current_prices = close[positions]
+            future_prices = close[positions + horizon]
+            actual_directions = np.where(future_prices > current_prices, "BUY", "SELL")
+            actions = np.asarray(batch["actions"], dtype=object)
+            correct = actions == actual_directions
+            confidences = batch["confidences"]
+            max_confidences = np.max(np.vstack(list(confidences.values())), axis=0) if confidences else np.zeros(len(positions))
+            
+            times = candles['time'] if 'time' in candles.columns else candles.index
+            timestamps = [t.isoformat() if isinstance(t, pd.Timestamp) else t for t in np.asarray(times, dtype=object)[positions]]
+            
+            # Enregistrer les prédictions
+            results["predictions"] = [
+                {
+                    "timestamp": timestamp,
+                    "predicted_action": action,
+                    "predicted_confidence": confidence,
+                    "actual_direction": actual,
+                    "correct": is_correct,
+                    "price_at_prediction": current_price,
+                    "future_price": future_price,
+                    "price_change": future_price - current_price
                 }
-                
-                # Calculer les indicateurs
-                market_data["indicators"] = self._calculate_indicators(market_data["candles"])
-                
-                # Extraire les caractéristiques
-                features = self._extract_features(market_data)
-                
-                # Faire une prédiction
-                prediction = self.oba.imitation_manager.predict(features)
-                
-                if prediction:
-                    # Déterminer la direction réelle
-                    # La direction est considérée comme correcte si le prix se déplace dans cette direction
-                    # dans les 5 bougies suivantes
-                    future_price = candles_data[i+5]["close"] if i+5 < len(candles_data) else None
-                    current_price = subset[-1]["close"]
-                    
-                    if future_price is not None:
-                        actual_direction = "BUY" if future_price > current_price else "SELL"
-                        prediction_correct = prediction["action"] == actual_direction
-                        
-                        # Enregistrer la prédiction
-                        prediction_result = {
-                            "timestamp": subset[-1]["time"],
-                            "predicted_action": prediction["action"],
-                            "predicted_confidence": max(prediction.get("confidences", {}).values() or [0]),
-                            "actual_direction": actual_direction,
-                            "correct": prediction_correct,
-                            "price_at_prediction": current_price,
-                            "future_price": future_price,
-                            "price_change": future_price - current_price
-                        }
-                        
-                        results["predictions"].append(prediction_result)
-                        results["total_predictions"] += 1
-                        if prediction_correct:
-                            results["correct_predictions"] += 1
+                for timestamp, action, confidence, actual, is_correct, current_price, future_price in zip(
+                    timestamps, actions.tolist(), max_confidences.tolist(), actual_directions.tolist(),
+                    correct.tolist(), current_prices.tolist(), future_prices.tolist())
+            ]
+            results["total_predictions"] = len(positions)
+            results["correct_predictions"] = int(correct.sum())
             
             # Calculer la précision
             if results["total_predictions"] > 0:
@@ -1253,6 +1724,7 @@ class AkobenTrader:
             return results
 
 
+
 def parse_arguments():
     """
     Parse les arguments de ligne de commande
@@ -1289,6 +1761,21 @@ def parse_arguments():
     parser.add_argument('--reprocess', action='store_true',
                         help='Retraiter les données historiques pour l\'entraînement')
     
+    parser.add_argument('--scan-setups', action='store_true',
+                        help='Détecter les setups de signal sur les données historiques')
+    
+    parser.add_argument('--backtest', type=str, nargs='?', const='', default=None, metavar='CSV',
+                        help='Backtester le trader sur les bougies stockées (après import d\'un export CSV MT5 facultatif)')
+    
+    parser.add_argument('--walk-forward', type=str, nargs='?', const='', default=None, metavar='CSV',
+                        help='Walk-forward du modèle d\'imitation sur les bougies stockées (après import d\'un CSV facultatif)')
+    
+    parser.add_argument('--wf-train', type=int, default=20000,
+                        help='Fenêtre d\'entraînement du walk-forward en bougies (par défaut: 20000)')
+    
+    parser.add_argument('--wf-test', type=int, default=5000,
+                        help='Fenêtre de test du walk-forward en bougies (par défaut: 5000)')
+    
     parser.add_argument('--days', type=int, default=7,
                         help='Nombre de jours d\'historique à retraiter (par défaut: 7)')
     
@@ -1320,6 +1807,21 @@ def main():
     # Créer l'instance du trader
     trader = AkobenTrader(config)
     
+    # Scanner les setups historiques si demandé
+    if args['scan_setups']:
+        trader.scan_historical_setups(days=args['days'])
+        return
+    
+    # Backtester sur un export CSV si demandé
+    if args['backtest'] is not None:
+        trader.run_backtest(args['backtest'] or None)
+        return
+    
+    # Walk-forward du modèle si demandé
+    if args['walk_forward'] is not None:
+        trader.run_walk_forward(args['walk_forward'] or None, train_bars=args['wf_train'], test_bars=args['wf_test'])
+        return
+    
     # Retraiter les données historiques si demandé
     if args['reprocess']:
         trader.reprocess_historical_data(days=args['days'])
@@ -1330,4 +1832,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,206 @@
+"""
+Connecteur MT5 asynchrone (asyncio)
+Plusieurs commandes peuvent être en cours en même temps et attendues ensemble
+(asyncio.gather): chaque commande reçoit un ID et un futur dans la table des requêtes en
+attente, et une seule tâche de lecture échange avec l'EA. Les commandes arrivées pendant un
+aller-retour partent ensemble au suivant, dans un lot BATCH, et les réponses sont rendues
+à leurs futurs d'après leur ID. Les ordres (ORDER, CLOSE_*) partent seuls: les lectures
+déjà en file sont envoyées avant, puis l'ordre dans son propre aller-retour.
+
+Les méthodes (get_current_price, get_data, place_order...) réutilisent l'analyse des
+réponses de MT5FileConnector, exécutée dans un thread.
+
+Usage:
+    async with AsyncMT5Connector() as mt5:
+        price, candles, positions = await asyncio.gather(
+            mt5.get_current_price("US30"), mt5.get_data("US30", "M1", 100), mt5.get_positions("US30"))
+"""
+
+import asyncio
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from src.agents.execution.mt5_connector import MT5FileConnector
+
+# Commandes jamais regroupées dans un lot BATCH (voir docs/components/mt5_bridge_protocol.md)
+ORDER_COMMANDS = ("ORDER", "CLOSE_POSITION", "CLOSE_ALL_POSITIONS")
+
+
+class _RoutedConnector(MT5FileConnector):
+    """MT5FileConnector dont les commandes passent par la table des requêtes du connecteur asynchrone."""
+
+    def __init__(self, owner, config=None):
+        super().__init__(config)
+        self._owner = owner
+
+    def send_command(self, command, timeout=None):
+        return self._owner._send_from_thread(command, timeout)
+
+
+class AsyncMT5Connector:
+    """
+    Connecteur MT5 asynchrone: mêmes méthodes que MT5FileConnector, en coroutines.
+    """
+
+    def __init__(self, config=None, max_batch=32):
+        """
+        Args:
+            config: Configuration de MT5FileConnector (files_dir, timeout, response_wait...)
+            max_batch: Nombre maximal de commandes par aller-retour
+        """
+        self.connector = _RoutedConnector(self, config)
+        self.max_batch = max_batch
+        self._pending = {}      # ID de commande -> futur de la réponse
+        self._queue = []        # (ID, commande, timeout) pas encore envoyées
+        self._wakeup = None
+        self._reader = None
+        self._loop = None
+        # Un seul thread d'échange avec les fichiers (indépendant des threads d'analyse)
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mt5-io")
+        self.stats = {"commands": 0, "round_trips": 0}
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.disconnect()
+
+    def _start_reader(self):
+        if self._reader is None or self._reader.done():
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._reader = self._loop.create_task(self._read_loop())
+
+    async def _read_loop(self):
+        """Tâche de lecture: envoie les commandes en attente et distribue les réponses par ID."""
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            batch = self._next_batch()
+            commands = {command_id: command for command_id, command, _ in batch}
+            timeouts = [timeout for _, _, timeout in batch if timeout]
+            try:
+                responses = await self._loop.run_in_executor(
+                    self._io, self.connector.send_tagged, commands, max(timeouts) if timeouts else None)
+            except Exception as e:
+                responses = {command_id: f"ERROR: {str(e)}" for command_id in commands}
+            self.stats["round_trips"] += 1
+            for command_id in commands:
+                future = self._pending.pop(command_id, None)
+                if future is not None and not future.done():
+                    future.set_result(responses.get(command_id, "ERROR: MISSING RESPONSE"))
+
+    def _next_batch(self):
+        """Retire de la file les commandes du prochain aller-retour (un ordre part seul)."""
+        batch = []
+        for item in self._queue[:self.max_batch]:
+            if item[1].split(" ", 1)[0] in ORDER_COMMANDS:
+                # Lectures déjà en file envoyées d'abord, l'ordre au tour suivant
+                if not batch:
+                    batch.append(item)
+                break
+            batch.append(item)
+        self._queue = self._queue[len(batch):]
+        return batch
+
+    async def send_command(self, command, timeout=None):
+        """
+        Envoie une commande à MT5 et attend sa réponse
+
+        Args:
+            command: Commande à envoyer
+            timeout: Délai d'attente en secondes (utilise la valeur par défaut si None)
+
+        Returns:
+            str: Réponse du serveur ou message d'erreur
+        """
+        self._start_reader()
+        command_id = str(uuid.uuid4())[:8]
+        future = self._loop.create_future()
+        self._pending[command_id] = future
+        self._queue.append((command_id, command, timeout))
+        self.stats["commands"] += 1
+        self._wakeup.set()
+        return await future
+
+    async def send_batch(self, commands, timeout=None):
+        """
+        Envoie plusieurs commandes et attend toutes les réponses
+
+        Returns:
+            list: Réponses dans l'ordre des commandes
+        """
+        return list(await asyncio.gather(*(self.send_command(command, timeout) for command in commands)))
+
+    def _send_from_thread(self, command, timeout=None):
+        """send_command appelé depuis un thread d'analyse (méthodes de MT5FileConnector)."""
+        return asyncio.run_coroutine_threadsafe(self.send_command(command, timeout), self._loop).result()
+
+    async def _call(self, method, *args, **kwargs):
+        self._start_reader()
+        return await asyncio.to_thread(method, *args, **kwargs)
+
+    async def _run_io(self, method, *args):
+        """Exécute une méthode du connecteur dans le thread d'échange avec les fichiers."""
+        self._start_reader()
+        return await self._loop.run_in_executor(self._io, method, *args)
+
+    async def connect(self):
+        """Vérifie que l'EA est prêt (fichier de réponse READY)."""
+        return await self._run_io(self.connector.connect)
+
+    async def disconnect(self):
+        """Arrête la tâche de lecture et se déconnecte (le connecteur n'est plus utilisable ensuite)."""
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+        for future in self._pending.values():
+            if not future.done():
+                future.set_result("ERROR: DISCONNECTED")
+        self._pending.clear()
+        self._queue.clear()
+        await asyncio.get_running_loop().run_in_executor(self._io, self.connector.disconnect)
+        self._io.shutdown(wait=False)
+
+    async def get_account_info(self):
+        return await self._call(self.connector.get_account_info)
+
+    async def get_current_price(self, symbol):
+        return await self._call(self.connector.get_current_price, symbol)
+
+    async def get_data(self, symbol, timeframe, count=500):
+        return await self._call(self.connector.get_data, symbol, timeframe, count)
+
+    async def get_rates(self, symbol, timeframe, count=500):
+        return await self._call(self.connector.get_rates, symbol, timeframe, count)
+
+    async def get_rates_range(self, symbol, timeframe, start, end):
+        return await self._call(self.connector.get_rates_range, symbol, timeframe, start, end)
+
+    async def place_order(self, symbol, order_type, volume, price=0.0, sl=0.0, tp=0.0, comment="", magic=0):
+        return await self._call(self.connector.place_order, symbol, order_type, volume, price, sl, tp, comment, magic)
+
+    async def close_position(self, position_id=None, symbol=None):
+        return await self._call(self.connector.close_position, position_id, symbol)
+
+    async def close_all_positions(self):
+        return await self._call(self.connector.close_all_positions)
+
+    async def get_positions(self, symbol=None):
+        return await self._call(self.connector.get_positions, symbol)
+
+    async def calculate_position_size(self, symbol, stop_loss_pips, risk_percent):
+        return await self._call(self.connector.calculate_position_size, symbol, stop_loss_pips, risk_percent)
+
+    async def get_history_orders(self, days=7, symbol=None):
+        return await self._call(self.connector.get_history_orders, days, symbol)
+
+    async def calculate_performance_metrics(self, days=30, symbol=None):
+        return await self._call(self.connector.calculate_performance_metrics, days, symbol)
@@ -0,0 +1,128 @@
+"""
+Cache des réponses du connecteur MT5 avec durée de validité par commande
+Évite les allers-retours redondants avec l'EA au cours d'un même cycle (solde demandé par
+les statistiques après le calcul de taille de position, prix redemandé par la simulation
+des trades juste après la collecte...).
+
+- Chaque méthode de lecture a sa durée de validité (TTL, secondes); une réponse en cache
+  est réutilisée pour les mêmes arguments tant qu'elle est valide.
+- Les réponses en échec (None) ne sont pas gardées.
+- Chaque appel rend une copie profonde: un appelant qui annote une position ou le dict du
+  compte (Fihavanana.perceive, le trader) ne modifie pas la réponse lue par les suivants.
+- place_order, close_position et close_all_positions invalident les positions, le compte
+  et l'historique (avant et après l'ordre).
+- Toute autre méthode est transmise telle quelle au connecteur.
+"""
+
+import copy
+import time
+
+# Durée de validité par méthode (secondes)
+DEFAULT_TTLS = {
+    "get_current_price": 2.0,
+    "get_account_info": 10.0,
+    "get_positions": 5.0,
+    "get_history_orders": 10.0,
+    "calculate_position_size": 10.0,
+    "calculate_performance_metrics": 60.0,
+}
+
+# Méthodes qui modifient le compte, et réponses qu'elles rendent obsolètes
+INVALIDATED_BY_ORDERS = ("get_account_info", "get_positions", "get_history_orders",
+                         "calculate_position_size", "calculate_performance_metrics")
+
+
+class CachedMT5Connector:
+    """
+    Connecteur MT5 avec cache des lectures (même interface que MT5FileConnector).
+    """
+
+    def __init__(self, connector, ttls: dict | None = None, clock=time.monotonic):
+        """
+        Args:
+            connector: Connecteur MT5 (MT5FileConnector ou compatible)
+            ttls: Durées de validité par méthode, fusionnées avec DEFAULT_TTLS (0: pas de cache)
+            clock: Horloge en secondes (remplaçable pour les tests)
+        """
+        self.connector = connector
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.clock = clock
+        self._entries = {}
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def __getattr__(self, name):
+        # Méthodes non mises en cache (connect, send_command, get_data, prefetch...)
+        if name == "connector":
+            raise AttributeError(name)
+        return getattr(self.connector, name)
+
+    def _cached(self, method: str, *args):
+        ttl = self.ttls.get(method, 0)
+        key = (method, args)
+        entry = self._entries.get(key)
+        now = self.clock()
+        if entry is not None and now - entry[0] < ttl:
+            self.stats["hits"] += 1
+            return copy.deepcopy(entry[1])
+
+        self.stats["misses"] += 1
+        result = getattr(self.connector, method)(*args)
+        if result is not None and ttl > 0:
+            self._entries[key] = (now, result)
+        return copy.deepcopy(result)
+
+    def invalidate(self, *methods):
+        """
+        Supprime les réponses en cache.
+
+        Args:
+            methods: Méthodes à invalider (toutes si aucune)
+        """
+        self.stats["invalidations"] += 1
+        if not methods:
+            self._entries.clear()
+            return
+        for key in [key for key in self._entries if key[0] in methods]:
+            del self._entries[key]
+
+    def _order(self, method: str, *args, **kwargs):
+        self.invalidate(*INVALIDATED_BY_ORDERS)
+        try:
+            return getattr(self.connector, method)(*args, **kwargs)
+        finally:
+            self.invalidate(*INVALIDATED_BY_ORDERS)
+
+    # --- Lectures mises en cache ---
+
+    def get_current_price(self, symbol):
+        return self._cached("get_current_price", symbol)
+
+    def get_account_info(self):
+        return self._cached("get_account_info")
+
+    def get_positions(self, symbol=None):
+        return self._cached("get_positions", symbol)
+
+    def get_history_orders(self, days=7, symbol=None):
+        return self._cached("get_history_orders", days, symbol)
+
+    def calculate_position_size(self, symbol, stop_loss_pips, risk_percent):
+        return self._cached("calculate_position_size", symbol, stop_loss_pips, risk_percent)
+
+    def calculate_performance_metrics(self, days=30, symbol=None):
+        return self._cached("calculate_performance_metrics", days, symbol)
+
+    # --- Ordres (invalidation) ---
+
+    def place_order(self, *args, **kwargs):
+        return self._order("place_order", *args, **kwargs)
+
+    def close_position(self, *args, **kwargs):
+        return self._order("close_position", *args, **kwargs)
+
+    def close_all_positions(self):
+        return self._order("close_all_positions")
+
+    def disconnect(self):
+        self.invalidate()
+        return self.connector.disconnect()
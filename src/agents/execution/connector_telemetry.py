@@ -0,0 +1,254 @@
+"""
+Mesures du pont fichiers MT5 par type de commande
+Latences (histogrammes à seaux logarithmiques, style HDR), timeouts, erreurs, réponses
+d'ID non correspondant et octets échangés, pour voir quelles commandes dominent la durée
+d'un cycle.
+
+- Histogramme: valeurs en microsecondes, 16 seaux par puissance de 2 (précision relative
+  ~6 %), mémoire fixe, enregistrement en temps constant; percentiles par cumul des seaux.
+- snapshot(): état courant (dict JSON), types triés par temps total passé.
+- Écriture périodique facultative: une ligne JSON par snapshot (dump_path, dump_interval).
+
+Usage:
+    telemetry = connector.telemetry
+    print(format_snapshot(telemetry.snapshot()))
+"""
+
+import json
+import threading
+import time
+from datetime import datetime
+
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+# Percentiles rapportés par snapshot()
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram:
+    """
+    Histogramme de latences à seaux log-linéaires (secondes en entrée, microsecondes en interne).
+    """
+
+    def __init__(self, max_seconds: float = 60.0):
+        """
+        Args:
+            max_seconds: Plus grande latence distinguée (les valeurs au-delà vont dans le dernier seau)
+        """
+        self.max_value = int(max_seconds * 1e6)
+        self.counts = [0] * (self._index(self.max_value) + 1)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    @staticmethod
+    def _index(value: int) -> int:
+        if value < SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - SUB_BUCKET_BITS - 1
+        return SUB_BUCKETS * (shift + 1) + (value >> shift) - SUB_BUCKETS
+
+    @staticmethod
+    def _highest_value(index: int) -> int:
+        """Plus grande valeur (microsecondes) du seau."""
+        if index < SUB_BUCKETS:
+            return index
+        shift = index // SUB_BUCKETS - 1
+        top = SUB_BUCKETS + index % SUB_BUCKETS
+        return ((top + 1) << shift) - 1
+
+    def record(self, seconds: float):
+        value = max(0, int(seconds * 1e6))
+        self.counts[self._index(min(value, self.max_value))] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Latence sous laquelle se trouvent `percent` % des mesures (borne haute du seau).
+
+        Args:
+            percent: Percentile (0-100)
+
+        Returns:
+            float: Secondes (0 sans mesure)
+        """
+        if self.count == 0:
+            return 0.0
+        target = max(1, int(percent / 100 * self.count + 0.5))
+        cumulated = 0
+        for index, count in enumerate(self.counts):
+            cumulated += count
+            if cumulated >= target:
+                # Dernier seau: valeurs au-delà de max_seconds, seul le maximum est exact
+                if index == len(self.counts) - 1:
+                    return self.max / 1e6
+                return min(self._highest_value(index), self.max) / 1e6
+        return self.max / 1e6
+
+    def to_dict(self) -> dict:
+        summary = {"count": self.count, "mean": self.total / self.count / 1e6 if self.count else 0.0,
+                   "min": (self.min or 0) / 1e6, "max": self.max / 1e6}
+        for percent in PERCENTILES:
+            summary[f"p{percent:g}".replace(".", "")] = self.percentile(percent)
+        return summary
+
+
+class ConnectorTelemetry:
+    """
+    Compteurs et histogrammes de latence par type de commande (PRICE, DATA, BATCH...).
+    """
+
+    def __init__(self, dump_path=None, dump_interval: float = 60.0, clock=time.monotonic):
+        """
+        Args:
+            dump_path: Fichier JSON Lines des snapshots périodiques (None: pas d'écriture)
+            dump_interval: Intervalle entre deux snapshots écrits (secondes)
+            clock: Horloge monotone (remplaçable pour les tests)
+        """
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Remet tous les compteurs à zéro."""
+        with self._lock:
+            self.commands = {}
+            self.id_mismatches = 0
+            self.started_at = self.clock()
+            self._last_dump = self.started_at
+            self._last_mismatch = None
+
+    def _entry(self, command_type: str) -> dict:
+        entry = self.commands.get(command_type)
+        if entry is None:
+            entry = self.commands[command_type] = {
+                "latency": LatencyHistogram(), "timeouts": 0, "errors": 0, "prefetched": 0,
+                "batched": 0, "bytes_sent": 0, "bytes_received": 0,
+            }
+        return entry
+
+    @staticmethod
+    def command_type(command: str) -> str:
+        """Type d'une commande: son premier mot (ex: 'DATA US30.cash M1 500' -> 'DATA')."""
+        return command.split(" ", 1)[0].upper() if command else ""
+
+    def record(self, command_type: str, seconds: float, response: str | None,
+               bytes_sent: int = 0, bytes_received: int = 0):
+        """
+        Enregistre un aller-retour avec l'EA.
+
+        Args:
+            command_type: Type de commande (voir command_type)
+            seconds: Durée de l'aller-retour
+            response: Réponse (None: timeout; 'ERROR...': erreur)
+            bytes_sent: Taille de la requête écrite
+            bytes_received: Taille de la réponse lue
+        """
+        with self._lock:
+            entry = self._entry(command_type)
+            entry["latency"].record(seconds)
+            entry["bytes_sent"] += bytes_sent
+            entry["bytes_received"] += bytes_received
+            if response is None:
+                entry["timeouts"] += 1
+            elif response.startswith("ERROR"):
+                entry["errors"] += 1
+
+    def count(self, command_type: str, counter: str):
+        """
+        Incrémente un compteur sans aller-retour propre ('prefetched': réponse obtenue
+        par prefetch, 'batched': commande envoyée dans un lot, 'errors').
+        """
+        with self._lock:
+            self._entry(command_type)[counter] += 1
+
+    def id_mismatch(self, expected_id: str, received_id: str):
+        """Réponse d'un autre ID lue à la place de la réponse attendue (comptée une fois par paire)."""
+        with self._lock:
+            if self._last_mismatch != (expected_id, received_id):
+                self._last_mismatch = (expected_id, received_id)
+                self.id_mismatches += 1
+
+    def snapshot(self) -> dict:
+        """
+        État courant des mesures.
+
+        Returns:
+            dict: elapsed, id_mismatches, totaux et {type: compteurs, latences en secondes,
+                  part du temps total} trié par temps total décroissant
+        """
+        with self._lock:
+            elapsed = self.clock() - self.started_at
+            commands = {}
+            for command_type, entry in self.commands.items():
+                latency = entry["latency"]
+                commands[command_type] = {
+                    **latency.to_dict(),
+                    "total_seconds": latency.total / 1e6,
+                    **{key: value for key, value in entry.items() if key != "latency"},
+                }
+            busy = sum(c["total_seconds"] for c in commands.values())
+            for summary in commands.values():
+                summary["share"] = summary["total_seconds"] / busy if busy else 0.0
+            return {
+                "timestamp": datetime.now().isoformat(),
+                "elapsed": elapsed,
+                "round_trips": sum(c["count"] for c in commands.values()),
+                "busy_seconds": busy,
+                "timeouts": sum(c["timeouts"] for c in commands.values()),
+                "id_mismatches": self.id_mismatches,
+                "bytes_sent": sum(c["bytes_sent"] for c in commands.values()),
+                "bytes_received": sum(c["bytes_received"] for c in commands.values()),
+                "commands": dict(sorted(commands.items(), key=lambda item: -item[1]["total_seconds"])),
+            }
+
+    def dump(self, path=None) -> dict:
+        """
+        Ajoute le snapshot courant (une ligne JSON) au fichier des snapshots.
+
+        Args:
+            path: Fichier (None: dump_path)
+
+        Returns:
+            dict: Snapshot écrit
+        """
+        snapshot = self.snapshot()
+        with open(path or self.dump_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(snapshot) + "\n")
+        self._last_dump = self.clock()
+        return snapshot
+
+    def maybe_dump(self) -> bool:
+        """Écrit un snapshot si dump_path est défini et que dump_interval est écoulé."""
+        if self.dump_path is None or self.clock() - self._last_dump < self.dump_interval:
+            return False
+        self.dump()
+        return True
+
+
+def format_snapshot(snapshot: dict) -> str:
+    """
+    Tableau texte d'un snapshot (une ligne par type de commande).
+
+    Args:
+        snapshot: Résultat de ConnectorTelemetry.snapshot()
+
+    Returns:
+        str: Tableau
+    """
+    lines = [f"{'commande':<16}{'n':>7}{'part':>7}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+             f"{'timeouts':>9}{'erreurs':>8}{'Ko reçus':>10}"]
+    for command_type, c in snapshot["commands"].items():
+        lines.append(f"{command_type:<16}{c['count']:>7}{c['share']:>7.0%}{c['p50'] * 1000:>9.2f}"
+                     f"{c['p99'] * 1000:>9.2f}{c['max'] * 1000:>9.2f}{c['timeouts']:>9}{c['errors']:>8}"
+                     f"{c['bytes_received'] / 1024:>10.1f}")
+    lines.append(f"{snapshot['round_trips']} allers-retours, {snapshot['busy_seconds'] * 1000:.0f} ms d'attente, "
+                 f"{snapshot['timeouts']} timeouts, {snapshot['id_mismatches']} ID non correspondants")
+    return "\n".join(lines)
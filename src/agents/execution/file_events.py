@@ -0,0 +1,183 @@
+"""
+Attente d'événements sur les fichiers d'échange avec MT5
+Réveille l'attente d'une réponse dès qu'un fichier du dossier d'échange est écrit, au
+lieu d'une boucle time.sleep(0.1):
+
+- 'watchfiles': notifications du système via watchfiles (si installé)
+- 'inotify': inotify Linux appelé directement (ctypes), sans dépendance
+- 'poll': relecture périodique (intervalle croissant de poll_interval à max_poll_interval)
+
+Avec 'auto', le premier mécanisme disponible est utilisé. Dans tous les cas, la condition
+est aussi revérifiée au moins toutes les max_poll_interval secondes (un événement manqué
+ne bloque pas l'attente).
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+try:
+    import watchfiles
+except ImportError:
+    watchfiles = None
+
+WAIT_BACKENDS = ("auto", "watchfiles", "inotify", "poll")
+
+# inotify(7)
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _InotifyWatch:
+    """Surveillance inotify d'un dossier (écritures terminées et renommages)."""
+
+    def __init__(self, directory: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        # Fichier refermé ou renommé: écriture terminée (pas de lecture d'une réponse partielle)
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"inotify_add_watch {directory}")
+
+    def wait(self, timeout: float, names: set) -> bool:
+        """Attend un événement sur l'un des fichiers `names` (True) ou la fin du délai (False)."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            ready, _, _ = select.select([self.fd], [], [], max(0.0, remaining))
+            if not ready:
+                return False
+            if self._drain(names):
+                return True
+            if remaining <= 0:
+                return False
+
+    def _drain(self, names: set) -> bool:
+        matched = False
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return False
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b"\0")
+            matched = matched or os.fsdecode(name) in names
+            offset += _EVENT_HEADER.size + length
+        return matched
+
+    def close(self):
+        os.close(self.fd)
+
+
+class _WatchfilesWatch:
+    """Surveillance via watchfiles dans un thread, qui signale les changements à l'attente."""
+
+    def __init__(self, directory: str):
+        self._changed = threading.Condition()
+        self._changes = set()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(directory,), daemon=True)
+        self._thread.start()
+
+    def _run(self, directory: str):
+        for changes in watchfiles.watch(directory, debounce=0, step=1, stop_event=self._stop,
+                                        raise_interrupt=False):
+            with self._changed:
+                self._changes.update(os.path.basename(path) for _, path in changes)
+                self._changed.notify_all()
+
+    def wait(self, timeout: float, names: set) -> bool:
+        with self._changed:
+            if not self._changes & names:
+                self._changed.wait(timeout)
+            matched = bool(self._changes & names)
+            self._changes.clear()
+            return matched
+
+    def close(self):
+        self._stop.set()
+
+
+class FileEventWaiter:
+    """
+    Attend qu'une condition sur des fichiers d'un dossier soit vraie, réveillée par
+    les écritures de ces fichiers.
+    """
+
+    def __init__(self, directory: str, backend: str = "auto", poll_interval: float = 0.002,
+                 max_poll_interval: float = 0.05):
+        """
+        Args:
+            directory: Dossier des fichiers surveillés
+            backend: 'auto', 'watchfiles', 'inotify' ou 'poll'
+            poll_interval: Premier intervalle de relecture en mode 'poll' (secondes)
+            max_poll_interval: Intervalle maximal entre deux vérifications, tous modes confondus
+        """
+        if backend not in WAIT_BACKENDS:
+            raise ValueError(f"Mode d'attente inconnu: {backend}")
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self._watch = None
+        self.backend = "poll"
+
+        candidates = ("watchfiles", "inotify") if backend == "auto" else (backend,)
+        for candidate in candidates:
+            try:
+                if candidate == "watchfiles" and watchfiles is not None:
+                    self._watch = _WatchfilesWatch(directory)
+                elif candidate == "inotify" and sys.platform.startswith("linux"):
+                    self._watch = _InotifyWatch(directory)
+                else:
+                    continue
+                self.backend = candidate
+                break
+            except OSError as e:
+                print(f"Surveillance {candidate} indisponible ({e}), repli sur la relecture périodique")
+
+    def wait_for(self, condition, timeout: float, names=()):
+        """
+        Attend que condition() renvoie autre chose que None.
+
+        Args:
+            condition: Fonction sans argument, vérifiée au début puis à chaque événement
+            timeout: Délai maximal en secondes
+            names: Noms des fichiers dont l'écriture déclenche une vérification
+
+        Returns:
+            Valeur renvoyée par condition(), ou None si le délai est écoulé
+        """
+        names = set(names)
+        deadline = time.monotonic() + timeout
+        interval = self.poll_interval
+        while True:
+            result = condition()
+            if result is not None:
+                return result
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            if self._watch is not None:
+                self._watch.wait(min(remaining, self.max_poll_interval), names)
+            else:
+                time.sleep(min(remaining, interval))
+                interval = min(interval * 2, self.max_poll_interval)
+
+    def close(self):
+        """Arrête la surveillance."""
+        if self._watch is not None:
+            self._watch.close()
+            self._watch = None
@@ -9,9 +9,30 @@ import time
 import json
 import codecs
 import uuid
+import binascii
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+from src.agents.execution.connector_telemetry import ConnectorTelemetry
+from src.agents.execution.file_events import FileEventWaiter
+from src.tools.bar_store import BAR_DTYPE, records_to_frame
+
+# Formats des bougies renvoyées par la commande DATA
+DATA_FORMATS = ("json", "rates")
+# Réponses d'un EA qui ne connaît pas l'option RATES (les autres erreurs ne changent pas le format)
+RATES_REFUSED = ("ERROR: UNSUPPORTED RATES", "ERROR: UNKNOWN ARGUMENT")
+# Réponses d'un EA sans la commande DATA_RANGE (HistoryFetcher demande alors l'historique en
+# une seule commande DATA; les autres erreurs sont des échecs de la tranche)
+RANGE_UNSUPPORTED = ("ERROR: UNKNOWN COMMAND", "ERROR: UNSUPPORTED DATA_RANGE")
+
 class MT5FileConnector:
     """
     Agent Fihavanana - Connecteur pour MetaTrader 5 via fichiers
@@ -24,7 +45,8 @@ class MT5FileConnector:
         self.connected = False
         
         # Chemins des fichiers de communication (utilise le dossier Files de MT5)
-        mt5_path = os.path.expanduser("~/.wine64/drive_c/Program Files/MetaTrader 5/MQL5/Files")
+        mt5_path = self.config.get("files_dir") or os.path.expanduser(
+            "~/.wine64/drive_c/Program Files/MetaTrader 5/MQL5/Files")
         self.request_file = os.path.join(mt5_path, "requests.txt")
         self.response_file = os.path.join(mt5_path, "responses.txt")
         
@@ -32,6 +54,32 @@ class MT5FileConnector:
         self.encoding = 'latin-1'  # Encoding compatible avec MT5/Windows
         self.timeout = self.config.get("timeout", 10)  # Timeout en secondes
         
+        # Attente des réponses: événements fichiers ('auto', 'watchfiles', 'inotify') ou 'poll'
+        self.response_wait = self.config.get("response_wait", "auto")
+        self.poll_interval = self.config.get("poll_interval", 0.002)
+        self.max_poll_interval = self.config.get("max_poll_interval", 0.05)
+        # Attente maximale de la lecture par l'EA d'une commande restée sans réponse
+        self.handshake_timeout = self.config.get("handshake_timeout", 0.5)
+        self._waiter = None
+        self._unanswered_command = None
+        
+        # Envoi groupé (BATCH): désactivé automatiquement si l'EA ne le prend pas en charge
+        self.batch_supported = self.config.get("batch", True)
+        # Réponses obtenues à l'avance par prefetch(), consommées une seule fois
+        self._prefetched = {}
+        
+        # Format des bougies: 'json' (lignes JSON) ou 'rates' (MqlRates binaires en base64,
+        # repasse en 'json' si l'EA ne le prend pas en charge)
+        self.data_format = self.config.get("data_format", "json")
+        if self.data_format not in DATA_FORMATS:
+            raise ValueError(f"Format de données inconnu: {self.data_format}")
+        
+        # Mesures par type de commande (latences, timeouts, octets), écrites périodiquement
+        # dans telemetry_dump (JSON Lines) si défini
+        self.telemetry = ConnectorTelemetry(self.config.get("telemetry_dump"),
+                                            self.config.get("telemetry_interval", 60.0))
+        self._last_read_bytes = 0
+        
         print("Agent Fihavanana (MT5 File Connector) initialisé")
         print(f"Fichier de requête: {self.request_file}")
         print(f"Fichier de réponse: {self.response_file}")
@@ -101,59 +149,279 @@ class MT5FileConnector:
         if not self.connected and not self.connect():
             return "ERROR: NOT CONNECTED"
         
+        if command in self._prefetched:
+            print(f"Réponse obtenue par lot pour: '{command}'")
+            self.telemetry.count(self.telemetry.command_type(command), "prefetched")
+            return self._prefetched.pop(command)
+        
         timeout = timeout or self.timeout
         
         try:
             # Générer un ID unique pour cette commande
             command_id = str(uuid.uuid4())[:8]
-            tagged_command = f"ID:{command_id}|{command}"
-            print(f"Envoi de la commande: '{tagged_command}'")
-            
-            # S'assurer que le fichier de réponse est prêt pour une nouvelle commande
-            with codecs.open(self.response_file, 'w', encoding=self.encoding) as f:
-                f.write("READY")
-            
-            # Attendre un court instant pour que l'EA puisse lire "READY"
-            time.sleep(0.5)
-            
-            # Écrire la commande avec son ID dans le fichier de requête
-            with codecs.open(self.request_file, 'w', encoding=self.encoding) as f:
-                f.write(tagged_command)
-            print(f"Commande écrite dans {self.request_file}")
-            
-            # Attendre la réponse avec un timeout
-            start_time = time.time()
-            while time.time() - start_time < timeout:
-                if os.path.exists(self.response_file):
-                    with codecs.open(self.response_file, 'r', encoding=self.encoding, errors='ignore') as f:
-                        response = f.read().strip()
-                        
-                        # Vérifier si la réponse contient l'ID et n'est pas READY
-                        if response and response != "READY":
-                            # Extraire l'ID et le contenu de la réponse
-                            if response.startswith("ID:") and "|" in response:
-                                parts = response.split("|", 1)
-                                response_id = parts[0][3:]  # Ignorer "ID:" au début
-                                content = parts[1]
-                                
-                                # Vérifier que l'ID correspond
-                                if response_id == command_id:
-                                    print(f"Réponse reçue avec ID correspondant: '{content}'")
-                                    return content
-                                else:
-                                    print(f"ID de réponse non correspondant: attendu {command_id}, reçu {response_id}")
-                            else:
-                                # Compatibilité avec l'ancien format sans ID
-                                print(f"Réponse reçue (ancien format): '{response}'")
-                                return response
-                time.sleep(0.1)
-            
-            print(f"Timeout atteint ({timeout}s) sans réponse")
-            return "ERROR: TIMEOUT"
+            return self._send_one(command_id, command, timeout)
         except Exception as e:
             print(f"Erreur lors de l'envoi de la commande à MT5: {e}")
+            self.telemetry.count(self.telemetry.command_type(command), "errors")
             return f"ERROR: {str(e)}"
     
+    def _send_one(self, command_id, command, timeout):
+        """Envoie une commande identifiée et attend sa réponse (ou "ERROR: TIMEOUT")."""
+        tagged_command = f"ID:{command_id}|{command}"
+        print(f"Envoi de la commande: '{tagged_command}'")
+        
+        content = self._exchange(tagged_command, lambda: self._read_response(command_id), timeout,
+                                 self.telemetry.command_type(command))
+        if content is not None:
+            return content
+        
+        print(f"Timeout atteint ({timeout}s) sans réponse")
+        return "ERROR: TIMEOUT"
+    
+    def send_batch(self, commands, timeout=None):
+        """
+        Envoie plusieurs commandes en un seul aller-retour (trame BATCH, voir
+        docs/components/mt5_bridge_protocol.md)
+        
+        Si l'EA ne reconnaît pas BATCH, les commandes sont envoyées une par une
+        (et le sont ensuite directement).
+        
+        Args:
+            commands: Liste de commandes (même format que send_command)
+            timeout: Délai d'attente en secondes pour l'ensemble du lot
+            
+        Returns:
+            list: Réponses dans l'ordre des commandes (ou messages d'erreur)
+        """
+        commands = list(commands)
+        if len(commands) <= 1 or not self.batch_supported:
+            return [self.send_command(command, timeout) for command in commands]
+        
+        # Un ID par commande pour démultiplexer les réponses
+        command_ids = [str(uuid.uuid4())[:8] for _ in commands]
+        responses = self.send_tagged(dict(zip(command_ids, commands)), timeout)
+        return [responses[command_id] for command_id in command_ids]
+    
+    def send_tagged(self, commands, timeout=None):
+        """
+        Envoie des commandes déjà identifiées en un seul aller-retour: commande simple,
+        ou lot BATCH s'il y en a plusieurs (une par une si l'EA ne connaît pas BATCH)
+        
+        Args:
+            commands: {ID de commande: commande}
+            timeout: Délai d'attente en secondes pour l'ensemble du lot
+            
+        Returns:
+            dict: {ID de commande: réponse ou message d'erreur}
+        """
+        if not self.connected and not self.connect():
+            return {command_id: "ERROR: NOT CONNECTED" for command_id in commands}
+        
+        timeout = timeout or self.timeout
+        
+        try:
+            if len(commands) == 1 or not self.batch_supported:
+                return {command_id: self._send_one(command_id, command, timeout)
+                        for command_id, command in commands.items()}
+            
+            batch_id = str(uuid.uuid4())[:8]
+            lines = [f"ID:{batch_id}|BATCH {len(commands)}"]
+            lines += [f"ID:{command_id}|{command}" for command_id, command in commands.items()]
+            print(f"Envoi d'un lot de {len(commands)} commandes: {list(commands.values())}")
+            
+            for command in commands.values():
+                self.telemetry.count(self.telemetry.command_type(command), "batched")
+            parts = self._exchange("\n".join(lines), lambda: self._read_batch_response(batch_id, len(commands)),
+                                   timeout, "BATCH")
+            if parts is None:
+                print(f"Timeout atteint ({timeout}s) sans réponse au lot")
+                return {command_id: "ERROR: TIMEOUT" for command_id in commands}
+            if isinstance(parts, str):
+                print(f"BATCH non pris en charge par l'EA ({parts}), envoi commande par commande")
+                self.batch_supported = False
+                return {command_id: self._send_one(command_id, command, timeout)
+                        for command_id, command in commands.items()}
+            return {command_id: parts.get(command_id, "ERROR: MISSING RESPONSE") for command_id in commands}
+        except Exception as e:
+            print(f"Erreur lors de l'envoi du lot de commandes à MT5: {e}")
+            return {command_id: f"ERROR: {str(e)}" for command_id in commands}
+    
+    def prefetch(self, commands, timeout=None):
+        """
+        Obtient les réponses de plusieurs commandes en un seul lot; les prochains appels
+        de send_command avec exactement ces commandes (get_current_price, get_data...)
+        utilisent ces réponses au lieu d'un aller-retour.
+        
+        Args:
+            commands: Liste de commandes
+            timeout: Délai d'attente en secondes
+            
+        Returns:
+            int: Nombre de réponses obtenues
+        """
+        self._prefetched.clear()
+        for command, response in zip(commands, self.send_batch(commands, timeout)):
+            if not response.startswith("ERROR"):
+                self._prefetched[command] = response
+        return len(self._prefetched)
+    
+    def _exchange(self, request, read_response, timeout, command_type=""):
+        """
+        Écrit une requête et attend sa réponse (aller-retour mesuré dans self.telemetry).
+        
+        Args:
+            request: Contenu du fichier de requête
+            read_response: Fonction de lecture de la réponse (None tant qu'elle n'est pas arrivée)
+            timeout: Délai d'attente en secondes
+            command_type: Type de commande pour les mesures (PRICE, DATA, BATCH...)
+            
+        Returns:
+            Réponse lue, ou None en cas de timeout
+        """
+        started = time.perf_counter()
+        # Poignée de main: une réponse reçue prouve que l'EA a lu la commande précédente.
+        # Seule une commande restée sans réponse (timeout) impose d'attendre que l'EA la lise.
+        self._wait_request_consumed()
+        
+        # S'assurer que le fichier de réponse est prêt pour une nouvelle commande
+        with codecs.open(self.response_file, 'w', encoding=self.encoding) as f:
+            f.write("READY")
+        
+        # Écrire la commande avec son ID dans le fichier de requête (remplacement atomique:
+        # l'EA ne peut pas lire une commande à moitié écrite)
+        self._write_request(request)
+        print(f"Commande écrite dans {self.request_file}")
+        
+        # Attendre la réponse avec un timeout (réveil à chaque écriture du fichier de réponse)
+        response = self._get_waiter().wait_for(read_response, timeout,
+                                               names=(os.path.basename(self.response_file),))
+        self._unanswered_command = request if response is None else None
+        
+        self.telemetry.record(command_type, time.perf_counter() - started,
+                              response if response is None or isinstance(response, str) else "",
+                              bytes_sent=len(request), bytes_received=self._last_read_bytes if response is not None else 0)
+        self.telemetry.maybe_dump()
+        return response
+    
+    @staticmethod
+    def mt5_symbol(symbol):
+        """Nom du symbole chez le courtier (US30 -> US30.cash)."""
+        if symbol and symbol.lower() == "us30":
+            return "US30.cash"
+        return symbol
+    
+    def _get_waiter(self):
+        """Surveillance du dossier d'échange, créée à la première commande."""
+        if self._waiter is None:
+            self._waiter = FileEventWaiter(os.path.dirname(self.request_file), self.response_wait,
+                                           self.poll_interval, self.max_poll_interval)
+            print(f"Attente des réponses MT5: {self._waiter.backend}")
+        return self._waiter
+    
+    def _read_text(self, path):
+        """Contenu d'un fichier d'échange (lecture binaire puis décodage en une fois)."""
+        with open(path, 'rb') as f:
+            data = f.read()
+        self._last_read_bytes = len(data)
+        return data.decode(self.encoding, errors='ignore')
+    
+    def _write_request(self, tagged_command):
+        """Écrit le fichier de requête via un fichier temporaire renommé."""
+        tmp_file = self.request_file + ".tmp"
+        with codecs.open(tmp_file, 'w', encoding=self.encoding) as f:
+            f.write(tagged_command)
+        os.replace(tmp_file, self.request_file)
+    
+    def _wait_request_consumed(self):
+        """
+        Attend (au plus handshake_timeout) que l'EA ait lu la dernière commande restée
+        sans réponse: fichier de requête vidé/supprimé ou réponse tardive écrite.
+        """
+        if self._unanswered_command is None:
+            return
+        
+        def consumed():
+            try:
+                if self._read_text(self.request_file).strip() != self._unanswered_command:
+                    return True
+                return True if self._read_text(self.response_file).strip() not in ("", "READY") else None
+            except FileNotFoundError:
+                return True
+        
+        self._get_waiter().wait_for(consumed, self.handshake_timeout,
+                                    names=(os.path.basename(self.request_file), os.path.basename(self.response_file)))
+        self._unanswered_command = None
+    
+    def _read_response(self, command_id):
+        """
+        Lit le fichier de réponse.
+        
+        Args:
+            command_id: ID de la commande attendue
+            
+        Returns:
+            str: Contenu de la réponse à cette commande (ou au format sans ID), None sinon
+        """
+        try:
+            response = self._read_text(self.response_file).strip()
+        except FileNotFoundError:
+            return None
+        
+        # Vérifier si la réponse contient l'ID et n'est pas READY (ni READY écrit par-dessus
+        # une réponse tardive à une commande précédente)
+        if not response or response.startswith("READY"):
+            return None
+        # Extraire l'ID et le contenu de la réponse
+        if response.startswith("ID:") and "|" in response:
+            response_id, content = response.split("|", 1)
+            response_id = response_id[3:]  # Ignorer "ID:" au début
+            
+            # Vérifier que l'ID correspond
+            if response_id == command_id:
+                print(f"Réponse reçue avec ID correspondant: '{content}'")
+                return content
+            print(f"ID de réponse non correspondant: attendu {command_id}, reçu {response_id}")
+            self.telemetry.id_mismatch(command_id, response_id)
+            return None
+        # Compatibilité avec l'ancien format sans ID
+        print(f"Réponse reçue (ancien format): '{response}'")
+        return response
+    
+    def _read_batch_response(self, batch_id, count):
+        """
+        Lit la réponse à un lot de commandes.
+        
+        Args:
+            batch_id: ID du lot
+            count: Nombre de commandes du lot
+            
+        Returns:
+            dict: {ID de commande: réponse} une fois toutes les réponses écrites,
+                  str: réponse de l'EA qui n'est pas une trame BATCH (lot non pris en charge),
+                  None sinon
+        """
+        try:
+            header, _, body = self._read_text(self.response_file).strip().partition("\n")
+        except FileNotFoundError:
+            return None
+        
+        header = header.strip()
+        if not header.startswith(f"ID:{batch_id}|"):
+            if header.startswith("ID:") and "|" in header:
+                self.telemetry.id_mismatch(batch_id, header[3:header.index("|")])
+            return None
+        content = header.split("|", 1)[1]
+        if not content.startswith("BATCH"):
+            return content
+        
+        parts = {}
+        for line in body.splitlines():
+            if line.startswith("ID:") and "|" in line:
+                part_id, part = line.split("|", 1)
+                parts[part_id[3:]] = part.strip()
+        # Réponse encore incomplète (en cours d'écriture)
+        return parts if len(parts) >= count else None
+    
     def get_account_info(self):
         """
         Récupère les informations du compte actuel
@@ -196,8 +464,7 @@ class MT5FileConnector:
             dict: Prix bid et ask ou None en cas d'échec
         """
         # Ajustement pour US30
-        if symbol.lower() == "us30":
-            symbol = "US30.cash"
+        symbol = self.mt5_symbol(symbol)
         
         response = self.send_command(f"PRICE {symbol}")
         
@@ -223,9 +490,40 @@ class MT5FileConnector:
             print(f"Erreur lors de la récupération du prix pour {symbol}: {response}")
             return None
     
-    def get_data(self, symbol, timeframe, count=500):
+    def data_command(self, symbol, timeframe, count):
         """
-        Récupère les données historiques de MT5
+        Commande DATA dans le format de bougies configuré
+        
+        Args:
+            symbol: Instrument financier
+            timeframe: Temporalité (ex: "M1", "H1", "D1")
+            count: Nombre de barres à récupérer
+            
+        Returns:
+            str: Commande (ex: "DATA US30.cash M1 500 RATES")
+        """
+        command = f"DATA {self.mt5_symbol(symbol)} {timeframe} {count}"
+        return command + " RATES" if self.data_format == "rates" else command
+    
+    def range_command(self, symbol, timeframe, start, end):
+        """
+        Commande DATA_RANGE (bougies d'une plage de temps) dans le format de bougies configuré
+        
+        Args:
+            symbol: Instrument financier
+            timeframe: Temporalité
+            start: Début de la plage, secondes epoch (inclus)
+            end: Fin de la plage, secondes epoch (exclue)
+            
+        Returns:
+            str: Commande (ex: "DATA_RANGE US30.cash M1 1743170400 1743470400 RATES")
+        """
+        command = f"DATA_RANGE {self.mt5_symbol(symbol)} {timeframe} {int(start)} {int(end)}"
+        return command + " RATES" if self.data_format == "rates" else command
+    
+    def get_rates(self, symbol, timeframe, count=500):
+        """
+        Récupère les bougies de MT5 sous forme d'enregistrements BAR_DTYPE
         
         Args:
             symbol: Instrument financier (ex: "EURUSD")
@@ -233,31 +531,69 @@ class MT5FileConnector:
             count: Nombre de barres à récupérer
             
         Returns:
-            pandas.DataFrame: Données historiques ou None en cas d'échec
+            np.ndarray: Enregistrements BAR_DTYPE (ordre de l'EA) ou None en cas d'échec
         """
-        # Ajustement pour US30
-        if symbol.lower() == "us30":
-            symbol = "US30.cash"
+        response = self._request_rates(self.data_command, symbol, timeframe, count)
+        return self.parse_rates(response, symbol, timeframe)
+    
+    def request_rates_range(self, symbol, timeframe, start, end, timeout=None):
+        """
+        Demande les bougies de la plage [start, end) sans décoder la réponse (voir parse_rates)
+        
+        Args:
+            symbol: Instrument financier
+            timeframe: Temporalité
+            start: Début de la plage, secondes epoch (inclus)
+            end: Fin de la plage, secondes epoch (exclue)
+            timeout: Timeout en secondes (None: timeout du connecteur)
             
-        response = self.send_command(f"DATA {symbol} {timeframe} {count}")
+        Returns:
+            str: Réponse de l'EA ("DATA ...", "DATA_RATES ..." ou "ERROR: ...")
+        """
+        return self._request_rates(self.range_command, symbol, timeframe, start, end, timeout=timeout)
+    
+    def get_rates_range(self, symbol, timeframe, start, end):
+        """
+        Récupère les bougies de la plage [start, end) en enregistrements BAR_DTYPE
+        
+        Returns:
+            np.ndarray: Enregistrements BAR_DTYPE ou None en cas d'échec
+        """
+        return self.parse_rates(self.request_rates_range(symbol, timeframe, start, end), symbol, timeframe)
+    
+    def _request_rates(self, build_command, *args, timeout=None):
+        response = self.send_command(build_command(*args), timeout)
+        if self.data_format == "rates" and response.startswith(RATES_REFUSED):
+            # EA sans le format compact: retour au JSON pour la suite de la session
+            print(f"Format RATES refusé par l'EA ({response}), retour au format JSON")
+            self.data_format = "json"
+            response = self.send_command(build_command(*args), timeout)
+        return response
+    
+    def parse_rates(self, response, symbol="", timeframe=""):
+        """
+        Décode une réponse DATA (JSON) ou DATA_RATES en enregistrements BAR_DTYPE
         
-        if response.startswith("DATA"):
+        Args:
+            response: Réponse de l'EA
+            symbol: Instrument (messages d'erreur)
+            timeframe: Temporalité (messages d'erreur)
+            
+        Returns:
+            np.ndarray: Enregistrements BAR_DTYPE ou None si la réponse est une erreur ou illisible
+        """
+        if response.startswith("DATA_RATES"):
+            try:
+                return self._parse_rates(response)
+            except Exception as e:
+                print(f"Erreur lors du traitement des données: {e}")
+                return None
+        elif response.startswith("DATA"):
             try:
                 # Extraire les données JSON
                 json_start = response.find("[")
                 if json_start != -1:
-                    json_data = response[json_start:]
-                    data = json.loads(json_data)
-                    
-                    # Convertir en DataFrame
-                    df = pd.DataFrame(data)
-                    
-                    # Convertir la colonne time en datetime
-                    if 'time' in df.columns:
-                        df['time'] = pd.to_datetime(df['time'], unit='s')
-                        df.set_index('time', inplace=True)
-                    
-                    return df
+                    return self._rows_to_records(_json_loads(response[json_start:]))
                 else:
                     print("Données JSON non trouvées dans la réponse")
                     return None
@@ -268,6 +604,43 @@ class MT5FileConnector:
             print(f"Erreur lors de la récupération des données pour {symbol} sur {timeframe}: {response}")
             return None
     
+    @staticmethod
+    def _parse_rates(response):
+        """
+        Décode une réponse "DATA_RATES <symbole> <timeframe> <n> <base64>": tableau de
+        MqlRates (60 octets, little-endian) lu sans copie par np.frombuffer.
+        """
+        _, _, _, count, payload = response.split(" ", 4)
+        records = np.frombuffer(binascii.a2b_base64(payload), dtype=BAR_DTYPE)
+        if len(records) != int(count):
+            raise ValueError(f"{len(records)} bougies décodées, {count} annoncées")
+        return records
+    
+    @staticmethod
+    def _rows_to_records(rows):
+        """Lignes JSON de l'EA (dicts time, open, ...) converties colonne par colonne en BAR_DTYPE."""
+        records = np.zeros(len(rows), dtype=BAR_DTYPE)
+        if rows:
+            for name in BAR_DTYPE.names:
+                if name in rows[0]:
+                    records[name] = [row[name] for row in rows]
+        return records
+    
+    def get_data(self, symbol, timeframe, count=500):
+        """
+        Récupère les données historiques de MT5
+        
+        Args:
+            symbol: Instrument financier (ex: "EURUSD")
+            timeframe: Temporalité (ex: "M1", "H1", "D1")
+            count: Nombre de barres à récupérer
+            
+        Returns:
+            pandas.DataFrame: Données historiques ou None en cas d'échec
+        """
+        records = self.get_rates(symbol, timeframe, count)
+        return records_to_frame(records) if records is not None else None
+    
     def place_order(self, symbol, order_type, volume, price=0.0, sl=0.0, tp=0.0, comment="", magic=0):
         """
         Place un ordre de trading
@@ -286,10 +659,11 @@ class MT5FileConnector:
             dict: Résultat de l'exécution de l'ordre ou None en cas d'échec
         """
         # Ajustement pour US30
-        if symbol.lower() == "us30":
-            symbol = "US30.cash"
+        symbol = self.mt5_symbol(symbol)
             
         command = f"ORDER {symbol} {order_type} {volume} {price} {sl} {tp} {magic} {comment}"
+        # Les positions et le compte obtenus à l'avance ne sont plus à jour
+        self._prefetched.clear()
         response = self.send_command(command)
         
         if response.startswith("ORDER_RESULT"):
@@ -326,8 +700,7 @@ class MT5FileConnector:
             bool: True si la fermeture est réussie, False sinon
         """
         # Ajustement pour US30
-        if symbol and symbol.lower() == "us30":
-            symbol = "US30.cash"
+        symbol = self.mt5_symbol(symbol)
             
         if position_id is not None:
             command = f"CLOSE_POSITION ID={position_id}"
@@ -337,6 +710,7 @@ class MT5FileConnector:
             print("Veuillez spécifier soit l'ID de la position, soit le symbole")
             return False
         
+        self._prefetched.clear()
         response = self.send_command(command)
         
         if response == "POSITION_CLOSED":
@@ -352,6 +726,7 @@ class MT5FileConnector:
         Returns:
             bool: True si toutes les fermetures sont réussies, False sinon
         """
+        self._prefetched.clear()
         response = self.send_command("CLOSE_ALL_POSITIONS")
         
         if response.startswith("POSITIONS_CLOSED"):
@@ -376,8 +751,7 @@ class MT5FileConnector:
             list: Liste des positions ouvertes ou None en cas d'échec
         """
         # Ajustement pour US30
-        if symbol and symbol.lower() == "us30":
-            symbol = "US30.cash"
+        symbol = self.mt5_symbol(symbol)
             
         command = "POSITIONS"
         if symbol:
@@ -390,8 +764,7 @@ class MT5FileConnector:
                 # Extraire les données JSON
                 json_start = response.find("[")
                 if json_start != -1:
-                    json_data = response[json_start:]
-                    positions = json.loads(json_data)
+                    positions = _json_loads(response[json_start:])
                     return positions
                 else:
                     # Pas de positions ou format différent
@@ -419,8 +792,7 @@ class MT5FileConnector:
             float: Taille de position recommandée ou None en cas d'échec
         """
         # Ajustement pour US30
-        if symbol.lower() == "us30":
-            symbol = "US30.cash"
+        symbol = self.mt5_symbol(symbol)
             
         command = f"POSITION_SIZE {symbol} {stop_loss_pips} {risk_percent}"
         response = self.send_command(command)
@@ -448,8 +820,7 @@ class MT5FileConnector:
             list: Liste des ordres historiques ou None en cas d'échec
         """
         # Ajustement pour US30
-        if symbol and symbol.lower() == "us30":
-            symbol = "US30.cash"
+        symbol = self.mt5_symbol(symbol)
             
         command = f"HISTORY_ORDERS {days}"
         if symbol:
@@ -462,8 +833,7 @@ class MT5FileConnector:
                 # Extraire les données JSON
                 json_start = response.find("[")
                 if json_start != -1:
-                    json_data = response[json_start:]
-                    orders = json.loads(json_data)
+                    orders = _json_loads(response[json_start:])
                     return orders
                 else:
                     # Pas d'ordres ou format différent
@@ -490,8 +860,7 @@ class MT5FileConnector:
             dict: Métriques de performance ou None en cas d'échec
         """
         # Ajustement pour US30
-        if symbol and symbol.lower() == "us30":
-            symbol = "US30.cash"
+        symbol = self.mt5_symbol(symbol)
             
         command = f"PERFORMANCE {days}"
         if symbol:
@@ -504,8 +873,7 @@ class MT5FileConnector:
                 # Extraire les données JSON
                 json_start = response.find("{")
                 if json_start != -1:
-                    json_data = response[json_start:]
-                    metrics = json.loads(json_data)
+                    metrics = _json_loads(response[json_start:])
                     return metrics
                 else:
                     print("Données JSON non trouvées dans la réponse")
@@ -521,6 +889,9 @@ class MT5FileConnector:
         """
         Déconnecte du terminal MT5
         """
+        if getattr(self, "_waiter", None) is not None:
+            self._waiter.close()
+            self._waiter = None
         if self.connected:
             self.connected = False
             print("Déconnecté de MetaTrader 5")
@@ -7,6 +7,7 @@ import time
 import json
 from src.anansi.agent_framework.autonomous_agent import AutonomousAgent
 from src.agents.execution.mt5_connector import MT5FileConnector
+from src.agents.execution.cached_connector import CachedMT5Connector
 
 class Fihavanana(AutonomousAgent):
     """
@@ -19,10 +20,13 @@ class Fihavanana(AutonomousAgent):
     def __init__(self, name="fihavanana", config=None, anansi_core=None):
         super().__init__(name, config, anansi_core)
         
-        # Initialiser le connecteur MT5
-        self.mt5_connector = MT5FileConnector(
-            config=config.get("mt5_config", {}),
-            llm_caller=lambda prompt: self.anansi_core.call_llm(prompt) if self.anansi_core else None
+        # Initialiser le connecteur MT5 (compte, positions et prix en cache entre perceive et act)
+        self.mt5_connector = CachedMT5Connector(
+            MT5FileConnector(
+                config=config.get("mt5_config", {}),
+                llm_caller=lambda prompt: self.anansi_core.call_llm(prompt) if self.anansi_core else None
+            ),
+            config.get("mt5_cache_ttls")
         )
         
         # État interne spécifique à Fihavanana
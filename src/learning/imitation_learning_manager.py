@@ -190,6 +190,31 @@ class ImitationLearningManager:
         
         return encoded_labels, label_map
     
+    @staticmethod
+    def build_model(model_type="baseline"):
+        """
+        Crée un modèle non entraîné du type demandé.
+        
+        Args:
+            model_type: Type de modèle (baseline, decision_tree, random_forest)
+            
+        Returns:
+            Tuple (modèle scikit-learn, nom du modèle)
+        """
+        from sklearn.tree import DecisionTreeClassifier
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.linear_model import LogisticRegression
+        
+        if model_type == "baseline":
+            return LogisticRegression(max_iter=1000, C=1.0), "logistic_regression"
+        elif model_type == "decision_tree":
+            return DecisionTreeClassifier(max_depth=10), "decision_tree"
+        elif model_type == "random_forest":
+            return RandomForestClassifier(n_estimators=100, max_depth=10), "random_forest"
+        else:
+            # Modèle par défaut
+            return LogisticRegression(max_iter=1000), "default_logistic_regression"
+    
     def train_imitation_model(self, model_type="baseline", training_data=None):
         """
         Entraîne un modèle d'imitation sur les données d'entraînement.
@@ -203,9 +228,6 @@ class ImitationLearningManager:
         """
         try:
             from sklearn.model_selection import train_test_split
-            from sklearn.tree import DecisionTreeClassifier
-            from sklearn.ensemble import RandomForestClassifier
-            from sklearn.linear_model import LogisticRegression
             from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
         except ImportError:
             self.logger.error("scikit-learn non installé. Impossible d'entraîner le modèle.")
@@ -227,19 +249,7 @@ class ImitationLearningManager:
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
         
         # Sélection du modèle
-        if model_type == "baseline":
-            model = LogisticRegression(max_iter=1000, C=1.0)
-            model_name = "logistic_regression"
-        elif model_type == "decision_tree":
-            model = DecisionTreeClassifier(max_depth=10)
-            model_name = "decision_tree"
-        elif model_type == "random_forest":
-            model = RandomForestClassifier(n_estimators=100, max_depth=10)
-            model_name = "random_forest"
-        else:
-            # Modèle par défaut
-            model = LogisticRegression(max_iter=1000)
-            model_name = "default_logistic_regression"
+        model, model_name = self.build_model(model_type)
         
         # Entraînement
         start_time = time.time()
@@ -673,4 +683,58 @@ class ImitationLearningManager:
             self.logger.error(f"Erreur lors de la prédiction: {str(e)}")
             import traceback
             self.logger.error(traceback.format_exc())
-            return None        
\ No newline at end of file
+            return None
+
+    def predict_batch(self, feature_columns, n_samples):
+        """
+        Prédit les actions d'un lot d'échantillons en un seul appel au modèle.
+    
+        Args:
+            feature_columns: Dict {caractéristique: tableau de n_samples valeurs}
+            n_samples: Nombre d'échantillons
+        
+        Returns:
+            Dict {"actions": liste des actions, "confidences": {action: tableau des probabilités}}
+            ou None en cas d'erreur
+        """
+        # Vérifier qu'un modèle est chargé
+        if self.current_model is None:
+            try:
+                self.load_model()
+                if self.current_model is None:
+                    self.logger.error("Aucun modèle disponible pour la prédiction.")
+                    return None
+            except Exception as e:
+                self.logger.error(f"Erreur lors du chargement du modèle: {str(e)}")
+                return None
+    
+        try:
+            # Encoder les caractéristiques dans une matrice (mêmes colonnes que predict)
+            feature_map = self.current_model["feature_map"]
+            encoded_features = np.zeros((n_samples, len(feature_map)))
+        
+            for feature, values in feature_columns.items():
+                if feature in feature_map:
+                    encoded_features[:, feature_map[feature]] = values
+        
+            model = self.current_model["model"]
+            label_map = self.current_model["label_map"]
+        
+            # Un seul appel au modèle: l'action est la classe la plus probable
+            confidences = {}
+            if hasattr(model, 'predict_proba'):
+                proba = model.predict_proba(encoded_features)
+                for i in range(proba.shape[1]):
+                    confidences[label_map.get(i, f"Unknown-{i}")] = proba[:, i]
+                classes = getattr(model, 'classes_', np.arange(proba.shape[1]))
+                actions = [label_map[y] for y in np.asarray(classes)[proba.argmax(axis=1)].tolist()]
+            else:
+                actions = [label_map[y] for y in model.predict(encoded_features).tolist()]
+        
+            return {"actions": actions, "confidences": confidences}
+        
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la prédiction par lot: {str(e)}")
+            import traceback
+            self.logger.error(traceback.format_exc())
+            return None
\ No newline at end of file
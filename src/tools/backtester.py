@@ -0,0 +1,460 @@
+"""
+Backtest événementiel par rejeu de bougies
+Rejoue des bougies OHLC (export CSV MT5 ou DataFrame) et exécute des signaux
+(table de setups ou stratégie appelée bougie par bougie) avec:
+- exécution intrabar des SL/TP, ordre configurable quand les deux sont touchés
+  dans la même bougie ('worst', 'best' ou 'ohlc')
+- spread MT5 (<SPREAD>, en points): les bougies sont en Bid, achats exécutés à l'Ask
+- courbe d'équité bougie par bougie et registre des trades
+
+Entre deux événements (signal, sortie), les bougies ne sont pas parcourues une par une:
+la sortie d'une position est cherchée par blocs vectorisés.
+
+Usage:
+    python -m src.tools.backtester US30.cash_M1_....csv --intrabar worst --output backtests/
+"""
+
+import argparse
+import json
+import math
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.tools.bar_store import to_epoch_seconds
+from src.tools.market_snapshot import CandleArrays
+from src.tools.mt5_csv import load_mt5_csv
+from src.tools.signal_scanner import DEFAULT_SCAN_PARAMS, normalize_ohlc, scan_setups
+
+BACKTEST_DEFAULTS = {
+    "initial_balance": 10000.0,
+    "risk_percentage": 1.0,
+    "symbol_info": None,          # Infos symbole MT5 (point, trade_tick_value, trade_tick_size, volume_*)
+    "point": 0.01,                # Taille du point si symbol_info est absent (conversion du spread)
+    "contract_value": 100.0,      # Gain par lot pour 1.0 de prix si symbol_info est absent (convention d'AkobenTrader)
+    "intrabar_order": "worst",    # 'worst': SL d'abord, 'best': TP d'abord, 'ohlc': chemin O-H-L-C ou O-L-H-C
+    "use_spread": True,
+    "default_spread_points": 0.0, # Spread utilisé si les données n'ont pas de colonne spread
+    "entry": "close",             # 'close': clôture de la bougie du signal, 'next_open': ouverture suivante
+    "max_holding_bars": None,     # Clôture forcée après N bougies
+    "commission_per_lot": 0.0,
+}
+
+INTRABAR_ORDERS = ("worst", "best", "ohlc")
+
+LEDGER_COLUMNS = [
+    "trade_id", "direction", "signal_position", "entry_position", "entry_time", "entry_price",
+    "stop_loss", "take_profit", "position_size", "exit_position", "exit_time", "exit_price",
+    "close_reason", "bars_held", "spread_cost", "commission", "profit", "r_multiple", "balance"
+]
+
+# Taille des blocs de recherche de sortie (doublée à chaque bloc sans sortie)
+_FIRST_CHUNK = 64
+_MAX_CHUNK = 65536
+
+
+class BacktestResult:
+    """
+    Résultat d'un backtest: registre des trades, courbe d'équité et statistiques.
+    """
+
+    def __init__(self, ledger: pd.DataFrame, equity: pd.DataFrame, config: dict, elapsed: float):
+        self.ledger = ledger
+        self.equity = equity
+        self.config = config
+        self.elapsed = elapsed
+        self.summary = self._summarize()
+
+    def _summarize(self) -> dict:
+        profits = self.ledger["profit"].to_numpy(dtype=float)
+        gains = profits[profits > 0]
+        losses = profits[profits <= 0]
+        equity = self.equity["equity"].to_numpy(dtype=float)
+        peak = np.maximum.accumulate(equity) if len(equity) else equity
+        drawdown = peak - equity
+        worst = int(np.argmax(drawdown)) if len(drawdown) else 0
+        initial = self.config["initial_balance"]
+        return {
+            "bars": len(self.equity),
+            "trades": len(profits),
+            "wins": len(gains),
+            "losses": len(losses),
+            "win_rate": len(gains) / len(profits) if len(profits) else 0.0,
+            "net_profit": float(profits.sum()),
+            "gross_profit": float(gains.sum()),
+            "gross_loss": float(losses.sum()),
+            "profit_factor": float(gains.sum() / abs(losses.sum())) if losses.sum() != 0 else float("inf") if len(gains) else 0.0,
+            "expectancy_r": float(self.ledger["r_multiple"].mean()) if len(profits) else 0.0,
+            "final_balance": float(initial + profits.sum()),
+            "max_drawdown": float(drawdown[worst]) if len(drawdown) else 0.0,
+            "max_drawdown_percent": float(drawdown[worst] / peak[worst] * 100) if len(drawdown) and peak[worst] > 0 else 0.0,
+            "elapsed_seconds": self.elapsed,
+        }
+
+    def save(self, output_dir, prefix: str = "backtest") -> dict:
+        """
+        Enregistre le registre (CSV), la courbe d'équité (CSV) et le résumé (JSON).
+
+        Args:
+            output_dir: Répertoire de sortie
+            prefix: Préfixe des fichiers
+
+        Returns:
+            dict: Chemins des fichiers écrits
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        paths = {
+            "ledger": output_dir / f"{prefix}_trades.csv",
+            "equity": output_dir / f"{prefix}_equity.csv",
+            "summary": output_dir / f"{prefix}_summary.json",
+        }
+        self.ledger.to_csv(paths["ledger"], index=False)
+        self.equity.to_csv(paths["equity"])
+        with open(paths["summary"], "w") as f:
+            json.dump(self.summary, f, indent=2)
+        return paths
+
+
+class BarReplayBacktester:
+    """
+    Moteur de rejeu de bougies (une position à la fois).
+
+    Les signaux sont des dicts {'direction': 'BUY'/'SELL', 'sl': float, 'tp': float,
+    'size': float facultatif} émis à la clôture d'une bougie.
+    """
+
+    def __init__(self, bars: pd.DataFrame, config: dict | None = None):
+        """
+        Args:
+            bars: Bougies OHLC en Bid (format Akoben ou MT5), colonne de spread facultative
+            config: Paramètres (voir BACKTEST_DEFAULTS)
+        """
+        self.config = {**BACKTEST_DEFAULTS, **(config or {})}
+        if self.config["intrabar_order"] not in INTRABAR_ORDERS:
+            raise ValueError(f"Ordre intrabar inconnu: {self.config['intrabar_order']}")
+        if self.config["entry"] not in ("close", "next_open"):
+            raise ValueError(f"Mode d'entrée inconnu: {self.config['entry']}")
+
+        # Spread lu après normalize_ohlc, qui peut retrier les bougies
+        bars = normalize_ohlc(bars)
+        spread_column = next((c for c in ("Spread", "spread", "<SPREAD>") if c in bars.columns), None)
+        spread_points = bars[spread_column].to_numpy(dtype=float) if spread_column else None
+        self.time = bars.index
+        self.open = bars["Open"].to_numpy(dtype=float)
+        self.high = bars["High"].to_numpy(dtype=float)
+        self.low = bars["Low"].to_numpy(dtype=float)
+        self.close = bars["Close"].to_numpy(dtype=float)
+        self.n = len(self.close)
+
+        symbol_info = self.config["symbol_info"]
+        self.point = symbol_info.get("point") if symbol_info else self.config["point"]
+        if symbol_info and symbol_info.get("trade_tick_size"):
+            self.contract_value = symbol_info["trade_tick_value"] / symbol_info["trade_tick_size"]
+        else:
+            self.contract_value = self.config["contract_value"]
+
+        if spread_points is None:
+            spread_points = np.full(self.n, float(self.config["default_spread_points"]))
+        self.spread = spread_points * self.point if self.config["use_spread"] else np.zeros(self.n)
+        # Prix Ask (exécution des achats / sortie des ventes)
+        self.ask_high = self.high + self.spread
+        self.ask_low = self.low + self.spread
+        self._time_seconds = None  # Colonnes de candles(), calculées au premier appel
+        self._spread_points = None
+
+    # --- Aides pour les stratégies ---
+
+    def candles(self, t: int, count: int) -> CandleArrays:
+        """
+        Bougies [t - count + 1, t] en colonnes NumPy (vues, sans objet par bougie).
+
+        Args:
+            t: Position de la dernière bougie clôturée
+            count: Nombre de bougies
+
+        Returns:
+            CandleArrays: Colonnes time, open, high, low, close et spread (en points)
+        """
+        if self._time_seconds is None:
+            self._time_seconds = to_epoch_seconds(self.time)
+            self._spread_points = self.spread / self.point
+        window = slice(max(0, t - count + 1), t + 1)
+        return CandleArrays({"time": self._time_seconds[window], "open": self.open[window], "high": self.high[window],
+                             "low": self.low[window], "close": self.close[window],
+                             "spread": self._spread_points[window]})
+
+    # --- Exécution ---
+
+    def _position_size(self, balance: float, entry: float, stop_loss: float) -> float:
+        """Taille de position pour risquer risk_percentage du solde (pas de volume des infos symbole)."""
+        symbol_info = self.config["symbol_info"] or {}
+        step = symbol_info.get("volume_step", 0.01)
+        volume_min = symbol_info.get("volume_min", 0.01)
+        volume_max = symbol_info.get("volume_max", float("inf"))
+        distance = abs(entry - stop_loss)
+        if distance <= 0 or balance <= 0:
+            return 0.0
+        ideal = balance * self.config["risk_percentage"] / 100.0 / (distance * self.contract_value)
+        return min(volume_max, max(volume_min, math.floor(ideal / step + 1e-9) * step))
+
+    def _find_exit(self, start: int, buy: bool, stop_loss: float, take_profit: float, last: int) -> tuple:
+        """
+        Cherche la première bougie (à partir de 'start') qui touche le SL ou le TP.
+
+        Returns:
+            tuple: (position, prix de sortie, raison) - raison None si aucune sortie avant 'last'
+        """
+        if buy:
+            sl_prices, tp_prices = self.low, self.high
+        else:
+            sl_prices, tp_prices = self.ask_high, self.ask_low
+        chunk = _FIRST_CHUNK
+        position = start
+        while position <= last:
+            end = min(last + 1, position + chunk)
+            if buy:
+                sl_hit = sl_prices[position:end] <= stop_loss
+                tp_hit = tp_prices[position:end] >= take_profit
+            else:
+                sl_hit = sl_prices[position:end] >= stop_loss
+                tp_hit = tp_prices[position:end] <= take_profit
+            hits = np.flatnonzero(sl_hit | tp_hit)
+            if len(hits):
+                k = int(hits[0])
+                t = position + k
+                return (t, *self._resolve_bar(t, buy, stop_loss, take_profit, bool(sl_hit[k]), bool(tp_hit[k])))
+            position = end
+            chunk = min(chunk * 2, _MAX_CHUNK)
+        return last, None, None
+
+    def _resolve_bar(self, t: int, buy: bool, stop_loss: float, take_profit: float,
+                     sl_hit: bool, tp_hit: bool) -> tuple:
+        """Prix et raison de sortie dans la bougie t (gap à l'ouverture, puis ordre intrabar)."""
+        open_price = self.open[t] if buy else self.open[t] + self.spread[t]
+        # Ouverture au-delà d'un niveau: exécution au prix d'ouverture
+        if buy:
+            if open_price <= stop_loss:
+                return open_price, "STOP_LOSS"
+            if open_price >= take_profit:
+                return open_price, "TAKE_PROFIT"
+        else:
+            if open_price >= stop_loss:
+                return open_price, "STOP_LOSS"
+            if open_price <= take_profit:
+                return open_price, "TAKE_PROFIT"
+
+        if sl_hit and tp_hit:
+            order = self.config["intrabar_order"]
+            if order == "worst":
+                sl_first = True
+            elif order == "best":
+                sl_first = False
+            else:
+                # Chemin O-H-L-C si l'ouverture est plus proche du plus haut, sinon O-L-H-C
+                high_first = (self.high[t] - self.open[t]) <= (self.open[t] - self.low[t])
+                sl_first = (not high_first) if buy else high_first
+            return (stop_loss, "STOP_LOSS") if sl_first else (take_profit, "TAKE_PROFIT")
+        return (stop_loss, "STOP_LOSS") if sl_hit else (take_profit, "TAKE_PROFIT")
+
+    def _open_trade(self, signal: dict, t: int, balance: float, trade_id: int) -> dict | None:
+        """Ouvre un trade sur le signal émis à la clôture de la bougie t."""
+        buy = signal["direction"] == "BUY"
+        if self.config["entry"] == "close":
+            entry_position = t
+            bid = self.close[t]
+            first_check = t + 1
+        else:
+            entry_position = t + 1
+            if entry_position >= self.n:
+                return None
+            bid = self.open[entry_position]
+            first_check = entry_position
+        spread = self.spread[entry_position]
+        entry = bid + spread if buy else bid
+        stop_loss, take_profit = float(signal["sl"]), float(signal["tp"])
+        if buy and not (stop_loss < entry < take_profit):
+            return None
+        if not buy and not (take_profit < entry < stop_loss):
+            return None
+        size = signal.get("size")
+        if size is None or not np.isfinite(size) or size <= 0:
+            size = self._position_size(balance, entry, stop_loss)
+        if size <= 0:
+            return None
+        return {
+            "trade_id": trade_id, "direction": signal["direction"], "signal_position": t,
+            "entry_position": entry_position, "entry_price": entry, "stop_loss": stop_loss,
+            "take_profit": take_profit, "position_size": size, "first_check": first_check,
+            "spread_cost": spread * size * self.contract_value,
+        }
+
+    def _close_trade(self, trade: dict, balance: float) -> dict:
+        """Cherche la sortie du trade et calcule le résultat."""
+        buy = trade["direction"] == "BUY"
+        last = self.n - 1
+        max_holding = self.config["max_holding_bars"]
+        if max_holding is not None:
+            last = min(last, trade["entry_position"] + max_holding)
+        exit_position, exit_price, reason = self._find_exit(
+            trade["first_check"], buy, trade["stop_loss"], trade["take_profit"], last)
+        if reason is None:
+            exit_position = last
+            exit_price = self.close[last] if buy else self.close[last] + self.spread[last]
+            reason = "TIMEOUT" if last < self.n - 1 else "END_OF_DATA"
+
+        direction = 1.0 if buy else -1.0
+        size = trade["position_size"]
+        commission = self.config["commission_per_lot"] * size
+        profit = (exit_price - trade["entry_price"]) * direction * size * self.contract_value - commission
+        risk = abs(trade["entry_price"] - trade["stop_loss"]) * size * self.contract_value
+        trade.update({
+            "exit_position": exit_position, "exit_price": exit_price, "close_reason": reason,
+            "bars_held": exit_position - trade["entry_position"], "commission": commission,
+            "profit": profit, "r_multiple": profit / risk if risk > 0 else 0.0, "balance": balance + profit,
+        })
+        return trade
+
+    def _replay(self, next_signal) -> BacktestResult:
+        """Boucle événementielle commune: signal -> entrée -> sortie -> signal suivant."""
+        start = time.time()
+        balance = float(self.config["initial_balance"])
+        trades = []
+        t = 0
+        while t < self.n:
+            event = next_signal(t, balance)
+            if event is None:
+                break
+            t, signal = event
+            trade = self._open_trade(signal, t, balance, len(trades) + 1)
+            if trade is None:
+                t += 1
+                continue
+            trade = self._close_trade(trade, balance)
+            balance = trade["balance"]
+            trades.append(trade)
+            # Une position à la fois: prochain signal après la bougie de sortie
+            t = trade["exit_position"] + 1
+
+        ledger = pd.DataFrame(trades, columns=LEDGER_COLUMNS)
+        if len(ledger):
+            ledger["entry_time"] = self.time[ledger["entry_position"].to_numpy()]
+            ledger["exit_time"] = self.time[ledger["exit_position"].to_numpy()]
+        return BacktestResult(ledger, self._equity_curve(ledger), self.config, time.time() - start)
+
+    def _equity_curve(self, ledger: pd.DataFrame) -> pd.DataFrame:
+        """Solde réalisé et équité (positions ouvertes évaluées à la clôture) pour chaque bougie."""
+        realized = np.zeros(self.n)
+        unrealized = np.zeros(self.n)
+        for trade in ledger.itertuples(index=False):
+            realized[trade.exit_position] += trade.profit
+            span = slice(trade.entry_position, trade.exit_position)
+            if trade.direction == "BUY":
+                marks = self.close[span] - trade.entry_price
+            else:
+                marks = trade.entry_price - (self.close[span] + self.spread[span])
+            unrealized[span] += marks * trade.position_size * self.contract_value
+        balance = self.config["initial_balance"] + np.cumsum(realized)
+        return pd.DataFrame({"balance": balance, "equity": balance + unrealized}, index=self.time)
+
+    def run(self, signals: pd.DataFrame) -> BacktestResult:
+        """
+        Backteste une table de signaux (ex: résultat de scan_setups).
+
+        Args:
+            signals: Colonnes 'position' (bougie du signal), 'direction', 'sl', 'tp', 'size' facultative
+
+        Returns:
+            BacktestResult: Registre, courbe d'équité et résumé
+        """
+        signals = signals.sort_values("position", kind="stable")
+        positions = signals["position"].to_numpy(dtype=np.int64)
+        sizes = signals["size"].to_numpy(dtype=float) if "size" in signals.columns else np.full(len(signals), np.nan)
+        records = [
+            {"direction": d, "sl": sl, "tp": tp, "size": None if np.isnan(size) else size}
+            for d, sl, tp, size in zip(signals["direction"].tolist(), signals["sl"].to_numpy(dtype=float).tolist(),
+                                       signals["tp"].to_numpy(dtype=float).tolist(), sizes.tolist())
+        ]
+
+        def next_signal(t, balance):
+            k = int(np.searchsorted(positions, t, side="left"))
+            while k < len(positions):
+                record = records[k]
+                if not (np.isnan(record["sl"]) or np.isnan(record["tp"])):
+                    return int(positions[k]), record
+                k += 1
+            return None
+        return self._replay(next_signal)
+
+    def run_strategy(self, strategy, warmup: int = 0, every: int = 1) -> BacktestResult:
+        """
+        Backteste une stratégie appelée à la clôture de chaque bougie quand aucune position n'est ouverte.
+
+        Args:
+            strategy: Fonction (backtester, t, balance) -> signal dict ou None
+            warmup: Nombre de bougies ignorées au début (historique des indicateurs)
+            every: Appeler la stratégie toutes les N bougies
+
+        Returns:
+            BacktestResult: Registre, courbe d'équité et résumé
+        """
+        def next_signal(t, balance):
+            t = max(t, warmup)
+            if every > 1 and t % every:
+                t += every - t % every
+            while t < self.n:
+                signal = strategy(self, t, balance)
+                if signal:
+                    return t, signal
+                t += every
+            return None
+        return self._replay(next_signal)
+
+
+def backtest_setups(bars: pd.DataFrame, scan_params: dict | None = None, config: dict | None = None) -> BacktestResult:
+    """
+    Détecte les setups (scan_setups) puis les backteste.
+
+    Args:
+        bars: Bougies OHLC (avec colonne de spread facultative)
+        scan_params: Paramètres de scan_setups
+        config: Paramètres du backtest (voir BACKTEST_DEFAULTS)
+
+    Returns:
+        BacktestResult: Résultat du backtest
+    """
+    config = {**BACKTEST_DEFAULTS, **(config or {})}
+    scan_params = {**DEFAULT_SCAN_PARAMS, "risk_percentage": config["risk_percentage"],
+                   "account_balance": config["initial_balance"], "symbol_info": config["symbol_info"],
+                   **(scan_params or {})}
+    setups = scan_setups(bars, scan_params)
+    # La taille est recalculée sur le solde courant du backtest
+    return BarReplayBacktester(bars, config).run(setups.drop(columns=["size"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest des setups ZigZag par rejeu de bougies")
+    parser.add_argument("csv", help="Export MT5 (séparateur tabulation: <DATE> <TIME> <OPEN> ... <SPREAD>)")
+    parser.add_argument("--intrabar", default="worst", choices=INTRABAR_ORDERS, help="Ordre SL/TP dans une même bougie")
+    parser.add_argument("--entry", default="close", choices=["close", "next_open"])
+    parser.add_argument("--no-spread", action="store_true", help="Ignorer la colonne <SPREAD>")
+    parser.add_argument("--balance", type=float, default=10000.0)
+    parser.add_argument("--risk", type=float, default=1.0, help="Risque par trade en pourcentage")
+    parser.add_argument("--max-holding", type=int, default=None, help="Durée maximale d'un trade (bougies)")
+    parser.add_argument("--output", default=None, help="Répertoire où enregistrer registre, équité et résumé")
+    args = parser.parse_args()
+
+    bars = load_mt5_csv(args.csv)
+    config = {"intrabar_order": args.intrabar, "entry": args.entry, "use_spread": not args.no_spread,
+              "initial_balance": args.balance, "risk_percentage": args.risk, "max_holding_bars": args.max_holding}
+    result = backtest_setups(bars, config=config)
+    print(json.dumps(result.summary, indent=2))
+    if args.output:
+        paths = result.save(args.output, prefix=Path(args.csv).stem)
+        print(f"Résultats enregistrés: {paths['ledger']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+"""
+Stockage colonnaire des bougies sur disque
+Une partition par symbole / timeframe / jour: <racine>/<symbole>/<timeframe>/<AAAAMMJJ>.bars,
+fichier binaire brut d'enregistrements de taille fixe (BAR_DTYPE), lisible en mémoire
+mappée sans copie.
+
+- Écriture en ajout seul: seules les bougies plus récentes que la dernière bougie stockée
+  sont ajoutées en fin de fichier. Une bougie déjà présente (même horodatage) est ignorée,
+  sauf la dernière bougie de la partition, mise à jour (bougie en cours de formation).
+  Les bougies manquantes plus anciennes (trous d'historique) sont fusionnées en réécrivant
+  la seule partition concernée.
+- Lecture par plage [start, end): tableau structuré (vue mappée sans copie si la plage tient
+  dans une partition), dict de colonnes ou DataFrame au format du connecteur MT5.
+
+Les horodatages sont stockés en secondes epoch (int64) à l'heure du serveur MT5, comme les
+bougies du connecteur (DATA, DATA_RANGE): les exports CSV sont lus sans conversion en UTC
+(load_mt5_csv(..., server_tz=None)) pour que leurs bougies se confondent avec celles du
+connecteur sur une même série.
+
+Usage:
+    python -m src.tools.bar_store import US30.cash_M1_....csv --symbol US30 --timeframe M1
+    python -m src.tools.bar_store info --symbol US30 --timeframe M1
+"""
+
+import argparse
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.tools.mt5_csv import load_mt5_csv
+
+BAR_DTYPE = np.dtype([
+    ("time", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("tick_volume", "<i8"),
+    ("spread", "<i4"),
+    ("real_volume", "<i8"),
+])
+
+PARTITION_SUFFIX = ".bars"
+SECONDS_PER_DAY = 86400
+
+DEFAULT_STORE_ROOT = "data/bars"
+
+# Noms de colonnes acceptés en entrée (format du connecteur, DataFrame Akoben, export MT5)
+_COLUMN_ALIASES = {
+    "open": ("open", "Open", "<OPEN>"),
+    "high": ("high", "High", "<HIGH>"),
+    "low": ("low", "Low", "<LOW>"),
+    "close": ("close", "Close", "<CLOSE>"),
+    "tick_volume": ("tick_volume", "TickVolume", "<TICKVOL>"),
+    "spread": ("spread", "Spread", "<SPREAD>"),
+    "real_volume": ("real_volume", "RealVolume", "<VOL>"),
+}
+
+
+def to_epoch_seconds(times) -> np.ndarray:
+    """
+    Convertit des horodatages (datetime64, Timestamp, epoch) en secondes epoch int64.
+    Les horodatages avec fuseau sont ramenés en UTC.
+
+    Args:
+        times: Index, Series ou tableau d'horodatages
+
+    Returns:
+        np.ndarray: Secondes epoch (int64)
+    """
+    if isinstance(times, (pd.Index, pd.Series)) and isinstance(times.dtype, pd.DatetimeTZDtype):
+        times = times.tz_convert("UTC").tz_localize(None)
+    values = np.asarray(times)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[s]").astype(np.int64)
+    return values.astype(np.int64)
+
+
+def bars_to_records(bars) -> np.ndarray:
+    """
+    Convertit des bougies en enregistrements BAR_DTYPE triés et sans doublon d'horodatage
+    (la dernière occurrence est conservée).
+
+    Args:
+        bars: DataFrame (index ou colonne 'time'), liste de dicts ou tableau BAR_DTYPE
+
+    Returns:
+        np.ndarray: Enregistrements BAR_DTYPE
+    """
+    if isinstance(bars, np.ndarray) and bars.dtype == BAR_DTYPE:
+        records = bars
+    else:
+        df = pd.DataFrame(bars) if not isinstance(bars, pd.DataFrame) else bars
+        times = df["time"] if "time" in df.columns else df.index
+        records = np.zeros(len(df), dtype=BAR_DTYPE)
+        records["time"] = to_epoch_seconds(times)
+        for field, aliases in _COLUMN_ALIASES.items():
+            column = next((c for c in aliases if c in df.columns), None)
+            if column is not None:
+                records[field] = df[column].to_numpy()
+
+    # Tri stable puis dernière occurrence de chaque horodatage
+    order = np.argsort(records["time"], kind="stable")
+    records = records[order]
+    if len(records) > 1:
+        keep = np.ones(len(records), dtype=bool)
+        keep[:-1] = records["time"][1:] != records["time"][:-1]
+        records = records[keep]
+    return records
+
+
+def records_to_frame(records: np.ndarray) -> pd.DataFrame:
+    """
+    Convertit des enregistrements BAR_DTYPE en DataFrame au format du connecteur MT5
+    (colonnes en minuscules, index 'time').
+
+    Args:
+        records: Enregistrements BAR_DTYPE
+
+    Returns:
+        pd.DataFrame: Bougies indexées par le temps
+    """
+    df = pd.DataFrame({name: records[name] for name in BAR_DTYPE.names if name != "time"})
+    df.index = pd.DatetimeIndex(records["time"].astype("datetime64[s]").astype("datetime64[ns]"), name="time")
+    return df
+
+
+class BarStore:
+    """
+    Stockage des bougies partitionné par symbole / timeframe / jour.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_ROOT):
+        """
+        Args:
+            root: Répertoire racine du stockage
+        """
+        self.root = Path(root)
+
+    # --- Partitions ---
+
+    def _series_dir(self, symbol: str, timeframe: str) -> Path:
+        return self.root / symbol / timeframe
+
+    def partition_path(self, symbol: str, timeframe: str, day: int) -> Path:
+        """
+        Chemin de la partition d'un jour.
+
+        Args:
+            symbol: Symbole (ex: 'US30')
+            timeframe: Timeframe (ex: 'M1')
+            day: Jour en jours epoch (time // 86400)
+
+        Returns:
+            Path: Chemin du fichier .bars
+        """
+        date = np.datetime64(int(day), "D").astype(object)
+        return self._series_dir(symbol, timeframe) / f"{date:%Y%m%d}{PARTITION_SUFFIX}"
+
+    def days(self, symbol: str, timeframe: str) -> list:
+        """
+        Jours stockés (jours epoch, ordre chronologique).
+
+        Args:
+            symbol: Symbole
+            timeframe: Timeframe
+
+        Returns:
+            list: Jours epoch des partitions existantes
+        """
+        series_dir = self._series_dir(symbol, timeframe)
+        if not series_dir.is_dir():
+            return []
+        days = []
+        for path in series_dir.glob(f"*{PARTITION_SUFFIX}"):
+            stem = path.stem
+            days.append(int(np.datetime64(f"{stem[:4]}-{stem[4:6]}-{stem[6:8]}", "D").astype(np.int64)))
+        return sorted(days)
+
+    @staticmethod
+    def _rows(path: Path) -> int:
+        return os.path.getsize(path) // BAR_DTYPE.itemsize if path.exists() else 0
+
+    @staticmethod
+    def _map(path: Path, mode: str = "r") -> np.ndarray:
+        rows = BarStore._rows(path)
+        if rows == 0:
+            return np.zeros(0, dtype=BAR_DTYPE)
+        return np.memmap(path, dtype=BAR_DTYPE, mode=mode, shape=(rows,))
+
+    def last_time(self, symbol: str, timeframe: str) -> int | None:
+        """
+        Horodatage (secondes epoch) de la dernière bougie stockée.
+
+        Args:
+            symbol: Symbole
+            timeframe: Timeframe
+
+        Returns:
+            int: Secondes epoch, ou None si aucune bougie n'est stockée
+        """
+        for day in reversed(self.days(symbol, timeframe)):
+            path = self.partition_path(symbol, timeframe, day)
+            rows = self._rows(path)
+            if rows:
+                with open(path, "rb") as f:
+                    f.seek((rows - 1) * BAR_DTYPE.itemsize)
+                    return int(np.frombuffer(f.read(BAR_DTYPE.itemsize), dtype=BAR_DTYPE)["time"][0])
+        return None
+
+    # --- Écriture ---
+
+    def write(self, symbol: str, timeframe: str, bars) -> int:
+        """
+        Ajoute des bougies (seules les nouvelles sont écrites, voir l'en-tête du module).
+
+        Args:
+            symbol: Symbole
+            timeframe: Timeframe
+            bars: Bougies (DataFrame, liste de dicts ou tableau BAR_DTYPE)
+
+        Returns:
+            int: Nombre de bougies ajoutées
+        """
+        records = bars_to_records(bars)
+        if len(records) == 0:
+            return 0
+        series_dir = self._series_dir(symbol, timeframe)
+        series_dir.mkdir(parents=True, exist_ok=True)
+
+        written = 0
+        days = records["time"] // SECONDS_PER_DAY
+        bounds = np.flatnonzero(np.diff(days)) + 1
+        for chunk in np.split(records, bounds):
+            written += self._write_partition(self.partition_path(symbol, timeframe, chunk["time"][0] // SECONDS_PER_DAY), chunk)
+        return written
+
+    def _write_partition(self, path: Path, chunk: np.ndarray) -> int:
+        rows = self._rows(path)
+        if rows == 0:
+            with open(path, "wb") as f:
+                f.write(chunk.tobytes())
+            return len(chunk)
+
+        existing = self._map(path)
+        last = existing["time"][-1]
+        older = chunk[chunk["time"] < last]
+        missing = older[~np.isin(older["time"], existing["time"])] if len(older) else older
+        newer = chunk[chunk["time"] > last]
+        same = chunk[chunk["time"] == last]
+
+        if len(missing):
+            # Trou d'historique: fusion triée et réécriture atomique de la partition
+            merged = np.concatenate([np.asarray(existing), missing, newer])
+            if len(same):
+                merged[len(existing) - 1] = same[-1]
+            merged = merged[np.argsort(merged["time"], kind="stable")]
+            del existing
+            tmp_path = path.with_suffix(PARTITION_SUFFIX + ".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(merged.tobytes())
+            os.replace(tmp_path, path)
+            return len(missing) + len(newer)
+
+        del existing
+        with open(path, "r+b") as f:
+            if len(same):
+                # Dernière bougie en cours de formation: valeurs les plus récentes
+                f.seek((rows - 1) * BAR_DTYPE.itemsize)
+                f.write(same[-1:].tobytes())
+            if len(newer):
+                f.seek(rows * BAR_DTYPE.itemsize)
+                f.write(newer.tobytes())
+        return len(newer)
+
+    # --- Lecture ---
+
+    def read(self, symbol: str, timeframe: str, start=None, end=None) -> np.ndarray:
+        """
+        Bougies de la plage [start, end) en enregistrements BAR_DTYPE.
+
+        Args:
+            symbol: Symbole
+            timeframe: Timeframe
+            start: Début inclus (datetime, Timestamp, chaîne ou secondes epoch; None: début)
+            end: Fin exclue (None: fin)
+
+        Returns:
+            np.ndarray: Vue mappée en lecture seule si la plage tient dans une partition, copie sinon
+        """
+        start_s = None if start is None else self._seconds(start)
+        end_s = None if end is None else self._seconds(end)
+        parts = []
+        for day in self.days(symbol, timeframe):
+            day_start = day * SECONDS_PER_DAY
+            if (end_s is not None and day_start >= end_s) or (start_s is not None and day_start + SECONDS_PER_DAY <= start_s):
+                continue
+            records = self._map(self.partition_path(symbol, timeframe, day))
+            times = records["time"]
+            lo = 0 if start_s is None else int(np.searchsorted(times, start_s, side="left"))
+            hi = len(records) if end_s is None else int(np.searchsorted(times, end_s, side="left"))
+            if hi > lo:
+                parts.append(records[lo:hi])
+        if not parts:
+            return np.zeros(0, dtype=BAR_DTYPE)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def read_arrays(self, symbol: str, timeframe: str, start=None, end=None) -> dict:
+        """
+        Bougies de la plage [start, end) en colonnes NumPy (vues du tableau de read).
+
+        Returns:
+            dict: {colonne: tableau}
+        """
+        records = self.read(symbol, timeframe, start, end)
+        return {name: records[name] for name in BAR_DTYPE.names}
+
+    def read_frame(self, symbol: str, timeframe: str, start=None, end=None, count: int | None = None) -> pd.DataFrame:
+        """
+        Bougies de la plage [start, end) au format du connecteur MT5 (index 'time').
+
+        Args:
+            symbol, timeframe, start, end: Voir read
+            count: Ne garder que les N dernières bougies de la plage
+
+        Returns:
+            pd.DataFrame: Bougies (open, high, low, close, tick_volume, spread, real_volume)
+        """
+        records = self.read(symbol, timeframe, start, end)
+        if count is not None:
+            records = records[-count:] if count > 0 else records[:0]
+        return records_to_frame(records)
+
+    @staticmethod
+    def _seconds(value) -> int:
+        if isinstance(value, (int, np.integer)):
+            return int(value)
+        timestamp = pd.Timestamp(value)
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+        return int(timestamp.value // 10**9)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stockage colonnaire des bougies")
+    parser.add_argument("command", choices=["import", "info"])
+    parser.add_argument("csv", nargs="?", help="Export MT5 à importer")
+    parser.add_argument("--symbol", required=True)
+    parser.add_argument("--timeframe", required=True)
+    parser.add_argument("--root", default=DEFAULT_STORE_ROOT, help="Racine du stockage")
+    args = parser.parse_args()
+
+    store = BarStore(args.root)
+    if args.command == "import":
+        written = store.write(args.symbol, args.timeframe, load_mt5_csv(args.csv, server_tz=None))
+        print(f"{written} bougies ajoutées à {args.symbol}/{args.timeframe}")
+    days = store.days(args.symbol, args.timeframe)
+    records = store.read(args.symbol, args.timeframe)
+    if len(records):
+        print(f"{len(records)} bougies sur {len(days)} jours, du {records_to_frame(records[:1]).index[0]} "
+              f"au {records_to_frame(records[-1:]).index[0]}")
+    else:
+        print("Aucune bougie stockée")
+
+
+if __name__ == "__main__":
+    main()
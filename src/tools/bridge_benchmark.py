@@ -0,0 +1,135 @@
+"""
+Banc de mesure du pont fichiers MT5 avec l'EA simulé (src/tools/fake_ea.py)
+Lance l'EA simulé dans un processus séparé, envoie une suite de commandes avec
+MT5FileConnector (une par une ou en lots BATCH) et affiche le débit (commandes/s) et les
+latences (p50, p90, p99, p99.9, max).
+
+Usage:
+    python -m src.tools.bridge_benchmark --commands 1000 --latency 0.001 --jitter 0.002
+    python -m src.tools.bridge_benchmark --batch 6 --csv US30.cash_M1_....csv
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from src.agents.execution.connector_telemetry import format_snapshot
+from src.agents.execution.mt5_connector import MT5FileConnector
+
+# Commandes d'un cycle de surveillance type
+DEFAULT_MIX = ("PRICE US30.cash", "DATA US30.cash M1 3", "DATA US30.cash M5 3", "DATA US30.cash M15 3",
+               "POSITIONS US30.cash", "ACCOUNT_INFO")
+
+
+def run_benchmark(connector, commands: int = 500, batch: int = 1, mix=DEFAULT_MIX) -> dict:
+    """
+    Envoie `commands` commandes (cycliquement dans `mix`) et mesure chaque aller-retour.
+
+    Args:
+        connector: MT5FileConnector connecté
+        commands: Nombre de commandes
+        batch: Commandes par aller-retour (1: send_command, sinon send_batch)
+        mix: Commandes envoyées à tour de rôle
+
+    Returns:
+        dict: commands, round_trips, errors, seconds, commands_per_second,
+              latences des allers-retours en ms (p50, p90, p99, p999, max)
+    """
+    sequence = [mix[i % len(mix)] for i in range(commands)]
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(0, commands, batch):
+            chunk = sequence[i:i + batch]
+            sent = time.perf_counter()
+            if batch == 1:
+                responses = [connector.send_command(chunk[0])]
+            else:
+                responses = connector.send_batch(chunk)
+            latencies.append(time.perf_counter() - sent)
+            errors += sum(1 for response in responses if response.startswith("ERROR"))
+    seconds = time.perf_counter() - start
+
+    latencies = np.array(latencies) * 1000
+    return {
+        "commands": commands,
+        "round_trips": len(latencies),
+        "errors": errors,
+        "seconds": seconds,
+        "commands_per_second": commands / seconds,
+        "p50": float(np.percentile(latencies, 50)),
+        "p90": float(np.percentile(latencies, 90)),
+        "p99": float(np.percentile(latencies, 99)),
+        "p999": float(np.percentile(latencies, 99.9)),
+        "max": float(latencies.max()),
+    }
+
+
+def format_results(results: dict) -> str:
+    return (f"{results['commands']} commandes en {results['round_trips']} allers-retours, "
+            f"{results['errors']} erreurs: {results['commands_per_second']:.0f} commandes/s | "
+            f"latence p50 {results['p50']:.2f} ms, p90 {results['p90']:.2f} ms, p99 {results['p99']:.2f} ms, "
+            f"p99.9 {results['p999']:.2f} ms, max {results['max']:.2f} ms")
+
+
+def start_fake_ea(files_dir: str, csv_path=None, latency=0.0, jitter=0.0, timer_interval=None) -> subprocess.Popen:
+    """
+    Lance l'EA simulé dans un processus et attend qu'il soit prêt.
+
+    Returns:
+        subprocess.Popen: Processus de l'EA (à arrêter avec terminate())
+    """
+    response_file = os.path.join(files_dir, "responses.txt")
+    if os.path.exists(response_file):
+        os.remove(response_file)
+    command = [sys.executable, "-m", "src.tools.fake_ea", "--files-dir", files_dir,
+               "--latency", str(latency), "--jitter", str(jitter)]
+    if csv_path:
+        command += ["--csv", csv_path]
+    if timer_interval:
+        command += ["--timer-interval", str(timer_interval)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while not os.path.exists(response_file):
+        if process.poll() is not None or time.monotonic() > deadline:
+            raise RuntimeError("L'EA simulé n'a pas démarré")
+        time.sleep(0.01)
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit et latence du pont fichiers MT5 avec l'EA simulé")
+    parser.add_argument("--commands", type=int, default=600, help="Nombre de commandes")
+    parser.add_argument("--batch", type=int, default=1, help="Commandes par aller-retour (BATCH)")
+    parser.add_argument("--csv", help="Export MT5 M1 rejoué par l'EA simulé")
+    parser.add_argument("--latency", type=float, default=0.0, help="Délai de réponse de l'EA (secondes)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Délai aléatoire supplémentaire de l'EA (secondes)")
+    parser.add_argument("--timer-interval", type=float, help="Timer de l'EA (secondes) au lieu des événements fichiers")
+    parser.add_argument("--response-wait", default="auto", help="Attente côté Python: auto, watchfiles, inotify, poll")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as files_dir:
+        process = start_fake_ea(files_dir, args.csv, args.latency, args.jitter, args.timer_interval)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                connector = MT5FileConnector({"files_dir": files_dir, "response_wait": args.response_wait})
+                connector.connect()
+            results = run_benchmark(connector, args.commands, args.batch)
+            print(f"Attente des réponses: {connector._waiter.backend}")
+            print(format_results(results))
+            print(format_snapshot(connector.telemetry.snapshot()))
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
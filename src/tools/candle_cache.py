@@ -0,0 +1,246 @@
+"""
+Cache incrémental des bougies par symbole / timeframe
+Garde en mémoire les dernières bougies de chaque série dans un tampon circulaire
+d'enregistrements BAR_DTYPE et ne demande à MT5 que les bougies plus récentes que la
+dernière bougie en cache (plus un petit recouvrement).
+
+- Premier appel: la fenêtre complète est demandée (comme auparavant).
+- Appels suivants: le nombre de bougies demandées est estimé à partir du temps écoulé
+  depuis la dernière mise à jour, plus `overlap` bougies de recouvrement. Si les bougies
+  reçues ne recouvrent pas le cache (interruption plus longue que prévu), la demande est
+  agrandie jusqu'à la fenêtre complète.
+- Fusion sur place: les nouvelles bougies sont ajoutées, les bougies déjà en cache
+  (dont la dernière, en cours de formation) sont mises à jour.
+
+La fenêtre est exposée en colonnes NumPy (vues contiguës, sans copie) ou en DataFrame
+au format du connecteur MT5.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.tools.bar_store import BAR_DTYPE, bars_to_records, records_to_frame
+
+TIMEFRAME_SECONDS = {
+    "M1": 60, "M2": 120, "M3": 180, "M4": 240, "M5": 300, "M6": 360, "M10": 600, "M12": 720,
+    "M15": 900, "M20": 1200, "M30": 1800, "H1": 3600, "H2": 7200, "H3": 10800, "H4": 14400,
+    "H6": 21600, "H8": 28800, "H12": 43200, "D1": 86400,
+}
+
+
+class CandleRing:
+    """
+    Tampon circulaire des N dernières bougies d'une série.
+
+    Les enregistrements sont stockés dans un tableau de 2N cases: les ajouts se font en
+    fin de zone occupée, et quand le tableau est plein les N dernières bougies sont
+    recopiées au début (coût amorti constant). La fenêtre reste ainsi toujours contiguë.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity: Nombre de bougies conservées
+        """
+        self.capacity = capacity
+        self._buffer = np.zeros(2 * capacity, dtype=BAR_DTYPE)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def records(self) -> np.ndarray:
+        """Fenêtre des bougies (vue contiguë, ordre chronologique)."""
+        return self._buffer[self._start:self._end]
+
+    @property
+    def last_time(self) -> int | None:
+        """Horodatage (secondes epoch) de la dernière bougie, None si vide."""
+        return int(self._buffer["time"][self._end - 1]) if len(self) else None
+
+    def clear(self):
+        self._start = self._end = 0
+
+    def merge(self, records: np.ndarray) -> int:
+        """
+        Fusionne des bougies triées dans la fenêtre.
+
+        Les bougies déjà présentes sont mises à jour sur place, les plus récentes sont
+        ajoutées, les plus anciennes que la fenêtre sont ignorées.
+
+        Args:
+            records: Enregistrements BAR_DTYPE triés sans doublon
+
+        Returns:
+            int: Nombre de bougies ajoutées
+        """
+        if len(records) == 0:
+            return 0
+        window = self.records
+        if len(window):
+            times = window["time"]
+            known = records[(records["time"] >= times[0]) & (records["time"] <= times[-1])]
+            if len(known):
+                positions = np.searchsorted(times, known["time"])
+                found = times[positions] == known["time"]
+                window[positions[found]] = known[found]
+            records = records[records["time"] > times[-1]]
+        if len(records) == 0:
+            return 0
+
+        records = records[-self.capacity:]
+        if self._end + len(records) > len(self._buffer):
+            # Compactage: on ne garde que les bougies qui resteront dans la fenêtre
+            keep = max(0, min(len(self), self.capacity - len(records)))
+            self._buffer[:keep] = self._buffer[self._end - keep:self._end]
+            self._start, self._end = 0, keep
+        self._buffer[self._end:self._end + len(records)] = records
+        self._end += len(records)
+        self._start = max(self._start, self._end - self.capacity)
+        return len(records)
+
+
+class CandleCache:
+    """
+    Cache des bougies récentes de plusieurs séries, alimenté par un connecteur MT5.
+    """
+
+    def __init__(self, connector, window: int = 100, overlap: int = 2, windows: dict | None = None):
+        """
+        Args:
+            connector: Connecteur MT5 (méthode get_data(symbol, timeframe, count))
+            window: Nombre de bougies conservées par série
+            overlap: Bougies déjà en cache redemandées à chaque mise à jour
+                     (la dernière bougie, en formation, doit être rafraîchie)
+            windows: Taille de fenêtre par timeframe (ex: {'M1': 1500}), window par défaut
+        """
+        self.connector = connector
+        self.window = window
+        self.windows = windows or {}
+        self.overlap = max(1, overlap)
+        self._rings = {}
+        self._updated_at = {}
+        self.stats = {"requests": 0, "bars_received": 0, "bars_added": 0, "resets": 0}
+
+    def ring(self, symbol: str, timeframe: str) -> CandleRing:
+        key = (symbol, timeframe)
+        if key not in self._rings:
+            self._rings[key] = CandleRing(self.windows.get(timeframe, self.window))
+        return self._rings[key]
+
+    def _fetch(self, symbol: str, timeframe: str, count: int) -> np.ndarray | None:
+        # Enregistrements BAR_DTYPE directement quand le connecteur les fournit (sans DataFrame)
+        get_rates = getattr(self.connector, "get_rates", None)
+        candles = (get_rates or self.connector.get_data)(symbol, timeframe, count)
+        self.stats["requests"] += 1
+        if candles is None:
+            return None
+        self.stats["bars_received"] += len(candles)
+        return bars_to_records(candles)
+
+    def _bars_to_request(self, symbol: str, timeframe: str) -> int:
+        """Bougies à demander: celles apparues depuis la dernière mise à jour, plus le recouvrement."""
+        window = self.ring(symbol, timeframe).capacity
+        updated_at = self._updated_at.get((symbol, timeframe))
+        seconds = TIMEFRAME_SECONDS.get(timeframe)
+        if updated_at is None or seconds is None:
+            return window
+        elapsed = time.monotonic() - updated_at
+        return min(window, self.overlap + int(elapsed // seconds))
+
+    def request_count(self, symbol: str, timeframe: str) -> int:
+        """Nombre de bougies demandées par la prochaine mise à jour d'une série (si elle recouvre le cache)."""
+        ring = self.ring(symbol, timeframe)
+        return self._bars_to_request(symbol, timeframe) if len(ring) else ring.capacity
+
+    def update(self, symbol: str, timeframe: str) -> bool:
+        """
+        Met à jour une série en ne demandant que les nouvelles bougies.
+
+        Args:
+            symbol: Symbole
+            timeframe: Timeframe
+
+        Returns:
+            bool: True si la série est à jour, False si le connecteur n'a pas répondu
+        """
+        ring = self.ring(symbol, timeframe)
+        count = self.request_count(symbol, timeframe)
+        while True:
+            records = self._fetch(symbol, timeframe, count)
+            if records is None:
+                return False
+            last = ring.last_time
+            # Recouvrement avec le cache: la bougie la plus ancienne reçue est déjà connue
+            if last is None or len(records) == 0 or records["time"][0] <= last or len(records) < count:
+                break
+            if count >= ring.capacity:
+                # Trou plus grand que la fenêtre: le cache est remplacé
+                ring.clear()
+                self.stats["resets"] += 1
+                break
+            count = min(ring.capacity, count * 4)
+        self.stats["bars_added"] += ring.merge(records)
+        self._updated_at[(symbol, timeframe)] = time.monotonic()
+        return True
+
+    def arrays(self, symbol: str, timeframe: str) -> dict:
+        """
+        Fenêtre d'une série en colonnes NumPy (vues sur le tampon, valides jusqu'à la
+        prochaine mise à jour).
+
+        Returns:
+            dict: {colonne: tableau} (time en secondes epoch)
+        """
+        records = self.ring(symbol, timeframe).records
+        return {name: records[name] for name in BAR_DTYPE.names}
+
+    def records(self, symbol: str, timeframe: str, count: int | None = None) -> np.ndarray:
+        """
+        Copie des dernières bougies d'une série (indépendante des mises à jour suivantes).
+
+        Args:
+            symbol: Symbole
+            timeframe: Timeframe
+            count: Nombre de bougies (None: toute la fenêtre)
+
+        Returns:
+            np.ndarray: Enregistrements BAR_DTYPE
+        """
+        records = self.ring(symbol, timeframe).records
+        return (records if count is None else records[-count:]).copy()
+
+    def frame(self, symbol: str, timeframe: str, count: int | None = None) -> pd.DataFrame:
+        """
+        Fenêtre d'une série au format du connecteur MT5 (index 'time', colonnes en minuscules).
+
+        Args:
+            symbol: Symbole
+            timeframe: Timeframe
+            count: Nombre de bougies (None: toute la fenêtre)
+
+        Returns:
+            pd.DataFrame: Bougies (copie)
+        """
+        records = self.ring(symbol, timeframe).records
+        return records_to_frame(records if count is None else records[-count:])
+
+    def get_data(self, symbol: str, timeframe: str, count: int | None = None) -> pd.DataFrame | None:
+        """
+        Met à jour une série et renvoie ses dernières bougies (même interface que le connecteur).
+
+        Args:
+            symbol: Symbole
+            timeframe: Timeframe
+            count: Nombre de bougies (None: toute la fenêtre)
+
+        Returns:
+            pd.DataFrame: Bougies, ou None si le connecteur n'a pas répondu
+        """
+        if not self.update(symbol, timeframe):
+            return None
+        return self.frame(symbol, timeframe, count)
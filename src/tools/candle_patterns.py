@@ -0,0 +1,78 @@
+"""
+Masques vectorisés de patterns chandeliers
+Calcule en une passe les colonnes booléennes d'englobante haussière / baissière
+pour tout un DataFrame OHLC, au lieu d'appeler detect_engulfing_pattern bougie par bougie.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Règles anti-doji disponibles (tolérance sur le corps de la bougie précédente)
+ANTI_DOJI_RULES = {
+    'close_pct': "signal_utils.py - corps < 0.01% de la clôture précédente",
+    'mean_range': "signal_utils_doji.py - corps < 1% de (moyenne High - moyenne Low) du DataFrame",
+    None: "signal_utils_ameliore.py - englobement des dojis autorisé",
+}
+
+
+def engulfing_mask_arrays(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                          anti_doji: str | None = 'close_pct') -> tuple:
+    """
+    Calcule les masques d'englobante sur des tableaux positionnels.
+
+    Args:
+        open_, high, low, close: Tableaux de prix triés chronologiquement
+        anti_doji: Règle de tolérance sur le corps précédent ('close_pct', 'mean_range' ou None)
+
+    Returns:
+        tuple: (masque haussier, masque baissier) - True à la bougie de confirmation
+    """
+    if anti_doji not in ANTI_DOJI_RULES:
+        raise ValueError(f"Règle anti-doji inconnue: {anti_doji}")
+
+    open_ = np.asarray(open_, dtype=float)
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+    bullish = np.zeros(n, dtype=bool)
+    bearish = np.zeros(n, dtype=bool)
+    if n < 2:
+        return bullish, bearish
+
+    cur_open, cur_close = open_[1:], close[1:]
+    prev_open, prev_close = open_[:-1], close[:-1]
+    valid = ~(np.isnan(cur_open) | np.isnan(cur_close) | np.isnan(prev_open) | np.isnan(prev_close))
+
+    if anti_doji == 'close_pct':
+        body_tolerance = np.where(prev_close > 0, prev_close * 0.0001, 0.01)
+        valid &= ~(np.abs(prev_close - prev_open) < body_tolerance)
+    elif anti_doji == 'mean_range':
+        body_tolerance = (np.nanmean(np.asarray(high, dtype=float)) - np.nanmean(np.asarray(low, dtype=float))) * 0.01
+        valid &= ~(np.abs(prev_close - prev_open) < body_tolerance)
+
+    bullish[1:] = valid & (cur_close > cur_open) & (prev_close < prev_open) & \
+        (cur_open < prev_close) & (cur_close > prev_open)
+    bearish[1:] = valid & (cur_close < cur_open) & (prev_close > prev_open) & \
+        (cur_open > prev_close) & (cur_close < prev_open)
+    return bullish, bearish
+
+
+def engulfing_masks(df_ohlc: pd.DataFrame, anti_doji: str | None = 'close_pct') -> pd.DataFrame:
+    """
+    Colonnes d'englobante pour tout le DataFrame (équivalent de detect_engulfing_pattern
+    appelé sur chaque bougie).
+
+    Args:
+        df_ohlc: DataFrame avec 'Open', 'High', 'Low', 'Close', trié chronologiquement
+        anti_doji: 'close_pct' (signal_utils), 'mean_range' (signal_utils_doji) ou None (signal_utils_ameliore)
+
+    Returns:
+        pd.DataFrame: Colonnes booléennes 'bullish' et 'bearish' alignées sur l'index de df_ohlc
+    """
+    bullish, bearish = engulfing_mask_arrays(
+        df_ohlc['Open'].to_numpy(dtype=float),
+        df_ohlc['High'].to_numpy(dtype=float),
+        df_ohlc['Low'].to_numpy(dtype=float),
+        df_ohlc['Close'].to_numpy(dtype=float),
+        anti_doji
+    )
+    return pd.DataFrame({'bullish': bullish, 'bearish': bearish}, index=df_ohlc.index)
@@ -0,0 +1,409 @@
+"""
+EA MT5 simulé (Python pur) pour tester et mesurer le pont fichiers sans MetaTrader
+Surveille requests.txt dans un dossier d'échange et répond au même protocole que l'EA
+(docs/components/mt5_bridge_protocol.md): PRICE, DATA, DATA_RANGE, ORDER, POSITIONS,
+HISTORY_ORDERS, POSITION_SIZE, CLOSE_POSITION, CLOSE_ALL_POSITIONS, ACCOUNT_INFO, PERFORMANCE,
+en commande simple ou en lot BATCH.
+
+- Marché rejoué à partir d'un export CSV MT5 (ou d'une marche aléatoire sans CSV): la
+  bougie courante avance de `bars_per_second` bougies M1 par seconde (0: figée, advance()).
+- DATA sur les timeframes supérieurs: bougies reconstruites à partir des bougies M1.
+  Format JSON, ou MqlRates binaires en base64 avec l'option RATES (DATA_RATES).
+- Ordres au marché (BUY à l'ask, SELL au bid), stop loss / take profit vérifiés sur les
+  bougies rejouées, P&L = écart de prix x volume x contract_size.
+- Délai de réponse configurable: latency + uniforme(0, jitter) secondes par requête.
+
+Usage:
+    python -m src.tools.fake_ea --files-dir /tmp/mt5 [--csv US30.cash_M1_....csv] [--latency 0.002]
+"""
+
+import argparse
+import binascii
+import json
+import os
+import signal
+import threading
+import time
+
+import numpy as np
+
+from src.agents.execution.file_events import FileEventWaiter
+from src.tools.bar_store import BAR_DTYPE
+from src.tools.candle_cache import TIMEFRAME_SECONDS
+from src.tools.mt5_csv import load_mt5_records
+from src.tools.resampler import can_resample, resample_records
+
+DEFAULT_CONFIG = {
+    "symbol": "US30.cash",
+    "latency": 0.0,             # Délai de traitement d'une requête (secondes)
+    "jitter": 0.0,              # Délai supplémentaire aléatoire, uniforme entre 0 et jitter
+    "bars_per_second": 0.0,     # Vitesse du rejeu (bougies M1 par seconde)
+    "history": 5000,            # Bougies disponibles avant la bougie courante au départ
+    "point": 0.01,
+    "contract_size": 100,
+    "balance": 10000.0,
+    "timer_interval": None,     # Relecture de la requête (timer MT5), None: événements fichiers
+    "seed": 0,
+}
+
+
+def synthetic_records(n: int, seed: int = 0, start: int = 1735689600) -> np.ndarray:
+    """
+    Bougies M1 en marche aléatoire (quand aucun export CSV n'est fourni).
+
+    Args:
+        n: Nombre de bougies
+        seed: Graine du générateur
+        start: Horodatage de la première bougie (secondes epoch)
+
+    Returns:
+        np.ndarray: Enregistrements BAR_DTYPE
+    """
+    rng = np.random.default_rng(seed)
+    records = np.zeros(n, dtype=BAR_DTYPE)
+    close = np.round(42000 + np.cumsum(rng.normal(0, 5, n)), 1)
+    records["time"] = start + 60 * np.arange(n)
+    records["close"] = close
+    records["open"] = np.concatenate([[close[0]], close[:-1]])
+    records["high"] = np.maximum(records["open"], close) + np.round(rng.exponential(3, n), 1)
+    records["low"] = np.minimum(records["open"], close) - np.round(rng.exponential(3, n), 1)
+    records["tick_volume"] = rng.integers(50, 500, n)
+    records["spread"] = 200
+    return records
+
+
+class FakeEA:
+    """
+    EA simulé: répond aux requêtes du dossier d'échange à partir de bougies M1 rejouées.
+    """
+
+    def __init__(self, files_dir: str, records: np.ndarray | None = None, config: dict | None = None):
+        """
+        Args:
+            files_dir: Dossier d'échange (requests.txt / responses.txt)
+            records: Bougies M1 rejouées (BAR_DTYPE ou MT5_CSV_DTYPE), marche aléatoire si None
+            config: Voir DEFAULT_CONFIG
+        """
+        self.config = {**DEFAULT_CONFIG, **(config or {})}
+        self.files_dir = files_dir
+        self.request_file = os.path.join(files_dir, "requests.txt")
+        self.response_file = os.path.join(files_dir, "responses.txt")
+
+        if records is None:
+            records = synthetic_records(self.config["history"] + 20000, self.config["seed"])
+        self.bars = np.zeros(len(records), dtype=BAR_DTYPE)
+        for name in BAR_DTYPE.names:
+            if name in records.dtype.names:
+                self.bars[name] = records[name]
+        self.start_index = min(self.config["history"], len(self.bars) - 1)
+        self._offset = 0
+        self._started_at = time.monotonic()
+        self._rng = np.random.default_rng(self.config["seed"])
+
+        self.balance = float(self.config["balance"])
+        self.positions = []
+        self.history = []
+        self._next_ticket = 1000
+        self._checked_index = self.start_index
+        self.stats = {"requests": 0, "commands": 0}
+
+        self._stop = threading.Event()
+        self._thread = None
+        self._waiter = None
+        self._lock = threading.Lock()
+
+    # --- Marché rejoué ---
+
+    @property
+    def index(self) -> int:
+        """Indice de la bougie M1 courante."""
+        elapsed = (time.monotonic() - self._started_at) * self.config["bars_per_second"]
+        return min(len(self.bars) - 1, self.start_index + self._offset + int(elapsed))
+
+    def advance(self, bars: int = 1):
+        """Avance le rejeu de `bars` bougies M1."""
+        self._offset += bars
+
+    def _prices(self, index: int) -> tuple:
+        bid = float(self.bars["close"][index])
+        return bid, round(bid + self.bars["spread"][index] * self.config["point"], 5)
+
+    def _candles(self, timeframe: str, count: int) -> np.ndarray | None:
+        index = self.index
+        if timeframe == "M1":
+            return self.bars[max(0, index + 1 - count):index + 1]
+        if not can_resample("M1", timeframe):
+            return None
+        ratio = TIMEFRAME_SECONDS[timeframe] // 60
+        base = self.bars[max(0, index + 1 - (count + 1) * ratio):index + 1]
+        return resample_records(base, timeframe)[-count:]
+
+    # --- Positions ---
+
+    def _profit(self, position: dict, price: float) -> float:
+        direction = 1 if position["type"] == "BUY" else -1
+        return round(direction * (price - position["price_open"]) * position["volume"] * self.config["contract_size"], 2)
+
+    def _close(self, position: dict, price: float, when: int):
+        self.positions.remove(position)
+        profit = self._profit(position, price)
+        self.balance += profit
+        self.history.append({**position, "price_close": price, "time_close": when, "profit": profit})
+
+    def _update_positions(self):
+        """Ferme les positions dont le stop loss ou le take profit a été touché depuis la dernière requête."""
+        index = self.index
+        for i in range(self._checked_index + 1, index + 1 if self.positions else 0):
+            high, low = float(self.bars["high"][i]), float(self.bars["low"][i])
+            spread = self.bars["spread"][i] * self.config["point"]
+            for position in list(self.positions):
+                sl, tp = position["sl"], position["tp"]
+                if position["type"] == "BUY":
+                    if sl and low <= sl:
+                        self._close(position, sl, int(self.bars["time"][i]))
+                    elif tp and high >= tp:
+                        self._close(position, tp, int(self.bars["time"][i]))
+                else:
+                    if sl and high + spread >= sl:
+                        self._close(position, sl, int(self.bars["time"][i]))
+                    elif tp and low + spread <= tp:
+                        self._close(position, tp, int(self.bars["time"][i]))
+        self._checked_index = max(self._checked_index, index)
+        bid, ask = self._prices(index)
+        for position in self.positions:
+            position["price_current"] = bid if position["type"] == "BUY" else ask
+            position["profit"] = self._profit(position, position["price_current"])
+
+    # --- Commandes ---
+
+    def execute(self, command: str) -> str:
+        """
+        Exécute une commande du protocole.
+
+        Args:
+            command: Commande sans ID (ex: 'PRICE US30.cash')
+
+        Returns:
+            str: Réponse (sur une ligne)
+        """
+        self.stats["commands"] += 1
+        name, *args = command.split()
+        handler = getattr(self, f"_cmd_{name.lower()}", None)
+        if handler is None:
+            return "ERROR: UNKNOWN COMMAND"
+        try:
+            self._update_positions()
+            return handler(args)
+        except (ValueError, IndexError) as e:
+            return f"ERROR: {name} {e}"
+
+    def _cmd_price(self, args):
+        bid, ask = self._prices(self.index)
+        return f"PRICE BID={bid} ASK={ask}"
+
+    def _cmd_data(self, args):
+        symbol, timeframe, count = args[0], args[1], int(args[2])
+        candles = self._candles(timeframe, count)
+        if candles is None:
+            return f"ERROR: TIMEFRAME {timeframe}"
+        return self._data_response(symbol, timeframe, candles, rates=len(args) > 3 and args[3].upper() == "RATES")
+
+    def _cmd_data_range(self, args):
+        symbol, timeframe, start, end = args[0], args[1], int(args[2]), int(args[3])
+        seconds = TIMEFRAME_SECONDS.get(timeframe)
+        if seconds is None or (timeframe != "M1" and not can_resample("M1", timeframe)):
+            return f"ERROR: TIMEFRAME {timeframe}"
+        # Bougies M1 déjà rejouées, depuis le début de la bougie qui contient start
+        available = self.bars[:self.index + 1]
+        lo, hi = np.searchsorted(available["time"], [start - start % seconds, end])
+        candles = available[lo:hi]
+        if timeframe != "M1":
+            candles = resample_records(candles, timeframe, drop_first_partial=False)
+        candles = candles[(candles["time"] >= start) & (candles["time"] < end)]
+        return self._data_response(symbol, timeframe, candles, rates=len(args) > 4 and args[4].upper() == "RATES")
+
+    @staticmethod
+    def _data_response(symbol: str, timeframe: str, candles: np.ndarray, rates: bool) -> str:
+        if rates:
+            # MqlRates binaires en base64 (format compact)
+            payload = binascii.b2a_base64(np.ascontiguousarray(candles, dtype=BAR_DTYPE).tobytes(), newline=False)
+            return f"DATA_RATES {symbol} {timeframe} {len(candles)} {payload.decode('ascii')}"
+        names = ("time", "open", "high", "low", "close", "tick_volume", "spread", "real_volume")
+        rows = zip(*(candles[name].tolist() for name in names))
+        return f"DATA {symbol} {timeframe} {json.dumps([dict(zip(names, row)) for row in rows])}"
+
+    def _cmd_order(self, args):
+        symbol, order_type, volume = args[0], args[1].upper(), float(args[2])
+        sl, tp = float(args[4]), float(args[5])
+        magic = int(args[6]) if len(args) > 6 else 0
+        if order_type not in ("BUY", "SELL"):
+            return f"ERROR: ORDER TYPE {order_type}"
+        bid, ask = self._prices(self.index)
+        price = ask if order_type == "BUY" else bid
+        self._next_ticket += 1
+        self.positions.append({
+            "ticket": self._next_ticket, "symbol": symbol, "type": order_type, "volume": volume,
+            "price_open": price, "price_current": price, "sl": sl, "tp": tp, "profit": 0.0,
+            "magic": magic, "comment": " ".join(args[7:]), "time": int(self.bars["time"][self.index]),
+        })
+        return f"ORDER_RESULT ticket={self._next_ticket} price={price} volume={volume}"
+
+    def _cmd_positions(self, args):
+        positions = [p for p in self.positions if not args or p["symbol"] == args[0]]
+        return f"POSITIONS {json.dumps(positions)}" if positions else "POSITIONS EMPTY"
+
+    def _cmd_history_orders(self, args):
+        since = int(self.bars["time"][self.index]) - int(args[0]) * 86400
+        orders = [o for o in self.history if o["time_close"] >= since and (len(args) < 2 or o["symbol"] == args[1])]
+        return f"HISTORY_ORDERS {json.dumps(orders)}" if orders else "HISTORY_ORDERS EMPTY"
+
+    def _cmd_position_size(self, args):
+        stop_points, risk_percent = float(args[1]), float(args[2])
+        risk_amount = self.balance * risk_percent / 100
+        size = risk_amount / max(stop_points * self.config["point"] * self.config["contract_size"], 1e-9)
+        return f"POSITION_SIZE={max(round(size, 2), 0.01)}"
+
+    def _cmd_close_position(self, args):
+        key, _, value = args[0].partition("=")
+        bid, ask = self._prices(self.index)
+        for position in list(self.positions):
+            if (key == "ID" and str(position["ticket"]) == value) or (key == "SYMBOL" and position["symbol"] == value):
+                self._close(position, bid if position["type"] == "BUY" else ask, int(self.bars["time"][self.index]))
+                return "POSITION_CLOSED"
+        return "ERROR: POSITION NOT FOUND"
+
+    def _cmd_close_all_positions(self, args):
+        bid, ask = self._prices(self.index)
+        positions = list(self.positions)
+        for position in positions:
+            self._close(position, bid if position["type"] == "BUY" else ask, int(self.bars["time"][self.index]))
+        return f"POSITIONS_CLOSED={len(positions)}"
+
+    def _cmd_account_info(self, args):
+        equity = self.balance + sum(p["profit"] for p in self.positions)
+        return (f"ACCOUNT_INFO LOGIN=1000001 BALANCE={round(self.balance, 2)} EQUITY={round(equity, 2)} "
+                f"MARGIN=0.0 FREE_MARGIN={round(equity, 2)} CURRENCY=USD")
+
+    def _cmd_performance(self, args):
+        profits = [o["profit"] for o in self.history]
+        wins = sum(1 for p in profits if p > 0)
+        return "PERFORMANCE " + json.dumps({"trades": len(profits), "profit": round(sum(profits), 2),
+                                             "win_rate": wins / len(profits) * 100 if profits else 0.0})
+
+    # --- Échange de fichiers ---
+
+    def respond(self, request: str) -> str:
+        """
+        Réponse à un contenu de requests.txt (commande simple, ancien format sans ID, ou lot BATCH).
+        """
+        lines = [line.strip() for line in request.split("\n") if line.strip()]
+        header = lines[0]
+        if not header.startswith("ID:") or "|" not in header:
+            return self.execute(header)
+        command_id, command = header[3:].split("|", 1)
+        if not command.startswith("BATCH"):
+            return f"ID:{command_id}|{self.execute(command)}"
+        parts = [header]
+        for line in lines[1:]:
+            part_id, part = line.split("|", 1)
+            parts.append(f"{part_id}|{self.execute(part)}")
+        return "\n".join(parts)
+
+    def _take_request(self):
+        try:
+            with open(self.request_file, encoding="latin-1") as f:
+                request = f.read().strip()
+        except FileNotFoundError:
+            return None
+        if not request:
+            return None
+        # Requête lue: fichier vidé (comme l'EA)
+        open(self.request_file, "w").close()
+        return request
+
+    def _write_response(self, response: str):
+        # Écriture atomique (fichier temporaire renommé, FileMove côté MQL5)
+        tmp_file = self.response_file + ".tmp"
+        with open(tmp_file, "w", encoding="latin-1") as f:
+            f.write(response)
+        os.replace(tmp_file, self.response_file)
+
+    def serve_once(self, timeout: float = 0.05) -> bool:
+        """
+        Attend une requête (au plus `timeout` secondes) et y répond.
+
+        Returns:
+            bool: True si une requête a été traitée
+        """
+        if self.config["timer_interval"]:
+            time.sleep(self.config["timer_interval"])
+            request = self._take_request()
+        else:
+            request = self._waiter.wait_for(self._take_request, timeout, names=("requests.txt",))
+        if request is None:
+            return False
+        delay = self.config["latency"] + self._rng.uniform(0, self.config["jitter"])
+        if delay > 0:
+            time.sleep(delay)
+        with self._lock:
+            self.stats["requests"] += 1
+            response = self.respond(request)
+        self._write_response(response)
+        return True
+
+    def serve_forever(self):
+        """Répond aux requêtes jusqu'à stop()."""
+        os.makedirs(self.files_dir, exist_ok=True)
+        self._waiter = FileEventWaiter(self.files_dir)
+        try:
+            with open(self.response_file, "w", encoding="latin-1") as f:
+                f.write("READY")
+            while not self._stop.is_set():
+                self.serve_once()
+        finally:
+            self._waiter.close()
+
+    def start(self) -> "FakeEA":
+        """Démarre l'EA dans un thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        while not os.path.exists(self.response_file):
+            time.sleep(0.001)
+        return self
+
+    def stop(self):
+        """Arrête l'EA."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EA MT5 simulé (protocole fichiers requests.txt / responses.txt)")
+    parser.add_argument("--files-dir", required=True, help="Dossier d'échange")
+    parser.add_argument("--csv", help="Export MT5 M1 rejoué (marche aléatoire si absent)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Délai de réponse (secondes)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Délai aléatoire supplémentaire maximal (secondes)")
+    parser.add_argument("--bars-per-second", type=float, default=0.0, help="Vitesse du rejeu (bougies M1 par seconde)")
+    parser.add_argument("--timer-interval", type=float, help="Relecture périodique de la requête au lieu des événements")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Horodatages du CSV laissés à l'heure du serveur, comme dans les réponses de l'EA
+    records = load_mt5_records(args.csv, server_tz=None)[0] if args.csv else None
+    ea = FakeEA(args.files_dir, records, {
+        "latency": args.latency, "jitter": args.jitter, "bars_per_second": args.bars_per_second,
+        "timer_interval": args.timer_interval, "seed": args.seed,
+    })
+    signal.signal(signal.SIGTERM, lambda *_: ea._stop.set())
+    print(f"EA simulé prêt dans {args.files_dir} ({len(ea.bars)} bougies M1)", flush=True)
+    try:
+        ea.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
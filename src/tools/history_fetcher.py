@@ -0,0 +1,244 @@
+"""
+Téléchargement de l'historique MT5 par tranches, écrit au fil de l'eau dans le stockage des
+bougies (BarStore)
+
+Remplace la demande de tout l'historique en une seule commande DATA (un seul timeout, une
+seule réponse JSON de plusieurs Mo) par des commandes DATA_RANGE sur des plages de temps de
+taille fixe (chunk_size bougies).
+
+- Chaque tranche est écrite dans le stockage dès sa réception ; le décodage et l'écriture
+  d'une tranche se font dans un thread pendant la demande de la tranche suivante (les plages
+  sont connues à l'avance, sans attendre la réponse précédente).
+- Une tranche en échec (timeout, erreur de l'EA) est redemandée (max_retries), puis le
+  téléchargement s'arrête. La progression est enregistrée après chaque tranche écrite
+  (<racine>/<symbole>/<timeframe>/history_fetch.json) : l'appel suivant reprend après la
+  dernière tranche stockée au lieu de tout redemander.
+- EA sans DATA_RANGE (réponse RANGE_UNSUPPORTED à la première tranche): une seule commande
+  DATA (ancien comportement). Les autres erreurs ne déclenchent pas ce repli.
+
+Usage:
+    fetcher = HistoryFetcher(connector, BarStore("data/bars"))
+    fetcher.fetch_recent("US30", "M1", days=30)
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.agents.execution.mt5_connector import RANGE_UNSUPPORTED
+from src.tools.bar_store import SECONDS_PER_DAY
+from src.tools.candle_cache import TIMEFRAME_SECONDS
+
+CHECKPOINT_FILE = "history_fetch.json"
+
+# Heure du serveur MT5 en avance sur l'UTC (jusqu'à 14 h): la fin ouverte de l'historique est
+# prolongée d'un jour, et les tranches de ce dernier jour sont toujours redemandées
+LIVE_MARGIN = SECONDS_PER_DAY
+
+
+class HistoryFetcher:
+    """
+    Téléchargement par tranches et reprenable de l'historique d'une série.
+    """
+
+    def __init__(self, connector, store, chunk_size: int = 5000, max_retries: int = 2,
+                 retry_delay: float = 1.0, timeout: float | None = None, clock=time.time):
+        """
+        Args:
+            connector: Connecteur MT5 (request_rates_range / parse_rates, voir MT5FileConnector)
+            store: Stockage des bougies (BarStore)
+            chunk_size: Nombre de bougies du timeframe couvert par une tranche
+            max_retries: Nouvelles tentatives par tranche en échec
+            retry_delay: Attente avant la première nouvelle tentative (doublée ensuite)
+            timeout: Timeout d'une tranche en secondes (None: timeout du connecteur)
+            clock: Horloge en secondes epoch (remplaçable pour les tests)
+        """
+        self.connector = connector
+        self.store = store
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self.clock = clock
+
+    # --- Progression ---
+
+    def checkpoint_path(self, symbol: str, timeframe: str) -> Path:
+        return Path(self.store.root) / symbol / timeframe / CHECKPOINT_FILE
+
+    def load_checkpoint(self, symbol: str, timeframe: str) -> dict | None:
+        """
+        Progression enregistrée d'une série.
+
+        Returns:
+            dict: {'start': début couvert, 'cursor': reprise} en secondes epoch, ou None
+        """
+        try:
+            with open(self.checkpoint_path(symbol, timeframe), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _save_checkpoint(self, symbol: str, timeframe: str, start: int, cursor: int):
+        path = self.checkpoint_path(symbol, timeframe)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"start": start, "cursor": cursor}, f)
+        os.replace(tmp_path, path)
+
+    # --- Téléchargement ---
+
+    def windows(self, timeframe: str, start: int, end: int) -> list:
+        """
+        Plages [début, fin) des tranches, alignées sur les bougies du timeframe.
+
+        Returns:
+            list: Tuples (début, fin) en secondes epoch
+        """
+        seconds = TIMEFRAME_SECONDS[timeframe]
+        span = self.chunk_size * seconds
+        lo = start - start % seconds
+        bounds = list(range(lo, end, span)) + [end]
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def fetch(self, symbol: str, timeframe: str, start, end=None) -> dict:
+        """
+        Télécharge les bougies de [start, end) dans le stockage, en reprenant après la
+        dernière tranche stockée par un appel précédent.
+
+        Args:
+            symbol: Symbole
+            timeframe: Timeframe (ex: 'M1')
+            start: Début (secondes epoch, datetime ou chaîne)
+            end: Fin exclue (None: jusqu'à la dernière bougie)
+
+        Returns:
+            dict: start, end, chunks, bars, written, retries, resumed_from, complete, error
+        """
+        if timeframe not in TIMEFRAME_SECONDS:
+            raise ValueError(f"Timeframe inconnu: {timeframe}")
+        now = int(self.clock())
+        start_s = self._seconds(start)
+        end_s = now + LIVE_MARGIN if end is None else self._seconds(end)
+        stats = self._new_stats(start_s, end_s)
+
+        # Reprise: la progression enregistrée couvre déjà le début demandé
+        covered_from, cursor = start_s, start_s
+        checkpoint = self.load_checkpoint(symbol, timeframe)
+        if checkpoint and checkpoint["start"] <= start_s < checkpoint["cursor"]:
+            covered_from, cursor = checkpoint["start"], min(checkpoint["cursor"], end_s)
+            stats["resumed_from"] = cursor
+
+        with ThreadPoolExecutor(max_workers=1) as worker:
+            pending = None
+            for lo, hi in self.windows(timeframe, cursor, end_s):
+                response = self._request(symbol, timeframe, lo, hi, stats)
+                # Tranche précédente décodée et écrite pendant la demande de celle-ci
+                if pending is not None and not self._collect(pending, stats):
+                    return stats
+                if response is None:
+                    if (stats["chunks"] == 0 and stats["resumed_from"] is None
+                            and stats["error"].startswith(RANGE_UNSUPPORTED)):
+                        self._fetch_legacy(symbol, timeframe, start_s, end_s, stats)
+                    return stats
+                pending = worker.submit(self._store_chunk, symbol, timeframe, response, lo, hi, covered_from, now)
+            if pending is not None and not self._collect(pending, stats):
+                return stats
+        stats["complete"] = True
+        return stats
+
+    def fetch_recent(self, symbol: str, timeframe: str, days: float) -> dict:
+        """
+        Télécharge les `days` derniers jours jusqu'à la dernière bougie de MT5 (période
+        ancrée sur l'heure du serveur, pas sur l'horloge locale).
+
+        Args:
+            symbol: Symbole
+            timeframe: Timeframe
+            days: Nombre de jours d'historique
+
+        Returns:
+            dict: Voir fetch (start: début de la période, None si MT5 ne répond pas)
+        """
+        latest = self.connector.get_rates(symbol, timeframe, 1)
+        if latest is None or len(latest) == 0:
+            stats = self._new_stats(None, None)
+            stats["error"] = "Dernière bougie indisponible"
+            return stats
+        end = int(latest["time"][-1]) + TIMEFRAME_SECONDS[timeframe]
+        return self.fetch(symbol, timeframe, end - int(days * SECONDS_PER_DAY), end)
+
+    @staticmethod
+    def _new_stats(start, end) -> dict:
+        return {"start": start, "end": end, "chunks": 0, "bars": 0, "written": 0, "retries": 0,
+                "resumed_from": None, "complete": False, "error": None}
+
+    def _request(self, symbol: str, timeframe: str, lo: int, hi: int, stats: dict) -> str | None:
+        """Réponse de l'EA pour une tranche, avec nouvelles tentatives (None: échec)."""
+        for attempt in range(self.max_retries + 1):
+            response = self.connector.request_rates_range(symbol, timeframe, lo, hi, timeout=self.timeout)
+            if response.startswith("DATA"):
+                return response
+            stats["error"] = response
+            if attempt < self.max_retries:
+                stats["retries"] += 1
+                time.sleep(self.retry_delay * 2 ** attempt)
+        return None
+
+    def _store_chunk(self, symbol: str, timeframe: str, response: str, lo: int, hi: int,
+                     covered_from: int, now: int) -> tuple | None:
+        """
+        Décode une tranche, l'écrit dans le stockage et enregistre la progression
+        (thread d'écriture: les statistiques sont mises à jour par _collect).
+
+        Returns:
+            tuple: (bougies reçues, bougies écrites), None si la réponse est illisible
+        """
+        records = self.connector.parse_rates(response, symbol, timeframe)
+        if records is None:
+            return None
+        written = self.store.write(symbol, timeframe, records)
+        if hi <= now - LIVE_MARGIN:
+            cursor = hi
+        else:
+            # Tranche récente (peut encore recevoir des bougies): reprise à sa dernière bougie
+            cursor = int(records["time"].max()) if len(records) else lo
+        self._save_checkpoint(symbol, timeframe, covered_from, cursor)
+        return len(records), written
+
+    @staticmethod
+    def _collect(pending, stats: dict) -> bool:
+        """Ajoute aux statistiques le résultat d'une tranche écrite (False: tranche illisible)."""
+        result = pending.result()
+        if result is None:
+            stats["error"] = "DATA illisible"
+            return False
+        stats["chunks"] += 1
+        stats["bars"] += result[0]
+        stats["written"] += result[1]
+        return True
+
+    def _fetch_legacy(self, symbol: str, timeframe: str, start: int, end: int, stats: dict):
+        """EA sans DATA_RANGE: toute la période en une seule commande DATA."""
+        count = (min(end, int(self.clock())) - start) // TIMEFRAME_SECONDS[timeframe]
+        records = self.connector.get_rates(symbol, timeframe, max(1, count))
+        if records is None:
+            return
+        stats["chunks"], stats["bars"] = 1, len(records)
+        stats["written"] = self.store.write(symbol, timeframe, records)
+        stats["complete"], stats["error"] = True, None
+
+    @staticmethod
+    def _seconds(value) -> int:
+        if isinstance(value, (int, float, np.integer, np.floating)):
+            return int(value)
+        timestamp = pd.Timestamp(value)
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+        return int(timestamp.value // 10**9)
@@ -0,0 +1,528 @@
+"""
+Moteur d'indicateurs techniques (sans pandas_ta)
+SMA, EMA, RSI de Wilder, ATR et ROC en deux modes:
+- batch: calcul vectorisé sur des tableaux NumPy (backtest, scanner, historique)
+- streaming: mise à jour O(1) par bougie (trading live, voir LiveIndicators)
+
+Les deux modes effectuent exactement les mêmes opérations flottantes dans le même
+ordre: les valeurs sont identiques au bit près, donc les features live et backtest
+concordent. Les moyennes RMA (RSI, ATR de Wilder) reproduisent ewm(alpha=1/n,
+adjust=True) de pandas, c'est-à-dire le calcul de pandas_ta.
+"""
+
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+NAN = float("nan")
+
+
+# === Mode batch ===
+
+def sma(values, period: int) -> np.ndarray:
+    """
+    Moyenne mobile simple.
+    Sommes cumulées ancrées sur la première valeur (x - x0) pour limiter l'erreur d'arrondi;
+    les NaN de tête (période de chauffe d'un autre indicateur) sont ignorés.
+
+    Args:
+        values: Série de valeurs
+        period: Période de la moyenne
+
+    Returns:
+        np.ndarray: SMA (NaN pendant la période de chauffe)
+    """
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(values), np.nan)
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return out
+    first = int(np.argmax(valid))
+    anchor = values[first]
+    cumulative = np.concatenate(([0.0], np.cumsum(values[first:] - anchor)))
+    if len(cumulative) > period:
+        out[first + period - 1:] = (cumulative[period:] - cumulative[:-period]) / period + anchor
+    return out
+
+
+def _ewm_mean(values: np.ndarray, alpha: float, adjust: bool, min_periods: int) -> np.ndarray:
+    """
+    Moyenne exponentielle vectorisée (ewm de pandas, compilé).
+    _EwmState applique la même récurrence que pandas valeur par valeur.
+    """
+    return pd.Series(values, copy=False).ewm(alpha=alpha, adjust=adjust, min_periods=min_periods).mean().to_numpy()
+
+
+def rma(values, period: int) -> np.ndarray:
+    """
+    Moyenne de Wilder (RMA): ewm(alpha=1/period, adjust=True, min_periods=period).
+
+    Args:
+        values: Série de valeurs
+        period: Période
+
+    Returns:
+        np.ndarray: RMA (NaN pendant la période de chauffe)
+    """
+    return _ewm_mean(np.asarray(values, dtype=float), 1.0 / period, True, period)
+
+
+def ema(values, period: int) -> np.ndarray:
+    """
+    Moyenne mobile exponentielle (alpha = 2 / (period + 1)), initialisée par la SMA
+    des 'period' premières valeurs comme pandas_ta.ema.
+
+    Args:
+        values: Série de valeurs
+        period: Période
+
+    Returns:
+        np.ndarray: EMA (NaN pendant la période de chauffe)
+    """
+    values = np.asarray(values, dtype=float)
+    seeded = np.full(len(values), np.nan)
+    seeds = sma(values, period)
+    valid = ~np.isnan(seeds)
+    if not valid.any():
+        return seeded
+    first = int(np.argmax(valid))
+    seeded[first] = seeds[first]
+    seeded[first + 1:] = values[first + 1:]
+    return _ewm_mean(seeded, 2.0 / (period + 1), False, 1)
+
+
+def rsi(close, period: int = 14) -> np.ndarray:
+    """
+    RSI de Wilder (identique à pandas_ta.rsi).
+
+    Args:
+        close: Série des clôtures
+        period: Période du RSI
+
+    Returns:
+        np.ndarray: RSI entre 0 et 100 (NaN pendant la période de chauffe)
+    """
+    close = np.asarray(close, dtype=float)
+    change = np.full(len(close), np.nan)
+    change[1:] = close[1:] - close[:-1]
+    with np.errstate(invalid='ignore'):
+        gains = np.where(change > 0, change, np.where(np.isnan(change), np.nan, 0.0))
+        losses = np.where(change < 0, change, np.where(np.isnan(change), np.nan, 0.0))
+        avg_gain = rma(gains, period)
+        avg_loss = rma(losses, period)
+        return 100 * avg_gain / (avg_gain + np.abs(avg_loss))
+
+
+def true_range(high, low, close) -> np.ndarray:
+    """
+    True Range (la première bougie utilise High - Low).
+
+    Args:
+        high, low, close: Tableaux de prix
+
+    Returns:
+        np.ndarray: True Range
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    tr = high - low
+    if len(close) > 1:
+        prev_close = close[:-1]
+        tr[1:] = np.maximum(tr[1:], np.maximum(np.abs(high[1:] - prev_close), np.abs(low[1:] - prev_close)))
+    return tr
+
+
+def atr(high, low, close, period: int = 14, wilder: bool = True) -> np.ndarray:
+    """
+    Average True Range.
+
+    Args:
+        high, low, close: Tableaux de prix
+        period: Période
+        wilder: Lissage de Wilder (RMA) si True, moyenne simple du True Range sinon
+
+    Returns:
+        np.ndarray: ATR (NaN pendant la période de chauffe)
+    """
+    tr = true_range(high, low, close)
+    return rma(tr, period) if wilder else sma(tr, period)
+
+
+def roc(close, period: int = 14) -> np.ndarray:
+    """
+    Rate of Change en pourcentage: (close / close[t - period] - 1) * 100.
+
+    Args:
+        close: Série des clôtures
+        period: Décalage
+
+    Returns:
+        np.ndarray: ROC (NaN pendant les 'period' premières bougies)
+    """
+    close = np.asarray(close, dtype=float)
+    out = np.full(len(close), np.nan)
+    if len(close) > period:
+        out[period:] = (close[period:] / close[:-period] - 1) * 100
+    return out
+
+
+# === Mode streaming ===
+
+class _EwmState:
+    """
+    État O(1) d'une moyenne exponentielle: même récurrence que pandas ewm
+    (ignore_na=False), donc mêmes valeurs que _ewm_mean.
+    """
+
+    __slots__ = ('old_wt_factor', 'new_wt', 'adjust', 'min_periods', 'weighted', 'old_wt', 'nobs')
+
+    def __init__(self, alpha: float, adjust: bool, min_periods: int):
+        alpha = 1.0 / (1.0 + (1.0 - alpha) / alpha)  # pandas passe par le centre de masse (com)
+        self.old_wt_factor = 1.0 - alpha
+        self.new_wt = 1.0 if adjust else alpha
+        self.adjust = adjust
+        self.min_periods = min_periods
+        self.weighted = NAN
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def update(self, cur: float) -> float:
+        is_observation = cur == cur
+        self.nobs += is_observation
+        weighted = self.weighted
+        if weighted == weighted:
+            self.old_wt *= self.old_wt_factor
+            if is_observation:
+                if weighted != cur:
+                    weighted = ((self.old_wt * weighted) + (self.new_wt * cur)) / (self.old_wt + self.new_wt)
+                    self.weighted = weighted
+                self.old_wt = self.old_wt + self.new_wt if self.adjust else 1.0
+        elif is_observation:
+            self.weighted = weighted = cur
+        return weighted if self.nobs >= self.min_periods else NAN
+
+    def peek(self, cur: float) -> float:
+        """Valeur après update(cur), sans modifier l'état."""
+        saved = self.weighted, self.old_wt, self.nobs
+        value = self.update(cur)
+        self.weighted, self.old_wt, self.nobs = saved
+        return value
+
+
+class StreamingSMA:
+    """SMA mise à jour en O(1) par valeur (identique à sma())."""
+
+    __slots__ = ('period', 'anchor', 'cumulative', 'history', 'value')
+
+    def __init__(self, period: int):
+        self.period = period
+        self.anchor = None
+        self.cumulative = 0.0
+        self.history = deque([0.0], maxlen=period + 1)  # Sommes cumulées des 'period' dernières valeurs
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        if self.anchor is None:
+            if x != x:
+                return NAN
+            self.anchor = x
+        self.cumulative += x - self.anchor
+        self.history.append(self.cumulative)
+        if len(self.history) > self.period:
+            self.value = (self.cumulative - self.history[0]) / self.period + self.anchor
+        return self.value
+
+    def peek(self, x: float) -> float:
+        """Valeur après update(x), sans modifier l'état."""
+        anchor = self.anchor
+        if anchor is None:
+            if x != x:
+                return NAN
+            anchor = x
+        cumulative = self.cumulative + (x - anchor)
+        history = self.history
+        if len(history) == history.maxlen:
+            return (cumulative - history[1]) / self.period + anchor
+        if len(history) + 1 > self.period:
+            return (cumulative - history[0]) / self.period + anchor
+        return self.value
+
+
+class StreamingEMA:
+    """EMA initialisée par une SMA, mise à jour en O(1) (identique à ema())."""
+
+    __slots__ = ('seed', 'state', 'value')
+
+    def __init__(self, period: int):
+        self.seed = StreamingSMA(period)
+        self.state = _EwmState(2.0 / (period + 1), False, 1)
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        if self.seed is not None:
+            seed = self.seed.update(x)
+            if seed != seed:
+                return NAN
+            self.seed = None
+            x = seed
+        self.value = self.state.update(x)
+        return self.value
+
+    def peek(self, x: float) -> float:
+        """Valeur après update(x), sans modifier l'état."""
+        if self.seed is not None:
+            x = self.seed.peek(x)
+            if x != x:
+                return NAN
+        return self.state.peek(x)
+
+
+class StreamingRSI:
+    """RSI de Wilder mis à jour en O(1) (identique à rsi())."""
+
+    __slots__ = ('prev_close', 'gains', 'losses', 'value')
+
+    def __init__(self, period: int = 14):
+        self.prev_close = None
+        self.gains = _EwmState(1.0 / period, True, period)
+        self.losses = _EwmState(1.0 / period, True, period)
+        self.value = NAN
+
+    def update(self, close: float) -> float:
+        self.value = self._next(close, commit=True)
+        self.prev_close = close
+        return self.value
+
+    def peek(self, close: float) -> float:
+        """Valeur après update(close), sans modifier l'état."""
+        return self._next(close, commit=False)
+
+    def _next(self, close: float, commit: bool) -> float:
+        if self.prev_close is None:
+            change = NAN
+        else:
+            change = close - self.prev_close
+        if change != change:
+            gain = loss = NAN
+        else:
+            gain = change if change > 0 else 0.0
+            loss = change if change < 0 else 0.0
+        if commit:
+            avg_gain, avg_loss = self.gains.update(gain), self.losses.update(loss)
+        else:
+            avg_gain, avg_loss = self.gains.peek(gain), self.losses.peek(loss)
+        denominator = avg_gain + abs(avg_loss)
+        return 100 * avg_gain / denominator if denominator != 0 else NAN
+
+
+class StreamingATR:
+    """ATR mis à jour en O(1) (identique à atr())."""
+
+    __slots__ = ('prev_close', 'average', 'value')
+
+    def __init__(self, period: int = 14, wilder: bool = True):
+        self.prev_close = None
+        self.average = _EwmState(1.0 / period, True, period) if wilder else StreamingSMA(period)
+        self.value = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        self.value = self.average.update(self._true_range(high, low))
+        self.prev_close = close
+        return self.value
+
+    def peek(self, high: float, low: float, close: float) -> float:
+        """Valeur après update(high, low, close), sans modifier l'état."""
+        return self.average.peek(self._true_range(high, low))
+
+    def _true_range(self, high: float, low: float) -> float:
+        tr = high - low
+        if self.prev_close is not None:
+            tr = max(tr, max(abs(high - self.prev_close), abs(low - self.prev_close)))
+        return tr
+
+
+class StreamingROC:
+    """ROC mis à jour en O(1) (identique à roc())."""
+
+    __slots__ = ('period', 'history', 'value')
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.history = deque(maxlen=period + 1)
+        self.value = NAN
+
+    def update(self, close: float) -> float:
+        self.history.append(close)
+        if len(self.history) > self.period:
+            self.value = (close / self.history[0] - 1) * 100
+        return self.value
+
+    def peek(self, close: float) -> float:
+        """Valeur après update(close), sans modifier l'état."""
+        history = self.history
+        if len(history) == history.maxlen:
+            return (close / history[1] - 1) * 100
+        if len(history) + 1 > self.period:
+            return (close / history[0] - 1) * 100
+        return self.value
+
+
+# === Ensemble d'indicateurs ===
+
+# Indicateurs disponibles: nom -> (fonction batch, classe streaming, entrées)
+INDICATORS = {
+    'sma': (sma, StreamingSMA, ('close',)),
+    'ema': (ema, StreamingEMA, ('close',)),
+    'rsi': (rsi, StreamingRSI, ('close',)),
+    'atr': (atr, StreamingATR, ('high', 'low', 'close')),
+    'roc': (roc, StreamingROC, ('close',)),
+}
+
+
+class IndicatorSet:
+    """
+    Ensemble nommé d'indicateurs calculés en batch ou bougie par bougie.
+
+    Exemple:
+        indicators = IndicatorSet({'ma20': ('sma', 20), 'rsi14': ('rsi', 14), 'atr14': ('atr', 14, False)})
+        columns = indicators.batch(high, low, close)     # backtest
+        indicators.warm_up(high, low, close)             # puis en live:
+        values = indicators.update(bar_high, bar_low, bar_close)
+    """
+
+    __slots__ = ('specs', 'streams')
+
+    def __init__(self, specs: dict):
+        for name, (kind, *_) in specs.items():
+            if kind not in INDICATORS:
+                raise ValueError(f"Indicateur inconnu pour {name}: {kind}")
+        self.specs = dict(specs)
+        self.streams = None
+        self.reset()
+
+    def reset(self):
+        """Réinitialise les états streaming."""
+        self.streams = {name: INDICATORS[kind][1](*args) for name, (kind, *args) in self.specs.items()}
+
+    def batch(self, high, low, close) -> dict:
+        """
+        Calcule tous les indicateurs sur des tableaux complets.
+
+        Returns:
+            dict: Nom -> tableau NumPy de valeurs
+        """
+        prices = {'high': high, 'low': low, 'close': close}
+        return {
+            name: INDICATORS[kind][0](*(prices[field] for field in INDICATORS[kind][2]), *args)
+            for name, (kind, *args) in self.specs.items()
+        }
+
+    def update(self, high: float, low: float, close: float) -> dict:
+        """
+        Ajoute une bougie clôturée à tous les indicateurs (O(1) par indicateur).
+
+        Returns:
+            dict: Nom -> dernière valeur
+        """
+        prices = {'high': high, 'low': low, 'close': close}
+        return {
+            name: stream.update(*(prices[field] for field in INDICATORS[self.specs[name][0]][2]))
+            for name, stream in self.streams.items()
+        }
+
+    def peek(self, high: float, low: float, close: float) -> dict:
+        """
+        Valeurs qu'aurait chaque indicateur avec une bougie de plus, sans modifier l'état
+        (bougie en formation, mise à jour à chaque cycle jusqu'à sa clôture).
+
+        Returns:
+            dict: Nom -> valeur
+        """
+        prices = {'high': high, 'low': low, 'close': close}
+        return {
+            name: stream.peek(*(prices[field] for field in INDICATORS[self.specs[name][0]][2]))
+            for name, stream in self.streams.items()
+        }
+
+    def warm_up(self, high, low, close) -> dict:
+        """
+        Réinitialise puis rejoue un historique pour préparer le mode streaming.
+
+        Returns:
+            dict: Dernières valeurs après l'historique
+        """
+        self.reset()
+        values = {name: NAN for name in self.specs}
+        for h, l, c in zip(np.asarray(high, dtype=float).tolist(), np.asarray(low, dtype=float).tolist(),
+                           np.asarray(close, dtype=float).tolist()):
+            values = self.update(h, l, c)
+        return values
+
+    def values(self) -> dict:
+        """Dernières valeurs de chaque indicateur."""
+        return {name: stream.value for name, stream in self.streams.items()}
+
+
+class LiveIndicators:
+    """
+    IndicatorSet alimenté par les fenêtres de bougies successives d'un flux live (cycle de
+    trading, rejeu du backtest).
+
+    Seules les bougies clôturées apparues depuis l'appel précédent sont ajoutées (O(1) par
+    bougie) ; la dernière bougie de la fenêtre, en formation, est évaluée par peek(). Les
+    états sont réamorcés sur la fenêtre (warm_up) au premier appel, quand la dernière
+    bougie ajoutée n'est plus dans la fenêtre (réinitialisation du cache, trou dans les
+    données) ou quand les bougies n'ont pas d'horodatage. Les valeurs sont alors celles
+    de IndicatorSet.batch sur la fenêtre.
+    """
+
+    __slots__ = ('indicators', 'last_time', 'stats')
+
+    def __init__(self, specs: dict):
+        self.indicators = IndicatorSet(specs)
+        self.last_time = None  # Horodatage de la dernière bougie clôturée ajoutée
+        self.stats = {'warm_ups': 0, 'updates': 0}
+
+    def values(self, time, high, low, close) -> dict:
+        """
+        Valeurs des indicateurs à la dernière bougie d'une fenêtre.
+
+        Args:
+            time: Horodatages croissants des bougies (secondes epoch, None si inconnus)
+            high, low, close: Prix des bougies de la fenêtre
+
+        Returns:
+            dict: Nom -> valeur à la dernière bougie
+        """
+        n = len(close)
+        if n == 0:
+            return {name: NAN for name in self.indicators.specs}
+        start = self._resume_position(time, n)
+        if start is None:
+            self.indicators.warm_up(high[:-1], low[:-1], close[:-1])
+            self.stats['warm_ups'] += 1
+        else:
+            for h, l, c in zip(np.asarray(high[start:-1], dtype=float).tolist(),
+                               np.asarray(low[start:-1], dtype=float).tolist(),
+                               np.asarray(close[start:-1], dtype=float).tolist()):
+                self.indicators.update(h, l, c)
+            self.stats['updates'] += n - 1 - start
+        self.last_time = int(time[-2]) if time is not None and n > 1 else None
+        return self.indicators.peek(float(high[-1]), float(low[-1]), float(close[-1]))
+
+    def _resume_position(self, time, n: int):
+        """Position de la première bougie clôturée pas encore ajoutée (None: réamorçage)."""
+        if time is None or self.last_time is None:
+            return None
+        position = int(np.searchsorted(time, self.last_time))
+        if position >= n - 1 or time[position] != self.last_time:
+            return None
+        return position + 1
+
+
+def is_ready(value: float) -> bool:
+    """True si la valeur d'indicateur est disponible (hors période de chauffe)."""
+    return value is not None and not math.isnan(value)
@@ -0,0 +1,146 @@
+"""
+Recherche vectorisée des zones d'intérêt
+Trouve en une seule passe toutes les zones haussières et baissières définies par
+find_interest_zone (première clôture au-delà de la SMA20 entre deux pivots opposés),
+au lieu d'un scan iterrows par pivot.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.tools.pivot_series import PivotSeries
+
+ZONE_COLUMNS = [
+    'pivot_number', 'pivot_status', 'direction', 'start_price', 'end_price',
+    'breakout_position', 'breakout_candle_index', 'preceding_pivot_position', 'preceding_pivot_index'
+]
+
+
+def _next_true_position(mask: np.ndarray) -> np.ndarray:
+    """
+    Pour chaque position i, renvoie la plus petite position j >= i où mask[j] est vrai
+    (len(mask) si aucune).
+    """
+    n = len(mask)
+    candidates = np.where(mask, np.arange(n), n)
+    return np.minimum.accumulate(candidates[::-1])[::-1]
+
+
+def interest_zone_arrays(pivot_positions: np.ndarray,
+                         pivot_types: np.ndarray,
+                         pivot_prices: np.ndarray,
+                         close: np.ndarray,
+                         sma: np.ndarray,
+                         high: np.ndarray,
+                         low: np.ndarray,
+                         candidate_mask: np.ndarray | None = None) -> dict:
+    """
+    Calcule toutes les zones d'intérêt à partir de tableaux positionnels.
+
+    Args:
+        pivot_positions: Positions des pivots dans les tableaux de prix (-1 si absent)
+        pivot_types: Types des pivots ('high' / 'low')
+        pivot_prices: Prix des pivots
+        close, sma, high, low: Tableaux de prix et de SMA20 alignés
+        candidate_mask: Pivots pour lesquels chercher une zone (tous si None)
+
+    Returns:
+        dict: Tableaux 'pivot_number', 'direction', 'start_price', 'end_price',
+        'breakout_position', 'preceding_pivot_position' (une entrée par zone trouvée)
+    """
+    pivot_positions = np.asarray(pivot_positions, dtype=np.int64)
+    pivot_types = np.asarray(pivot_types)
+    pivot_prices = np.asarray(pivot_prices, dtype=float)
+    close = np.asarray(close, dtype=float)
+    sma = np.asarray(sma, dtype=float)
+    n = len(close)
+
+    empty = {
+        'pivot_number': np.empty(0, dtype=np.int64), 'direction': np.empty(0, dtype='<U7'),
+        'start_price': np.empty(0), 'end_price': np.empty(0),
+        'breakout_position': np.empty(0, dtype=np.int64), 'preceding_pivot_position': np.empty(0, dtype=np.int64)
+    }
+    if len(pivot_positions) < 2 or n == 0:
+        return empty
+
+    # Paires (pivot précédent, nouveau pivot) de types opposés, pivots présents dans les données
+    new_k = np.arange(1, len(pivot_positions))
+    prev_pos = pivot_positions[:-1]
+    new_pos = pivot_positions[1:]
+    is_bull = (pivot_types[1:] == 'high') & (pivot_types[:-1] == 'low')
+    is_bear = (pivot_types[1:] == 'low') & (pivot_types[:-1] == 'high')
+    valid = (is_bull | is_bear) & (prev_pos >= 0) & (new_pos >= 0) & (prev_pos + 1 <= new_pos)
+    if candidate_mask is not None:
+        valid &= np.asarray(candidate_mask, dtype=bool)[1:]
+
+    with np.errstate(invalid='ignore'):
+        bull_breakout = _next_true_position(close > sma)
+        bear_breakout = _next_true_position(close < sma)
+
+    search_start = np.clip(prev_pos + 1, 0, n - 1)
+    breakout = np.where(is_bull, bull_breakout[search_start], bear_breakout[search_start])
+    valid &= breakout <= new_pos
+
+    breakout = breakout[valid]
+    bull = is_bull[valid]
+    return {
+        'pivot_number': new_k[valid],
+        'direction': np.where(bull, 'bullish', 'bearish'),
+        'start_price': np.where(bull, np.asarray(high, dtype=float)[breakout], np.asarray(low, dtype=float)[breakout]),
+        'end_price': pivot_prices[:-1][valid],
+        'breakout_position': breakout,
+        'preceding_pivot_position': prev_pos[valid]
+    }
+
+
+def find_interest_zones(df_ohlc_sma: pd.DataFrame, pivots: list, statuses: tuple | None = ('HH', 'LL'),
+                        sma_column: str = 'SMA20') -> pd.DataFrame:
+    """
+    Version batch de find_interest_zone: toutes les zones de la liste de pivots en une passe.
+
+    Args:
+        df_ohlc_sma: DataFrame avec 'High', 'Low', 'Close' et la SMA20, trié chronologiquement
+        pivots: Pivots ZigZag (PivotSeries ou liste de dicts 'index', 'price', 'type', 'status')
+        statuses: Statuts des nouveaux pivots à analyser (par défaut HH/LL, None pour tous)
+        sma_column: Nom de la colonne SMA
+
+    Returns:
+        pd.DataFrame: Une ligne par zone (colonnes ZONE_COLUMNS). Les colonnes 'start_price',
+        'end_price', 'direction', 'breakout_candle_index' et 'preceding_pivot_index'
+        reprennent le format du dict retourné par find_interest_zone.
+    """
+    if not pivots:
+        return pd.DataFrame(columns=ZONE_COLUMNS)
+
+    index = df_ohlc_sma.index
+    if isinstance(pivots, PivotSeries):
+        positions = index.get_indexer(pivots.labels)
+        types = pivots.types()
+        prices = pivots.prices
+        pivot_statuses = pivots.statuses()
+    else:
+        positions = index.get_indexer([p['index'] for p in pivots])
+        types = np.array([p['type'] for p in pivots])
+        prices = np.array([p['price'] for p in pivots], dtype=float)
+        pivot_statuses = np.array([p.get('status', '') for p in pivots])
+    candidate_mask = np.isin(pivot_statuses, statuses) if statuses is not None else None
+
+    zones = interest_zone_arrays(
+        positions, types, prices,
+        df_ohlc_sma['Close'].to_numpy(dtype=float),
+        df_ohlc_sma[sma_column].to_numpy(dtype=float),
+        df_ohlc_sma['High'].to_numpy(dtype=float),
+        df_ohlc_sma['Low'].to_numpy(dtype=float),
+        candidate_mask
+    )
+    return pd.DataFrame({
+        'pivot_number': zones['pivot_number'],
+        'pivot_status': pivot_statuses[zones['pivot_number']],
+        'direction': zones['direction'],
+        'start_price': zones['start_price'],
+        'end_price': zones['end_price'],
+        'breakout_position': zones['breakout_position'],
+        'breakout_candle_index': index[zones['breakout_position']],
+        'preceding_pivot_position': zones['preceding_pivot_position'],
+        'preceding_pivot_index': index[zones['preceding_pivot_position']]
+    }, columns=ZONE_COLUMNS)
@@ -0,0 +1,165 @@
+"""
+Instantané des données de marché d'un cycle de trading
+Les bougies de chaque timeframe sont gardées en colonnes NumPy (time, open, high, low,
+close, tick_volume, spread) de bout en bout: collecte, indicateurs, stockage. Les vues
+DataFrame et liste de dicts (journaux JSON, code existant) ne sont construites qu'à la
+demande, une seule fois.
+
+MarketSnapshot s'utilise aussi comme le dict market_data d'origine
+(snapshot["indicators"], snapshot.get("current_price")...).
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.tools.bar_store import BAR_DTYPE, bars_to_records, to_epoch_seconds
+
+CANDLE_COLUMNS = ("time", "open", "high", "low", "close", "tick_volume", "spread")
+
+# Noms de colonnes (en minuscules) des autres formats de bougies
+_COLUMN_NAMES = {"tickvolume": "tick_volume", "<tickvol>": "tick_volume", "<spread>": "spread"}
+
+
+class CandleArrays:
+    """
+    Bougies d'un timeframe en colonnes NumPy (time en secondes epoch).
+
+    Une colonne absente de la source (ex: tick_volume des bougies du backtester) vaut None.
+    """
+
+    def __init__(self, columns: dict, records: np.ndarray | None = None):
+        """
+        Args:
+            columns: {colonne: tableau} (voir CANDLE_COLUMNS)
+            records: Enregistrements BAR_DTYPE d'origine, si les colonnes en sont des vues
+        """
+        for name in CANDLE_COLUMNS:
+            setattr(self, name, columns.get(name))
+        self._records = records
+        self._frame = None
+        self._dicts = None
+
+    @classmethod
+    def from_records(cls, records: np.ndarray) -> "CandleArrays":
+        """Colonnes en vues sur des enregistrements BAR_DTYPE (sans copie)."""
+        return cls({name: records[name] for name in CANDLE_COLUMNS}, records)
+
+    @classmethod
+    def from_bars(cls, bars) -> "CandleArrays":
+        """
+        Colonnes à partir de bougies quelconques (DataFrame du connecteur, liste de dicts).
+
+        Les listes de dicts sans horodatage (ancien format to_dict('records')) sont acceptées.
+        """
+        if isinstance(bars, CandleArrays):
+            return bars
+        if isinstance(bars, np.ndarray) and bars.dtype == BAR_DTYPE:
+            return cls.from_records(bars)
+        df = bars if isinstance(bars, pd.DataFrame) else pd.DataFrame(list(bars))
+        df = df.rename(columns=lambda c: _COLUMN_NAMES.get(str(c).lower(), str(c).lower()))
+        columns = {name: df[name].to_numpy() for name in CANDLE_COLUMNS[1:] if name in df.columns}
+        if "time" in df.columns:
+            columns["time"] = to_epoch_seconds(df["time"])
+        elif isinstance(df.index, pd.DatetimeIndex):
+            columns["time"] = to_epoch_seconds(df.index)
+        return cls(columns)
+
+    def __len__(self) -> int:
+        return 0 if self.close is None else len(self.close)
+
+    def tail(self, count: int) -> "CandleArrays":
+        """Dernières bougies (vues)."""
+        if self._records is not None:
+            return CandleArrays.from_records(self._records[-count:])
+        return CandleArrays({name: getattr(self, name)[-count:] for name in CANDLE_COLUMNS
+                             if getattr(self, name) is not None})
+
+    def to_records(self) -> np.ndarray:
+        """Enregistrements BAR_DTYPE (ceux d'origine si disponibles)."""
+        if self._records is not None:
+            return self._records
+        return bars_to_records(self.frame)
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Vue DataFrame au format du connecteur MT5 (index 'time'), construite à la demande."""
+        if self._frame is None:
+            data = {name: getattr(self, name) for name in CANDLE_COLUMNS[1:] if getattr(self, name) is not None}
+            self._frame = pd.DataFrame(data)
+            if self.time is not None:
+                self._frame.index = pd.DatetimeIndex(np.asarray(self.time).astype("datetime64[s]").astype("datetime64[ns]"),
+                                                     name="time")
+        return self._frame
+
+    def to_dicts(self) -> list:
+        """Vue liste de dicts (une par bougie, valeurs Python), construite à la demande."""
+        if self._dicts is None:
+            names = [name for name in CANDLE_COLUMNS if getattr(self, name) is not None]
+            rows = zip(*(np.asarray(getattr(self, name)).tolist() for name in names))
+            self._dicts = [dict(zip(names, row)) for row in rows]
+        return self._dicts
+
+
+class MarketSnapshot:
+    """
+    Données de marché d'un cycle: prix courant, bougies par timeframe, indicateurs.
+    """
+
+    FIELDS = ("timestamp", "instrument", "current_price", "candles", "indicators")
+
+    def __init__(self, instrument: str, timestamp: str | None = None, current_price: dict | None = None):
+        """
+        Args:
+            instrument: Instrument (ex: 'US30')
+            timestamp: Horodatage ISO de la collecte
+            current_price: {'bid', 'ask', 'spread'}
+        """
+        self.timestamp = timestamp
+        self.instrument = instrument
+        self.current_price = current_price
+        self.candles = {}
+        self.indicators = {}
+
+    def set_candles(self, timeframe: str, bars):
+        """
+        Ajoute les bougies d'un timeframe.
+
+        Args:
+            timeframe: Timeframe
+            bars: Enregistrements BAR_DTYPE, DataFrame, liste de dicts ou CandleArrays
+        """
+        self.candles[timeframe] = CandleArrays.from_bars(bars)
+
+    # --- Compatibilité avec le dict market_data ---
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key) -> bool:
+        return key in self.FIELDS
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if key in self.FIELDS else None
+        return default if value is None else value
+
+    def to_dict(self) -> dict:
+        """
+        Vue dict (sérialisable en JSON): bougies en listes de dicts.
+
+        Returns:
+            dict: Format du market_data d'origine
+        """
+        return {
+            "timestamp": self.timestamp,
+            "instrument": self.instrument,
+            "current_price": self.current_price,
+            "candles": {tf: candles.to_dicts() for tf, candles in self.candles.items()},
+            "indicators": self.indicators,
+        }
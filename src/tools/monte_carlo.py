@@ -0,0 +1,238 @@
+"""
+Simulation Monte Carlo des séquences de trades (drawdown et risque de ruine)
+Rééchantillonne le registre des trades fermés (fichiers JSON de trades_dir ou registre
+d'un backtest) en un grand nombre de trajectoires d'équité, et donne pour chaque
+niveau de risque par trade la distribution du drawdown maximal, du rendement final
+et la probabilité de ruine.
+
+Les trades sont ramenés en multiples de R (profit / risque initial) puis rejoués en
+risque fixe: à chaque trade, le solde varie de risk_per_trade % x R. Toutes les
+trajectoires d'un bloc sont calculées d'un coup sur un tenseur (trajectoires x trades),
+en log-équité (cumsum de log1p), et les mêmes tirages servent à tous les niveaux de risque.
+
+Usage:
+    python -m src.tools.monte_carlo data/trading/trades --risk 0.5,1,2,3 --paths 100000
+    python -m src.tools.monte_carlo backtests/US30/..._trades.csv --method shuffle
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+MONTE_CARLO_DEFAULTS = {
+    "n_paths": 100_000,
+    "n_trades": None,          # Longueur des trajectoires (None: nombre de trades du registre)
+    "method": "bootstrap",     # 'bootstrap': tirage avec remise, 'shuffle': permutation des trades
+    "ruin_level": 0.5,         # Ruine: solde <= ruin_level x solde initial
+    "contract_value": 100.0,   # Gain par lot pour 1.0 de prix (convention d'AkobenTrader)
+    "chunk_size": 20_000,      # Trajectoires calculées par bloc (borne la mémoire)
+    "seed": None,
+}
+
+METHODS = ("bootstrap", "shuffle")
+
+DRAWDOWN_PERCENTILES = (50, 90, 95, 99)
+RETURN_PERCENTILES = (5, 50, 95)
+
+
+def load_trade_ledger(trades_dir) -> pd.DataFrame:
+    """
+    Charge les trades fermés enregistrés par AkobenTrader (un fichier JSON par trade).
+
+    Args:
+        trades_dir: Répertoire des trades (AkobenTrader.trades_dir)
+
+    Returns:
+        pd.DataFrame: Un trade fermé par ligne, trié par date de clôture
+    """
+    rows = []
+    for trade_file in Path(trades_dir).glob("*.json"):
+        try:
+            with open(trade_file, 'r', encoding='utf-8') as f:
+                trade = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if trade.get("status") == "CLOSED" and trade.get("profit") is not None:
+            rows.append({key: trade.get(key) for key in
+                         ("id", "action", "entry_price", "stop_loss", "take_profit", "position_size",
+                          "profit", "close_reason", "close_time")})
+    ledger = pd.DataFrame(rows, columns=["id", "action", "entry_price", "stop_loss", "take_profit",
+                                         "position_size", "profit", "close_reason", "close_time"])
+    return ledger.sort_values("close_time", kind="stable").reset_index(drop=True)
+
+
+def load_ledger(path) -> pd.DataFrame:
+    """
+    Charge un registre de trades: répertoire de trades JSON ou CSV de backtest (*_trades.csv).
+
+    Args:
+        path: Répertoire ou fichier CSV
+
+    Returns:
+        pd.DataFrame: Registre des trades
+    """
+    path = Path(path)
+    return load_trade_ledger(path) if path.is_dir() else pd.read_csv(path)
+
+
+def ledger_r_multiples(ledger: pd.DataFrame, contract_value: float = 100.0) -> np.ndarray:
+    """
+    Convertit un registre de trades en multiples de R.
+
+    Utilise la colonne 'r_multiple' (registre du backtester) si elle existe, sinon
+    profit / (|entry_price - stop_loss| x position_size x contract_value).
+
+    Args:
+        ledger: Registre des trades fermés
+        contract_value: Gain par lot pour 1.0 de prix
+
+    Returns:
+        np.ndarray: Multiples de R des trades exploitables (dans l'ordre du registre)
+    """
+    if "r_multiple" in ledger.columns:
+        r = ledger["r_multiple"].to_numpy(dtype=float)
+    else:
+        risk = ((ledger["entry_price"].astype(float) - ledger["stop_loss"].astype(float)).abs()
+                * ledger["position_size"].astype(float) * contract_value).to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r = ledger["profit"].to_numpy(dtype=float) / risk
+    return r[np.isfinite(r)]
+
+
+def _path_chunks(r_multiples: np.ndarray, n_paths: int, n_trades: int, method: str, rng, chunk_size: int):
+    """Génère les blocs de trajectoires (tenseurs trajectoires x trades de multiples de R)."""
+    for start in range(0, n_paths, chunk_size):
+        rows = min(chunk_size, n_paths - start)
+        if method == "bootstrap":
+            yield r_multiples[rng.integers(0, len(r_multiples), size=(rows, n_trades))]
+        else:
+            yield rng.permuted(np.broadcast_to(r_multiples, (rows, len(r_multiples))), axis=1)[:, :n_trades]
+
+
+def simulate_risk_of_ruin(r_multiples, risk_levels=(0.5, 1.0, 2.0, 3.0), config: dict | None = None) -> dict:
+    """
+    Rééchantillonne les trades et calcule, par niveau de risque, les distributions par trajectoire.
+
+    Args:
+        r_multiples: Multiples de R des trades fermés
+        risk_levels: Risques par trade à évaluer (en % du solde, comme risk_per_trade)
+        config: Paramètres (voir MONTE_CARLO_DEFAULTS)
+
+    Returns:
+        dict: {risque: {'max_drawdown': tableau, 'final_return': tableau, 'ruined': tableau booléen}},
+              une valeur par trajectoire (drawdown et rendement en fraction du solde)
+    """
+    config = {**MONTE_CARLO_DEFAULTS, **(config or {})}
+    if config["method"] not in METHODS:
+        raise ValueError(f"Méthode inconnue: {config['method']}")
+    r_multiples = np.asarray(r_multiples, dtype=float)
+    if len(r_multiples) == 0:
+        raise ValueError("Aucun trade exploitable dans le registre")
+
+    n_paths = config["n_paths"]
+    n_trades = config["n_trades"] or len(r_multiples)
+    if config["method"] == "shuffle":
+        n_trades = min(n_trades, len(r_multiples))
+    ruin_log = np.log(config["ruin_level"]) if config["ruin_level"] > 0 else -np.inf
+    rng = np.random.default_rng(config["seed"])
+
+    results = {risk: {"max_drawdown": np.empty(n_paths), "final_return": np.empty(n_paths),
+                      "ruined": np.empty(n_paths, dtype=bool)} for risk in risk_levels}
+    start = 0
+    for paths in _path_chunks(r_multiples, n_paths, n_trades, config["method"], rng, config["chunk_size"]):
+        rows = slice(start, start + len(paths))
+        for risk in risk_levels:
+            # Log-équité relative au solde initial (un trade à -100% ou pire ruine la trajectoire)
+            log_equity = np.multiply(paths, risk / 100.0)
+            np.maximum(log_equity, -1.0, out=log_equity)
+            with np.errstate(divide='ignore'):
+                np.log1p(log_equity, out=log_equity)
+            np.cumsum(log_equity, axis=1, out=log_equity)
+            results[risk]["final_return"][rows] = np.expm1(log_equity[:, -1])
+            results[risk]["ruined"][rows] = log_equity.min(axis=1) <= ruin_log
+
+            # Drawdown en log: sommet courant (solde initial inclus) moins log-équité
+            peak = np.maximum.accumulate(log_equity, axis=1)
+            np.maximum(peak, 0.0, out=peak)
+            with np.errstate(invalid='ignore'):
+                np.subtract(peak, log_equity, out=peak)
+            results[risk]["max_drawdown"][rows] = -np.expm1(-peak.max(axis=1))
+        start += len(paths)
+    return results
+
+
+def summarize_risk_of_ruin(results: dict) -> pd.DataFrame:
+    """
+    Résume les distributions de simulate_risk_of_ruin (une ligne par niveau de risque).
+
+    Args:
+        results: Résultat de simulate_risk_of_ruin
+
+    Returns:
+        pd.DataFrame: Probabilité de ruine, percentiles du drawdown maximal et du rendement final (en %)
+    """
+    rows = []
+    for risk, values in results.items():
+        row = {"risk_per_trade": risk, "ruin_probability": float(values["ruined"].mean())}
+        drawdown = values["max_drawdown"] * 100
+        row["drawdown_mean"] = float(drawdown.mean())
+        row.update({f"drawdown_p{p}": v for p, v in zip(DRAWDOWN_PERCENTILES, np.percentile(drawdown, DRAWDOWN_PERCENTILES))})
+        final = values["final_return"] * 100
+        row.update({f"return_p{p}": v for p, v in zip(RETURN_PERCENTILES, np.percentile(final, RETURN_PERCENTILES))})
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def analyze_ledger(ledger: pd.DataFrame, risk_levels=(0.5, 1.0, 2.0, 3.0), config: dict | None = None) -> pd.DataFrame:
+    """
+    Analyse Monte Carlo complète d'un registre de trades.
+
+    Args:
+        ledger: Registre des trades fermés (load_ledger, BacktestResult.ledger)
+        risk_levels: Risques par trade à évaluer (en %)
+        config: Paramètres (voir MONTE_CARLO_DEFAULTS)
+
+    Returns:
+        pd.DataFrame: Résumé par niveau de risque (voir summarize_risk_of_ruin)
+    """
+    config = {**MONTE_CARLO_DEFAULTS, **(config or {})}
+    r_multiples = ledger_r_multiples(ledger, config["contract_value"])
+    summary = summarize_risk_of_ruin(simulate_risk_of_ruin(r_multiples, risk_levels, config))
+    summary.insert(1, "trades", len(r_multiples))
+    return summary
+
+
+def _parse_values(text: str):
+    return [float(v) for v in text.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo des séquences de trades (drawdown, risque de ruine)")
+    parser.add_argument("ledger", help="Répertoire des trades JSON ou registre CSV d'un backtest")
+    parser.add_argument("--risk", default="0.5,1,2,3", help="Risques par trade en %% (ex: 0.5,1,2)")
+    parser.add_argument("--paths", type=int, default=MONTE_CARLO_DEFAULTS["n_paths"], help="Nombre de trajectoires")
+    parser.add_argument("--trades", type=int, default=None, help="Trades par trajectoire (défaut: taille du registre)")
+    parser.add_argument("--method", default="bootstrap", choices=METHODS)
+    parser.add_argument("--ruin", type=float, default=MONTE_CARLO_DEFAULTS["ruin_level"],
+                        help="Seuil de ruine en fraction du solde initial")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", default=None, help="Fichier CSV du résumé")
+    args = parser.parse_args()
+
+    start = time.time()
+    config = {"n_paths": args.paths, "n_trades": args.trades, "method": args.method,
+              "ruin_level": args.ruin, "seed": args.seed}
+    summary = analyze_ledger(load_ledger(args.ledger), _parse_values(args.risk), config)
+    print(summary.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    print(f"{args.paths} trajectoires en {time.time() - start:.2f}s")
+    if args.output:
+        summary.to_csv(args.output, index=False)
+        print(f"Résumé enregistré: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Chargement rapide des exports CSV MT5 (séparateur tabulation: <DATE> <TIME> <OPEN> ... <SPREAD>)
+
+- Date et heure au format fixe 'AAAA.MM.JJ' et 'HH:MM:SS' décodées de façon vectorisée
+  à partir des octets du fichier (pas de pd.to_datetime ligne à ligne).
+- Horodatages ramenés en UTC: les exports sont à l'heure du serveur MT5 (server_tz,
+  'Etc/GMT-1' par défaut, comme dans les scripts de test). Avec server_tz=None, ils
+  restent à l'heure du serveur (base de temps du connecteur et de bar_store) et l'index
+  du DataFrame est sans fuseau.
+- Résultat mis en cache dans un fichier binaire à côté du CSV (<csv>.cache, un fichier
+  par base de temps, voir cache_path): en-tête (taille, date de modification, server_tz
+  demandé) suivi des enregistrements MT5_CSV_DTYPE. Les chargements suivants lisent ce
+  fichier en mémoire mappée; il est refait si le CSV change.
+
+Usage:
+    python -m src.tools.mt5_csv US30.cash_M1_....csv
+"""
+
+import argparse
+import io
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SERVER_TZ = "Etc/GMT-1"
+
+CACHE_SUFFIX = ".cache"
+CACHE_MAGIC = b"MT5CSV01"
+
+MT5_CSV_DTYPE = np.dtype([
+    ("time", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("tick_volume", "<i8"),
+    ("real_volume", "<i8"),
+    ("spread", "<i8"),
+])
+
+_HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("columns", "<i8"),     # Masque des colonnes présentes dans l'export
+    ("size", "<i8"),
+    ("mtime_ns", "<i8"),
+    ("server_tz", "S32"),
+])
+
+# Colonnes de l'export -> champ des enregistrements, colonne du DataFrame (format d'Akoben)
+_CSV_COLUMNS = {
+    "<OPEN>": ("open", "Open"),
+    "<HIGH>": ("high", "High"),
+    "<LOW>": ("low", "Low"),
+    "<CLOSE>": ("close", "Close"),
+    "<TICKVOL>": ("tick_volume", "TickVolume"),
+    "<VOL>": ("real_volume", None),
+    "<SPREAD>": ("spread", "Spread"),
+}
+
+# Octets de 'AAAA.MM.JJ\tHH:MM:SS' en tête de chaque ligne
+_DATE_WIDTH = 10
+_DATETIME_WIDTH = 19
+_SEPARATORS = {4: ord("."), 7: ord("."), 10: ord("\t"), 13: ord(":"), 16: ord(":")}
+
+
+def _read_export(csv_path) -> bytes:
+    """Contenu de l'export en ASCII (les exports MT5 peuvent être en UTF-16)."""
+    data = Path(csv_path).read_bytes()
+    if data[:2] in (b"\xff\xfe", b"\xfe\xff"):
+        data = data.decode("utf-16").encode("ascii")
+    return data.removeprefix(b"\xef\xbb\xbf")
+
+
+def _parse_times(buf: np.ndarray, starts: np.ndarray, with_time: bool) -> np.ndarray:
+    """
+    Décode les date/heure au format fixe en tête des lignes.
+
+    Args:
+        buf: Octets du fichier
+        starts: Position du début de chaque ligne de données
+        with_time: L'export a une colonne <TIME>
+
+    Returns:
+        np.ndarray: Secondes epoch (heure du serveur, int64)
+    """
+    width = _DATETIME_WIDTH if with_time else _DATE_WIDTH
+    chars = buf[starts[:, None] + np.arange(width)]
+    for column, separator in _SEPARATORS.items():
+        if column < width and not (chars[:, column] == separator).all():
+            raise ValueError("Format de date/heure inattendu (attendu 'AAAA.MM.JJ HH:MM:SS')")
+    digits = chars - np.uint8(ord("0"))  # Hors chiffres: > 9 (arithmétique uint8)
+    digit_columns = [i for i in range(width) if i not in _SEPARATORS]
+    if (digits[:, digit_columns] > 9).any():
+        raise ValueError("Format de date/heure inattendu (chiffre attendu)")
+
+    def number(first, last):
+        value = digits[:, first].astype(np.int64)
+        for i in range(first + 1, last):
+            value = value * 10 + digits[:, i]
+        return value
+
+    months = (number(0, 4) - 1970) * 12 + number(5, 7) - 1
+    days = months.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64) + number(8, 10) - 1
+    seconds = days * 86400
+    if with_time:
+        seconds += number(11, 13) * 3600 + number(14, 16) * 60 + number(17, 19)
+    return seconds
+
+
+def _to_utc(seconds: np.ndarray, server_tz: str | None) -> np.ndarray:
+    """Secondes à l'heure du serveur -> secondes UTC (inchangées avec None: heure du serveur conservée)."""
+    if not server_tz or server_tz == "UTC":
+        return seconds
+    local = pd.DatetimeIndex(seconds.astype("datetime64[s]").astype("datetime64[ns]"))
+    # Heure ambiguë (passage à l'heure d'hiver): heure standard
+    aware = local.tz_localize(server_tz, ambiguous=np.zeros(len(local), dtype=bool), nonexistent="shift_forward")
+    return aware.tz_convert("UTC").tz_localize(None).asi8 // 10**9
+
+
+def parse_mt5_csv(csv_path, server_tz: str | None = DEFAULT_SERVER_TZ) -> tuple:
+    """
+    Lit un export MT5 sans cache.
+
+    Args:
+        csv_path: Chemin du fichier CSV
+        server_tz: Fuseau de l'heure du serveur MT5, pour la conversion en UTC ('UTC': export
+                       déjà en UTC, None: horodatages conservés à l'heure du serveur)
+
+    Returns:
+        tuple: (enregistrements MT5_CSV_DTYPE triés par le temps, masque des colonnes présentes)
+    """
+    data = _read_export(csv_path)
+    header = data[:data.find(b"\n")].decode("ascii").strip().split("\t")
+    if header[:1] != ["<DATE>"]:
+        raise ValueError(f"{csv_path}: colonne <DATE> attendue en premier")
+    with_time = header[1:2] == ["<TIME>"]
+
+    buf = np.frombuffer(data, dtype=np.uint8)
+    starts = np.flatnonzero(buf == ord("\n")) + 1
+    width = _DATETIME_WIDTH if with_time else _DATE_WIDTH
+    starts = starts[starts + width <= len(buf)]
+    starts = starts[(buf[starts] >= ord("0")) & (buf[starts] <= ord("9"))]  # Lignes vides ignorées
+
+    numeric = [column for column in header if column in _CSV_COLUMNS]
+    values = pd.read_csv(io.BytesIO(data), sep="\t", usecols=numeric, engine="c", na_filter=False)
+    if len(values) != len(starts):
+        raise ValueError(f"{csv_path}: {len(values)} lignes de valeurs pour {len(starts)} dates")
+
+    records = np.zeros(len(starts), dtype=MT5_CSV_DTYPE)
+    records["time"] = _to_utc(_parse_times(buf, starts, with_time), server_tz)
+    mask = 0
+    for bit, (column, (field, _)) in enumerate(_CSV_COLUMNS.items()):
+        if column in values.columns:
+            records[field] = values[column].to_numpy()
+            mask |= 1 << bit
+    if len(records) > 1 and not (np.diff(records["time"]) >= 0).all():
+        records = records[np.argsort(records["time"], kind="stable")]
+    return records, mask
+
+
+def cache_path(csv_path, server_tz: str | None = DEFAULT_SERVER_TZ) -> Path:
+    """
+    Chemin du fichier cache d'un export pour une base de temps: <csv>.cache pour le fuseau
+    par défaut, <csv>.<fuseau>.cache sinon (<csv>.server.cache pour l'heure du serveur), pour
+    que des chargements alternant les bases de temps ne réécrivent pas le cache à chaque fois.
+    """
+    csv_path = Path(csv_path)
+    if server_tz == DEFAULT_SERVER_TZ:
+        return csv_path.with_name(csv_path.name + CACHE_SUFFIX)
+    tag = "server" if server_tz is None else server_tz.replace("/", "_")
+    return csv_path.with_name(f"{csv_path.name}.{tag}{CACHE_SUFFIX}")
+
+
+def _cache_header(csv_path, mask: int, server_tz: str | None) -> np.ndarray:
+    stat = os.stat(csv_path)
+    header = np.zeros(1, dtype=_HEADER_DTYPE)
+    header["magic"] = CACHE_MAGIC
+    header["columns"] = mask
+    header["size"] = stat.st_size
+    header["mtime_ns"] = stat.st_mtime_ns
+    header["server_tz"] = (server_tz or "").encode("ascii")  # None: vide (heure du serveur)
+    return header
+
+
+def _read_cache(csv_path, server_tz: str | None):
+    path = cache_path(csv_path, server_tz)
+    try:
+        cache_size = os.path.getsize(path)
+        if cache_size < _HEADER_DTYPE.itemsize:
+            return None
+        header = np.fromfile(path, dtype=_HEADER_DTYPE, count=1)
+    except OSError:
+        return None
+    expected = _cache_header(csv_path, int(header["columns"][0]), server_tz)
+    if header.tobytes() != expected.tobytes():
+        return None
+    rows = (cache_size - _HEADER_DTYPE.itemsize) // MT5_CSV_DTYPE.itemsize
+    if rows == 0:
+        return np.zeros(0, dtype=MT5_CSV_DTYPE), int(header["columns"][0])
+    records = np.memmap(path, dtype=MT5_CSV_DTYPE, mode="r", offset=_HEADER_DTYPE.itemsize, shape=(rows,))
+    return records, int(header["columns"][0])
+
+
+def _write_cache(csv_path, records: np.ndarray, mask: int, server_tz: str | None):
+    path = cache_path(csv_path, server_tz)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(_cache_header(csv_path, mask, server_tz).tobytes())
+            f.write(records.tobytes())
+        os.replace(tmp_path, path)
+    except OSError:
+        # Répertoire en lecture seule: chargement sans cache
+        tmp_path.unlink(missing_ok=True)
+
+
+def load_mt5_records(csv_path, server_tz: str | None = DEFAULT_SERVER_TZ, cache: bool = True) -> tuple:
+    """
+    Charge un export MT5 en enregistrements, via le cache binaire s'il est à jour.
+
+    Args:
+        csv_path: Chemin du fichier CSV
+        server_tz: Fuseau de l'heure du serveur MT5, pour la conversion en UTC ('UTC': export
+                       déjà en UTC, None: horodatages conservés à l'heure du serveur)
+        cache: Lire/écrire le cache à côté du CSV
+
+    Returns:
+        tuple: (enregistrements MT5_CSV_DTYPE, vue mappée en lecture seule si lus dans le cache,
+                masque des colonnes présentes)
+    """
+    if cache:
+        cached = _read_cache(csv_path, server_tz)
+        if cached is not None:
+            return cached
+    records, mask = parse_mt5_csv(csv_path, server_tz)
+    if cache:
+        _write_cache(csv_path, records, mask, server_tz)
+    return records, mask
+
+
+def load_mt5_csv(csv_path, server_tz: str | None = DEFAULT_SERVER_TZ, cache: bool = True) -> pd.DataFrame:
+    """
+    Charge un export MT5 (séparateur tabulation, <DATE> <TIME> <OPEN> ... <SPREAD>).
+
+    Args:
+        csv_path: Chemin du fichier CSV
+        server_tz: Fuseau de l'heure du serveur MT5, pour la conversion en UTC ('UTC': export
+                       déjà en UTC, None: horodatages conservés à l'heure du serveur)
+        cache: Utiliser le cache binaire à côté du CSV
+
+    Returns:
+        pd.DataFrame: Colonnes 'Open', 'High', 'Low', 'Close', 'TickVolume', 'Spread' présentes
+                      dans l'export, indexées par le temps UTC (sans fuseau, à l'heure du
+                      serveur, avec server_tz=None)
+    """
+    records, mask = load_mt5_records(csv_path, server_tz, cache)
+    columns = {}
+    for bit, (field, name) in enumerate(_CSV_COLUMNS.values()):
+        if name is not None and mask & (1 << bit):
+            columns[name] = records[field]
+    df = pd.DataFrame(columns)
+    df.index = pd.DatetimeIndex(records["time"].astype("datetime64[s]").astype("datetime64[ns]"), name="time")
+    if server_tz is not None:
+        df.index = df.index.tz_localize("UTC")
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chargement d'un export CSV MT5 (avec cache binaire)")
+    parser.add_argument("csv", help="Export MT5 (séparateur tabulation: <DATE> <TIME> <OPEN> ...)")
+    parser.add_argument("--server-tz", default=DEFAULT_SERVER_TZ, help="Fuseau de l'heure du serveur MT5")
+    parser.add_argument("--no-cache", action="store_true", help="Ignorer et ne pas écrire le cache")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df = load_mt5_csv(args.csv, args.server_tz, cache=not args.no_cache)
+    print(f"{len(df)} bougies du {df.index[0]} au {df.index[-1]} en {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Balayage parallèle des paramètres de la stratégie ZigZag
+Évalue une grille (ZIGZAG_LENGTH, SMA_PERIOD, RSI_PERIOD, SL_BUFFER_POINTS...) sur un pool
+de processus. Les tableaux OHLC sont partagés en lecture seule via la mémoire partagée
+(pas de pickling des données), et chaque processus garde en cache les calculs glissants
+communs à plusieurs points de la grille (SMA, RSI, pivots, zones, englobantes).
+
+Usage:
+    python -m src.tools.param_sweep US30.cash_M1_....csv --zigzag 5,9,14 --sma 20,50 \
+        --rsi 7,14 --sl-buffer 3,5 --workers 8 --output sweep_results.csv
+"""
+
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from src.tools.mt5_csv import load_mt5_csv
+from src.tools.signal_scanner import DEFAULT_SCAN_PARAMS, normalize_ohlc, scan_setup_arrays
+
+# Paramètres qui déterminent les calculs glissants réutilisables: les points de grille
+# partageant ces valeurs sont envoyés ensemble au même processus
+SHARED_STAGE_PARAMS = ("zigzag_length", "sma_period", "rsi_period")
+
+METRIC_COLUMNS = [
+    "setups", "trades", "wins", "losses", "win_rate", "total_r",
+    "expectancy_r", "profit_factor", "max_drawdown_r"
+]
+
+# État d'un processus du pool (tableaux attachés à la mémoire partagée + cache des étapes)
+_worker_state = {}
+
+
+def evaluate_setups(setups: pd.DataFrame, high: np.ndarray, low: np.ndarray,
+                    max_holding_bars: int | None = None) -> dict:
+    """
+    Résout chaque setup (SL ou TP atteint en premier) et calcule les métriques en multiples de R.
+    Si SL et TP sont touchés par la même bougie, le SL est retenu (hypothèse pessimiste).
+
+    Args:
+        setups: Résultat de scan_setups / scan_setup_arrays
+        high, low: Tableaux de prix (mêmes positions que la colonne 'position')
+        max_holding_bars: Nombre maximum de bougies avant d'abandonner le trade (None: fin des données)
+
+    Returns:
+        dict: Métriques (METRIC_COLUMNS)
+    """
+    results = []
+    n = len(high)
+    for setup in setups.itertuples(index=False):
+        if np.isnan(setup.sl) or np.isnan(setup.tp):
+            continue
+        risk = abs(setup.entry - setup.sl)
+        if risk <= 0:
+            continue
+        start = setup.position + 1
+        end = n if max_holding_bars is None else min(n, start + max_holding_bars)
+        if start >= end:
+            continue
+        if setup.direction == 'BUY':
+            sl_hit = low[start:end] <= setup.sl
+            tp_hit = high[start:end] >= setup.tp
+            reward = setup.tp - setup.entry
+        else:
+            sl_hit = high[start:end] >= setup.sl
+            tp_hit = low[start:end] <= setup.tp
+            reward = setup.entry - setup.tp
+        first_sl = int(np.argmax(sl_hit)) if sl_hit.any() else end
+        first_tp = int(np.argmax(tp_hit)) if tp_hit.any() else end
+        if first_sl == end and first_tp == end:
+            continue  # Trade non résolu sur la période
+        results.append(-1.0 if first_sl <= first_tp else reward / risk)
+
+    r = np.asarray(results, dtype=float)
+    wins = r[r > 0]
+    losses = r[r <= 0]
+    equity = np.concatenate([[0.0], np.cumsum(r)])
+    drawdown = (np.maximum.accumulate(equity) - equity).max()
+    if len(losses) and losses.sum() != 0:
+        profit_factor = float(wins.sum() / abs(losses.sum()))
+    else:
+        profit_factor = float("inf") if len(wins) else 0.0
+    return {
+        "setups": len(setups),
+        "trades": len(r),
+        "wins": len(wins),
+        "losses": len(losses),
+        "win_rate": len(wins) / len(r) if len(r) else 0.0,
+        "total_r": float(r.sum()),
+        "expectancy_r": float(r.mean()) if len(r) else 0.0,
+        "profit_factor": profit_factor,
+        "max_drawdown_r": float(drawdown),
+    }
+
+
+def expand_grid(grid: dict) -> list:
+    """
+    Développe une grille {paramètre: [valeurs]} en liste de jeux de paramètres.
+
+    Args:
+        grid: Valeurs à tester par paramètre
+
+    Returns:
+        list: Produit cartésien des valeurs (liste de dicts)
+    """
+    keys = list(grid.keys())
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def _attach_worker(shm_name: str, shape: tuple, max_holding_bars):
+    """Initialiseur du pool: attache les tableaux OHLC partagés (sans copie)."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ohlc = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    ohlc.flags.writeable = False
+    _worker_state.clear()
+    _worker_state.update({"shm": shm, "ohlc": ohlc, "cache": {}, "max_holding_bars": max_holding_bars})
+
+
+def _run_group(param_sets: list, base_params: dict) -> list:
+    """Évalue un groupe de points de grille partageant les mêmes calculs glissants."""
+    open_, high, low, close = _worker_state["ohlc"]
+    rows = []
+    for grid_point in param_sets:
+        params = {**base_params, **grid_point}
+        setups = scan_setup_arrays(open_, high, low, close, params, cache=_worker_state["cache"])
+        metrics = evaluate_setups(setups, high, low, _worker_state["max_holding_bars"])
+        rows.append({**grid_point, **metrics})
+    return rows
+
+
+def run_parameter_sweep(df: pd.DataFrame, grid: dict, base_params: dict | None = None,
+                        workers: int | None = None, rank_by: str = "total_r",
+                        max_holding_bars: int | None = None, output_path: str | None = None) -> pd.DataFrame:
+    """
+    Évalue toute la grille de paramètres et retourne le classement.
+
+    Args:
+        df: Bougies OHLC (format Akoben ou MT5)
+        grid: Valeurs à tester, ex: {"zigzag_length": [5, 9], "sl_buffer_points": [3.0, 5.0]}
+        base_params: Paramètres fixes de scan_setups (fusionnés avec DEFAULT_SCAN_PARAMS)
+        workers: Nombre de processus (None: tous les cœurs, 0 ou 1: dans le processus courant)
+        rank_by: Métrique de classement (décroissant)
+        max_holding_bars: Durée maximale d'un trade en bougies
+        output_path: Fichier CSV où écrire le classement (facultatif)
+
+    Returns:
+        pd.DataFrame: Une ligne par point de grille, triée par rank_by, avec une colonne 'rank'
+    """
+    df = normalize_ohlc(df)
+    base = {**DEFAULT_SCAN_PARAMS, **(base_params or {})}
+    param_sets = expand_grid(grid)
+
+    # Regrouper les points de grille qui partagent SMA/RSI/pivots
+    groups = {}
+    for grid_point in param_sets:
+        key = tuple({**base, **grid_point}[k] for k in SHARED_STAGE_PARAMS)
+        groups.setdefault(key, []).append(grid_point)
+
+    ohlc = np.ascontiguousarray(df[['Open', 'High', 'Low', 'Close']].to_numpy(dtype=np.float64).T)
+    workers = os.cpu_count() if workers is None else workers
+
+    start = time.time()
+    shm = shared_memory.SharedMemory(create=True, size=ohlc.nbytes)
+    try:
+        shared = np.ndarray(ohlc.shape, dtype=np.float64, buffer=shm.buf)
+        shared[:] = ohlc
+        rows = []
+        if workers <= 1:
+            _attach_worker(shm.name, ohlc.shape, max_holding_bars)
+            for group in groups.values():
+                rows.extend(_run_group(group, base))
+            _worker_state["shm"].close()
+            _worker_state.clear()
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach_worker,
+                                     initargs=(shm.name, ohlc.shape, max_holding_bars)) as pool:
+                futures = [pool.submit(_run_group, group, base) for group in groups.values()]
+                for future in futures:
+                    rows.extend(future.result())
+        del shared
+    finally:
+        shm.close()
+        shm.unlink()
+
+    results = pd.DataFrame(rows)
+    results = results.sort_values(rank_by, ascending=False, kind="stable").reset_index(drop=True)
+    results.insert(0, "rank", np.arange(1, len(results) + 1))
+    print(f"Balayage terminé: {len(results)} jeux de paramètres en {time.time() - start:.1f}s")
+
+    if output_path:
+        results.to_csv(output_path, index=False)
+        print(f"Classement enregistré: {output_path}")
+    return results
+
+
+def _parse_values(text: str, cast):
+    return [cast(v) for v in text.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Balayage parallèle des paramètres ZigZag/SMA/RSI")
+    parser.add_argument("csv", help="Export MT5 (séparateur tabulation: <DATE> <TIME> <OPEN> ...)")
+    parser.add_argument("--zigzag", default="9", help="Valeurs de ZIGZAG_LENGTH (ex: 5,9,14)")
+    parser.add_argument("--sma", default="20", help="Valeurs de SMA_PERIOD")
+    parser.add_argument("--rsi", default="14", help="Valeurs de RSI_PERIOD")
+    parser.add_argument("--sl-buffer", default="5.0", help="Valeurs de SL_BUFFER_POINTS")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus")
+    parser.add_argument("--rank-by", default="total_r", choices=METRIC_COLUMNS)
+    parser.add_argument("--max-holding", type=int, default=None, help="Durée maximale d'un trade (bougies)")
+    parser.add_argument("--output", default="sweep_results.csv", help="Fichier CSV du classement")
+    args = parser.parse_args()
+
+    df = load_mt5_csv(args.csv)[["Open", "High", "Low", "Close"]]
+
+    grid = {
+        "zigzag_length": _parse_values(args.zigzag, int),
+        "sma_period": _parse_values(args.sma, int),
+        "rsi_period": _parse_values(args.rsi, int),
+        "sl_buffer_points": _parse_values(args.sl_buffer, float),
+    }
+    results = run_parameter_sweep(df, grid, workers=args.workers, rank_by=args.rank_by,
+                                  max_holding_bars=args.max_holding, output_path=args.output)
+    print(results.head(20).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Représentation compacte des pivots ZigZag
+Stocke les pivots dans des tableaux NumPy positionnels (position, prix, code de type,
+code de statut) au lieu d'une liste de dicts indexés par Timestamp. Les requêtes du type
+"dernier pivot haut avant la position p" se font par recherche dichotomique, sans
+index.get_loc ni parcours de reversed(pivots). Les pivots restent accessibles comme
+des dicts ({'index', 'price', 'type', 'status'}) pour le code existant.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.tools.zigzag_engine import zigzag_pivot_arrays
+
+# Codes de type et de statut (position dans le tuple)
+PIVOT_TYPES = ('high', 'low')
+PIVOT_STATUSES = ('H', 'HH', 'LH', 'EH', 'L', 'LL', 'HL', 'EL')
+TYPE_HIGH = 0
+TYPE_LOW = 1
+
+_PIVOT_KEYS = ('index', 'price', 'type', 'status')
+
+
+def _type_code(pivot_type) -> int:
+    """Convertit 'high'/'low' (ou un code) en code de type."""
+    if isinstance(pivot_type, str):
+        return PIVOT_TYPES.index(pivot_type)
+    return int(pivot_type)
+
+
+class Pivot:
+    """
+    Vue sur un pivot d'une PivotSeries (aucune copie).
+    Se lit comme le dict historique: pivot['index'], pivot.get('price'), dict(pivot.items())...
+    """
+
+    __slots__ = ('_series', '_k')
+
+    def __init__(self, series: "PivotSeries", k: int):
+        self._series = series
+        self._k = k
+
+    @property
+    def number(self) -> int:
+        return self._k
+
+    @property
+    def position(self) -> int:
+        return int(self._series.positions[self._k])
+
+    @property
+    def index(self):
+        return self._series.labels[self._k]
+
+    @property
+    def price(self) -> float:
+        return float(self._series.prices[self._k])
+
+    @property
+    def type(self) -> str:
+        return PIVOT_TYPES[self._series.type_codes[self._k]]
+
+    @property
+    def status(self) -> str:
+        return PIVOT_STATUSES[self._series.status_codes[self._k]]
+
+    @property
+    def confirmation(self) -> int | None:
+        confirmations = self._series.confirmations
+        return int(confirmations[self._k]) if confirmations is not None else None
+
+    def __getitem__(self, key: str):
+        if key not in _PIVOT_KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in _PIVOT_KEYS else default
+
+    def keys(self):
+        return _PIVOT_KEYS
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in _PIVOT_KEYS]
+
+    def to_dict(self) -> dict:
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, (Pivot, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Pivot({self.to_dict()})"
+
+
+class PivotSeries:
+    """
+    Pivots ZigZag triés par position, stockés en tableaux NumPy.
+
+    Attributs:
+        positions: Positions des pivots dans les tableaux de prix (int64)
+        prices: Prix des pivots (float64)
+        type_codes: Codes de type (TYPE_HIGH / TYPE_LOW, int8)
+        status_codes: Codes de statut (indices dans PIVOT_STATUSES, int8)
+        confirmations: Positions des barres de confirmation (int64) ou None
+        labels: Index temporel de chaque pivot (positions si aucun index n'est fourni)
+    """
+
+    __slots__ = ('positions', 'prices', 'type_codes', 'status_codes', 'confirmations', 'labels',
+                 '_type_positions', '_type_confirmations')
+
+    def __init__(self, positions, prices, type_codes, status_codes, confirmations=None, labels=None):
+        self.positions = np.asarray(positions, dtype=np.int64)
+        self.prices = np.asarray(prices, dtype=float)
+        self.type_codes = np.asarray(type_codes, dtype=np.int8)
+        self.status_codes = np.asarray(status_codes, dtype=np.int8)
+        self.confirmations = None if confirmations is None else np.asarray(confirmations, dtype=np.int64)
+        self.labels = pd.Index(self.positions) if labels is None else pd.Index(labels)
+
+        # Numéros de pivot par type: base des recherches dichotomiques
+        self._type_positions = {}
+        self._type_confirmations = {}
+
+    # --- Construction ---
+
+    @classmethod
+    def from_arrays(cls, positions, prices, types, statuses, confirmations=None, index=None) -> "PivotSeries":
+        """
+        Construit la série depuis les tableaux de zigzag_pivot_arrays.
+
+        Args:
+            positions, prices, types, statuses: Tableaux retournés par zigzag_pivot_arrays
+            confirmations: Positions de confirmation (with_confirmation=True), facultatif
+            index: Index temporel des bougies (pour les libellés 'index' des pivots)
+
+        Returns:
+            PivotSeries: La série de pivots
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        type_codes = np.where(np.asarray(types) == 'high', TYPE_HIGH, TYPE_LOW)
+        status_lookup = {status: code for code, status in enumerate(PIVOT_STATUSES)}
+        status_codes = [status_lookup[status] for status in np.asarray(statuses).tolist()]
+        labels = None if index is None else index[positions]
+        return cls(positions, prices, type_codes, status_codes, confirmations, labels)
+
+    @classmethod
+    def from_ohlc(cls, df_ohlc: pd.DataFrame, length: int = 9) -> "PivotSeries":
+        """
+        Calcule les pivots ZigZag d'un DataFrame OHLC (mêmes pivots que calculate_zigzag_pivots).
+
+        Args:
+            df_ohlc: DataFrame avec 'High', 'Low', 'Close', trié chronologiquement
+            length: Période de recherche du ZigZag
+
+        Returns:
+            PivotSeries: Pivots avec positions de confirmation et libellés de l'index
+        """
+        if len(df_ohlc) < length:
+            return cls.from_arrays([], [], [], [], [], df_ohlc.index)
+        df = df_ohlc if df_ohlc.index.is_monotonic_increasing else df_ohlc.sort_index(ascending=True)
+        arrays = zigzag_pivot_arrays(
+            df['High'].to_numpy(dtype=float),
+            df['Low'].to_numpy(dtype=float),
+            df['Close'].to_numpy(dtype=float),
+            length,
+            with_confirmation=True
+        )
+        return cls.from_arrays(*arrays, index=df.index)
+
+    @classmethod
+    def from_dicts(cls, pivots: list, index: pd.Index) -> "PivotSeries":
+        """
+        Convertit une liste de pivots historique ({'index', 'price', 'type', 'status'}).
+        Les pivots absents de l'index reçoivent la position -1.
+
+        Args:
+            pivots: Liste de dicts triés chronologiquement
+            index: Index du DataFrame de prix
+
+        Returns:
+            PivotSeries: La série de pivots
+        """
+        labels = [p['index'] for p in pivots]
+        series = cls.from_arrays(
+            index.get_indexer(labels) if len(labels) else np.empty(0, dtype=np.int64),
+            [p['price'] for p in pivots],
+            [p['type'] for p in pivots],
+            [p.get('status', 'H' if p['type'] == 'high' else 'L') for p in pivots]
+        )
+        series.labels = pd.Index(labels)
+        return series
+
+    # --- Vue liste de dicts (compatibilité) ---
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __bool__(self) -> bool:
+        return len(self.positions) > 0
+
+    def __getitem__(self, k: int) -> Pivot:
+        n = len(self.positions)
+        if k < 0:
+            k += n
+        if not 0 <= k < n:
+            raise IndexError("numéro de pivot hors limites")
+        return Pivot(self, k)
+
+    def __iter__(self):
+        return (Pivot(self, k) for k in range(len(self.positions)))
+
+    def __reversed__(self):
+        return (Pivot(self, k) for k in range(len(self.positions) - 1, -1, -1))
+
+    def to_dicts(self) -> list:
+        """
+        Returns:
+            list: Pivots au format historique {'index', 'price', 'type', 'status'}
+        """
+        return [
+            {'index': label, 'price': price, 'type': PIVOT_TYPES[t], 'status': PIVOT_STATUSES[s]}
+            for label, price, t, s in zip(self.labels, self.prices.tolist(),
+                                          self.type_codes.tolist(), self.status_codes.tolist())
+        ]
+
+    def types(self) -> np.ndarray:
+        """Types des pivots en chaînes ('high'/'low')."""
+        return np.asarray(PIVOT_TYPES)[self.type_codes]
+
+    def statuses(self) -> np.ndarray:
+        """Statuts des pivots en chaînes ('HH', 'LL'...)."""
+        return np.asarray(PIVOT_STATUSES)[self.status_codes]
+
+    # --- Requêtes ---
+
+    def _numbers_of_type(self, type_code: int) -> tuple:
+        if type_code not in self._type_positions:
+            numbers = np.flatnonzero(self.type_codes == type_code)
+            self._type_positions[type_code] = (numbers, self.positions[numbers])
+        return self._type_positions[type_code]
+
+    def number_of(self, label) -> int | None:
+        """
+        Numéro du pivot situé sur la bougie 'label' (Timestamp de l'index), None si absent.
+        """
+        k = int(self.labels.searchsorted(label, side='right')) - 1
+        if k >= 0 and self.labels[k] == label:
+            return k
+        return None
+
+    def find(self, label) -> Pivot | None:
+        """Pivot situé sur la bougie 'label' (remplace next(p for p in reversed(pivots) if ...))."""
+        k = self.number_of(label)
+        return Pivot(self, k) if k is not None else None
+
+    def last_before(self, position: int, pivot_type=None, inclusive: bool = False) -> int | None:
+        """
+        Numéro du dernier pivot (de type pivot_type si fourni) dont la position est
+        strictement inférieure à 'position' (inférieure ou égale si inclusive).
+
+        Args:
+            position: Position de la bougie de référence
+            pivot_type: 'high', 'low', code de type ou None pour tous
+            inclusive: Inclut un pivot situé sur la position elle-même
+
+        Returns:
+            int | None: Numéro du pivot dans la série, None si aucun
+        """
+        side = 'right' if inclusive else 'left'
+        if pivot_type is None:
+            k = int(np.searchsorted(self.positions, position, side=side)) - 1
+            return k if k >= 0 else None
+        numbers, positions = self._numbers_of_type(_type_code(pivot_type))
+        j = int(np.searchsorted(positions, position, side=side)) - 1
+        return int(numbers[j]) if j >= 0 else None
+
+    def last_before_label(self, label, pivot_type=None, inclusive: bool = False) -> int | None:
+        """Comme last_before, avec un Timestamp de l'index au lieu d'une position."""
+        side = 'right' if inclusive else 'left'
+        if pivot_type is None:
+            k = int(self.labels.searchsorted(label, side=side)) - 1
+            return k if k >= 0 else None
+        numbers, _ = self._numbers_of_type(_type_code(pivot_type))
+        j = int(self.labels[numbers].searchsorted(label, side=side)) - 1
+        return int(numbers[j]) if j >= 0 else None
+
+    def last_confirmed_before(self, position: int, pivot_type=None) -> int | None:
+        """
+        Numéro du dernier pivot (de type pivot_type si fourni) déjà confirmé à la
+        bougie 'position' (confirmation <= position). Nécessite les confirmations.
+        """
+        if self.confirmations is None:
+            raise ValueError("PivotSeries construite sans positions de confirmation")
+        code = None if pivot_type is None else _type_code(pivot_type)
+        if code not in self._type_confirmations:
+            numbers = np.arange(len(self.positions)) if code is None else self._numbers_of_type(code)[0]
+            # Les confirmations ne sont pas forcément triées: maximum courant des numéros confirmés
+            order = np.argsort(self.confirmations[numbers], kind='stable')
+            self._type_confirmations[code] = (self.confirmations[numbers][order],
+                                              np.maximum.accumulate(numbers[order]))
+        confirmed_at, latest_number = self._type_confirmations[code]
+        j = int(np.searchsorted(confirmed_at, position, side='right')) - 1
+        return int(latest_number[j]) if j >= 0 else None
+
+    def __repr__(self):
+        return f"PivotSeries({len(self)} pivots)"
@@ -0,0 +1,94 @@
+"""
+Rééchantillonnage local des bougies (M1 -> M5, M15, H1...)
+Construit les bougies des timeframes supérieurs à partir des bougies d'un timeframe de base,
+alignées sur les bornes des bougies MT5 (M5: :00, :05..., H1: début d'heure, D1: minuit,
+à l'heure du serveur comme les bougies de base).
+
+Agrégation par bougie: open = première ouverture, high = max, low = min, close = dernière
+clôture, tick_volume et real_volume = sommes, spread = minimum (comme MT5, qui garde le plus
+petit spread de la bougie). La dernière bougie est partielle si la bougie de base la plus
+récente n'est pas la dernière de sa période (bougie en formation, comme dans MT5).
+
+Tout est vectorisé (np.add.reduceat, np.maximum.reduceat...) sur des enregistrements BAR_DTYPE.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.tools.bar_store import BAR_DTYPE, bars_to_records, records_to_frame
+from src.tools.candle_cache import TIMEFRAME_SECONDS
+
+
+def can_resample(base_timeframe: str, timeframe: str) -> bool:
+    """
+    Indique si un timeframe peut être construit à partir d'un timeframe de base.
+
+    Args:
+        base_timeframe: Timeframe de base (ex: 'M1')
+        timeframe: Timeframe cible (ex: 'M15')
+
+    Returns:
+        bool: True si la durée cible est un multiple de la durée de base
+    """
+    base = TIMEFRAME_SECONDS.get(base_timeframe)
+    target = TIMEFRAME_SECONDS.get(timeframe)
+    return base is not None and target is not None and target > base and target % base == 0
+
+
+def resample_records(records: np.ndarray, timeframe: str, base_timeframe: str = "M1",
+                     drop_first_partial: bool = True) -> np.ndarray:
+    """
+    Rééchantillonne des bougies vers un timeframe supérieur.
+
+    Args:
+        records: Bougies de base (BAR_DTYPE, triées)
+        timeframe: Timeframe cible
+        base_timeframe: Timeframe des bougies de base
+        drop_first_partial: Ignorer la première bougie si les bougies de base ne commencent
+                            pas au début de sa période (historique tronqué par la fenêtre)
+
+    Returns:
+        np.ndarray: Bougies du timeframe cible (BAR_DTYPE), la dernière éventuellement partielle
+    """
+    if not can_resample(base_timeframe, timeframe):
+        raise ValueError(f"Impossible de construire {timeframe} à partir de {base_timeframe}")
+    if len(records) == 0:
+        return np.zeros(0, dtype=BAR_DTYPE)
+
+    seconds = TIMEFRAME_SECONDS[timeframe]
+    buckets = records["time"] // seconds
+    starts = np.flatnonzero(np.diff(buckets)) + 1
+    starts = np.concatenate([[0], starts])
+    if drop_first_partial and records["time"][0] % seconds != 0:
+        first = starts[1] if len(starts) > 1 else len(records)
+        records, buckets, starts = records[first:], buckets[first:], starts[1:] - first
+        if len(records) == 0:
+            return np.zeros(0, dtype=BAR_DTYPE)
+
+    ends = np.concatenate([starts[1:], [len(records)]]) - 1
+    out = np.zeros(len(starts), dtype=BAR_DTYPE)
+    out["time"] = buckets[starts] * seconds
+    out["open"] = records["open"][starts]
+    out["high"] = np.maximum.reduceat(records["high"], starts)
+    out["low"] = np.minimum.reduceat(records["low"], starts)
+    out["close"] = records["close"][ends]
+    out["tick_volume"] = np.add.reduceat(records["tick_volume"], starts)
+    out["real_volume"] = np.add.reduceat(records["real_volume"], starts)
+    out["spread"] = np.minimum.reduceat(records["spread"], starts)
+    return out
+
+
+def resample_bars(bars, timeframe: str, base_timeframe: str = "M1", drop_first_partial: bool = True) -> pd.DataFrame:
+    """
+    Rééchantillonne des bougies au format du connecteur MT5 (DataFrame indexé par le temps).
+
+    Args:
+        bars: Bougies de base (DataFrame, liste de dicts ou BAR_DTYPE)
+        timeframe: Timeframe cible
+        base_timeframe: Timeframe des bougies de base
+        drop_first_partial: Voir resample_records
+
+    Returns:
+        pd.DataFrame: Bougies du timeframe cible (index 'time', colonnes en minuscules)
+    """
+    return records_to_frame(resample_records(bars_to_records(bars), timeframe, base_timeframe, drop_first_partial))
@@ -0,0 +1,298 @@
+"""
+Scanner de setups en une passe
+Enchaîne les étapes vectorisées (pivots ZigZag, zones d'intérêt, divergence RSI,
+englobantes, SL, TP, taille de position) et retourne tous les setups BUY/SELL
+d'un jeu de données sous forme de DataFrame.
+Utilisable depuis les scripts de test comme depuis AkobenTrader.
+"""
+
+import math
+import numpy as np
+import pandas as pd
+
+from src.tools import indicators
+from src.tools.zigzag_engine import zigzag_pivot_arrays
+from src.tools.interest_zones import interest_zone_arrays
+from src.tools.pivot_series import PivotSeries, TYPE_HIGH, TYPE_LOW
+from src.tools.candle_patterns import engulfing_mask_arrays
+
+DEFAULT_SCAN_PARAMS = {
+    "zigzag_length": 9,
+    "sma_period": 20,
+    "rsi_period": 14,
+    "rsi_column": None,            # Colonne RSI existante (calculée si absente)
+    "zone_statuses": ("HH", "LL"),
+    "anti_doji": "close_pct",      # Voir candle_patterns.ANTI_DOJI_RULES
+    "sl_buffer_points": 5.0,
+    "sl_max_lookback": 10,
+    "risk_percentage": 1.0,
+    "account_balance": 10000.0,
+    "symbol_info": None,           # Sans infos symbole, la taille n'est pas calculée
+    # 'causal': zone active = dernière zone confirmée avant la bougie (backtest/live)
+    # 'latest': dernière zone de chaque direction sur tout le jeu (comportement de test_zigzag_logic.py)
+    "zone_mode": "causal",
+}
+
+SETUP_COLUMNS = [
+    'time', 'position', 'direction', 'type', 'entry', 'sl', 'tp', 'size',
+    'zone_start', 'zone_end', 'pivot_price', 'rsi', 'rsi_at_pivot'
+]
+
+
+def normalize_ohlc(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalise un DataFrame de bougies au format Open/High/Low/Close trié chronologiquement.
+    Accepte le format MT5 (colonnes en minuscules, colonne ou index 'time').
+
+    Args:
+        df: DataFrame de bougies
+
+    Returns:
+        pd.DataFrame: Copie normalisée
+    """
+    renamed = df.rename(columns={'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close'})
+    if 'time' in renamed.columns and not isinstance(renamed.index, pd.DatetimeIndex):
+        renamed = renamed.set_index('time')
+    if not renamed.index.is_monotonic_increasing:
+        renamed = renamed.sort_index()
+    return renamed
+
+
+def rsi_pandas_ta(close: pd.Series, length: int = 14) -> pd.Series:
+    """
+    RSI identique à pandas_ta.rsi (RSI de Wilder du moteur d'indicateurs).
+
+    Args:
+        close: Série des clôtures
+        length: Période du RSI
+
+    Returns:
+        pd.Series: RSI (NaN pendant la période de chauffe)
+    """
+    return pd.Series(indicators.rsi(close.to_numpy(dtype=float), length), index=close.index)
+
+
+def _stop_loss(open_, high, low, close, position: int, bullish: bool, buffer_points: float, max_lookback: int):
+    """Équivalent positionnel de calculate_stop_loss (range depuis la dernière bougie opposée)."""
+    if position < 1:
+        return None
+    start = -1
+    for i in range(position - 1, max(position - 1 - max_lookback, -1), -1):
+        if math.isnan(open_[i]) or math.isnan(close[i]):
+            continue
+        if bullish and close[i] < open_[i]:
+            start = i; break
+        if not bullish and close[i] > open_[i]:
+            start = i; break
+    if start == -1:
+        start = position - 1
+    lows = low[start:position + 1]
+    highs = high[start:position + 1]
+    if np.isnan(lows).any() or np.isnan(highs).any():
+        return None
+    level = lows.min() - buffer_points if bullish else highs.max() + buffer_points
+    return round(level, 2)
+
+
+def _position_size(account_balance: float, risk_percentage: float, sl_level: float, entry_price: float, symbol_info: dict):
+    """Même règle que calculate_position_size, sans les traces console."""
+    if account_balance <= 0 or risk_percentage <= 0 or sl_level == entry_price:
+        return None
+    point = symbol_info.get('point'); tick_value = symbol_info.get('trade_tick_value'); tick_size = symbol_info.get('trade_tick_size')
+    volume_min = symbol_info.get('volume_min'); volume_max = symbol_info.get('volume_max'); volume_step = symbol_info.get('volume_step')
+    if None in [point, tick_value, tick_size, volume_min, volume_max, volume_step] or tick_size == 0 or point == 0:
+        return None
+    if volume_step <= 0:
+        return None
+    risk_amount = account_balance * (risk_percentage / 100.0)
+    sl_distance_points = abs(entry_price - sl_level) / point
+    point_value_per_lot = (tick_value / tick_size) * point
+    if sl_distance_points <= 0 or point_value_per_lot <= 0:
+        return None
+    volume_ideal = risk_amount / (sl_distance_points * point_value_per_lot)
+    volume_adjusted = math.floor(volume_ideal / volume_step) * volume_step
+    volume_final = min(volume_max, max(volume_min, volume_adjusted))
+    decimals = len(str(volume_step).split('.')[-1]) if '.' in str(volume_step) else 0
+    volume_final = round(volume_final, decimals)
+    return volume_final if volume_final >= volume_min else None
+
+
+def _divergence_masks(low, high, rsi, zone_start, zone_end, pivot_price, rsi_at_pivot, bullish: bool):
+    """
+    Version vectorisée de check_divergence_in_zone (signal_utils.py) sur toutes les bougies.
+
+    Returns:
+        tuple: (masque divergence régulière, masque divergence de continuation)
+    """
+    zone_upper = np.maximum(zone_start, zone_end)
+    zone_lower = np.minimum(zone_start, zone_end)
+    zone_size = zone_upper - zone_lower
+    tolerance = np.where(zone_size > 0, zone_size * 0.05, 0.00001)
+    with np.errstate(invalid='ignore'):
+        valid = ~np.isnan(rsi) & ~np.isnan(rsi_at_pivot)
+        price = low if bullish else high
+        valid &= (zone_lower <= price) & (price <= zone_upper)
+        if bullish:
+            regular = valid & (low < pivot_price - tolerance) & (rsi > rsi_at_pivot)
+            continuation = valid & ~regular & (low > pivot_price + tolerance) & (rsi < rsi_at_pivot)
+        else:
+            regular = valid & (high > pivot_price + tolerance) & (rsi < rsi_at_pivot)
+            continuation = valid & ~regular & (high < pivot_price - tolerance) & (rsi > rsi_at_pivot)
+    return regular, continuation
+
+
+def _cached(cache: dict, key: tuple, compute):
+    """Retourne cache[key], calculé à la première demande."""
+    if key not in cache:
+        cache[key] = compute()
+    return cache[key]
+
+
+def scan_setups(df: pd.DataFrame, params: dict | None = None, cache: dict | None = None) -> pd.DataFrame:
+    """
+    Détecte tous les setups BUY/SELL d'un jeu de données en une passe.
+
+    Args:
+        df: Bougies OHLC (format Akoben 'Open'... ou MT5 'open'...), index temporel
+        params: Paramètres (voir DEFAULT_SCAN_PARAMS), fusionnés avec les valeurs par défaut
+        cache: Cache des étapes intermédiaires (voir scan_setup_arrays)
+
+    Returns:
+        pd.DataFrame: Un setup par ligne (colonnes SETUP_COLUMNS), trié chronologiquement.
+        'position' est la position de la bougie dans le DataFrame normalisé.
+        'sl', 'tp' et 'size' valent NaN lorsqu'ils ne peuvent pas être calculés.
+    """
+    p = {**DEFAULT_SCAN_PARAMS, **(params or {})}
+    df = normalize_ohlc(df)
+    rsi = None
+    if p["rsi_column"] and p["rsi_column"] in df.columns:
+        rsi = df[p["rsi_column"]].to_numpy(dtype=float)
+    return scan_setup_arrays(
+        df['Open'].to_numpy(dtype=float), df['High'].to_numpy(dtype=float),
+        df['Low'].to_numpy(dtype=float), df['Close'].to_numpy(dtype=float),
+        p, index=df.index, rsi=rsi, cache=cache
+    )
+
+
+def scan_setup_arrays(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                      params: dict | None = None, index=None, rsi: np.ndarray | None = None,
+                      cache: dict | None = None) -> pd.DataFrame:
+    """
+    Cœur de scan_setups sur des tableaux positionnels (aucune copie des prix).
+
+    Le cache conserve les étapes qui ne dépendent que d'une partie des paramètres
+    (SMA par période, RSI par période, pivots par longueur ZigZag, zones, englobantes),
+    ce qui permet de réutiliser les calculs entre plusieurs jeux de paramètres.
+    Un cache n'est valable que pour un seul jeu de données.
+
+    Args:
+        open_, high, low, close: Tableaux de prix triés chronologiquement
+        params: Paramètres (voir DEFAULT_SCAN_PARAMS)
+        index: Index temporel des bougies (colonne 'time'), positions si None
+        rsi: RSI déjà calculé (sinon calculé selon rsi_period)
+        cache: Dictionnaire de cache partagé entre appels sur les mêmes données
+
+    Returns:
+        pd.DataFrame: Setups (colonnes SETUP_COLUMNS), 'position' relative aux tableaux fournis
+    """
+    p = {**DEFAULT_SCAN_PARAMS, **(params or {})}
+    if p["zone_mode"] not in ("causal", "latest"):
+        raise ValueError(f"zone_mode inconnu: {p['zone_mode']}")
+    cache = {} if cache is None else cache
+
+    sma = _cached(cache, ('sma', p["sma_period"]), lambda: indicators.sma(close, p["sma_period"]))
+    if rsi is None:
+        rsi = _cached(cache, ('rsi', p["rsi_period"]), lambda: indicators.rsi(close, p["rsi_period"]))
+    keep = ~np.isnan(sma) & ~np.isnan(np.asarray(rsi, dtype=float))
+
+    # Période de chauffe des indicateurs: tranche (vue) si les NaN sont tous en tête
+    first = int(np.argmax(keep)) if keep.any() else len(keep)
+    contiguous = bool(keep[first:].all())
+    select = slice(first, None) if contiguous else keep
+    stage_key = (first,) if contiguous else None
+    source_positions = np.arange(len(keep))[select]
+    open_, high, low, close = open_[select], high[select], low[select], close[select]
+    sma, rsi = sma[select], np.asarray(rsi, dtype=float)[select]
+    if index is not None:
+        index = index[select]
+    n = len(close)
+    if n == 0:
+        return pd.DataFrame(columns=SETUP_COLUMNS)
+
+    def staged(key, compute):
+        return _cached(cache, key + stage_key, compute) if stage_key is not None else compute()
+
+    # 1. Pivots ZigZag et zones d'intérêt
+    positions, prices, types, statuses, confirmations = staged(
+        ('pivots', p["zigzag_length"]),
+        lambda: zigzag_pivot_arrays(high, low, close, p["zigzag_length"], with_confirmation=True))
+    zone_statuses = tuple(p["zone_statuses"]) if p["zone_statuses"] is not None else None
+
+    def compute_zones():
+        candidate_mask = np.isin(statuses, zone_statuses) if zone_statuses is not None else None
+        return interest_zone_arrays(positions, types, prices, close, sma, high, low, candidate_mask)
+    zones = staged(('zones', p["zigzag_length"], p["sma_period"], zone_statuses), compute_zones)
+    pivot_series = staged(('pivot_series', p["zigzag_length"]),
+                          lambda: PivotSeries.from_arrays(positions, prices, types, statuses, confirmations))
+    zone_activation = confirmations[zones['pivot_number']]
+
+    # 2. Englobantes sur tout le DataFrame
+    engulfing_bull, engulfing_bear = staged(
+        ('engulfing', p["anti_doji"]), lambda: engulfing_mask_arrays(open_, high, low, close, p["anti_doji"]))
+
+    bar_positions = np.arange(n)
+    triggers = []
+    for direction, bullish, engulfing in (('bullish', True, engulfing_bull), ('bearish', False, engulfing_bear)):
+        zone_ids = np.flatnonzero(zones['direction'] == direction)
+        if len(zone_ids) == 0:
+            continue
+        # 3. Zone active pour chaque bougie
+        if p["zone_mode"] == "latest":
+            active = np.full(n, len(zone_ids) - 1)
+        else:
+            active = np.searchsorted(zone_activation[zone_ids], bar_positions, side='right') - 1
+        has_zone = active >= 0
+        active_zone = zone_ids[np.where(has_zone, active, 0)]
+
+        pivot_pos = zones['preceding_pivot_position'][active_zone]
+        zone_start = zones['start_price'][active_zone]
+        zone_end = zones['end_price'][active_zone]
+        rsi_at_pivot = np.where(has_zone, rsi[pivot_pos], np.nan)
+
+        # 4. Divergence RSI dans la zone + confirmation par englobante
+        regular, continuation = _divergence_masks(low, high, rsi, zone_start, zone_end, zone_end, rsi_at_pivot, bullish)
+        hits = np.flatnonzero((regular | continuation) & engulfing & has_zone)
+        for t in hits.tolist():
+            triggers.append((t, 0 if bullish else 1, bullish, bool(regular[t]), int(active_zone[t]), rsi_at_pivot[t]))
+
+    # 5. SL / TP / taille pour chaque setup (peu nombreux: boucle sur les déclenchements seulement)
+    rows = []
+    for t, _, bullish, is_regular, zone_id, rsi_pivot in sorted(triggers):
+        prefix = "BULL" if bullish else "BEAR"
+        divergence_type = f"{prefix}_REGULAR" if is_regular else f"{prefix}_CONTINUATION"
+        entry = close[t]
+        sl = _stop_loss(open_, high, low, close, t, bullish, p["sl_buffer_points"], p["sl_max_lookback"])
+
+        if is_regular:
+            tp = round(zones['start_price'][zone_id], 2)
+        else:
+            target_type = TYPE_HIGH if bullish else TYPE_LOW
+            if p["zone_mode"] == "latest":
+                target = pivot_series.last_before(t, target_type)
+            else:
+                target = pivot_series.last_confirmed_before(t, target_type)
+            tp = round(prices[target], 2) if target is not None else None
+
+        size = None
+        if sl and tp and sl != entry and p["symbol_info"]:
+            size = _position_size(p["account_balance"], p["risk_percentage"], sl, entry, p["symbol_info"])
+
+        rows.append({
+            'time': index[t] if index is not None else source_positions[t], 'position': source_positions[t],
+            'direction': 'BUY' if bullish else 'SELL', 'type': divergence_type,
+            'entry': entry, 'sl': sl if sl is not None else np.nan, 'tp': tp if tp is not None else np.nan,
+            'size': size if size is not None else np.nan,
+            'zone_start': zones['start_price'][zone_id], 'zone_end': zones['end_price'][zone_id],
+            'pivot_price': zones['end_price'][zone_id], 'rsi': rsi[t], 'rsi_at_pivot': rsi_pivot
+        })
+    return pd.DataFrame(rows, columns=SETUP_COLUMNS)
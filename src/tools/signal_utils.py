@@ -1,9 +1,9 @@
 # ----- START OF FILE src/tools/signal_utils.py (Version "Précédente" + Règle Anti-Doji) -----
 import pandas as pd
 import numpy as np
-import pandas_ta as ta # Assurez-vous que pandas-ta est installé
 import math
 import traceback # Pour le débogage des erreurs
+from src.tools.pivot_series import PivotSeries
 
 # === Fonctions d'Analyse (Versions initiales ou peu modifiées) ===
 def calculate_zigzag_pivots(df_ohlc: pd.DataFrame, length: int = 9):
@@ -246,6 +246,9 @@ def calculate_take_profit_v1(pivots: list, confirmation_candle_index: pd.Timesta
     take_profit_level = None
     if "CONTINUATION" in divergence_type:
         target_pivot = None; target_pivot_type = 'high' if direction == 'bullish' else 'low'
+        if isinstance(pivots, PivotSeries): # Recherche dichotomique au lieu du parcours reversed(pivots)
+            k = pivots.last_before_label(confirmation_candle_index, target_pivot_type)
+            pivots = [pivots[k]] if k is not None else []
         for pivot in reversed(pivots):
             pivot_index = pivot.get('index'); pivot_type = pivot.get('type'); pivot_price = pivot.get('price')
             if pivot_index is None or pivot_type is None or pivot_price is None: continue
@@ -1,7 +1,6 @@
 # ----- START OF FILE src/tools/signal_utils.py (Version Complète - Permet Englobement Dojis) -----
 import pandas as pd
 import numpy as np
-import pandas_ta as ta # Assurez-vous que pandas-ta est installé
 import math
 import traceback # Pour le débogage des erreurs
 
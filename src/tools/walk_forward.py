@@ -0,0 +1,362 @@
+"""
+Optimisation walk-forward des règles de signal et du modèle d'imitation
+Fait glisser des fenêtres entraînement/test sur l'historique des bougies:
+- règles de signal: la grille de paramètres est évaluée sur la fenêtre d'entraînement,
+  le meilleur jeu est ensuite mesuré sur la fenêtre de test suivante
+- modèle d'imitation: un modèle est entraîné sur chaque fenêtre d'entraînement et
+  évalué sur la fenêtre de test
+
+Les caractéristiques sont causales (calculées une seule fois sur tout l'historique):
+chaque fold ne fait que découper ses positions, les fenêtres qui se chevauchent ne sont
+jamais recalculées. Les setups d'un point de grille sont gardés en cache par processus.
+Les folds tournent dans un pool de processus, avec un budget de temps global.
+
+Usage:
+    python -m src.tools.walk_forward US30.cash_M1_....csv --train 20000 --test 5000 \
+        --zigzag 5,9,14 --sl-buffer 3,5 --workers 8 --time-budget 600 --output walk_forward.csv
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from src.tools.mt5_csv import load_mt5_csv
+from src.tools.param_sweep import METRIC_COLUMNS, evaluate_setups, expand_grid
+from src.tools.signal_scanner import DEFAULT_SCAN_PARAMS, normalize_ohlc, scan_setup_arrays
+
+# États d'un processus du pool (tableaux attachés à la mémoire partagée): folds de signaux
+# (OHLC, caches des étapes et des setups) et folds de modèle (matrice de caractéristiques)
+_signal_state = {}
+_model_state = {}
+
+MODEL_METRIC_COLUMNS = ["train_samples", "test_samples", "train_accuracy", "test_accuracy", "test_buy_share"]
+
+
+def make_folds(n_bars: int, train_bars: int, test_bars: int, step: int | None = None,
+               anchored: bool = False) -> list:
+    """
+    Découpe l'historique en folds entraînement/test successifs.
+
+    Args:
+        n_bars: Nombre de bougies de l'historique
+        train_bars: Taille de la fenêtre d'entraînement
+        test_bars: Taille de la fenêtre de test (qui suit immédiatement l'entraînement)
+        step: Décalage entre deux folds (None: test_bars, fenêtres de test contiguës)
+        anchored: Si True, l'entraînement démarre toujours à la première bougie (fenêtre croissante)
+
+    Returns:
+        list: Tuples (train_start, train_end, test_start, test_end), bornes de fin exclues
+    """
+    if train_bars <= 0 or test_bars <= 0:
+        raise ValueError("train_bars et test_bars doivent être positifs")
+    step = test_bars if step is None else step
+    folds = []
+    train_start = 0
+    while train_start + train_bars + test_bars <= n_bars:
+        train_end = train_start + train_bars
+        folds.append((0 if anchored else train_start, train_end, train_end, train_end + test_bars))
+        train_start += step
+    return folds
+
+
+def _in_window(setups: pd.DataFrame, start: int, end: int) -> pd.DataFrame:
+    positions = setups["position"].to_numpy()
+    return setups.iloc[np.searchsorted(positions, start):np.searchsorted(positions, end)]
+
+
+def _fold_setups(grid_point: dict, base_params: dict) -> pd.DataFrame:
+    """Setups d'un point de grille sur tout l'historique (calculés une fois par processus)."""
+    key = tuple(sorted(grid_point.items()))
+    setups_cache = _signal_state["setups"]
+    if key not in setups_cache:
+        open_, high, low, close = _signal_state["ohlc"]
+        params = {**base_params, **grid_point}
+        setups_cache[key] = scan_setup_arrays(open_, high, low, close, params, cache=_signal_state["cache"])
+    return setups_cache[key]
+
+
+def _run_signal_fold(fold_number: int, fold: tuple, param_sets: list, base_params: dict, rank_by: str) -> dict:
+    """Sélectionne le meilleur point de grille sur l'entraînement et le mesure sur le test."""
+    train_start, train_end, test_start, test_end = fold
+    _, high, low, _ = _signal_state["ohlc"]
+    max_holding_bars = _signal_state["max_holding_bars"]
+
+    # Les trades d'une fenêtre sont résolus avec les seules bougies disponibles à sa fin
+    best_point, best_metrics = None, None
+    for grid_point in param_sets:
+        setups = _in_window(_fold_setups(grid_point, base_params), train_start, train_end)
+        metrics = evaluate_setups(setups, high[:train_end], low[:train_end], max_holding_bars)
+        if best_metrics is None or metrics[rank_by] > best_metrics[rank_by]:
+            best_point, best_metrics = grid_point, metrics
+
+    setups = _in_window(_fold_setups(best_point, base_params), test_start, test_end)
+    test_metrics = evaluate_setups(setups, high[:test_end], low[:test_end], max_holding_bars)
+
+    row = {"fold": fold_number, "train_start": train_start, "train_end": train_end,
+           "test_start": test_start, "test_end": test_end, **best_point}
+    row.update({f"train_{k}": v for k, v in best_metrics.items()})
+    row.update({f"test_{k}": v for k, v in test_metrics.items()})
+    return row
+
+
+def _attach_shared(shm_name: str, shape: tuple) -> tuple:
+    """Tableau en lecture seule sur la mémoire partagée (sans copie)."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    array = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    array.flags.writeable = False
+    return shm, array
+
+
+def _attach_signal_worker(shm_name: str, shape: tuple, max_holding_bars):
+    """Initialiseur du pool: attache les tableaux OHLC partagés (sans copie)."""
+    shm, ohlc = _attach_shared(shm_name, shape)
+    _signal_state.clear()
+    _signal_state.update({"shm": shm, "ohlc": ohlc, "cache": {}, "setups": {}, "max_holding_bars": max_holding_bars})
+
+
+def _attach_model_worker(shm_name: str, shape: tuple, labels: np.ndarray, model_factory):
+    """Initialiseur du pool: attache la matrice de caractéristiques partagée (sans copie)."""
+    shm, features = _attach_shared(shm_name, shape)
+    _model_state.clear()
+    _model_state.update({"shm": shm, "features": features, "labels": labels, "model_factory": model_factory})
+
+
+def _default_model_factory(model_type: str):
+    from src.learning.imitation_learning_manager import ImitationLearningManager
+    return ImitationLearningManager.build_model(model_type)[0]
+
+
+def _run_model_fold(fold_number: int, fold: tuple, model_type: str) -> dict:
+    """Entraîne un modèle sur la fenêtre d'entraînement et l'évalue sur la fenêtre de test."""
+    train_start, train_end, test_start, test_end = fold
+    features, labels = _model_state["features"], _model_state["labels"]
+    factory = _model_state["model_factory"] or _default_model_factory
+
+    model = factory(model_type)
+    model.fit(features[train_start:train_end], labels[train_start:train_end])
+    train_pred = model.predict(features[train_start:train_end])
+    test_pred = model.predict(features[test_start:test_end])
+
+    return {"fold": fold_number, "train_start": train_start, "train_end": train_end,
+            "test_start": test_start, "test_end": test_end,
+            "train_samples": train_end - train_start, "test_samples": test_end - test_start,
+            "train_accuracy": float(np.mean(train_pred == labels[train_start:train_end])),
+            "test_accuracy": float(np.mean(test_pred == labels[test_start:test_end])),
+            "test_buy_share": float(np.mean(test_pred == "BUY"))}
+
+
+def _run_folds(tasks: list, workers: int, time_budget: float | None, initializer, initargs, state: dict) -> tuple:
+    """
+    Exécute les folds (dans le processus courant ou dans un pool) en respectant le budget de temps.
+    Les folds non démarrés à l'échéance sont annulés. Dans le processus courant, la mémoire
+    partagée attachée par initializer dans state est détachée à la fin.
+
+    Returns:
+        tuple: (lignes des folds terminés, nombre de folds annulés)
+    """
+    deadline = None if time_budget is None else time.time() + time_budget
+    rows = []
+    if workers <= 1:
+        initializer(*initargs)
+        try:
+            for function, args in tasks:
+                if deadline is not None and time.time() >= deadline:
+                    break
+                rows.append(function(*args))
+        finally:
+            state["shm"].close()
+            state.clear()
+        return rows, len(tasks) - len(rows)
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs)
+    try:
+        pending = {pool.submit(function, *args) for function, args in tasks}
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - time.time())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            rows.extend(future.result() for future in done)
+            if deadline is not None and time.time() >= deadline:
+                break
+        # Les folds en cours se terminent, ceux en attente sont annulés
+        cancelled = sum(future.cancel() for future in pending)
+        rows.extend(future.result() for future in pending if not future.cancelled())
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    return rows, cancelled
+
+
+def _fold_table(rows: list, index: pd.Index | None) -> pd.DataFrame:
+    table = pd.DataFrame(rows)
+    if table.empty:
+        return table
+    table = table.sort_values("fold").reset_index(drop=True)
+    if index is not None:
+        table.insert(5, "test_from", index[table["test_start"].to_numpy()])
+        table.insert(6, "test_to", index[table["test_end"].to_numpy() - 1])
+    return table
+
+
+def summarize_folds(folds: pd.DataFrame, metrics: list | None = None) -> pd.DataFrame:
+    """
+    Agrège les métriques par fold (moyenne, écart-type, min, max, médiane).
+
+    Args:
+        folds: Résultat de run_signal_walk_forward ou run_model_walk_forward
+        metrics: Colonnes à agréger (None: toutes les colonnes train_* et test_* numériques)
+
+    Returns:
+        pd.DataFrame: Une ligne par métrique
+    """
+    if metrics is None:
+        metrics = [c for c in folds.columns
+                   if c.startswith(("train_", "test_")) and c not in ("train_start", "train_end", "test_start", "test_end")
+                   and pd.api.types.is_numeric_dtype(folds[c])]
+    values = folds[metrics].replace([np.inf, -np.inf], np.nan)
+    return pd.DataFrame({"mean": values.mean(), "std": values.std(), "min": values.min(),
+                         "median": values.median(), "max": values.max(), "folds": values.count()})
+
+
+def run_signal_walk_forward(df: pd.DataFrame, grid: dict, train_bars: int, test_bars: int,
+                            step: int | None = None, anchored: bool = False, base_params: dict | None = None,
+                            workers: int | None = None, rank_by: str = "total_r",
+                            max_holding_bars: int | None = None, time_budget: float | None = None,
+                            output_path: str | None = None) -> pd.DataFrame:
+    """
+    Walk-forward des paramètres du scanner de setups.
+
+    Args:
+        df: Bougies OHLC (format Akoben ou MT5)
+        grid: Valeurs à tester, ex: {"zigzag_length": [5, 9], "sl_buffer_points": [3.0, 5.0]}
+        train_bars, test_bars, step, anchored: Découpage des folds (voir make_folds)
+        base_params: Paramètres fixes de scan_setups (fusionnés avec DEFAULT_SCAN_PARAMS)
+        workers: Nombre de processus (None: tous les cœurs, 0 ou 1: dans le processus courant)
+        rank_by: Métrique de sélection sur la fenêtre d'entraînement (METRIC_COLUMNS)
+        max_holding_bars: Durée maximale d'un trade en bougies
+        time_budget: Durée maximale de l'étude en secondes (None: pas de limite)
+        output_path: Fichier CSV où écrire les résultats par fold (facultatif)
+
+    Returns:
+        pd.DataFrame: Une ligne par fold (paramètres retenus, métriques train_* et test_*)
+    """
+    df = normalize_ohlc(df)
+    base = {**DEFAULT_SCAN_PARAMS, **(base_params or {}), "zone_mode": "causal"}
+    param_sets = expand_grid(grid)
+    folds = make_folds(len(df), train_bars, test_bars, step, anchored)
+    workers = os.cpu_count() if workers is None else min(workers, len(folds))
+
+    ohlc = np.ascontiguousarray(df[['Open', 'High', 'Low', 'Close']].to_numpy(dtype=np.float64).T)
+    start = time.time()
+    shm = shared_memory.SharedMemory(create=True, size=ohlc.nbytes)
+    try:
+        shared = np.ndarray(ohlc.shape, dtype=np.float64, buffer=shm.buf)
+        shared[:] = ohlc
+        tasks = [(_run_signal_fold, (i, fold, param_sets, base, rank_by)) for i, fold in enumerate(folds)]
+        rows, cancelled = _run_folds(tasks, workers, time_budget, _attach_signal_worker,
+                                     (shm.name, ohlc.shape, max_holding_bars), _signal_state)
+        del shared
+    finally:
+        shm.close()
+        shm.unlink()
+
+    results = _fold_table(rows, df.index)
+    print(f"Walk-forward terminé: {len(results)}/{len(folds)} folds x {len(param_sets)} jeux de paramètres "
+          f"en {time.time() - start:.1f}s" + (f" ({cancelled} folds annulés, budget atteint)" if cancelled else ""))
+
+    if output_path:
+        results.to_csv(output_path, index=False)
+        print(f"Résultats enregistrés: {output_path}")
+    return results
+
+
+def run_model_walk_forward(features: np.ndarray, labels, train_bars: int, test_bars: int,
+                           step: int | None = None, anchored: bool = False, model_type: str = "baseline",
+                           model_factory=None, workers: int | None = None, time_budget: float | None = None,
+                           index: pd.Index | None = None, output_path: str | None = None) -> pd.DataFrame:
+    """
+    Walk-forward du modèle d'imitation sur une matrice de caractéristiques précalculée.
+
+    Args:
+        features: Matrice (n_bougies, n_caractéristiques), une ligne par bougie
+        labels: Action attendue pour chaque bougie ('BUY', 'SELL', ...)
+        train_bars, test_bars, step, anchored: Découpage des folds (voir make_folds)
+        model_type: Type de modèle (voir ImitationLearningManager.build_model)
+        model_factory: Fonction model_type -> modèle non entraîné (picklable; None: build_model)
+        workers: Nombre de processus (None: tous les cœurs, 0 ou 1: dans le processus courant)
+        time_budget: Durée maximale de l'étude en secondes (None: pas de limite)
+        index: Horodatage des bougies (facultatif, pour les colonnes test_from / test_to)
+        output_path: Fichier CSV où écrire les résultats par fold (facultatif)
+
+    Returns:
+        pd.DataFrame: Une ligne par fold (MODEL_METRIC_COLUMNS)
+    """
+    features = np.ascontiguousarray(features, dtype=np.float64)
+    labels = np.asarray(labels, dtype=object)
+    folds = make_folds(len(features), train_bars, test_bars, step, anchored)
+    workers = os.cpu_count() if workers is None else min(workers, len(folds))
+
+    start = time.time()
+    shm = shared_memory.SharedMemory(create=True, size=max(features.nbytes, 1))
+    try:
+        shared = np.ndarray(features.shape, dtype=np.float64, buffer=shm.buf)
+        shared[:] = features
+        tasks = [(_run_model_fold, (i, fold, model_type)) for i, fold in enumerate(folds)]
+        rows, cancelled = _run_folds(tasks, workers, time_budget, _attach_model_worker,
+                                     (shm.name, features.shape, labels, model_factory), _model_state)
+        del shared
+    finally:
+        shm.close()
+        shm.unlink()
+
+    results = _fold_table(rows, index)
+    print(f"Walk-forward du modèle terminé: {len(results)}/{len(folds)} folds en {time.time() - start:.1f}s"
+          + (f" ({cancelled} folds annulés, budget atteint)" if cancelled else ""))
+
+    if output_path:
+        results.to_csv(output_path, index=False)
+        print(f"Résultats enregistrés: {output_path}")
+    return results
+
+
+def _parse_values(text: str, cast):
+    return [cast(v) for v in text.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward des paramètres ZigZag/SMA/RSI")
+    parser.add_argument("csv", help="Export MT5 (séparateur tabulation: <DATE> <TIME> <OPEN> ...)")
+    parser.add_argument("--train", type=int, required=True, help="Taille de la fenêtre d'entraînement (bougies)")
+    parser.add_argument("--test", type=int, required=True, help="Taille de la fenêtre de test (bougies)")
+    parser.add_argument("--step", type=int, default=None, help="Décalage entre deux folds (défaut: --test)")
+    parser.add_argument("--anchored", action="store_true", help="Fenêtre d'entraînement croissante")
+    parser.add_argument("--zigzag", default="9", help="Valeurs de ZIGZAG_LENGTH (ex: 5,9,14)")
+    parser.add_argument("--sma", default="20", help="Valeurs de SMA_PERIOD")
+    parser.add_argument("--rsi", default="14", help="Valeurs de RSI_PERIOD")
+    parser.add_argument("--sl-buffer", default="5.0", help="Valeurs de SL_BUFFER_POINTS")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus")
+    parser.add_argument("--rank-by", default="total_r", choices=METRIC_COLUMNS)
+    parser.add_argument("--max-holding", type=int, default=None, help="Durée maximale d'un trade (bougies)")
+    parser.add_argument("--time-budget", type=float, default=None, help="Durée maximale de l'étude (secondes)")
+    parser.add_argument("--output", default="walk_forward.csv", help="Fichier CSV des résultats par fold")
+    args = parser.parse_args()
+
+    grid = {
+        "zigzag_length": _parse_values(args.zigzag, int),
+        "sma_period": _parse_values(args.sma, int),
+        "rsi_period": _parse_values(args.rsi, int),
+        "sl_buffer_points": _parse_values(args.sl_buffer, float),
+    }
+    results = run_signal_walk_forward(load_mt5_csv(args.csv), grid, args.train, args.test, step=args.step,
+                                      anchored=args.anchored, workers=args.workers, rank_by=args.rank_by,
+                                      max_holding_bars=args.max_holding, time_budget=args.time_budget,
+                                      output_path=args.output)
+    print(results.to_string(index=False))
+    print(summarize_folds(results, [f"test_{m}" for m in METRIC_COLUMNS]).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Moteur ZigZag vectorisé (NumPy)
+Calcule l'état de tendance, les positions de retournement et les extrêmes des pivots
+sur des tableaux positionnels, sans parcourir le DataFrame avec iloc/get_loc.
+Les pivots retournés sont identiques à ceux de signal_utils.calculate_zigzag_pivots.
+"""
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _rolling_extreme_shifted(values: np.ndarray, length: int, reducer) -> np.ndarray:
+    """
+    Équivalent positionnel de `serie.rolling(length).max().shift(1)` (ou min).
+
+    Args:
+        values: Tableau des prix
+        length: Taille de la fenêtre
+        reducer: np.max ou np.min
+
+    Returns:
+        np.ndarray: Extrême des `length` barres précédentes, NaN pour les premières barres
+    """
+    out = np.full(len(values), np.nan)
+    if len(values) > length:
+        # La fenêtre k couvre values[k:k+length] et s'applique à la barre k+length
+        out[length:] = reducer(sliding_window_view(values, length)[:-1], axis=1)
+    return out
+
+
+def zigzag_trend(high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int = 9) -> np.ndarray:
+    """
+    Calcule le vecteur d'état de tendance du ZigZag (1 ou -1) sans boucle Python.
+
+    La machine à états d'origine se réduit à trois événements par barre:
+    cassure du plus bas seule (tendance forcée à -1), cassure du plus haut seule
+    (tendance forcée à 1), ou les deux (bougie englobante: bascule de l'état).
+    L'état à chaque barre est donc la dernière valeur forcée, inversée selon la
+    parité du nombre de bascules survenues depuis.
+
+    Args:
+        high, low, close: Tableaux de prix triés chronologiquement
+        length: Période de recherche du ZigZag
+
+    Returns:
+        np.ndarray: Tendance par barre (entiers), zéros si pas assez de données
+    """
+    n = len(close)
+    trend = np.zeros(n, dtype=int)
+    if length < 1 or n <= length:
+        return trend
+
+    rolling_max = _rolling_extreme_shifted(high, length, np.max)
+    rolling_min = _rolling_extreme_shifted(low, length, np.min)
+    with np.errstate(invalid='ignore'):
+        up_turn = low <= rolling_min
+        down_turn = high >= rolling_max
+
+    initial_trend = 1 if close[length - 1] > close[0] else -1
+
+    forced_down = up_turn & ~down_turn
+    forced_up = down_turn & ~up_turn
+    toggles = np.cumsum(up_turn & down_turn)
+
+    positions = np.arange(n)
+    last_forced = np.maximum.accumulate(np.where(forced_down | forced_up, positions, -1))
+    has_forced = last_forced >= 0
+    safe_forced = np.where(has_forced, last_forced, 0)
+
+    base = np.where(has_forced, np.where(forced_up[safe_forced], 1, -1), initial_trend)
+    toggles_since = toggles - np.where(has_forced, toggles[safe_forced], 0)
+    trend[:] = np.where(toggles_since % 2 == 1, -base, base)
+    return trend
+
+
+def zigzag_pivot_arrays(high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int = 9,
+                        with_confirmation: bool = False):
+    """
+    Calcule les pivots ZigZag confirmés sous forme de tableaux positionnels.
+
+    Args:
+        high, low, close: Tableaux de prix triés chronologiquement
+        length: Période de recherche du ZigZag
+        with_confirmation: Ajoute la position de la barre qui a confirmé chaque pivot
+
+    Returns:
+        tuple: (positions, prix, types, statuts) - positions en int64, prix en float64,
+        types ('high'/'low') et statuts ('H', 'HH', 'LH', 'EH', 'L', 'LL', 'HL', 'EL')
+        en tableaux de chaînes, triés par position. Avec with_confirmation, un cinquième
+        tableau donne la position de confirmation (retournement de tendance) de chaque pivot.
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+
+    trend = zigzag_trend(high, low, close, length)
+    change = np.diff(trend)
+    flip_positions = np.flatnonzero(change) + 1
+    flip_directions = change[flip_positions - 1]
+
+    # Sans NaN, argmax/argmin (première occurrence, comme idxmax) suffisent
+    has_nan = bool(np.isnan(high).any() or np.isnan(low).any())
+    high_argmax = np.nanargmax if has_nan else np.argmax
+    low_argmin = np.nanargmin if has_nan else np.argmin
+
+    positions, prices, types, statuses, confirmations = [], [], [], [], []
+    last_low_pos = 0
+    last_high_pos = 0
+    prev_high_price = None
+    prev_low_price = None
+
+    for i, direction in zip(flip_positions.tolist(), flip_directions.tolist()):
+        if direction == -2:  # Pivot haut
+            window = high[last_low_pos:i]
+            if window.size == 0 or (has_nan and np.isnan(window).all()):
+                continue
+            pos = last_low_pos + int(high_argmax(window))
+            if positions and positions[-1] == pos:
+                continue
+            if pos <= last_low_pos:
+                continue
+            price = high[pos]
+            status = 'H'
+            if prev_high_price is not None:
+                if price > prev_high_price: status = 'HH'
+                elif price < prev_high_price: status = 'LH'
+                else: status = 'EH'
+            positions.append(pos); prices.append(price); types.append('high'); statuses.append(status); confirmations.append(i)
+            prev_high_price = price
+            last_high_pos = pos
+        elif direction == 2:  # Pivot bas
+            window = low[last_high_pos:i]
+            if window.size == 0 or (has_nan and np.isnan(window).all()):
+                continue
+            pos = last_high_pos + int(low_argmin(window))
+            if positions and positions[-1] == pos:
+                continue
+            if pos <= last_high_pos:
+                continue
+            price = low[pos]
+            status = 'L'
+            if prev_low_price is not None:
+                if price < prev_low_price: status = 'LL'
+                elif price > prev_low_price: status = 'HL'
+                else: status = 'EL'
+            positions.append(pos); prices.append(price); types.append('low'); statuses.append(status); confirmations.append(i)
+            prev_low_price = price
+            last_low_pos = pos
+
+    order = np.argsort(np.asarray(positions, dtype=np.int64), kind='stable')
+    result = (np.asarray(positions, dtype=np.int64)[order],
+              np.asarray(prices, dtype=float)[order],
+              np.asarray(types, dtype='<U4')[order],
+              np.asarray(statuses, dtype='<U2')[order])
+    if with_confirmation:
+        result += (np.asarray(confirmations, dtype=np.int64)[order],)
+    return result
+
+
+def calculate_zigzag_pivots_fast(df_ohlc: pd.DataFrame, length: int = 9) -> list:
+    """
+    Version vectorisée de calculate_zigzag_pivots (même signature, mêmes pivots).
+
+    Args:
+        df_ohlc: DataFrame pandas avec au moins les colonnes 'High', 'Low', 'Close'
+        length: La période de recherche pour le ZigZag
+
+    Returns:
+        list: Pivots {'index', 'price', 'type', 'status'} triés chronologiquement
+    """
+    if len(df_ohlc) < length:
+        return []
+    df = df_ohlc if df_ohlc.index.is_monotonic_increasing else df_ohlc.sort_index(ascending=True)
+    positions, prices, types, statuses = zigzag_pivot_arrays(
+        df['High'].to_numpy(dtype=float),
+        df['Low'].to_numpy(dtype=float),
+        df['Close'].to_numpy(dtype=float),
+        length
+    )
+    return [
+        {'index': idx, 'price': price, 'type': pivot_type, 'status': status}
+        for idx, price, pivot_type, status in zip(df.index[positions], list(prices), types.tolist(), statuses.tolist())
+    ]
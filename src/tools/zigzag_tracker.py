@@ -0,0 +1,191 @@
+"""
+Suivi ZigZag incrémental (barre par barre)
+Maintient l'état du ZigZag pour le trading en direct: chaque bougie clôturée est
+traitée en O(1) amorti au lieu de recalculer calculate_zigzag_pivots sur toute la fenêtre.
+Le rejeu d'un historique produit exactement les mêmes pivots que la version batch.
+"""
+
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+
+class ZigZagTracker:
+    """
+    Machine à états ZigZag alimentée bougie par bougie.
+
+    Deux paires de deques monotones sont maintenues:
+    - fenêtre glissante des `length` dernières barres (plus haut / plus bas) pour
+      détecter les retournements de tendance;
+    - extrêmes en attente depuis le dernier pivot opposé (premier plus haut / premier
+      plus bas), qui donnent directement le prix et la position du pivot à confirmer.
+    """
+
+    def __init__(self, length: int = 9):
+        """
+        Initialise le suivi ZigZag
+
+        Args:
+            length: Période de recherche du ZigZag (équivalent zigzag_len)
+        """
+        if length < 1:
+            raise ValueError("length doit être >= 1")
+        self.length = length
+        self.trend = 0
+        self.pivots: List[Dict[str, Any]] = []
+        self.bars_processed = 0
+
+        self._first_close = None
+        self._prev_close = None
+        # (position, prix) des barres de la fenêtre glissante
+        self._window_max = deque()
+        self._window_min = deque()
+        # (position, prix, index) des extrêmes candidats depuis le dernier pivot opposé
+        self._pending_high = deque()
+        self._pending_low = deque()
+
+        self._last_low_pos = 0
+        self._last_high_pos = 0
+        self._last_pivot_pos = None
+        self._prev_high_price = None
+        self._prev_low_price = None
+
+    @staticmethod
+    def _bar_value(bar, key: str) -> float:
+        """Lit une valeur OHLC en acceptant 'High' (DataFrame Akoben) ou 'high' (MT5)."""
+        try:
+            return float(bar[key])
+        except (KeyError, IndexError):
+            return float(bar[key.lower()])
+
+    def update(self, bar, index=None) -> List[Dict[str, Any]]:
+        """
+        Traite une bougie clôturée
+
+        Args:
+            bar: Bougie (dict, ligne pandas...) avec High/Low/Close (ou high/low/close)
+            index: Identifiant de la bougie (timestamp). Par défaut: `bar.name`, `bar['time']`
+                   ou la position de la bougie dans le flux
+
+        Returns:
+            list: Pivots nouvellement confirmés par cette bougie (0 ou 1 élément)
+        """
+        high = self._bar_value(bar, 'High')
+        low = self._bar_value(bar, 'Low')
+        close = self._bar_value(bar, 'Close')
+        position = self.bars_processed
+        if index is None:
+            index = getattr(bar, 'name', None)
+        if index is None and isinstance(bar, dict):
+            index = bar.get('time')
+        if index is None:
+            index = position
+
+        new_pivots = []
+        if position == 0:
+            self._first_close = close
+
+        if position >= self.length:
+            if position == self.length:
+                self.trend = 1 if self._prev_close > self._first_close else -1
+
+            window_start = position - self.length
+            while self._window_max[0][0] < window_start:
+                self._window_max.popleft()
+            while self._window_min[0][0] < window_start:
+                self._window_min.popleft()
+
+            previous_trend = self.trend
+            if previous_trend == 1 and low <= self._window_min[0][1]:
+                self.trend = -1
+            elif previous_trend == -1 and high >= self._window_max[0][1]:
+                self.trend = 1
+
+            if self.trend != previous_trend:
+                pivot = self._confirm_pivot(self.trend - previous_trend)
+                if pivot is not None:
+                    self.pivots.append(pivot)
+                    new_pivots.append(pivot)
+
+        self._push(position, high, low, index)
+        self._prev_close = close
+        self.bars_processed += 1
+        return new_pivots
+
+    def update_many(self, df_ohlc) -> List[Dict[str, Any]]:
+        """
+        Rejoue un DataFrame OHLC trié chronologiquement
+
+        Args:
+            df_ohlc: DataFrame pandas avec 'High', 'Low', 'Close'
+
+        Returns:
+            list: Pivots confirmés pendant le rejeu
+        """
+        new_pivots = []
+        columns = zip(df_ohlc.index, df_ohlc['High'].to_numpy(), df_ohlc['Low'].to_numpy(), df_ohlc['Close'].to_numpy())
+        for index, high, low, close in columns:
+            new_pivots.extend(self.update({'High': high, 'Low': low, 'Close': close}, index=index))
+        return new_pivots
+
+    def _push(self, position: int, high: float, low: float, index):
+        """Ajoute la barre courante aux deques (après la détection du retournement)."""
+        while self._window_max and self._window_max[-1][1] <= high:
+            self._window_max.pop()
+        self._window_max.append((position, high))
+        while self._window_min and self._window_min[-1][1] >= low:
+            self._window_min.pop()
+        self._window_min.append((position, low))
+
+        # Inégalité stricte: on garde la première occurrence d'un extrême (comme idxmax)
+        while self._pending_high and self._pending_high[-1][1] < high:
+            self._pending_high.pop()
+        self._pending_high.append((position, high, index))
+        while self._pending_low and self._pending_low[-1][1] > low:
+            self._pending_low.pop()
+        self._pending_low.append((position, low, index))
+
+    def _confirm_pivot(self, change: int) -> Optional[Dict[str, Any]]:
+        """
+        Confirme le pivot correspondant à un retournement de tendance
+
+        Args:
+            change: -2 pour un pivot haut (tendance 1 -> -1), 2 pour un pivot bas
+
+        Returns:
+            dict: Pivot confirmé ou None s'il est ignoré (mêmes règles que la version batch)
+        """
+        if change == -2:
+            pending, start = self._pending_high, self._last_low_pos
+        else:
+            pending, start = self._pending_low, self._last_high_pos
+
+        # Les débuts de fenêtre ne reculent jamais: les éléments antérieurs sont obsolètes
+        while pending and pending[0][0] < start:
+            pending.popleft()
+        if not pending:
+            return None
+        position, price, index = pending[0]
+        if self._last_pivot_pos == position or position <= start:
+            return None
+
+        if change == -2:
+            status = 'H'
+            if self._prev_high_price is not None:
+                if price > self._prev_high_price: status = 'HH'
+                elif price < self._prev_high_price: status = 'LH'
+                else: status = 'EH'
+            self._prev_high_price = price
+            self._last_high_pos = position
+            pivot_type = 'high'
+        else:
+            status = 'L'
+            if self._prev_low_price is not None:
+                if price < self._prev_low_price: status = 'LL'
+                elif price > self._prev_low_price: status = 'HL'
+                else: status = 'EL'
+            self._prev_low_price = price
+            self._last_low_pos = position
+            pivot_type = 'low'
+
+        self._last_pivot_pos = position
+        return {'index': index, 'price': price, 'type': pivot_type, 'status': status}
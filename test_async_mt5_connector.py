@@ -0,0 +1,137 @@
+"""
+Tests du connecteur MT5 asynchrone avec l'EA de substitution de test_mt5_bridge:
+commandes concurrentes regroupées en lots, réponses rendues à chaque appel d'après leur ID.
+
+Exécution: python test_async_mt5_connector.py  (ou pytest test_async_mt5_connector.py)
+Compare la durée de requêtes concurrentes à leur envoi en série par MT5FileConnector.
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from src.agents.execution.async_mt5_connector import AsyncMT5Connector
+from test_mt5_bridge import _StandInEA, _connector, _quiet
+
+
+async def _open(files_dir, **config):
+    with open(os.path.join(files_dir, "responses.txt"), "w") as f:
+        f.write("READY")
+    with contextlib.redirect_stdout(io.StringIO()):
+        mt5 = AsyncMT5Connector({"files_dir": files_dir, "timeout": 2, **config})
+        assert await mt5.connect()
+    return mt5
+
+
+def test_concurrent_commands_share_round_trips():
+    async def scenario(tmp):
+        mt5 = await _open(tmp)
+        with contextlib.redirect_stdout(io.StringIO()):
+            responses = await mt5.send_batch(["PRICE US30.cash", "DATA US30.cash M1 5", "ACCOUNT_INFO", "FOO"])
+            assert mt5.stats["round_trips"] == 1
+            price, candles, positions, account = await asyncio.gather(
+                mt5.get_current_price("US30"), mt5.get_data("US30", "M5", 10),
+                mt5.get_positions("US30"), mt5.get_account_info())
+            await mt5.disconnect()
+        return mt5, responses, price, candles, positions, account
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ea = _StandInEA(tmp, interval=0.02)
+        ea.start()
+        try:
+            mt5, responses, price, candles, positions, account = asyncio.run(scenario(tmp))
+        finally:
+            ea.stop()
+    assert responses[0].startswith("PRICE") and responses[1].startswith("DATA US30.cash M1")
+    assert responses[2].startswith("ACCOUNT_INFO") and responses[3] == "ERROR: UNKNOWN COMMAND"
+    assert price["bid"] == 42000.5 and price["symbol"] == "US30.cash"
+    assert len(candles) == 10 and (candles.index[1] - candles.index[0]).total_seconds() == 300
+    assert positions == [] and account["BALANCE"] == 10000.0
+    # Les commandes arrivées pendant un aller-retour partent ensemble au suivant
+    assert mt5.stats["commands"] == 8 and mt5.stats["round_trips"] < 5
+
+
+def test_error_and_timeout_reach_their_caller():
+    async def scenario(tmp, timeout=None):
+        mt5 = await _open(tmp)
+        with contextlib.redirect_stdout(io.StringIO()):
+            if timeout:
+                results = await asyncio.gather(mt5.send_command("PRICE US30.cash", timeout=timeout))
+            else:
+                results = await asyncio.gather(mt5.place_order("US30", "BUY", 0.1), mt5.get_current_price("US30"))
+            await mt5.disconnect()
+        return results
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ea = _StandInEA(tmp)
+        ea.start()
+        try:
+            # L'EA de substitution ne connaît pas ORDER: l'erreur ne revient qu'à place_order
+            order, price = asyncio.run(scenario(tmp))
+        finally:
+            ea.stop()
+        assert order is None and price["ask"] == 42001.5
+        # Sans EA: timeout rendu à l'appelant
+        assert asyncio.run(scenario(tmp, timeout=0.05)) == ["ERROR: TIMEOUT"]
+
+
+def test_orders_sent_alone():
+    async def scenario(tmp):
+        mt5 = await _open(tmp)
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = await asyncio.gather(
+                mt5.get_current_price("US30"), mt5.get_positions("US30"), mt5.place_order("US30", "BUY", 0.1),
+                mt5.get_current_price("US30"), mt5.close_all_positions(), mt5.get_account_info())
+            await mt5.disconnect()
+        return results
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ea = _StandInEA(tmp, interval=0.02)
+        ea.start()
+        try:
+            price, positions, order, second_price, closed, account = asyncio.run(scenario(tmp))
+        finally:
+            ea.stop()
+    assert price["bid"] == second_price["bid"] == 42000.5 and positions == [] and account["BALANCE"] == 10000.0
+    # L'EA de substitution ne connaît pas ORDER ni CLOSE_ALL_POSITIONS: erreurs rendues à leurs appelants
+    assert order is None and closed is False
+    # Chaque ordre dans son propre aller-retour, aucun dans un lot
+    alone = [request.split("|", 1)[1].split(" ", 1)[0] for request in ea.requests if "\n" not in request]
+    assert "ORDER" in alone and "CLOSE_ALL_POSITIONS" in alone
+    batched = [request for request in ea.requests if "\n" in request]
+    assert all("|ORDER " not in request and "|CLOSE_" not in request for request in batched)
+
+
+async def _concurrent_prices(tmp, count):
+    mt5 = await _open(tmp)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        await asyncio.gather(*(mt5.get_current_price("US30") for _ in range(count)))
+        elapsed = time.perf_counter() - start
+        await mt5.disconnect()
+    return elapsed, mt5.stats["round_trips"]
+
+
+if __name__ == "__main__":
+    test_concurrent_commands_share_round_trips()
+    test_error_and_timeout_reach_their_caller()
+    test_orders_sent_alone()
+    print("Connecteur MT5 asynchrone: commandes concurrentes et démultiplexage OK")
+
+    count = 20
+    with tempfile.TemporaryDirectory() as tmp:
+        ea = _StandInEA(tmp, interval=0.02)
+        ea.start()
+        connector = _connector(tmp)
+        start = time.perf_counter()
+        for _ in range(count):
+            _quiet(connector.get_current_price, "US30")
+        sequential = time.perf_counter() - start
+        _quiet(connector.disconnect)
+        concurrent, round_trips = asyncio.run(_concurrent_prices(tmp, count))
+        ea.stop()
+    print(f"{count} prix (EA avec un timer de 20 ms): en série {sequential * 1000:.0f} ms, "
+          f"concurrents {concurrent * 1000:.0f} ms ({round_trips} allers-retours)")
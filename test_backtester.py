@@ -0,0 +1,136 @@
+# ----- START OF FILE test_backtester.py -----
+"""
+Tests du backtest par rejeu de bougies: ordre intrabar des SL/TP, spread MT5,
+gaps d'ouverture, courbe d'équité, et comparaison avec une boucle bougie par bougie.
+
+Exécution: python test_backtester.py  (ou pytest test_backtester.py)
+"""
+
+import time
+import numpy as np
+import pandas as pd
+
+from src.tools.backtester import BarReplayBacktester, backtest_setups
+from src.tools.mt5_csv import load_mt5_csv
+from test_zigzag_engine import _synthetic_bars
+
+CSV_PATH = "US30.cash_M1_202503281400_202503281800.csv"
+
+
+def _bars(rows: list, spread: float = 0.0) -> pd.DataFrame:
+    df = pd.DataFrame(rows, columns=['Open', 'High', 'Low', 'Close'],
+                      index=pd.date_range("2025-03-28 10:00", periods=len(rows), freq="min"))
+    df['Spread'] = spread
+    return df
+
+
+def _signal(direction: str, sl: float, tp: float, position: int = 0, size: float = 1.0) -> pd.DataFrame:
+    return pd.DataFrame([{'position': position, 'direction': direction, 'sl': sl, 'tp': tp, 'size': size}])
+
+
+def test_intrabar_order_when_sl_and_tp_in_same_bar():
+    # Bougie 1: touche SL (95) et TP (110); ouverture plus proche du plus bas -> chemin O-L-H-C
+    bars = _bars([[100, 101, 99, 100], [98, 112, 94, 105]])
+    signal = _signal('BUY', 95.0, 110.0)
+    reasons = {order: BarReplayBacktester(bars, {'intrabar_order': order}).run(signal).ledger.iloc[0]['close_reason']
+               for order in ('worst', 'best', 'ohlc')}
+    assert reasons == {'worst': 'STOP_LOSS', 'best': 'TAKE_PROFIT', 'ohlc': 'STOP_LOSS'}
+
+    # Vente: ouverture plus proche du plus bas -> le bas (TP) est atteint d'abord en O-L-H-C
+    ledger = BarReplayBacktester(bars, {'intrabar_order': 'ohlc'}).run(_signal('SELL', 111.0, 96.0)).ledger
+    assert ledger.iloc[0]['close_reason'] == 'TAKE_PROFIT' and ledger.iloc[0]['exit_price'] == 96.0
+
+
+def test_spread_applied_to_buy_entry_and_sell_exit():
+    # Spread 200 points x 0.01 = 2.0: achat à l'Ask, sortie de vente à l'Ask
+    bars = _bars([[100, 101, 99, 100], [100, 101, 97.5, 99], [99, 100, 90, 91]], spread=200)
+    buy = BarReplayBacktester(bars, {'point': 0.01, 'contract_value': 1.0}).run(_signal('BUY', 95.0, 110.0)).ledger.iloc[0]
+    assert buy['entry_price'] == 102.0 and buy['close_reason'] == 'STOP_LOSS' and buy['profit'] == -7.0
+
+    # Vente: SL à 99.4 touché par l'Ask haute (97.5 + 2.0 < 99.4 < 101 + 2.0) dès la bougie 1
+    sell = BarReplayBacktester(bars, {'point': 0.01, 'contract_value': 1.0}).run(_signal('SELL', 102.5, 80.0)).ledger.iloc[0]
+    assert sell['entry_price'] == 100.0 and sell['exit_position'] == 1 and sell['profit'] == -2.5
+
+    no_spread = BarReplayBacktester(bars, {'use_spread': False, 'contract_value': 1.0}).run(_signal('SELL', 102.5, 80.0))
+    assert no_spread.ledger.iloc[0]['close_reason'] == 'END_OF_DATA'
+
+    # Bougies dans le désordre: le spread suit sa bougie une fois triées
+    bars['Spread'] = [200, 0, 50]
+    shuffled = BarReplayBacktester(bars.iloc[[2, 0, 1]], {'point': 0.01})
+    assert list(shuffled.spread) == [2.0, 0.0, 0.5] and list(shuffled.close) == [100, 99, 91]
+
+
+def test_gap_through_stop_fills_at_open_and_equity_curve():
+    bars = _bars([[100, 101, 99, 100], [100, 103, 99, 102], [90, 91, 88, 89], [89, 90, 88, 89]])
+    result = BarReplayBacktester(bars, {'contract_value': 1.0}).run(_signal('BUY', 95.0, 110.0))
+    trade = result.ledger.iloc[0]
+    assert trade['exit_position'] == 2 and trade['exit_price'] == 90.0 and trade['profit'] == -10.0
+    assert result.equity['equity'].tolist() == [10000.0, 10002.0, 9990.0, 9990.0]
+    assert result.summary['max_drawdown'] == 12.0
+
+
+def _reference_exits(bars: pd.DataFrame, signals: pd.DataFrame) -> list:
+    """Boucle bougie par bougie (pire cas, pas de spread) pour valider la recherche par blocs."""
+    exits = []
+    next_free = 0
+    for s in signals.itertuples():
+        if s.position < next_free or np.isnan(s.sl) or np.isnan(s.tp):
+            continue
+        entry = bars['Close'].iloc[s.position]
+        if not (min(s.sl, s.tp) < entry < max(s.sl, s.tp)):
+            continue
+        exit_position = len(bars) - 1
+        for t in range(s.position + 1, len(bars)):
+            o, h, l = bars['Open'].iloc[t], bars['High'].iloc[t], bars['Low'].iloc[t]
+            buy = s.direction == 'BUY'
+            if (o <= s.sl) if buy else (o >= s.sl):
+                exit_position = t; break
+            if (o >= s.tp) if buy else (o <= s.tp):
+                exit_position = t; break
+            if (l <= s.sl or h >= s.tp) if buy else (h >= s.sl or l <= s.tp):
+                exit_position = t; break
+        exits.append((s.position, exit_position))
+        next_free = exit_position + 1
+    return exits
+
+
+def test_chunked_exit_search_matches_bar_loop():
+    bars = _synthetic_bars(20000, seed=6)
+    rng = np.random.default_rng(6)
+    positions = np.sort(rng.choice(len(bars) - 1, 400, replace=False))
+    closes = bars['Close'].to_numpy()[positions]
+    directions = rng.choice(['BUY', 'SELL'], len(positions))
+    distance = rng.uniform(2, 60, len(positions))
+    sign = np.where(directions == 'BUY', 1, -1)
+    signals = pd.DataFrame({'position': positions, 'direction': directions,
+                            'sl': closes - sign * distance, 'tp': closes + sign * distance * 1.5})
+    ledger = BarReplayBacktester(bars, {'use_spread': False}).run(signals).ledger
+    assert list(zip(ledger['signal_position'], ledger['exit_position'])) == _reference_exits(bars, signals)
+
+
+def test_backtest_setups_on_mt5_csv():
+    bars = load_mt5_csv(CSV_PATH)
+    assert {'Open', 'High', 'Low', 'Close', 'Spread'} <= set(bars.columns)
+    result = backtest_setups(bars)
+    assert len(result.equity) == len(bars)
+    assert result.summary['trades'] == len(result.ledger)
+    final_balance = result.equity['balance'].iloc[-1]
+    assert np.isclose(final_balance, 10000.0 + result.ledger['profit'].sum())
+
+
+if __name__ == "__main__":
+    test_intrabar_order_when_sl_and_tp_in_same_bar()
+    test_spread_applied_to_buy_entry_and_sell_exit()
+    test_gap_through_stop_fills_at_open_and_equity_curve()
+    test_chunked_exit_search_matches_bar_loop()
+    test_backtest_setups_on_mt5_csv()
+    print("Backtest: ordre intrabar, spread, gaps et recherche par blocs OK")
+
+    bars = _synthetic_bars(1_000_000)
+    bars['Spread'] = 278
+    start = time.perf_counter()
+    result = backtest_setups(bars)
+    print(f"{result.summary['trades']} trades sur {len(bars)} barres en {time.perf_counter() - start:.2f} s "
+          f"(dont rejeu: {result.summary['elapsed_seconds']:.2f} s)")
+
+# ----- END OF FILE test_backtester.py -----
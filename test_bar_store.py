@@ -0,0 +1,166 @@
+# ----- START OF FILE test_bar_store.py -----
+"""
+Tests du stockage colonnaire des bougies: partitions par jour, ajout seul des nouvelles
+bougies, dédoublonnage sur l'horodatage, lectures par plage sans copie, et lecture
+par le trader (retraitement historique, backtest).
+
+Exécution: python test_bar_store.py  (ou pytest test_bar_store.py)
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.tools.bar_store import BAR_DTYPE, BarStore, bars_to_records
+from src.tools.fake_ea import FakeEA
+from src.tools.history_fetcher import HistoryFetcher
+from src.tools.mt5_csv import load_mt5_records
+from test_historical_predictions import _trader
+from test_mt5_bridge import _quiet
+from test_mt5_payload import _CannedConnector
+from test_zigzag_engine import _synthetic_bars
+
+CSV_PATH = "US30.cash_M1_202503281400_202503281800.csv"
+
+
+def _bars(n: int, seed: int = 0) -> pd.DataFrame:
+    """Bougies au format du connecteur MT5 (index 'time' naïf, colonnes en minuscules)."""
+    df = _synthetic_bars(n, seed).rename(columns=str.lower)
+    df.index = df.index.tz_localize(None).rename("time")
+    df['tick_volume'] = np.arange(n) % 300
+    df['spread'] = 200 + np.arange(n) % 50
+    return df
+
+
+def test_append_only_writes_and_dedup():
+    bars = _bars(3 * 1440 + 100)  # 4 partitions journalières
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BarStore(tmp)
+        assert store.write("US30", "M1", bars.iloc[:2000]) == 2000
+        assert len(store.days("US30", "M1")) == 2
+
+        # Fenêtre glissante du connecteur: seules les nouvelles bougies sont écrites
+        first_day = store.partition_path("US30", "M1", store.days("US30", "M1")[0])
+        first_bytes = first_day.read_bytes()
+        assert store.write("US30", "M1", bars.iloc[1900:2100]) == 100
+        assert store.write("US30", "M1", bars.iloc[1900:2100]) == 0
+        assert first_day.read_bytes() == first_bytes
+
+        # La dernière bougie (en formation) est mise à jour, l'historique n'est pas modifié
+        partial = bars.iloc[2090:2100].copy()
+        partial.loc[partial.index[-1], 'close'] = 1.0
+        partial.loc[partial.index[0], 'close'] = 2.0
+        store.write("US30", "M1", partial)
+        stored = store.read_frame("US30", "M1")
+        assert stored['close'].iloc[-1] == 1.0 and stored['close'].iloc[-10] == bars['close'].iloc[2090]
+
+        store.write("US30", "M1", bars.iloc[2100:])
+        stored = store.read_frame("US30", "M1")
+        expected = bars.copy()
+        expected.loc[expected.index[2099], 'close'] = 1.0
+        pd.testing.assert_frame_equal(stored[['open', 'high', 'low', 'close']], expected[['open', 'high', 'low', 'close']],
+                                      check_freq=False)
+        assert (stored['spread'].to_numpy() == bars['spread'].to_numpy()).all()
+        assert len(store.days("US30", "M1")) == 4
+        assert store.last_time("US30", "M1") == int(bars.index[-1].timestamp())
+
+
+def test_backfill_merges_missing_bars():
+    bars = _bars(600, seed=2)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BarStore(tmp)
+        store.write("US30", "M1", bars.drop(bars.index[100:150]))
+        assert store.write("US30", "M1", bars.iloc[90:160]) == 50
+        records = store.read("US30", "M1")
+        assert np.array_equal(records, bars_to_records(bars))
+
+
+def test_range_reads_are_zero_copy_views():
+    bars = _bars(3000, seed=3)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BarStore(tmp)
+        store.write("US30", "M1", bars)
+        start, end = bars.index[100], bars.index[400]
+        records = store.read("US30", "M1", start, end)
+        assert isinstance(records, np.memmap) and not records.flags.writeable
+        assert len(records) == 300 and records["time"][0] == int(start.timestamp())
+
+        # Plage sur deux partitions: copie concaténée
+        both = store.read("US30", "M1", bars.index[1400], bars.index[1500])
+        assert len(both) == 100 and not isinstance(both, np.memmap)
+
+        arrays = store.read_arrays("US30", "M1", start, end)
+        assert isinstance(arrays["close"], np.memmap) and arrays["close"][0] == records["close"][0]
+        assert store.read_frame("US30", "M1", count=50).index[0] == bars.index[-50]
+
+        # Horodatages avec fuseau: stockés en UTC
+        aware = bars.iloc[:10].copy()
+        aware.index = aware.index.tz_localize("Etc/GMT-1")
+        store.write("US30", "M5", aware)
+        assert store.read_frame("US30", "M5").index[0] == bars.index[0] - pd.Timedelta(hours=1)
+
+
+def test_trader_reads_history_from_store():
+    with tempfile.TemporaryDirectory() as tmp:
+        trader = _trader()
+        trader.config = {"history_fetch": {"chunk_size": 500}}
+        trader.data_dir = Path(tmp)
+        trader.bar_store = BarStore(Path(tmp) / "bars")
+        trader.mt5 = _CannedConnector(FakeEA(tmp, bars_to_records(_bars(1440 * 2)), {"history": 1440 * 2 - 1}))
+
+        results = trader.reprocess_historical_data(days=1)
+        assert results["total_predictions"] == 1440 - 50 - 4
+        assert len(trader.bar_store.read("US30", "M1")) == 1440
+
+        # Le backtest lit les bougies importées d'un export CSV dans le stockage
+        bars = trader._load_bars(CSV_PATH)
+        assert len(bars) == 1316 and list(bars.columns[:4]) == ['open', 'high', 'low', 'close']
+        assert len(trader._load_bars(start=bars.index[0], end=bars.index[100])) == 100
+
+
+
+def test_csv_and_connector_bars_share_server_time():
+    with tempfile.TemporaryDirectory() as tmp:
+        trader = _trader()
+        trader.bar_store = BarStore(tmp)
+        bars = trader._load_bars(CSV_PATH)
+        # Première ligne de l'export: 2025.03.28 01:05 (heure du serveur), stockée telle quelle
+        assert bars.index[0] == pd.Timestamp("2025-03-28 01:05")
+
+        # Les mêmes bougies reçues de l'EA (heure du serveur) se confondent avec celles du CSV
+        records = load_mt5_records(CSV_PATH, server_tz=None)[0]
+        connector = _CannedConnector(FakeEA(tmp, records, {"history": len(records) - 1}))
+        result = _quiet(HistoryFetcher(connector, trader.bar_store, chunk_size=200).fetch,
+                        "US30", "M1", int(records["time"][0]), int(records["time"][-1]) + 60)
+        stored = trader.bar_store.read("US30", "M1")
+        assert result["complete"] and result["bars"] == len(records) and result["written"] == 0
+        assert len(stored) == len(bars) and np.array_equal(stored["time"], records["time"])
+        assert np.array_equal(stored["close"], records["close"])
+
+if __name__ == "__main__":
+    test_append_only_writes_and_dedup()
+    test_backfill_merges_missing_bars()
+    test_range_reads_are_zero_copy_views()
+    test_trader_reads_history_from_store()
+    test_csv_and_connector_bars_share_server_time()
+    print("Stockage des bougies: ajout seul, dédoublonnage et lectures sans copie OK")
+
+    bars = _bars(260 * 1440)  # ~1 an de M1
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BarStore(tmp)
+        start = time.perf_counter()
+        store.write("US30", "M1", bars)
+        print(f"Écriture de {len(bars)} bougies: {time.perf_counter() - start:.2f} s "
+              f"({len(bars) * BAR_DTYPE.itemsize / 1e6:.0f} Mo)")
+        start = time.perf_counter()
+        for i in range(100):
+            store.write("US30", "M1", bars.iloc[-100:])  # Cycle de collecte du trader
+        print(f"Cycle de collecte (100 bougies, 0 nouvelle): {(time.perf_counter() - start) * 10:.2f} ms")
+        start = time.perf_counter()
+        records = store.read("US30", "M1", bars.index[-1440 * 30])
+        print(f"Lecture de 30 jours ({len(records)} bougies): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+# ----- END OF FILE test_bar_store.py -----
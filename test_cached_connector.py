@@ -0,0 +1,151 @@
+"""
+Tests du cache des réponses du connecteur MT5: réutilisation pendant la durée de validité,
+expiration, invalidation par les ordres, et allers-retours évités dans un cycle du trader
+et entre perceive / act de Fihavanana.
+
+Exécution: python test_cached_connector.py  (ou pytest test_cached_connector.py)
+"""
+
+import logging
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+from src.agents.execution.cached_connector import CachedMT5Connector
+from src.agents.ubuntu.fihavanana import Fihavanana
+from src.tools.bar_store import BarStore
+from src.tools.candle_cache import CandleCache
+from test_bar_store import _bars
+from test_candle_cache import _LiveConnector
+from test_historical_predictions import _trader
+
+
+class _CountingConnector(_LiveConnector):
+    """Connecteur simulé qui compte les appels par méthode."""
+
+    def __init__(self, bars, visible=200):
+        super().__init__(bars, visible)
+        self.calls = Counter()
+        self.balance = 10000.0
+
+    def connect(self):
+        return True
+
+    def get_current_price(self, symbol):
+        self.calls["get_current_price"] += 1
+        return super().get_current_price(symbol)
+
+    def get_account_info(self):
+        self.calls["get_account_info"] += 1
+        return {"BALANCE": self.balance, "EQUITY": self.balance}
+
+    def get_positions(self, symbol=None):
+        self.calls["get_positions"] += 1
+        return []
+
+    def place_order(self, symbol, order_type, volume, **kwargs):
+        self.calls["place_order"] += 1
+        self.balance -= 1.0
+        return {"ticket": 1, "price": 42000.0}
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_and_invalidation():
+    clock = _Clock()
+    connector = _CountingConnector(_bars(500, seed=1))
+    cached = CachedMT5Connector(connector, {"get_current_price": 1.0}, clock=clock)
+
+    first = cached.get_current_price("US30")
+    first["bid"] = 0.0  # Les réponses rendues sont des copies
+    assert cached.get_current_price("US30")["bid"] != 0.0
+    assert connector.calls["get_current_price"] == 1
+    clock.now = 1.5
+    cached.get_current_price("US30")
+    assert connector.calls["get_current_price"] == 2
+
+    assert cached.get_account_info()["BALANCE"] == 10000.0
+    assert cached.get_account_info()["BALANCE"] == 10000.0
+    cached.place_order("US30", "BUY", 0.1, sl=41900.0)
+    assert cached.get_account_info()["BALANCE"] == 9999.0
+    assert connector.calls["get_account_info"] == 2
+    # Le prix n'est pas invalidé par un ordre
+    cached.get_current_price("US30")
+    assert connector.calls["get_current_price"] == 2
+
+    # Méthodes transmises telles quelles
+    assert len(cached.get_data("US30", "M1", 10)) == 10
+    assert cached.stats["hits"] == 3 and cached.stats["misses"] == 4
+
+
+def test_failures_are_not_cached():
+    connector = _CountingConnector(_bars(500, seed=1))
+    responses = iter([None, {"BALANCE": 1.0}])
+    connector.get_account_info = lambda: next(responses)
+    cached = CachedMT5Connector(connector)
+    assert cached.get_account_info() is None
+    assert cached.get_account_info() == {"BALANCE": 1.0}
+
+
+def test_callers_cannot_alter_cached_responses():
+    connector = _CountingConnector(_bars(500, seed=1))
+    connector.get_positions = lambda symbol=None: [{"ticket": 1, "profit": 12.5, "details": {"sl": 41900.0}}]
+    cached = CachedMT5Connector(connector)
+
+    positions = cached.get_positions("US30")
+    positions[0]["profit"] = 0.0  # Annotations d'un appelant (ex: Fihavanana.perceive)
+    positions[0]["details"]["sl"] = 0.0
+    positions.append({"ticket": 2})
+    account = cached.get_account_info()
+    account["risk_state"] = "annotated"
+
+    assert cached.get_positions("US30") == [{"ticket": 1, "profit": 12.5, "details": {"sl": 41900.0}}]
+    assert cached.get_account_info() == {"BALANCE": 10000.0, "EQUITY": 10000.0}
+    assert cached.stats["hits"] == 2
+
+
+def test_trader_cycle_fetches_price_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        trader = _trader()
+        trader.timeframes = ["M1"]
+        trader.base_timeframe, trader.local_resampling, trader.candle_window = "M1", False, 100
+        trader.stats = {"connection_errors": 0}
+        trader.bar_store = BarStore(Path(tmp))
+        connector = _CountingConnector(_bars(2000, seed=3))
+        trader.mt5 = CachedMT5Connector(connector)
+        trader.candle_cache = CandleCache(trader.mt5, window=100)
+        trader.active_trades = [{"id": "1", "action": "BUY", "entry_price": 42000.0, "stop_loss": 0.0,
+                                 "take_profit": 1e9, "position_size": 0.1}]
+
+        market_data = trader._collect_market_data()
+        trader._simulate_trade_results()
+        assert market_data is not None and connector.calls["get_current_price"] == 1
+        assert trader.active_trades[0]["current_price"] == market_data["current_price"]["bid"]
+
+
+def test_fihavanana_status_reuses_perception():
+    agent = Fihavanana.__new__(Fihavanana)
+    agent.logger = logging.getLogger("fihavanana.test")
+    agent.state = {"execution_history": []}
+    connector = _CountingConnector(_bars(500, seed=1))
+    agent.mt5_connector = CachedMT5Connector(connector)
+
+    perceptions = agent.perceive({"symbols": ["US30"]})
+    results = agent.act({"action_type": "status", "parameters": {}})
+    assert perceptions["account_info"]["BALANCE"] == 10000.0 and results["success"]
+    assert connector.calls["get_account_info"] == 1 and connector.calls["get_positions"] == 1
+
+
+if __name__ == "__main__":
+    test_ttl_and_invalidation()
+    test_failures_are_not_cached()
+    test_callers_cannot_alter_cached_responses()
+    test_trader_cycle_fetches_price_once()
+    test_fihavanana_status_reuses_perception()
+    print("Cache du connecteur MT5: validité, invalidation et allers-retours évités OK")
@@ -0,0 +1,144 @@
+# ----- START OF FILE test_candle_cache.py -----
+"""
+Tests du cache incrémental des bougies: fenêtre identique à une récupération complète
+à chaque cycle, mise à jour de la bougie en formation, reprise après une interruption,
+et volume de bougies transférées par cycle de collecte du trader.
+
+Exécution: python test_candle_cache.py  (ou pytest test_candle_cache.py)
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.tools.bar_store import BarStore, bars_to_records
+from src.tools.candle_cache import CandleCache, CandleRing
+from test_bar_store import _bars
+from test_historical_predictions import _trader
+
+
+class _LiveConnector:
+    """Connecteur simulé: la série s'allonge d'une bougie par cycle, la dernière est en formation."""
+
+    def __init__(self, bars, visible=200):
+        self.bars = bars.copy()
+        self.visible = visible
+        self.requested = []
+
+    def advance(self, bars=1):
+        self.visible += bars
+        # Bougie en formation: clôture différente de sa valeur finale
+        self.bars.iloc[self.visible - 1, self.bars.columns.get_loc('close')] += 0.5
+
+    def get_data(self, symbol, timeframe, count=500):
+        self.requested.append(count)
+        return self.bars.iloc[max(0, self.visible - count):self.visible]
+
+    def get_current_price(self, symbol):
+        last = self.bars['close'].iloc[self.visible - 1]
+        return {"bid": last, "ask": last + 2.0, "spread": 2.0}
+
+
+def _elapse(cache, timeframe, seconds):
+    """Avance l'horloge de la dernière mise à jour d'une série."""
+    key = ("US30", timeframe)
+    cache._updated_at[key] -= seconds
+
+
+def test_ring_merge_keeps_last_window():
+    records = bars_to_records(_bars(1000))
+    ring = CandleRing(100)
+    for start in range(0, 1000, 7):
+        ring.merge(records[max(0, start - 2):start + 7])
+    assert np.array_equal(ring.records, records[-100:])
+
+    # Bougie en formation mise à jour, bougie trop ancienne ignorée
+    update = records[-1:].copy()
+    update["close"] = 1.0
+    assert ring.merge(np.concatenate([records[:1], update])) == 0
+    assert ring.records["close"][-1] == 1.0 and ring.records["time"][0] == records["time"][-100]
+
+
+def test_incremental_updates_match_full_refetch():
+    connector = _LiveConnector(_bars(2000, seed=1))
+    cache = CandleCache(connector, window=100)
+    assert cache.update("US30", "M1") and connector.requested == [100]
+    for _ in range(300):
+        connector.advance()
+        _elapse(cache, "M1", 60)
+        cache.update("US30", "M1")
+        expected = connector.bars.iloc[connector.visible - 100:connector.visible]
+        window = cache.arrays("US30", "M1")
+        assert np.array_equal(window["close"], expected['close'].to_numpy())
+        assert np.array_equal(window["time"], bars_to_records(expected)["time"])
+    assert max(connector.requested[1:]) <= 3
+    assert cache.frame("US30", "M1").index[-1] == connector.bars.index[connector.visible - 1]
+
+
+def test_gap_longer_than_estimate_is_refetched():
+    connector = _LiveConnector(_bars(5000, seed=2))
+    cache = CandleCache(connector, window=100)
+    cache.update("US30", "M1")
+
+    # 30 bougies manquées mais horloge non avancée: la demande est agrandie
+    connector.advance(30)
+    cache.update("US30", "M1")
+    assert connector.requested[1:] == [2, 8, 32]
+    assert np.array_equal(cache.ring("US30", "M1").records, bars_to_records(connector.bars.iloc[130:230]))
+
+    # Interruption plus longue que la fenêtre: le cache est remplacé
+    connector.advance(1000)
+    _elapse(cache, "M1", 60 * 1000)
+    cache.update("US30", "M1")
+    assert cache.stats["resets"] == 1 and connector.requested[-1] == 100
+    assert np.array_equal(cache.ring("US30", "M1").records, bars_to_records(connector.bars.iloc[1130:1230]))
+
+
+def test_trader_collects_only_new_bars():
+    with tempfile.TemporaryDirectory() as tmp:
+        trader = _trader()
+        trader.timeframes = ["M1", "M5"]
+        trader.base_timeframe, trader.local_resampling, trader.candle_window = "M1", False, 100
+        trader.stats = {"connection_errors": 0}
+        trader.bar_store = BarStore(Path(tmp))
+        trader.mt5 = connector = _LiveConnector(_bars(2000, seed=3))
+        trader.candle_cache = CandleCache(connector, window=100)
+
+        first = trader._collect_market_data()
+        assert len(first["candles"]["M1"]) == 100 and connector.requested == [100, 100]
+        connector.advance()
+        _elapse(trader.candle_cache, "M1", 60)
+        second = trader._collect_market_data()
+        assert connector.requested[2] == 3 and len(second["candles"]["M1"]) == 100
+        assert second["candles"]["M1"].close[-1] == connector.bars['close'].iloc[connector.visible - 1]
+        assert len(trader.bar_store.read("US30", "M1")) == 101
+
+
+if __name__ == "__main__":
+    test_ring_merge_keeps_last_window()
+    test_incremental_updates_match_full_refetch()
+    test_gap_longer_than_estimate_is_refetched()
+    test_trader_collects_only_new_bars()
+    print("Cache des bougies: fenêtre identique, bougie en formation et reprise OK")
+
+    timeframes = ("M1", "M5", "M15")
+    connector = _LiveConnector(_bars(20000, seed=4))
+    cache = CandleCache(connector, window=100)
+    for tf in timeframes:
+        cache.update("US30", tf)
+    received = cache.stats["bars_received"]
+    start = time.perf_counter()
+    for _ in range(1000):
+        connector.advance()
+        for tf in timeframes:
+            _elapse(cache, tf, 60)
+            cache.update("US30", tf)
+    elapsed = time.perf_counter() - start
+    per_cycle = (cache.stats["bars_received"] - received) / 1000
+    print(f"Bougies transférées par cycle: {per_cycle:.1f} au lieu de {100 * len(timeframes)} "
+          f"({1 - per_cycle / (100 * len(timeframes)):.1%} de moins)")
+    print(f"Mise à jour du cache ({len(timeframes)} timeframes): {elapsed:.3f} ms par cycle")
+
+# ----- END OF FILE test_candle_cache.py -----
@@ -0,0 +1,136 @@
+"""
+Tests des mesures du connecteur MT5: seaux de l'histogramme de latence, compteurs par type
+de commande (allers-retours, lots, prefetch, timeouts, ID non correspondants, octets),
+snapshot et écriture périodique.
+
+Exécution: python test_connector_telemetry.py  (ou pytest test_connector_telemetry.py)
+Affiche le tableau des mesures sous une charge mixte avec l'EA simulé, et le coût d'une mesure.
+"""
+
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from src.agents.execution.connector_telemetry import ConnectorTelemetry, LatencyHistogram, format_snapshot
+from src.agents.execution.mt5_connector import MT5FileConnector
+from src.tools.bridge_benchmark import run_benchmark
+from src.tools.fake_ea import FakeEA
+from test_cached_connector import _Clock
+from test_fake_ea import _connect
+from test_mt5_bridge import _quiet
+
+
+def test_histogram_buckets_and_percentiles():
+    # Chaque valeur tombe dans un seau dont elle ne dépasse pas la borne haute
+    previous_high = -1
+    for index in range(LatencyHistogram._index(10**6) + 1):
+        high = LatencyHistogram._highest_value(index)
+        assert high > previous_high and LatencyHistogram._index(high) == index
+        assert LatencyHistogram._index(previous_high + 1) == index
+        previous_high = high
+
+    histogram = LatencyHistogram()
+    latencies = np.random.default_rng(0).uniform(0.001, 0.1, 10000)
+    for seconds in latencies:
+        histogram.record(seconds)
+    for percent in (50, 90, 99, 99.9):
+        exact = np.percentile(latencies, percent)
+        assert exact * 0.99 <= histogram.percentile(percent) <= exact * 1.07
+    summary = histogram.to_dict()
+    assert summary["count"] == 10000 and set(summary) >= {"p50", "p90", "p99", "p999", "max"}
+    assert abs(summary["mean"] - latencies.mean()) < 1e-5
+
+    histogram.record(3600.0)  # Au-delà de max_seconds: dernier seau, max exact
+    assert histogram.percentile(100) == histogram.max / 1e6 == 3600.0
+
+
+def test_connector_counts_by_command_type():
+    with tempfile.TemporaryDirectory() as tmp:
+        ea = FakeEA(tmp, config={"latency": 0.005}).start()
+        connector = _connect(tmp)
+        try:
+            for _ in range(4):
+                _quiet(connector.get_current_price, "US30")
+            _quiet(connector.get_data, "US30", "M1", 200)
+            _quiet(connector.prefetch, ["PRICE US30.cash", "ACCOUNT_INFO", "FOO"])
+            _quiet(connector.get_current_price, "US30")
+        finally:
+            ea.stop()
+        # EA arrêté: timeout
+        assert _quiet(connector.send_command, "POSITIONS", 0.2) == "ERROR: TIMEOUT"
+        _quiet(connector.disconnect)
+
+    snapshot = connector.telemetry.snapshot()
+    commands = snapshot["commands"]
+    assert commands["PRICE"]["count"] == 4 and commands["PRICE"]["prefetched"] == 1 and commands["PRICE"]["batched"] == 1
+    assert commands["PRICE"]["p50"] >= 0.005 and commands["PRICE"]["errors"] == 0
+    assert commands["BATCH"]["count"] == 1 and commands["FOO"]["batched"] == 1
+    assert commands["DATA"]["bytes_received"] > 200 * 60 > commands["PRICE"]["bytes_received"]
+    assert commands["POSITIONS"]["timeouts"] == 1 and snapshot["timeouts"] == 1
+    assert snapshot["round_trips"] == 4 + 1 + 1 + 1
+    assert abs(sum(c["share"] for c in commands.values()) - 1.0) < 1e-9
+    # Trié par temps total: le timeout domine
+    assert next(iter(commands)) == "POSITIONS"
+
+
+def test_id_mismatch_counted_once_per_response():
+    with tempfile.TemporaryDirectory() as tmp:
+        connector = _quiet(MT5FileConnector, {"files_dir": tmp})
+        with open(connector.response_file, "w", encoding="latin-1") as f:
+            f.write("ID:aaaaaaaa|PRICE BID=1 ASK=2")
+        for _ in range(3):  # Relectures du même fichier pendant l'attente
+            assert _quiet(connector._read_response, "bbbbbbbb") is None
+        assert _quiet(connector._read_batch_response, "cccccccc", 2) is None
+        with open(connector.response_file, "w", encoding="latin-1") as f:
+            f.write("READY")
+        assert connector._read_response("bbbbbbbb") is None
+    assert connector.telemetry.id_mismatches == 2
+
+
+def test_periodic_dump():
+    clock = _Clock()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "telemetry.jsonl")
+        telemetry = ConnectorTelemetry(path, dump_interval=10.0, clock=clock)
+        telemetry.record("PRICE", 0.002, "PRICE BID=1 ASK=2", bytes_sent=30, bytes_received=40)
+        clock.now = 5.0
+        assert not telemetry.maybe_dump()
+        clock.now = 10.0
+        telemetry.record("DATA", 0.02, "ERROR: TIMEFRAME M7")
+        assert telemetry.maybe_dump() and not telemetry.maybe_dump()
+        clock.now = 25.0
+        assert telemetry.maybe_dump()
+        with open(path, encoding="utf-8") as f:
+            dumps = [json.loads(line) for line in f]
+    assert len(dumps) == 2 and dumps[0]["elapsed"] == 10.0 and dumps[1]["elapsed"] == 25.0
+    assert dumps[0]["commands"]["DATA"]["errors"] == 1 and dumps[0]["bytes_received"] == 40
+    assert "PRICE" in format_snapshot(dumps[1])
+
+
+if __name__ == "__main__":
+    test_histogram_buckets_and_percentiles()
+    test_connector_counts_by_command_type()
+    test_id_mismatch_counted_once_per_response()
+    test_periodic_dump()
+    print("Mesures du connecteur MT5: histogrammes, compteurs, snapshot et écriture périodique OK")
+
+    # Charge mixte avec l'EA simulé (délai 1 ms + gigue jusqu'à 2 ms)
+    with tempfile.TemporaryDirectory() as tmp:
+        ea = FakeEA(tmp, config={"latency": 0.001, "jitter": 0.002}).start()
+        connector = _connect(tmp)
+        try:
+            run_benchmark(connector, commands=300, batch=1)
+            run_benchmark(connector, commands=300, batch=6)
+            print(format_snapshot(connector.telemetry.snapshot()))
+        finally:
+            ea.stop()
+            _quiet(connector.disconnect)
+
+    telemetry = ConnectorTelemetry()
+    start = time.perf_counter()
+    for i in range(100000):
+        telemetry.record("PRICE", 0.0015, "PRICE BID=1 ASK=2", 30, 40)
+    print(f"Coût d'une mesure: {(time.perf_counter() - start) / 100000 * 1e6:.2f} µs")
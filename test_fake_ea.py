@@ -0,0 +1,137 @@
+"""
+Tests de l'EA simulé à travers MT5FileConnector: prix et bougies rejoués depuis l'export
+CSV, cycle de vie d'un ordre (position, stop loss touché, historique, solde), lots BATCH,
+délai de réponse configuré, et banc de mesure.
+
+Exécution: python test_fake_ea.py  (ou pytest test_fake_ea.py)
+Affiche le débit et les latences du pont avec l'EA simulé dans un processus séparé.
+"""
+
+import contextlib
+import io
+import tempfile
+import time
+
+import numpy as np
+
+from src.agents.execution.mt5_connector import MT5FileConnector
+from src.tools.bridge_benchmark import format_results, run_benchmark, start_fake_ea
+from src.tools.fake_ea import FakeEA
+from src.tools.mt5_csv import load_mt5_records
+from test_mt5_bridge import _quiet
+
+CSV_PATH = "US30.cash_M1_202503281400_202503281800.csv"
+
+
+def _connect(files_dir, **config):
+    with contextlib.redirect_stdout(io.StringIO()):
+        connector = MT5FileConnector({"files_dir": files_dir, "timeout": 2, **config})
+        assert connector.connect()
+    return connector
+
+
+def test_replayed_prices_and_candles():
+    records = load_mt5_records(CSV_PATH, server_tz=None)[0]
+    with tempfile.TemporaryDirectory() as tmp:
+        ea = FakeEA(tmp, records, {"history": 120}).start()
+        connector = _connect(tmp)
+        try:
+            price = _quiet(connector.get_current_price, "US30")
+            assert price["bid"] == records["close"][120]
+            assert np.isclose(price["spread"], records["spread"][120] * 0.01)
+
+            m1 = _quiet(connector.get_data, "US30", "M1", 50)
+            assert len(m1) == 50 and m1["close"].iloc[-1] == records["close"][120]
+            assert int(m1.index[-1].timestamp()) == records["time"][120]
+            m5 = _quiet(connector.get_data, "US30", "M5", 10)
+            assert len(m5) == 10 and (m5.index[1] - m5.index[0]).total_seconds() == 300
+            assert m5["high"].iloc[-2] == records["high"][m5.index[-2].timestamp() <= records["time"]][:5].max()
+
+            ea.advance(3)
+            assert _quiet(connector.get_current_price, "US30")["bid"] == records["close"][123]
+        finally:
+            ea.stop()
+            _quiet(connector.disconnect)
+
+
+def test_order_lifecycle():
+    with tempfile.TemporaryDirectory() as tmp:
+        ea = FakeEA(tmp, config={"seed": 1}).start()
+        connector = _connect(tmp)
+        try:
+            bid, ask = ea._prices(ea.index)
+            order = _quiet(connector.place_order, "US30", "BUY", 0.1, 0.0, bid - 20, bid + 1000)
+            assert order["price"] == ask and order["volume"] == 0.1
+
+            positions = _quiet(connector.get_positions, "US30")
+            assert [p["ticket"] for p in positions] == [order["ticket"]]
+            assert _quiet(connector.get_history_orders, 1) == []
+
+            # Rejeu jusqu'au stop loss
+            while ea.positions:
+                ea.advance(1)
+                ea._update_positions()
+            history = _quiet(connector.get_history_orders, 1)
+            assert history[0]["ticket"] == order["ticket"] and history[0]["price_close"] == bid - 20
+            assert history[0]["profit"] == round((bid - 20 - ask) * 0.1 * 100, 2)
+            account = _quiet(connector.get_account_info)
+            assert account["BALANCE"] == round(10000 + history[0]["profit"], 2)
+
+            second = _quiet(connector.place_order, "US30", "SELL", 0.2)
+            assert _quiet(connector.close_position, second["ticket"])
+            assert _quiet(connector.get_positions) == []
+            _quiet(connector.place_order, "US30", "BUY", 0.1)
+            _quiet(connector.place_order, "US30", "SELL", 0.1)
+            assert _quiet(connector.close_all_positions) and not ea.positions
+            assert _quiet(connector.calculate_position_size, "US30", 5000, 1.0) == round(ea.balance * 0.01 / 5000, 2)
+        finally:
+            ea.stop()
+            _quiet(connector.disconnect)
+
+
+def test_batch_and_latency():
+    with tempfile.TemporaryDirectory() as tmp:
+        ea = FakeEA(tmp, config={"latency": 0.02}).start()
+        connector = _connect(tmp)
+        try:
+            start = time.perf_counter()
+            responses = _quiet(connector.send_batch, ["PRICE US30.cash", "POSITIONS", "FOO"])
+            assert time.perf_counter() - start >= 0.02 and ea.stats["requests"] == 1
+            assert responses[0].startswith("PRICE BID=") and responses[1] == "POSITIONS EMPTY"
+            assert responses[2] == "ERROR: UNKNOWN COMMAND"
+        finally:
+            ea.stop()
+            _quiet(connector.disconnect)
+
+
+def test_benchmark_harness():
+    with tempfile.TemporaryDirectory() as tmp:
+        ea = FakeEA(tmp).start()
+        connector = _connect(tmp)
+        try:
+            results = run_benchmark(connector, commands=60, batch=6)
+        finally:
+            ea.stop()
+            _quiet(connector.disconnect)
+    assert results["round_trips"] == 10 and results["errors"] == 0
+    assert results["p50"] <= results["p99"] <= results["max"]
+
+
+if __name__ == "__main__":
+    test_replayed_prices_and_candles()
+    test_order_lifecycle()
+    test_batch_and_latency()
+    test_benchmark_harness()
+    print("EA simulé: rejeu, ordres, lots, délai de réponse et banc de mesure OK")
+
+    # EA simulé dans un processus séparé, délai de 1 ms + gigue jusqu'à 2 ms
+    for batch in (1, 6):
+        with tempfile.TemporaryDirectory() as tmp:
+            process = start_fake_ea(tmp, CSV_PATH, latency=0.001, jitter=0.002)
+            try:
+                connector = _connect(tmp)
+                print(f"lot de {batch}: {format_results(run_benchmark(connector, commands=600, batch=batch))}")
+                _quiet(connector.disconnect)
+            finally:
+                process.terminate()
+                process.wait()
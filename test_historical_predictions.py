@@ -0,0 +1,118 @@
+# ----- START OF FILE test_historical_predictions.py -----
+"""
+Tests de la simulation des prédictions historiques par lot: colonnes de caractéristiques
+identiques à _extract_features bougie par bougie, et un seul appel au modèle
+donnant les mêmes prédictions que ImitationLearningManager.predict.
+
+Exécution: python test_historical_predictions.py  (ou pytest test_historical_predictions.py)
+"""
+
+import time
+import logging
+import numpy as np
+import pandas as pd
+
+from akoben_trader import AkobenTrader
+from src.learning.imitation_learning_manager import ImitationLearningManager
+from src.tools.mt5_csv import load_mt5_csv
+from test_zigzag_engine import _synthetic_bars
+
+CSV_PATH = "US30.cash_M1_202503281400_202503281800.csv"
+WINDOW = 50
+
+
+class _SoftmaxModel:
+    """Modèle linéaire déterministe exposant l'interface scikit-learn utilisée par le gestionnaire."""
+
+    def __init__(self, n_features, seed=0):
+        self.classes_ = np.array([0, 1, 2])
+        self.weights = np.random.default_rng(seed).normal(size=(n_features, 3))
+        self.calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        scores = np.asarray(X) @ self.weights
+        scores = np.exp(scores - scores.max(axis=1, keepdims=True))
+        return scores / scores.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+FEATURES = ['trend_up', 'trend_down', 'trend_neutral', 'price_above_ma20', 'price_below_ma20',
+            'ma20_above_ma50', 'ma20_below_ma50', 'positive_momentum', 'negative_momentum',
+            'high_volatility', 'low_volatility', 'divergence_bearish', 'divergence_bullish', 'divergence_none',
+            'pattern_possible_hammer', 'pattern_possible_shooting_star', 'recent_trend_up', 'recent_trend_down',
+            'instrument_us30', 'timeframe_m1']
+
+
+def _trader(seed=0):
+    trader = AkobenTrader.__new__(AkobenTrader)
+    trader.instrument = "US30"
+    trader.main_timeframe = "M1"
+    trader.live_indicators = {}
+    trader.logger = logging.getLogger("akoben_trader.test")
+    trader.logger.setLevel(logging.WARNING)
+
+    manager = ImitationLearningManager.__new__(ImitationLearningManager)
+    manager.logger = trader.logger
+    manager.current_model = {
+        "model": _SoftmaxModel(len(FEATURES), seed),
+        "feature_map": {name: i for i, name in enumerate(FEATURES)},
+        "label_map": {0: "BUY", 1: "HOLD", 2: "SELL"}
+    }
+    trader.oba = type("Oba", (), {"imitation_manager": manager})()
+    return trader
+
+
+def _candles(df: pd.DataFrame) -> pd.DataFrame:
+    candles = df.rename(columns=str.lower)[['open', 'high', 'low', 'close']].copy()
+    candles['tick_volume'] = df['TickVolume'] if 'TickVolume' in df else np.arange(len(df)) % 97
+    candles.index.name = 'time'
+    return candles
+
+
+def test_feature_columns_match_per_candle_extraction():
+    trader = _trader()
+    for candles in (_candles(load_mt5_csv(CSV_PATH)), _candles(_synthetic_bars(1500, seed=3).round(0))):
+        columns = trader._extract_feature_columns(trader._calculate_indicator_columns(candles))
+        records = candles.to_dict('records')
+        for t in range(WINDOW - 1, len(records)):
+            market_data = {"candles": {"M1": records[t - WINDOW + 1:t + 1]}}
+            market_data["indicators"] = trader._calculate_indicators(market_data["candles"])
+            expected = trader._extract_features(market_data)
+            assert {name for name, values in columns.items() if values[t]} == set(expected), t
+
+
+def test_batch_simulation_matches_per_candle_predictions():
+    trader = _trader(seed=5)
+    candles = _candles(load_mt5_csv(CSV_PATH))
+    model = trader.oba.imitation_manager.current_model["model"]
+    results = trader._simulate_predictions_on_historical(candles)
+    assert model.calls == 1
+
+    records = candles.to_dict('records')
+    assert results["total_predictions"] == len(candles) - WINDOW - 4
+    for prediction, t in zip(results["predictions"], range(WINDOW - 1, len(records))):
+        market_data = {"candles": {"M1": records[t - WINDOW + 1:t + 1]}}
+        market_data["indicators"] = trader._calculate_indicators(market_data["candles"])
+        expected = trader.oba.imitation_manager.predict(trader._extract_features(market_data))
+        assert prediction["predicted_action"] == expected["action"], t
+        assert np.isclose(prediction["predicted_confidence"], max(expected["confidences"].values()))
+        assert prediction["timestamp"] == candles.index[t].isoformat()
+        assert prediction["future_price"] == records[t + 5]["close"]
+    assert results["correct_predictions"] == sum(p["correct"] for p in results["predictions"])
+
+
+if __name__ == "__main__":
+    test_feature_columns_match_per_candle_extraction()
+    test_batch_simulation_matches_per_candle_predictions()
+    print("Simulation historique par lot: caractéristiques et prédictions OK")
+
+    candles = _candles(_synthetic_bars(30 * 1440))  # --reprocess --days 30 en M1
+    trader = _trader()
+    start = time.perf_counter()
+    results = trader._simulate_predictions_on_historical(candles)
+    print(f"{results['total_predictions']} prédictions sur {len(candles)} bougies en {time.perf_counter() - start:.2f} s")
+
+# ----- END OF FILE test_historical_predictions.py -----
@@ -0,0 +1,140 @@
+"""
+Tests du téléchargement de l'historique par tranches: mêmes bougies qu'une seule commande
+DATA, écriture dans le stockage, reprise après un échec, repli sur DATA pour un EA sans
+DATA_RANGE.
+
+Exécution: python test_history_fetcher.py  (ou pytest test_history_fetcher.py)
+Compare 30 jours de M1 en une commande DATA et par tranches, avec l'EA simulé.
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.tools.bar_store import BarStore
+from src.tools.fake_ea import FakeEA, synthetic_records
+from src.tools.history_fetcher import HistoryFetcher
+from test_fake_ea import _connect
+from test_mt5_bridge import _quiet
+from test_mt5_payload import _CannedConnector
+
+
+class _FlakyConnector(_CannedConnector):
+    """Connecteur sans EA dont les commandes DATA_RANGE échouent après `fail_after` tranches."""
+
+    def __init__(self, ea, fail_after=None, range_error=None, config=None, refuse_rates=False):
+        super().__init__(ea, config, refuse_rates)
+        self.fail_after = fail_after
+        self.range_error = range_error  # Réponse à toute commande DATA_RANGE (None: réponse de l'EA)
+
+    def send_command(self, command, timeout=None):
+        if command.startswith("DATA_RANGE"):
+            if self.range_error:
+                self.commands.append(command)
+                return self.range_error
+            if self.fail_after is not None and sum(c.startswith("DATA_RANGE") for c in self.commands) >= self.fail_after:
+                self.commands.append(command)
+                return "ERROR: TIMEOUT"
+        return super().send_command(command, timeout)
+
+
+def test_chunked_fetch_matches_single_request():
+    with tempfile.TemporaryDirectory() as tmp:
+        ea = FakeEA(tmp, synthetic_records(12000, seed=5), {"history": 11000}).start()
+        connector = _connect(tmp, data_format="rates")
+        store = BarStore(Path(tmp) / "bars")
+        try:
+            fetcher = HistoryFetcher(connector, store, chunk_size=1000)
+            result = _quiet(fetcher.fetch_recent, "US30", "M1", 7)
+            single = _quiet(connector.get_rates, "US30", "M1", 7 * 1440)
+            m5 = _quiet(fetcher.fetch_recent, "US30", "M5", 2)
+            single_m5 = _quiet(connector.get_rates, "US30", "M5", 2 * 288)
+        finally:
+            ea.stop()
+            _quiet(connector.disconnect)
+
+        assert result["complete"] and result["chunks"] == 11 and result["bars"] == result["written"] == 7 * 1440
+        assert np.array_equal(store.read("US30", "M1", result["start"], result["end"]), single)
+        assert np.array_equal(store.read("US30", "M1"), ea.bars[11001 - 7 * 1440:11001])
+        assert m5["complete"] and np.array_equal(store.read("US30", "M5"), single_m5)
+
+
+def test_resume_after_failure():
+    with tempfile.TemporaryDirectory() as tmp:
+        ea = FakeEA(tmp, synthetic_records(6000, seed=2), {"history": 5999})
+        connector = _FlakyConnector(ea, fail_after=3)
+        store = BarStore(tmp)
+        fetcher = HistoryFetcher(connector, store, chunk_size=500, max_retries=1, retry_delay=0)
+
+        first = _quiet(fetcher.fetch_recent, "US30", "M1", 3)
+        assert not first["complete"] and first["chunks"] == 3 and first["retries"] == 1
+        assert first["error"] == "ERROR: TIMEOUT" and len(store.read("US30", "M1")) == 1500
+        checkpoint = fetcher.load_checkpoint("US30", "M1")
+        assert checkpoint == {"start": first["start"], "cursor": first["start"] + 1500 * 60}
+
+        connector.fail_after, connector.commands = None, []
+        second = _quiet(fetcher.fetch_recent, "US30", "M1", 3)
+        assert second["complete"] and second["resumed_from"] == checkpoint["cursor"]
+        # Seules les tranches manquantes sont redemandées
+        assert sum(c.startswith("DATA_RANGE") for c in connector.commands) == 6
+        assert np.array_equal(store.read("US30", "M1"), ea.bars[6000 - 3 * 1440:])
+
+
+def test_legacy_ea_falls_back_to_single_request():
+    with tempfile.TemporaryDirectory() as tmp:
+        ea = FakeEA(tmp, synthetic_records(3000, seed=3), {"history": 2999})
+        connector = _FlakyConnector(ea, range_error="ERROR: UNKNOWN COMMAND")
+        store = BarStore(tmp)
+        result = _quiet(HistoryFetcher(connector, store, retry_delay=0).fetch_recent, "US30", "M1", 1)
+        assert result["complete"] and result["chunks"] == 1 and result["written"] == 1440
+        assert connector.commands[-1] == "DATA US30.cash M1 1440"
+        assert np.array_equal(store.read("US30", "M1"), ea.bars[-1440:])
+
+
+def test_other_errors_do_not_fall_back_to_single_request():
+    with tempfile.TemporaryDirectory() as tmp:
+        ea = FakeEA(tmp, synthetic_records(3000, seed=3), {"history": 2999})
+        connector = _FlakyConnector(ea, range_error="ERROR: SYMBOL GER40.cash NOT FOUND")
+        store = BarStore(tmp)
+        result = _quiet(HistoryFetcher(connector, store, max_retries=1, retry_delay=0).fetch, "GER40", "M1", 0, 86400)
+        assert not result["complete"] and result["error"] == "ERROR: SYMBOL GER40.cash NOT FOUND"
+        assert result["retries"] == 1 and not any(c.startswith("DATA ") for c in connector.commands)
+
+        # RATES refusé sur DATA_RANGE: retour au JSON dans le connecteur, tranches conservées
+        connector = _FlakyConnector(ea, config={"data_format": "rates"}, refuse_rates=True)
+        result = _quiet(HistoryFetcher(connector, store, chunk_size=500, retry_delay=0).fetch_recent, "US30", "M1", 1)
+        assert result["complete"] and result["chunks"] == 3 and connector.data_format == "json"
+        # Dernière bougie (RATES refusé puis JSON), puis uniquement des tranches DATA_RANGE en JSON
+        assert connector.commands[:2] == ["DATA US30.cash M1 1 RATES", "DATA US30.cash M1 1"]
+        assert all(c.startswith("DATA_RANGE") and not c.endswith("RATES") for c in connector.commands[2:])
+        assert np.array_equal(store.read("US30", "M1"), ea.bars[-1440:])
+
+
+if __name__ == "__main__":
+    test_chunked_fetch_matches_single_request()
+    test_resume_after_failure()
+    test_legacy_ea_falls_back_to_single_request()
+    test_other_errors_do_not_fall_back_to_single_request()
+    print("Historique par tranches: découpage, reprise et repli OK")
+
+    # 30 jours de M1 (43 200 bougies) avec l'EA simulé à travers le pont fichiers
+    with tempfile.TemporaryDirectory() as tmp:
+        ea = FakeEA(tmp, synthetic_records(45000, seed=1), {"history": 44000}).start()
+        try:
+            for label, data_format, chunked in (("une commande DATA (JSON)", "json", False),
+                                                ("tranches de 5000 (JSON)", "json", True),
+                                                ("tranches de 5000 (RATES)", "rates", True)):
+                connector = _connect(tmp, data_format=data_format, timeout=30)
+                store = BarStore(Path(tmp) / f"bars_{data_format}_{chunked}")
+                start = time.perf_counter()
+                if chunked:
+                    _quiet(HistoryFetcher(connector, store).fetch_recent, "US30", "M1", 30)
+                else:
+                    store.write("US30", "M1", _quiet(connector.get_rates, "US30", "M1", 30 * 1440))
+                elapsed = time.perf_counter() - start
+                print(f"{label}: {elapsed * 1000:.0f} ms, {len(store.read('US30', 'M1'))} bougies stockées")
+                _quiet(connector.disconnect)
+        finally:
+            ea.stop()
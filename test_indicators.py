@@ -0,0 +1,199 @@
+# ----- START OF FILE test_indicators.py -----
+"""
+Tests du moteur d'indicateurs: modes batch et streaming identiques au bit près,
+valeurs conformes aux calculs pandas / pandas_ta remplacés, et indicateurs live suivant
+les fenêtres successives du cycle de trading (bougie en formation évaluée par peek).
+
+Exécution: python test_indicators.py  (ou pytest test_indicators.py)
+"""
+
+import time
+import numpy as np
+import pandas as pd
+
+from akoben_trader import LIVE_INDICATORS
+from src.tools import indicators
+from src.tools.indicators import IndicatorSet, LiveIndicators
+from src.tools.market_snapshot import CandleArrays
+from test_historical_predictions import _trader
+from test_zigzag_engine import _synthetic_bars
+
+SPECS = {
+    'sma20': ('sma', 20), 'sma50': ('sma', 50), 'ema5': ('ema', 5), 'ema21': ('ema', 21),
+    'rsi14': ('rsi', 14), 'rsi7': ('rsi', 7), 'atr14': ('atr', 14), 'atr14_sma': ('atr', 14, False),
+    'roc14': ('roc', 14),
+}
+
+
+def _prices(df: pd.DataFrame) -> tuple:
+    return df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy()
+
+
+def _stream(indicator_set: IndicatorSet, high, low, close) -> dict:
+    values = {name: [] for name in indicator_set.specs}
+    for h, l, c in zip(high.tolist(), low.tolist(), close.tolist()):
+        for name, value in indicator_set.update(h, l, c).items():
+            values[name].append(value)
+    return {name: np.asarray(v) for name, v in values.items()}
+
+
+def test_batch_and_streaming_identical():
+    for seed in range(3):
+        high, low, close = _prices(_synthetic_bars(5000, seed=seed))
+        indicator_set = IndicatorSet(SPECS)
+        batch = indicator_set.batch(high, low, close)
+        streamed = _stream(indicator_set, high, low, close)
+        for name in SPECS:
+            assert np.array_equal(batch[name], streamed[name], equal_nan=True), (seed, name)
+
+
+def test_warm_up_then_stream():
+    high, low, close = _prices(_synthetic_bars(3000, seed=8))
+    indicator_set = IndicatorSet(SPECS)
+    batch = indicator_set.batch(high, low, close)
+    indicator_set.warm_up(high[:2000], low[:2000], close[:2000])
+    streamed = _stream(indicator_set, high[2000:], low[2000:], close[2000:])
+    for name in SPECS:
+        assert np.array_equal(batch[name][2000:], streamed[name], equal_nan=True), name
+
+
+def test_peek_leaves_state_unchanged():
+    high, low, close = _prices(_synthetic_bars(500, seed=6))
+    indicator_set, reference = IndicatorSet(SPECS), IndicatorSet(SPECS)
+    for h, l, c in zip(high.tolist(), low.tolist(), close.tolist()):
+        indicator_set.peek(h + 3.0, l - 3.0, c + 1.0)  # Bougie en formation, révisée avant sa clôture
+        peeked = indicator_set.peek(h, l, c)
+        assert _same(peeked, indicator_set.update(h, l, c)) and _same(peeked, reference.update(h, l, c))
+
+
+def _same(a: dict, b: dict) -> bool:
+    return all(np.array_equal(a[name], b[name], equal_nan=True) for name in a)
+
+
+def test_live_indicators_follow_windows():
+    bars = _synthetic_bars(3000, seed=9)
+    high, low, close = _prices(bars)
+    times = bars.index.asi8 // 10**9
+    full = IndicatorSet(SPECS).batch(high, low, close)
+    live = LiveIndicators(SPECS)
+
+    # Fenêtre de 100 bougies qui avance d'une ou deux bougies par cycle (dernière en formation)
+    end = 100
+    while end < 2000:
+        window = slice(end - 100, end)
+        values = live.values(times[window], high[window], low[window], close[window])
+        # Amorcé une fois sur la première fenêtre (début de l'historique): identique au batch complet
+        for name in SPECS:
+            assert np.array_equal(values[name], full[name][end - 1], equal_nan=True), (end, name)
+        # Indicateurs à fenêtre finie: mêmes valeurs (à l'arrondi près) que le batch sur la fenêtre
+        expected = IndicatorSet(SPECS).batch(high[window], low[window], close[window])
+        for name in ('sma20', 'sma50', 'atr14_sma', 'roc14'):
+            assert np.isclose(values[name], expected[name][-1], rtol=1e-9), (end, name)
+        end += 1 + end % 2
+    assert live.stats['warm_ups'] == 1 and live.stats['updates'] == 2000 - 1 - 100
+
+    # Trou plus long que la fenêtre, puis retour en arrière (cache réinitialisé): réamorçage
+    for end in (2500, 1200):
+        window = slice(end - 100, end)
+        values = live.values(times[window], high[window], low[window], close[window])
+        expected = IndicatorSet(SPECS).batch(high[window], low[window], close[window])
+        assert all(np.array_equal(values[name], expected[name][-1], equal_nan=True) for name in SPECS)
+    assert live.stats['warm_ups'] == 3
+
+    # Sans horodatage: réamorcé à chaque appel, valeurs du batch sur la fenêtre
+    values = live.values(None, high[:100], low[:100], close[:100])
+    assert values['sma20'] == IndicatorSet(SPECS).batch(high[:100], low[:100], close[:100])['sma20'][-1]
+    assert live.stats['warm_ups'] == 4
+
+
+def test_trader_cycle_feeds_new_bars_only():
+    bars = _synthetic_bars(600, seed=2).rename(columns=str.lower)
+    bars['tick_volume'] = np.arange(len(bars)) % 89
+    trader = _trader()
+    for end in range(100, 600, 3):
+        window = bars.iloc[end - 100:end]
+        result = trader._calculate_indicators({"M1": CandleArrays.from_bars(window)})
+        close = window['close'].to_numpy()
+        assert np.isclose(result['ma20'], indicators.sma(close, 20)[-1], rtol=1e-12)
+        assert np.isclose(result['atr14'], indicators.atr(window['high'].to_numpy(), window['low'].to_numpy(),
+                                                          close, 14, wilder=False)[-1], rtol=1e-9)
+        assert np.isclose(result['roc14'], indicators.roc(close, 14)[-1], rtol=1e-12)
+    stream = trader.live_indicators["M1"]
+    assert stream.stats['warm_ups'] == 1 and stream.stats['updates'] == 598 - 100
+
+
+def test_match_pandas_references():
+    df = _synthetic_bars(5000, seed=4)
+    high, low, close = _prices(df)
+    closes = df['Close']
+
+    # RSI pandas_ta: RMA = ewm(alpha=1/n, adjust=True, min_periods=n) des gains / pertes
+    change = closes.diff()
+    avg_gain = change.clip(lower=0).ewm(alpha=1 / 14, min_periods=14).mean()
+    avg_loss = change.clip(upper=0).ewm(alpha=1 / 14, min_periods=14).mean()
+    expected_rsi = 100 * avg_gain / (avg_gain + avg_loss.abs())
+    assert np.array_equal(indicators.rsi(close, 14), expected_rsi.to_numpy(), equal_nan=True)
+
+    np.testing.assert_allclose(indicators.sma(close, 20), closes.rolling(20).mean(), rtol=1e-12)
+    np.testing.assert_allclose(indicators.roc(close, 14), (closes / closes.shift(14) - 1) * 100, rtol=1e-12)
+
+    # ATR simplifié d'AkobenTrader (moyenne simple du True Range)
+    true_range = pd.concat([df['High'] - df['Low'], (df['High'] - closes.shift(1)).abs(),
+                            (df['Low'] - closes.shift(1)).abs()], axis=1).max(axis=1)
+    np.testing.assert_allclose(indicators.atr(high, low, close, 14, wilder=False),
+                               true_range.rolling(14).mean(), rtol=1e-12)
+
+    # EMA pandas_ta (amorcée par la SMA des n premières valeurs)
+    seeded = closes.copy()
+    seeded.iloc[:20] = np.nan
+    seeded.iloc[19] = closes.iloc[:20].mean()
+    np.testing.assert_allclose(indicators.ema(close, 20), seeded.ewm(span=20, adjust=False).mean(), rtol=1e-12)
+
+
+def test_short_and_nan_inputs():
+    assert np.isnan(indicators.sma([1.0, 2.0], 5)).all()
+    assert indicators.rsi([], 14).shape == (0,)
+    values = np.array([np.nan, np.nan, 1.0, 2.0, 3.0, 4.0])
+    assert np.array_equal(indicators.sma(values, 2), [np.nan, np.nan, np.nan, 1.5, 2.5, 3.5], equal_nan=True)
+    stream = indicators.StreamingSMA(2)
+    assert np.array_equal([stream.update(v) for v in values], indicators.sma(values, 2), equal_nan=True)
+
+
+if __name__ == "__main__":
+    test_batch_and_streaming_identical()
+    test_warm_up_then_stream()
+    test_peek_leaves_state_unchanged()
+    test_live_indicators_follow_windows()
+    test_trader_cycle_feeds_new_bars_only()
+    test_match_pandas_references()
+    test_short_and_nan_inputs()
+    print("Indicateurs: batch/streaming identiques, fenêtres live, références pandas OK")
+
+    high, low, close = _prices(_synthetic_bars(1_000_000))
+    indicator_set = IndicatorSet(SPECS)
+    start = time.perf_counter()
+    indicator_set.batch(high, low, close)
+    print(f"Batch {len(SPECS)} indicateurs sur {len(close)} barres: {time.perf_counter() - start:.2f} s")
+    indicator_set.warm_up(high[:1000], low[:1000], close[:1000])
+    start = time.perf_counter()
+    for h, l, c in zip(high[1000:101000].tolist(), low[1000:101000].tolist(), close[1000:101000].tolist()):
+        indicator_set.update(h, l, c)
+    print(f"Streaming: {(time.perf_counter() - start) / 100_000 * 1e6:.1f} µs par bougie ({len(SPECS)} indicateurs)")
+
+    # Cycle live: fenêtre de 100 bougies, une nouvelle bougie par cycle
+    times = np.arange(len(close), dtype=np.int64) * 60
+    live = LiveIndicators(LIVE_INDICATORS)
+    cycles = range(100, 10100)
+    start = time.perf_counter()
+    for end in cycles:
+        indicators.sma(close[end - 100:end], 20), indicators.sma(close[end - 100:end], 50)
+        indicators.atr(high[end - 100:end], low[end - 100:end], close[end - 100:end], 14, wilder=False)
+        indicators.roc(close[end - 100:end], 14)
+    batch_cycle = (time.perf_counter() - start) / len(cycles) * 1e6
+    start = time.perf_counter()
+    for end in cycles:
+        live.values(times[end - 100:end], high[end - 100:end], low[end - 100:end], close[end - 100:end])
+    print(f"Cycle live (100 bougies, {len(LIVE_INDICATORS)} indicateurs): batch {batch_cycle:.1f} µs, "
+          f"streaming {(time.perf_counter() - start) / len(cycles) * 1e6:.1f} µs")
+
+# ----- END OF FILE test_indicators.py -----
@@ -0,0 +1,103 @@
+# ----- START OF FILE test_market_snapshot.py -----
+"""
+Tests de l'instantané de marché en colonnes NumPy: vues DataFrame et dicts identiques
+aux bougies d'origine, indicateurs identiques à ceux calculés sur l'ancien format
+liste de dicts (collecte live et rejeu du backtester), compatibilité dict et JSON.
+
+Exécution: python test_market_snapshot.py  (ou pytest test_market_snapshot.py)
+"""
+
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.tools.backtester import BarReplayBacktester
+from src.tools.bar_store import bars_to_records
+from src.tools.market_snapshot import CandleArrays, MarketSnapshot
+from src.tools.mt5_csv import load_mt5_csv
+from test_bar_store import _bars
+from test_historical_predictions import CSV_PATH, _trader
+
+WINDOW = 100
+
+
+def test_views_match_source_candles():
+    bars = _bars(300, seed=1)
+    candles = CandleArrays.from_records(bars_to_records(bars))
+    assert len(candles) == 300 and candles.frame is candles.frame
+    pd.testing.assert_frame_equal(candles.frame[bars.columns], bars, check_freq=False, check_dtype=False)
+
+    rows = candles.to_dicts()
+    assert rows[-1]["close"] == bars['close'].iloc[-1] and rows[0]["time"] == int(bars.index[0].timestamp())
+    assert all(type(value) in (int, float) for value in rows[0].values())
+
+    # Même colonnes depuis le DataFrame du connecteur et depuis l'ancien format liste de dicts
+    from_frame = CandleArrays.from_bars(bars)
+    from_dicts = CandleArrays.from_bars(bars.to_dict('records'))
+    assert np.array_equal(from_frame.time, candles.time) and from_dicts.time is None
+    assert np.array_equal(from_dicts.close, candles.close) and np.array_equal(candles.tail(10).high, bars['high'].iloc[-10:])
+
+
+def test_indicators_match_list_of_dicts():
+    trader = _trader()
+    bars = load_mt5_csv(CSV_PATH).rename(columns={'TickVolume': 'tick_volume'}).rename(columns=str.lower)
+    records = bars.to_dict('records')
+    for t in range(WINDOW, len(bars), 7):
+        expected = trader._calculate_indicators({"M1": records[t - WINDOW:t]})
+        snapshot = MarketSnapshot("US30")
+        snapshot.set_candles("M1", bars.iloc[t - WINDOW:t])
+        assert trader._calculate_indicators(snapshot.candles) == expected, t
+
+    # Rejeu du backtester: colonnes sans tick_volume (pas de divergence, comme auparavant)
+    bt = BarReplayBacktester(load_mt5_csv(CSV_PATH))
+    for t in range(WINDOW, bt.n, 13):
+        candles = bt.candles(t, WINDOW)
+        dicts = [{"open": o, "high": h, "low": l, "close": c} for o, h, l, c in
+                 zip(bt.open[t - WINDOW + 1:t + 1], bt.high[t - WINDOW + 1:t + 1], bt.low[t - WINDOW + 1:t + 1],
+                     bt.close[t - WINDOW + 1:t + 1])]
+        indicators = trader._calculate_indicators({"M1": candles})
+        assert indicators == trader._calculate_indicators({"M1": dicts}) and 'price_volume_divergence' not in indicators
+        assert candles.time[-1] == int(bt.time[t].timestamp())
+
+
+def test_snapshot_behaves_like_market_data_dict():
+    snapshot = MarketSnapshot("US30", timestamp="2025-03-28T10:00:00", current_price={"bid": 1.0, "ask": 2.0})
+    snapshot.set_candles("M1", bars_to_records(_bars(60)))
+    snapshot["indicators"] = {"atr14": np.float64(3.5)}
+    assert snapshot.get("current_price")["ask"] == 2.0 and snapshot["indicators"]["atr14"] == 3.5
+    assert snapshot.get("missing", {}) == {} and "candles" in snapshot
+    data = json.loads(json.dumps(snapshot.to_dict()))
+    assert len(data["candles"]["M1"]) == 60 and data["candles"]["M1"][-1]["spread"] == 209
+
+
+if __name__ == "__main__":
+    test_views_match_source_candles()
+    test_indicators_match_list_of_dicts()
+    test_snapshot_behaves_like_market_data_dict()
+    print("Instantané de marché: vues, indicateurs identiques et compatibilité dict OK")
+
+    trader = _trader()
+    frame = _bars(WINDOW, seed=2)
+    records = bars_to_records(frame)
+    n = 2000
+    start = time.perf_counter()
+    for _ in range(n):
+        trader._calculate_indicators({"M1": frame.to_dict('records')})
+    before = (time.perf_counter() - start) / n
+    start = time.perf_counter()
+    for _ in range(n):
+        snapshot = MarketSnapshot("US30")
+        snapshot.set_candles("M1", records.copy())
+        trader._calculate_indicators(snapshot.candles)
+    after = (time.perf_counter() - start) / n
+    print(f"Bougies + indicateurs par cycle: {before * 1e6:.0f} µs (to_dict('records')) -> {after * 1e6:.0f} µs (colonnes)")
+
+    bt = BarReplayBacktester(_bars(20000, seed=3).rename(columns=str.title))
+    start = time.perf_counter()
+    for t in range(WINDOW, bt.n):
+        trader._calculate_indicators({"M1": bt.candles(t, WINDOW)})
+    print(f"Rejeu de {bt.n - WINDOW} bougies (indicateurs du trader): {time.perf_counter() - start:.2f} s")
+
+# ----- END OF FILE test_market_snapshot.py -----
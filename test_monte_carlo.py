@@ -0,0 +1,100 @@
+# ----- START OF FILE test_monte_carlo.py -----
+"""
+Tests de la simulation Monte Carlo des séquences de trades: calcul tensoriel identique
+à une boucle trade par trade, invariants du rééchantillonnage, ruine, et lecture des
+trades JSON d'AkobenTrader.
+
+Exécution: python test_monte_carlo.py  (ou pytest test_monte_carlo.py)
+"""
+
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.tools.monte_carlo import (
+    _path_chunks, analyze_ledger, ledger_r_multiples, load_trade_ledger, simulate_risk_of_ruin
+)
+
+R_MULTIPLES = np.array([2.0, -1.0, -1.0, 1.5, -1.0, 3.0, -1.0, -0.4, 1.0, -1.0])
+
+
+def _reference_path(r_path, risk, ruin_level):
+    balance, peak, max_drawdown, ruined = 1.0, 1.0, 0.0, False
+    for r in r_path:
+        balance *= max(1.0 + r * risk / 100.0, 0.0)
+        peak = max(peak, balance)
+        max_drawdown = max(max_drawdown, 1.0 - balance / peak)
+        ruined = ruined or balance <= ruin_level
+    return max_drawdown, balance - 1.0, ruined
+
+
+def test_tensor_paths_match_trade_loop():
+    for method in ("bootstrap", "shuffle"):
+        config = {"n_paths": 500, "n_trades": 25, "method": method, "seed": 3, "chunk_size": 128}
+        results = simulate_risk_of_ruin(R_MULTIPLES, (1.0, 20.0), config)
+        paths = np.vstack(list(_path_chunks(R_MULTIPLES, 500, 25 if method == "bootstrap" else 10,
+                                            method, np.random.default_rng(3), 128)))
+        for risk in (1.0, 20.0):
+            for i in range(0, 500, 7):
+                drawdown, final, ruined = _reference_path(paths[i], risk, 0.5)
+                assert np.isclose(results[risk]["max_drawdown"][i], drawdown), (method, risk, i)
+                assert np.isclose(results[risk]["final_return"][i], final), (method, risk, i)
+                assert results[risk]["ruined"][i] == ruined, (method, risk, i)
+
+
+def test_shuffle_keeps_final_return_and_ruin():
+    results = simulate_risk_of_ruin(R_MULTIPLES, (1.0,), {"n_paths": 2000, "method": "shuffle", "seed": 1})
+    expected = np.prod(1 + R_MULTIPLES / 100) - 1
+    assert np.allclose(results[1.0]["final_return"], expected)
+    assert results[1.0]["max_drawdown"].max() <= 1 - 0.99 ** 6 + 1e-12  # Pire cas: les 6 pertes d'affilée
+
+    # À 100% de risque, une seule perte vide le compte (drawdown et perte de 100%)
+    wiped = simulate_risk_of_ruin(np.array([-1.0, 1.0]), (100.0,), {"n_paths": 100, "n_trades": 3, "seed": 0})[100.0]
+    ruined = wiped["ruined"]
+    assert 0 < (~ruined).sum() < 100
+    assert np.all(wiped["max_drawdown"][ruined] == 1.0) and np.all(wiped["final_return"][ruined] == -1.0)
+    assert np.allclose(wiped["final_return"][~ruined], 7.0)  # Trois gains: solde x 8
+
+
+def test_trade_ledger_from_trader_json():
+    with tempfile.TemporaryDirectory() as tmp:
+        trades = [
+            {"id": "SIM_1", "action": "BUY", "entry_price": 100.0, "stop_loss": 98.0, "position_size": 0.5,
+             "profit": 200.0, "status": "CLOSED", "close_time": "2025-03-28T10:05:00"},
+            {"id": "SIM_2", "action": "SELL", "entry_price": 100.0, "stop_loss": 101.0, "position_size": 1.0,
+             "profit": -100.0, "status": "CLOSED", "close_time": "2025-03-28T10:01:00"},
+            {"id": "SIM_3", "action": "BUY", "entry_price": 100.0, "stop_loss": 99.0, "position_size": 1.0,
+             "status": "SIMULATED"},
+        ]
+        for trade in trades:
+            with open(Path(tmp) / f"{trade['id']}.json", 'w', encoding='utf-8') as f:
+                json.dump(trade, f)
+        ledger = load_trade_ledger(tmp)
+    assert ledger["id"].tolist() == ["SIM_2", "SIM_1"]
+    assert ledger_r_multiples(ledger).tolist() == [-1.0, 2.0]
+
+    summary = analyze_ledger(ledger, (1.0, 2.0), {"n_paths": 1000, "seed": 0})
+    assert summary["risk_per_trade"].tolist() == [1.0, 2.0]
+    assert (summary["trades"] == 2).all()
+    assert summary["drawdown_p99"].iloc[1] >= summary["drawdown_p99"].iloc[0]
+
+
+if __name__ == "__main__":
+    test_tensor_paths_match_trade_loop()
+    test_shuffle_keeps_final_return_and_ruin()
+    test_trade_ledger_from_trader_json()
+    print("Monte Carlo: tenseur = boucle, rééchantillonnage et ruine OK")
+
+    r = np.random.default_rng(0).choice([-1.0, 1.8], size=200, p=[0.6, 0.4])
+    start = time.perf_counter()
+    results = simulate_risk_of_ruin(r, (0.5, 1.0, 2.0, 3.0), {"n_paths": 100_000, "seed": 0})
+    elapsed = time.perf_counter() - start
+    for risk, values in results.items():
+        print(f"Risque {risk}%: ruine {values['ruined'].mean():.2%}, "
+              f"drawdown p95 {np.percentile(values['max_drawdown'], 95):.2%}")
+    print(f"100000 trajectoires x {len(r)} trades x 4 niveaux de risque en {elapsed:.2f} s")
+
+# ----- END OF FILE test_monte_carlo.py -----
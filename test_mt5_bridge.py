@@ -0,0 +1,284 @@
+"""
+Tests du pont fichiers avec MT5: aller-retour d'une commande avec un EA de substitution
+(thread qui lit requests.txt et écrit responses.txt), sans l'ancienne pause fixe de 0,5 s,
+en mode événements et en relecture périodique, reprise après un timeout, et lots de
+commandes (BATCH) avec repli sur un EA qui ne les connaît pas.
+
+Exécution: python test_mt5_bridge.py  (ou pytest test_mt5_bridge.py)
+Affiche les latences p50/p99 d'une commande PRICE selon le mode d'attente, et la durée
+d'un cycle de trading en commandes séparées et en un lot.
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.agents.execution.mt5_connector import MT5FileConnector
+from src.tools.bar_store import BarStore
+from src.tools.candle_cache import TIMEFRAME_SECONDS, CandleCache
+from test_historical_predictions import _trader
+
+
+class _StandInEA(threading.Thread):
+    """EA de substitution: lit la requête toutes les `interval` secondes (timer MT5) et y répond."""
+
+    def __init__(self, files_dir, interval=0.001, with_id=True, batch=True):
+        super().__init__(daemon=True)
+        self.request_file = os.path.join(files_dir, "requests.txt")
+        self.response_file = os.path.join(files_dir, "responses.txt")
+        self.interval = interval
+        self.with_id = with_id
+        self.batch = batch
+        self.answered = 0
+        self.commands = []
+        self.requests = []
+        self._stopped = threading.Event()
+
+    def execute(self, command):
+        name, *args = command.split()
+        if name == "PRICE":
+            return "PRICE BID=42000.5 ASK=42001.5"
+        if name == "DATA":
+            symbol, timeframe, count = args[0], args[1], int(args[2])
+            seconds = TIMEFRAME_SECONDS[timeframe]
+            last = int(time.time()) // seconds * seconds
+            bars = [{"time": last - (count - 1 - i) * seconds, "open": 42000.0 + i, "high": 42010.0 + i,
+                     "low": 41990.0 + i, "close": 42005.0 + i, "tick_volume": 100, "spread": 200}
+                    for i in range(count)]
+            return f"DATA {symbol} {timeframe} {json.dumps(bars)}"
+        if name in ("POSITIONS", "HISTORY_ORDERS"):
+            return f"{name} EMPTY"
+        if name == "ACCOUNT_INFO":
+            return "ACCOUNT_INFO BALANCE=10000.0 EQUITY=10000.0"
+        return "ERROR: UNKNOWN COMMAND"
+
+    def respond(self, request):
+        self.requests.append(request)
+        lines = request.split("\n")
+        command_id, command = lines[0][3:].split("|", 1)
+        if command.startswith("BATCH") and self.batch:
+            parts = [lines[0]]
+            for line in lines[1:]:
+                part_id, part = line.split("|", 1)
+                self.commands.append(part)
+                parts.append(f"{part_id}|{self.execute(part)}")
+            return "\n".join(parts)
+        self.commands.append(command)
+        content = self.execute(command)
+        return f"ID:{command_id}|{content}" if self.with_id else content
+
+    def run(self):
+        while not self._stopped.is_set():
+            try:
+                with open(self.request_file, encoding="latin-1") as f:
+                    request = f.read().strip()
+            except FileNotFoundError:
+                request = ""
+            if request:
+                open(self.request_file, "w").close()
+                response = self.respond(request)
+                self.answered += 1
+                with open(self.response_file, "w", encoding="latin-1") as f:
+                    f.write(response)
+            time.sleep(self.interval)
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+def _connector(files_dir, **config):
+    with open(os.path.join(files_dir, "responses.txt"), "w") as f:
+        f.write("READY")
+    with contextlib.redirect_stdout(io.StringIO()):
+        connector = MT5FileConnector({"files_dir": files_dir, "timeout": 2, **config})
+        assert connector.connect()
+    return connector
+
+
+def _quiet(call, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return call(*args)
+
+
+def test_round_trip_without_fixed_pause():
+    for mode in ("auto", "poll"):
+        with tempfile.TemporaryDirectory() as tmp:
+            ea = _StandInEA(tmp)
+            ea.start()
+            connector = _connector(tmp, response_wait=mode)
+            try:
+                start = time.perf_counter()
+                for _ in range(5):
+                    price = _quiet(connector.get_current_price, "US30")
+                    assert price["bid"] == 42000.5 and price["ask"] == 42001.5
+                # Ancien protocole: au moins 0,5 s par commande
+                assert time.perf_counter() - start < 1.0
+                assert ea.answered == 5
+            finally:
+                ea.stop()
+                _quiet(connector.disconnect)
+
+
+def test_legacy_response_without_id():
+    with tempfile.TemporaryDirectory() as tmp:
+        ea = _StandInEA(tmp, with_id=False)
+        ea.start()
+        connector = _connector(tmp)
+        try:
+            assert _quiet(connector.send_command, "PRICE US30.cash") == "PRICE BID=42000.5 ASK=42001.5"
+        finally:
+            ea.stop()
+            _quiet(connector.disconnect)
+
+
+def test_timeout_then_handshake():
+    with tempfile.TemporaryDirectory() as tmp:
+        connector = _connector(tmp, handshake_timeout=0.2)
+        try:
+            assert _quiet(connector.send_command, "PRICE US30.cash", 0.1) == "ERROR: TIMEOUT"
+            # L'EA démarre ensuite: la commande restée sans réponse est lue, puis la suivante aboutit
+            ea = _StandInEA(tmp)
+            ea.start()
+            price = _quiet(connector.get_current_price, "US30")
+            assert price is not None and price["bid"] == 42000.5
+            ea.stop()
+        finally:
+            _quiet(connector.disconnect)
+
+
+def test_batch_demultiplexes_responses():
+    with tempfile.TemporaryDirectory() as tmp:
+        ea = _StandInEA(tmp)
+        ea.start()
+        connector = _connector(tmp)
+        try:
+            commands = ["PRICE US30.cash", "DATA US30.cash M5 3", "FOO", "ACCOUNT_INFO"]
+            responses = _quiet(connector.send_batch, commands)
+            assert ea.answered == 1 and ea.commands == commands
+            assert responses[0] == "PRICE BID=42000.5 ASK=42001.5"
+            assert responses[1].startswith("DATA US30.cash M5 [") and len(json.loads(responses[1][18:])) == 3
+            assert responses[2] == "ERROR: UNKNOWN COMMAND"
+            assert responses[3].startswith("ACCOUNT_INFO BALANCE=10000.0")
+        finally:
+            ea.stop()
+            _quiet(connector.disconnect)
+
+
+def test_batch_falls_back_without_ea_support():
+    with tempfile.TemporaryDirectory() as tmp:
+        ea = _StandInEA(tmp, batch=False)
+        ea.start()
+        connector = _connector(tmp)
+        try:
+            responses = _quiet(connector.send_batch, ["PRICE US30.cash", "ACCOUNT_INFO"])
+            assert responses[0].startswith("PRICE") and responses[1].startswith("ACCOUNT_INFO")
+            assert not connector.batch_supported and ea.answered == 3
+            _quiet(connector.send_batch, ["PRICE US30.cash", "ACCOUNT_INFO"])
+            assert ea.answered == 5
+        finally:
+            ea.stop()
+            _quiet(connector.disconnect)
+
+
+def _cycle_trader(tmp, connector):
+    trader = _trader()
+    trader.timeframes = ["M1", "M5", "M15"]
+    trader.base_timeframe, trader.local_resampling, trader.candle_window = "M1", False, 100
+    trader.dry_run, trader.active_trades = False, [{"id": "1"}]
+    trader.stats = {"connection_errors": 0}
+    trader.bar_store = BarStore(Path(tmp) / "bars")
+    trader.mt5 = connector
+    trader.candle_cache = CandleCache(connector, window=100)
+    return trader
+
+
+def _run_cycle(trader):
+    market_data = trader._collect_market_data()
+    positions = trader.mt5.get_positions(trader.instrument)
+    account = trader.mt5.get_account_info()
+    return market_data, positions, account
+
+
+def test_trader_cycle_in_one_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        ea = _StandInEA(tmp)
+        ea.start()
+        connector = _connector(tmp)
+        try:
+            trader = _cycle_trader(tmp, connector)
+            _quiet(trader._prefetch_cycle)
+            market_data, positions, account = _quiet(_run_cycle, trader)
+            assert ea.answered == 1
+            assert set(market_data["candles"]) == {"M1", "M5", "M15"} and len(market_data["candles"]["M5"]) == 100
+            assert market_data["current_price"]["bid"] == 42000.5
+            assert positions == [] and account["BALANCE"] == 10000.0
+            # Un ordre rend obsolètes les réponses du lot: les positions sont redemandées
+            _quiet(trader._prefetch_cycle)
+            _quiet(connector.place_order, "US30", "BUY", 0.1)
+            _quiet(connector.get_positions, "US30")
+            assert ea.answered == 4
+        finally:
+            ea.stop()
+            _quiet(connector.disconnect)
+
+
+def _latencies(mode, commands=300, **config):
+    with tempfile.TemporaryDirectory() as tmp:
+        ea = _StandInEA(tmp)
+        ea.start()
+        connector = _connector(tmp, response_wait=mode, **config)
+        latencies = []
+        try:
+            for _ in range(commands):
+                start = time.perf_counter()
+                _quiet(connector.send_command, "PRICE US30.cash")
+                latencies.append(time.perf_counter() - start)
+        finally:
+            ea.stop()
+            backend = connector._waiter.backend
+            _quiet(connector.disconnect)
+    return backend, np.array(latencies) * 1000
+
+
+if __name__ == "__main__":
+    test_round_trip_without_fixed_pause()
+    test_legacy_response_without_id()
+    test_timeout_then_handshake()
+    test_batch_demultiplexes_responses()
+    test_batch_falls_back_without_ea_support()
+    test_trader_cycle_in_one_round_trip()
+    print("Pont fichiers MT5: aller-retour, ancien format, reprise après timeout et lots OK")
+
+    runs = [("auto", {}), ("poll", {}), ("poll", {"poll_interval": 0.1, "max_poll_interval": 0.1})]
+    for mode, config in runs:
+        backend, latencies = _latencies(mode, **config)
+        label = backend if not config else f"{backend} 100 ms (ancienne boucle, sans la pause de 0,5 s)"
+        print(f"{label}: p50 {np.percentile(latencies, 50):.2f} ms, p99 {np.percentile(latencies, 99):.2f} ms")
+
+    # Cycle de trading (EA avec un timer de 20 ms): commandes séparées puis en un lot
+    with tempfile.TemporaryDirectory() as tmp:
+        ea = _StandInEA(tmp, interval=0.02)
+        ea.start()
+        connector = _connector(tmp)
+        trader = _cycle_trader(tmp, connector)
+        _quiet(_run_cycle, trader)
+        for batched in (False, True):
+            durations = []
+            for _ in range(20):
+                start = time.perf_counter()
+                if batched:
+                    _quiet(trader._prefetch_cycle)
+                _quiet(_run_cycle, trader)
+                durations.append(time.perf_counter() - start)
+            label = "en un lot" if batched else "commande par commande"
+            print(f"Cycle de trading {label}: {np.median(durations) * 1000:.1f} ms ({len(trader._cycle_commands())} commandes)")
+        ea.stop()
+        _quiet(connector.disconnect)
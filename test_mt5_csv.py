@@ -0,0 +1,118 @@
+# ----- START OF FILE test_mt5_csv.py -----
+"""
+Tests du chargement rapide des exports CSV MT5: décodage vectorisé date/heure identique
+à pd.to_datetime, conversion de l'heure serveur en UTC, cache binaire mappé et son
+invalidation quand le CSV change.
+
+Exécution: python test_mt5_csv.py  (ou pytest test_mt5_csv.py)
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.tools.mt5_csv import cache_path, load_mt5_csv, load_mt5_records
+from test_zigzag_engine import _synthetic_bars
+
+CSV_PATH = Path(__file__).with_name("US30.cash_M1_202503281400_202503281800.csv")
+
+
+def _reference_load(csv_path, server_tz="Etc/GMT-1") -> pd.DataFrame:
+    """Chargement d'origine des scripts de test: pd.to_datetime puis localisation UTC+1 -> UTC."""
+    raw = pd.read_csv(csv_path, sep='\t')
+    index = pd.to_datetime(raw['<DATE>'] + ' ' + raw['<TIME>'], format='%Y.%m.%d %H:%M:%S')
+    df = pd.DataFrame({'Open': raw['<OPEN>'].to_numpy(), 'High': raw['<HIGH>'].to_numpy(),
+                       'Low': raw['<LOW>'].to_numpy(), 'Close': raw['<CLOSE>'].to_numpy(),
+                       'TickVolume': raw['<TICKVOL>'].to_numpy(), 'Spread': raw['<SPREAD>'].to_numpy()},
+                      index=pd.DatetimeIndex(index, name='time'))
+    df.index = df.index.tz_localize(server_tz).tz_convert('UTC')
+    return df.sort_index()
+
+
+def _write_export(path, bars: pd.DataFrame, encoding: str = 'ascii'):
+    """Écrit des bougies au format d'un export MT5 (heure serveur UTC+1, fins de ligne CRLF)."""
+    local = bars.index.tz_convert('Etc/GMT-1')
+    lines = ['<DATE>\t<TIME>\t<OPEN>\t<HIGH>\t<LOW>\t<CLOSE>\t<TICKVOL>\t<VOL>\t<SPREAD>']
+    lines += [f"{t:%Y.%m.%d}\t{t:%H:%M:%S}\t{o}\t{h}\t{l}\t{c}\t{i % 97}\t0\t{278 + i % 5}"
+              for i, (t, o, h, l, c) in enumerate(zip(local, bars['Open'], bars['High'], bars['Low'], bars['Close']))]
+    Path(path).write_bytes(('\r\n'.join(lines) + '\r\n').encode(encoding))
+
+
+def test_parse_matches_pandas_and_converts_to_utc():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = shutil.copy(CSV_PATH, tmp)
+        df = load_mt5_csv(csv_path, cache=False)
+        pd.testing.assert_frame_equal(df, _reference_load(csv_path), check_dtype=False)
+        assert str(df.index.tz) == 'UTC' and df.index[0] == pd.Timestamp('2025-03-28 00:05', tz='UTC')
+        assert not cache_path(csv_path).exists()
+
+        # Export UTF-16 et heure serveur déjà en UTC
+        bars = _synthetic_bars(500, seed=5)
+        _write_export(Path(tmp) / 'utf16.csv', bars, encoding='utf-16')
+        df = load_mt5_csv(Path(tmp) / 'utf16.csv', cache=False)
+        assert (df.index == bars.index).all() and np.allclose(df['Close'], bars['Close'])
+        utc = load_mt5_csv(Path(tmp) / 'utf16.csv', server_tz='UTC', cache=False)
+        assert str(utc.index.tz) == 'UTC' and (utc.index == bars.index + pd.Timedelta(hours=1)).all()
+        # Heure du serveur conservée: index sans fuseau, pas étiqueté UTC
+        server = load_mt5_csv(Path(tmp) / 'utf16.csv', server_tz=None, cache=False)
+        assert server.index.tz is None and (server.index == utc.index.tz_localize(None)).all()
+
+
+def test_binary_cache_is_memory_mapped_and_invalidated():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / 'export.csv'
+        _write_export(csv_path, _synthetic_bars(2000, seed=1))
+        first = load_mt5_csv(csv_path)
+        assert cache_path(csv_path).exists()
+
+        records, _ = load_mt5_records(csv_path)
+        assert isinstance(records, np.memmap) and not records.flags.writeable
+        pd.testing.assert_frame_equal(load_mt5_csv(csv_path), first)
+
+        # Un autre fuseau ou un CSV modifié ne réutilise pas le cache
+        server = load_mt5_csv(csv_path, server_tz=None)
+        assert server.index[0] == first.index[0].tz_localize(None) + pd.Timedelta(hours=1)
+        utc = load_mt5_csv(csv_path, server_tz='UTC')
+        assert str(utc.index.tz) == 'UTC' and (utc.index.tz_localize(None) == server.index).all()
+        assert len({cache_path(csv_path, tz) for tz in (None, 'UTC', 'Etc/GMT-1')}) == 3
+        # Chargements alternés: chaque base de temps relit son propre cache sans le réécrire
+        mtimes = {tz: os.stat(cache_path(csv_path, tz)).st_mtime_ns for tz in (None, 'UTC', 'Etc/GMT-1')}
+        for tz in (None, 'Etc/GMT-1', None, 'UTC'):
+            assert isinstance(load_mt5_records(csv_path, tz)[0], np.memmap)
+        assert all(os.stat(cache_path(csv_path, tz)).st_mtime_ns == mtime for tz, mtime in mtimes.items())
+        _write_export(csv_path, _synthetic_bars(2100, seed=1))
+        os.utime(csv_path, ns=(0, os.stat(csv_path).st_mtime_ns + 10**9))
+        assert len(load_mt5_csv(csv_path)) == 2100
+
+
+if __name__ == "__main__":
+    test_parse_matches_pandas_and_converts_to_utc()
+    test_binary_cache_is_memory_mapped_and_invalidated()
+    print("Export MT5: décodage vectorisé, UTC et cache binaire OK")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / 'US30_M1_2ans.csv'
+        _write_export(csv_path, _synthetic_bars(2 * 260 * 1440))
+        print(f"Export de {2 * 260 * 1440} bougies ({os.path.getsize(csv_path) / 1e6:.0f} Mo)")
+        start = time.perf_counter()
+        pd.read_csv(csv_path, sep='\t', parse_dates={'time': ['<DATE>', '<TIME>']}, index_col='time')
+        print(f"pd.read_csv(parse_dates): {time.perf_counter() - start:.2f} s")
+        start = time.perf_counter()
+        _reference_load(csv_path)
+        print(f"pd.to_datetime au format fixe: {time.perf_counter() - start:.2f} s")
+        start = time.perf_counter()
+        load_mt5_csv(csv_path)
+        print(f"Décodage vectorisé + écriture du cache: {time.perf_counter() - start:.2f} s")
+        start = time.perf_counter()
+        load_mt5_records(csv_path)
+        print(f"Rechargement mappé du cache: {(time.perf_counter() - start) * 1000:.1f} ms")
+        start = time.perf_counter()
+        load_mt5_csv(csv_path)
+        print(f"Rechargement en DataFrame: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+# ----- END OF FILE test_mt5_csv.py -----
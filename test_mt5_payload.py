@@ -0,0 +1,136 @@
+"""
+Tests des formats de bougies de la commande DATA: JSON (lu avec orjson s'il est installé)
+et MqlRates binaires en base64 (DATA_RATES, décodés par np.frombuffer), retour au JSON si
+l'EA refuse le format compact.
+
+Exécution: python test_mt5_payload.py  (ou pytest test_mt5_payload.py)
+Affiche le temps d'analyse d'une réponse de 10 000 bougies selon le format.
+"""
+
+import json
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.agents.execution.mt5_connector import MT5FileConnector, _json_loads, orjson
+from src.tools.bar_store import BAR_DTYPE
+from src.tools.fake_ea import FakeEA, synthetic_records
+from test_fake_ea import _connect
+from test_mt5_bridge import _quiet
+
+
+class _CannedConnector(MT5FileConnector):
+    """Connecteur sans EA: réponses calculées par l'EA simulé, commandes enregistrées."""
+
+    def __init__(self, ea, config=None, refuse_rates=False):
+        _quiet(super().__init__, config)
+        self.ea = ea
+        self.refuse_rates = refuse_rates
+        self.commands = []
+
+    def send_command(self, command, timeout=None):
+        self.commands.append(command)
+        if self.refuse_rates and command.endswith(" RATES"):
+            return "ERROR: UNSUPPORTED RATES"
+        return self.ea.execute(command)
+
+
+def test_rates_and_json_formats_match():
+    with tempfile.TemporaryDirectory() as tmp:
+        ea = FakeEA(tmp, synthetic_records(3000, seed=4), {"history": 2000}).start()
+        connector = _connect(tmp)
+        try:
+            from_json = _quiet(connector.get_rates, "US30", "M5", 300)
+            frame_json = _quiet(connector.get_data, "US30", "M5", 300)
+            connector.data_format = "rates"
+            assert connector.data_command("US30", "M5", 300) == "DATA US30.cash M5 300 RATES"
+            from_rates = _quiet(connector.get_rates, "US30", "M5", 300)
+            frame_rates = _quiet(connector.get_data, "US30", "M5", 300)
+
+            # Format compact dans un lot
+            responses = _quiet(connector.send_batch, [connector.data_command("US30", "M1", 50), "PRICE US30.cash"])
+            assert responses[0].startswith("DATA_RATES US30.cash M1 50 ")
+        finally:
+            ea.stop()
+            _quiet(connector.disconnect)
+
+    assert from_rates.dtype == BAR_DTYPE and len(from_rates) == 300
+    assert np.array_equal(from_json, from_rates)
+    pd.testing.assert_frame_equal(frame_json, frame_rates)
+    assert frame_rates.index.name == "time" and list(frame_rates.columns)[:4] == ["open", "high", "low", "close"]
+
+
+def test_rates_refused_falls_back_to_json():
+    ea = FakeEA(tempfile.gettempdir(), synthetic_records(500, seed=2), {"history": 400})
+    connector = _CannedConnector(ea, {"data_format": "rates"}, refuse_rates=True)
+    records = _quiet(connector.get_rates, "US30", "M1", 100)
+    assert len(records) == 100 and connector.data_format == "json"
+    assert connector.commands == ["DATA US30.cash M1 100 RATES", "DATA US30.cash M1 100"]
+    assert np.array_equal(records["close"], ea.bars["close"][301:401])
+
+
+class _NoDataEA(FakeEA):
+    """EA simulé qui prend en charge RATES mais n'a pas de bougies pour les symboles inconnus."""
+
+    def _cmd_data(self, args):
+        if args[0] != "US30.cash":
+            return "ERROR: NO DATA"
+        return super()._cmd_data(args)
+
+
+def test_other_errors_keep_rates_format():
+    ea = _NoDataEA(tempfile.gettempdir(), synthetic_records(500, seed=2), {"history": 400})
+    connector = _CannedConnector(ea, {"data_format": "rates"})
+    assert _quiet(connector.get_rates, "GER40", "M1", 100) is None
+    assert connector.data_format == "rates"
+    # La commande suivante reste au format compact, sans nouvel envoi de la précédente
+    records = _quiet(connector.get_rates, "US30", "M1", 100)
+    assert connector.commands == ["DATA GER40 M1 100 RATES", "DATA US30.cash M1 100 RATES"]
+    assert np.array_equal(records, ea.bars[301:401])
+
+
+def test_malformed_payloads():
+    connector = _CannedConnector(None)
+    connector.send_command = lambda command, timeout=None: "DATA_RATES US30.cash M1 3 AAAA"
+    assert _quiet(connector.get_rates, "US30", "M1", 3) is None
+    connector.send_command = lambda command, timeout=None: 'DATA US30.cash M1 [{"time": 60, "close": 1.5}]'
+    records = connector.get_rates("US30", "M1", 1)
+    assert records["time"][0] == 60 and records["close"][0] == 1.5 and records["open"][0] == 0.0
+
+
+def _legacy_parse(response):
+    """Analyse avant le format compact: json.loads puis DataFrame ligne à ligne."""
+    data = json.loads(response[response.find("["):])
+    df = pd.DataFrame(data)
+    df['time'] = pd.to_datetime(df['time'], unit='s')
+    df.set_index('time', inplace=True)
+    return df
+
+
+if __name__ == "__main__":
+    test_rates_and_json_formats_match()
+    test_rates_refused_falls_back_to_json()
+    test_other_errors_keep_rates_format()
+    test_malformed_payloads()
+    print("Formats DATA: JSON, MqlRates base64, retour au JSON OK")
+
+    ea = FakeEA(tempfile.gettempdir(), synthetic_records(12000, seed=1), {"history": 11000})
+    json_response = ea.execute("DATA US30.cash M1 10000")
+    rates_response = ea.execute("DATA US30.cash M1 10000 RATES")
+    connector = _CannedConnector(ea)
+    cases = {
+        "json.loads + DataFrame (avant)": lambda: _legacy_parse(json_response),
+        "orjson -> BAR_DTYPE" if orjson else "json -> BAR_DTYPE":
+            lambda: connector._rows_to_records(_json_loads(json_response[json_response.find("["):])),
+        "DATA_RATES (frombuffer)": lambda: MT5FileConnector._parse_rates(rates_response),
+    }
+    print(f"10 000 bougies: JSON {len(json_response) / 1024:.0f} Ko, RATES {len(rates_response) / 1024:.0f} Ko")
+    for label, parse in cases.items():
+        durations = []
+        for _ in range(20):
+            start = time.perf_counter()
+            parse()
+            durations.append(time.perf_counter() - start)
+        print(f"{label}: {np.median(durations) * 1000:.2f} ms")
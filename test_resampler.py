@@ -0,0 +1,123 @@
+# ----- START OF FILE test_resampler.py -----
+"""
+Tests du rééchantillonnage local M1 -> M5/M15/H1: agrégation identique à pandas
+resample sur les bornes MT5 (avec trous de cotation), bougie partielle en cours,
+première bougie tronquée, et collecte du trader avec le seul M1 demandé à MT5.
+
+Exécution: python test_resampler.py  (ou pytest test_resampler.py)
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.tools.bar_store import BarStore, bars_to_records
+from src.tools.candle_cache import CandleCache
+from src.tools.resampler import can_resample, resample_bars, resample_records
+from test_bar_store import _bars
+from test_candle_cache import _LiveConnector, _elapse
+from test_historical_predictions import _trader
+
+AGGREGATION = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last',
+               'tick_volume': 'sum', 'spread': 'min'}
+RULES = {'M5': '5min', 'M15': '15min', 'H1': '60min'}
+
+
+def _with_gaps(n: int, seed: int = 0) -> pd.DataFrame:
+    """Bougies M1 avec minutes sans cotation et une interruption de plusieurs heures."""
+    bars = _bars(n, seed)
+    rng = np.random.default_rng(seed)
+    keep = rng.random(n) > 0.1
+    keep[0] = True
+    keep[n // 2:n // 2 + 200] = False
+    return bars[keep]
+
+
+def _reference(bars: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    resampled = bars.resample(RULES[timeframe], label='left', closed='left').agg(AGGREGATION)
+    return resampled.dropna(subset=['open'])
+
+
+def test_aggregation_matches_pandas_on_mt5_boundaries():
+    bars = _with_gaps(3000, seed=1)
+    for timeframe in RULES:
+        expected = _reference(bars, timeframe)
+        actual = resample_bars(bars, timeframe)
+        pd.testing.assert_frame_equal(actual[list(AGGREGATION)], expected, check_dtype=False, check_freq=False)
+        seconds = (actual.index - pd.Timestamp(0)).total_seconds()
+        assert (seconds % pd.Timedelta(RULES[timeframe]).total_seconds() == 0).all()
+    assert can_resample("M1", "M15") and not can_resample("M5", "M1") and not can_resample("M1", "W1")
+
+
+def test_partial_current_and_truncated_first_bar():
+    bars = _bars(60, seed=2).iloc[3:58]  # De hh:03 à hh:57
+    m15 = resample_records(bars_to_records(bars), "M15")
+    # Première bougie (hh:00) tronquée: ignorée; dernière (hh:45) en formation: partielle
+    assert len(m15) == 3 and m15["time"][0] % 900 == 0
+    assert m15["close"][-1] == bars['close'].iloc[-1] and m15["tick_volume"][-1] == bars['tick_volume'].iloc[42:].sum()
+    assert len(resample_records(bars_to_records(bars), "M15", drop_first_partial=False)) == 4
+
+    # La bougie en formation suit les mises à jour de la bougie M1 courante
+    updated = bars.copy()
+    updated.loc[updated.index[-1], 'high'] = updated['high'].max() + 10
+    assert resample_records(bars_to_records(updated), "M15")["high"][-1] == updated['high'].iloc[-1]
+
+
+def test_trader_requests_only_base_timeframe():
+    with tempfile.TemporaryDirectory() as tmp:
+        trader = _trader()
+        trader.timeframes = ["M1", "M5", "M15"]
+        trader.base_timeframe, trader.local_resampling, trader.candle_window = "M1", True, 100
+        trader.stats = {"connection_errors": 0}
+        trader.bar_store = BarStore(Path(tmp))
+        trader.mt5 = connector = _LiveConnector(_bars(5000, seed=3), visible=3000)
+        trader.candle_cache = CandleCache(connector, window=100, windows=trader._candle_windows())
+
+        assert trader._candle_windows() == {"M1": 1515}
+        trader._collect_market_data()
+        for _ in range(20):
+            connector.advance()
+            _elapse(trader.candle_cache, "M1", 60)
+            market_data = trader._collect_market_data()
+        assert connector.requested == [1515] + [3] * 20
+
+        history = connector.bars.iloc[:connector.visible]
+        for timeframe in ("M5", "M15"):
+            candles = market_data.candles[timeframe]
+            expected = _reference(history, timeframe).iloc[-100:]
+            assert len(candles) == 100
+            assert np.array_equal(candles.close, expected['close'].to_numpy())
+            assert np.array_equal(candles.high, expected['high'].to_numpy())
+        # Bougies M15 stockées au fil des cycles: mêmes valeurs finales que l'historique complet
+        stored = trader.bar_store.read_frame("US30", "M15")
+        expected = _reference(history, "M15").loc[stored.index[0]:]
+        assert np.array_equal(stored['close'].to_numpy(), expected['close'].to_numpy())
+
+
+if __name__ == "__main__":
+    test_aggregation_matches_pandas_on_mt5_boundaries()
+    test_partial_current_and_truncated_first_bar()
+    test_trader_requests_only_base_timeframe()
+    print("Rééchantillonnage: bornes MT5, bougie partielle et collecte M1 seule OK")
+
+    records = bars_to_records(_with_gaps(260 * 1440))
+    for timeframe in ("M5", "M15", "H1"):
+        start = time.perf_counter()
+        resampled = resample_records(records, timeframe)
+        elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        _reference(_with_gaps(260 * 1440), timeframe)
+        reference = time.perf_counter() - start
+        print(f"{timeframe}: {len(records)} -> {len(resampled)} bougies en {elapsed * 1000:.1f} ms "
+              f"(pandas resample: {reference * 1000:.0f} ms)")
+    window = records[-1515:]
+    start = time.perf_counter()
+    for _ in range(1000):
+        resample_records(window, "M5")[-100:]
+        resample_records(window, "M15")[-100:]
+    print(f"M5 + M15 par cycle de collecte: {(time.perf_counter() - start):.3f} ms")
+
+# ----- END OF FILE test_resampler.py -----
@@ -0,0 +1,196 @@
+# ----- START OF FILE test_signal_pipeline.py -----
+"""
+Tests d'équivalence des étapes vectorisées du pipeline de signal
+(zones d'intérêt, masques d'englobante, scanner de setups) avec les fonctions de
+référence de signal_utils et la boucle de test_zigzag_logic.py.
+
+Exécution: python test_signal_pipeline.py  (ou pytest test_signal_pipeline.py)
+"""
+
+import time
+import numpy as np
+import pandas as pd
+
+from src.tools import signal_utils, signal_utils_ameliore, signal_utils_doji
+from src.tools.signal_utils import find_interest_zone
+from src.tools.candle_patterns import engulfing_masks
+from src.tools.zigzag_engine import calculate_zigzag_pivots_fast
+from src.tools.interest_zones import find_interest_zones
+from src.tools.pivot_series import PivotSeries
+from src.tools.signal_scanner import scan_setups, rsi_pandas_ta
+from src.tools.param_sweep import evaluate_setups, run_parameter_sweep
+from test_zigzag_engine import _load_us30_csv, _synthetic_bars
+
+SMA_PERIOD = 20
+
+
+def _with_sma(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df['SMA20'] = df['Close'].rolling(window=SMA_PERIOD).mean()
+    return df
+
+
+def _reference_zones(df: pd.DataFrame, pivots: list, statuses=('HH', 'LL')) -> list:
+    zones = []
+    for i in range(1, len(pivots)):
+        if statuses is None or pivots[i].get('status') in statuses:
+            zone = find_interest_zone(df, pivots, i)
+            if zone:
+                zones.append(zone)
+    return zones
+
+
+def _assert_same_zones(expected: list, table: pd.DataFrame):
+    actual = table.to_dict('records')
+    assert len(expected) == len(actual), f"{len(expected)} zones attendues, {len(actual)} obtenues"
+    for ref, new in zip(expected, actual):
+        for key in ('start_price', 'end_price', 'direction', 'breakout_candle_index', 'preceding_pivot_index'):
+            assert ref[key] == new[key], (key, ref, new)
+
+
+def test_interest_zones_match_reference():
+    datasets = [_with_sma(_load_us30_csv()), _with_sma(_synthetic_bars(4000, seed=11))]
+    for df in datasets:
+        pivots = calculate_zigzag_pivots_fast(df, length=9)
+        _assert_same_zones(_reference_zones(df, pivots), find_interest_zones(df, pivots))
+        _assert_same_zones(_reference_zones(df, pivots, statuses=None), find_interest_zones(df, pivots, statuses=None))
+
+
+def test_pivot_series_in_zones_and_take_profit():
+    df = _with_sma(_synthetic_bars(4000, seed=12))
+    pivots = calculate_zigzag_pivots_fast(df, length=9)
+    series = PivotSeries.from_ohlc(df, length=9)
+    pd.testing.assert_frame_equal(find_interest_zones(df, pivots, statuses=None),
+                                  find_interest_zones(df, series, statuses=None))
+    zone = {'start_price': 1.0}
+    for idx in df.index[::53]:
+        for direction, divergence in (('bullish', 'BULL_CONTINUATION'), ('bearish', 'BEAR_CONTINUATION')):
+            expected = signal_utils.calculate_take_profit_v1(pivots, idx, direction, divergence, zone, df)
+            assert signal_utils.calculate_take_profit_v1(series, idx, direction, divergence, zone, df) == expected
+
+
+def test_interest_zones_after_dropna():
+    # Les pivots calculés avant dropna peuvent être absents du DataFrame: pas de zone
+    df = _with_sma(_synthetic_bars(1500, seed=5))
+    pivots = calculate_zigzag_pivots_fast(df, length=9)
+    trimmed = df.dropna(subset=['SMA20']).iloc[100:]
+    _assert_same_zones(_reference_zones(trimmed, pivots, statuses=None),
+                       find_interest_zones(trimmed, pivots, statuses=None))
+
+
+def test_interest_zones_empty():
+    df = _with_sma(_synthetic_bars(50))
+    assert find_interest_zones(df, []).empty
+
+
+def test_engulfing_masks_match_reference():
+    variants = [(signal_utils, 'close_pct'), (signal_utils_doji, 'mean_range'), (signal_utils_ameliore, None)]
+    for df in (_load_us30_csv(), _synthetic_bars(1500, seed=2)):
+        df = df.round(0)  # Crée des dojis et des égalités open/close
+        for module, rule in variants:
+            masks = engulfing_masks(df, anti_doji=rule)
+            for direction in ('bullish', 'bearish'):
+                expected = [module.detect_engulfing_pattern(df, idx, direction) for idx in df.index]
+                assert masks[direction].tolist() == expected, (module.__name__, direction)
+
+
+def _reference_setups(df: pd.DataFrame) -> list:
+    """Boucle iterrows de test_zigzag_logic.py (zones: dernière zone de chaque direction)."""
+    su = signal_utils
+    pivots = su.calculate_zigzag_pivots(df, length=9)
+    zones = {}
+    for zone in _reference_zones(df, pivots):
+        zones[zone['direction']] = zone
+    setups = []
+    for direction, action in (('bullish', 'BUY'), ('bearish', 'SELL')):
+        zone = zones.get(direction)
+        if not zone:
+            continue
+        pivot = next(p for p in reversed(pivots) if p['index'] == zone['preceding_pivot_index'])
+        rsi_at_pivot = df.loc[pivot['index'], 'RSI_14']
+        for idx, row in df.iterrows():
+            div = su.check_divergence_in_zone(row['Low'], row['High'], row['RSI_14'], zone, pivot, rsi_at_pivot)
+            if div and su.detect_engulfing_pattern(df, idx, direction):
+                sl = su.calculate_stop_loss(df, idx, direction, buffer_points=5.0)
+                tp = su.calculate_take_profit_v1(pivots, idx, direction, div, zone, df)
+                size = None
+                if sl and tp and sl != row['Close']:
+                    size = su.calculate_position_size(10000.0, 1.0, sl, row['Close'], su.SYMBOL_INFO_US30_EUR_SIMULATED)
+                setups.append((idx, action, div, row['Close'], sl, tp, size))
+    return sorted(setups, key=lambda s: (s[0], s[1]))
+
+
+def _prepared_frame(df: pd.DataFrame) -> pd.DataFrame:
+    df = _with_sma(df)
+    df['RSI_14'] = rsi_pandas_ta(df['Close'], 14)
+    return df.dropna(subset=['SMA20', 'RSI_14'])
+
+
+def test_scan_setups_latest_matches_reference_loop():
+    params = {'zone_mode': 'latest', 'rsi_column': 'RSI_14',
+              'symbol_info': signal_utils.SYMBOL_INFO_US30_EUR_SIMULATED}
+    total = 0
+    for seed in range(6):
+        df = _prepared_frame(_synthetic_bars(3000, seed=seed))
+        expected = _reference_setups(df)
+        table = scan_setups(df, params)
+        actual = [(r.time, r.direction, r.type, r.entry, r.sl, r.tp, None if np.isnan(r.size) else r.size)
+                  for r in table.itertuples()]
+        assert len(expected) == len(actual), (seed, len(expected), len(actual))
+        for ref, new in zip(expected, actual):
+            assert ref == new, (ref, new)
+        total += len(actual)
+    assert total > 0
+
+
+def test_scan_setups_causal_uses_confirmed_zones_only():
+    df = _synthetic_bars(20000, seed=1)
+    table = scan_setups(df, {'symbol_info': signal_utils.SYMBOL_INFO_US30_EUR_SIMULATED})
+    assert not table.empty
+    assert table['time'].is_monotonic_increasing
+    assert set(table['direction']) <= {'BUY', 'SELL'}
+    buys = table[table['direction'] == 'BUY']
+    assert (buys['sl'] < buys['entry']).all()
+
+
+def test_parameter_sweep_pool_matches_sequential():
+    df = _synthetic_bars(6000, seed=3)
+    grid = {'zigzag_length': [5, 9], 'sma_period': [20], 'sl_buffer_points': [3.0, 5.0]}
+    base = {'symbol_info': signal_utils.SYMBOL_INFO_US30_EUR_SIMULATED}
+    sequential = run_parameter_sweep(df, grid, base, workers=1)
+    pooled = run_parameter_sweep(df, grid, base, workers=2)
+    pd.testing.assert_frame_equal(sequential, pooled)
+    assert len(sequential) == 4
+    assert sequential['total_r'].is_monotonic_decreasing
+
+    # Le cache des étapes ne doit pas modifier les résultats d'un point de grille
+    params = {**base, 'zigzag_length': 9, 'sl_buffer_points': 5.0}
+    direct = evaluate_setups(scan_setups(df, params), df['High'].to_numpy(), df['Low'].to_numpy())
+    row = sequential[(sequential['zigzag_length'] == 9) & (sequential['sl_buffer_points'] == 5.0)].iloc[0]
+    for key, value in direct.items():
+        assert row[key] == value, key
+
+
+if __name__ == "__main__":
+    test_interest_zones_match_reference()
+    test_pivot_series_in_zones_and_take_profit()
+    test_interest_zones_after_dropna()
+    test_interest_zones_empty()
+    test_engulfing_masks_match_reference()
+    test_scan_setups_latest_matches_reference_loop()
+    test_scan_setups_causal_uses_confirmed_zones_only()
+    test_parameter_sweep_pool_matches_sequential()
+    print("Zones d'intérêt, englobantes et scanner: équivalence OK")
+
+    df = _with_sma(_synthetic_bars(30 * 1440))
+    pivots = calculate_zigzag_pivots_fast(df, length=9)
+    start = time.perf_counter()
+    zones = find_interest_zones(df, pivots)
+    print(f"{len(zones)} zones sur {len(df)} barres en {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    df = _synthetic_bars(260 * 1440)  # ~1 an de M1
+    start = time.perf_counter()
+    setups = scan_setups(df, {'symbol_info': signal_utils.SYMBOL_INFO_US30_EUR_SIMULATED})
+    print(f"{len(setups)} setups sur {len(df)} barres en {time.perf_counter() - start:.2f} s")
+
+# ----- END OF FILE test_signal_pipeline.py -----
@@ -0,0 +1,106 @@
+# ----- START OF FILE test_walk_forward.py -----
+"""
+Tests du walk-forward: découpage des folds, sélection des paramètres sur l'entraînement
+et mesure hors échantillon, pool de processus identique au calcul séquentiel,
+walk-forward du modèle et budget de temps.
+
+Exécution: python test_walk_forward.py  (ou pytest test_walk_forward.py)
+"""
+
+import time
+import numpy as np
+import pandas as pd
+
+from src.tools import signal_utils
+from src.tools.param_sweep import evaluate_setups, expand_grid
+from src.tools.signal_scanner import scan_setups
+from src.tools.walk_forward import make_folds, run_model_walk_forward, run_signal_walk_forward, summarize_folds
+from test_zigzag_engine import _synthetic_bars
+
+GRID = {'zigzag_length': [5, 9], 'sl_buffer_points': [3.0, 5.0]}
+BASE = {'symbol_info': signal_utils.SYMBOL_INFO_US30_EUR_SIMULATED}
+
+
+class _CentroidModel:
+    """Classifieur au plus proche centroïde (interface fit/predict de scikit-learn)."""
+
+    def fit(self, X, y):
+        self.classes_ = np.unique(y)
+        self.centroids = np.array([X[y == label].mean(axis=0) for label in self.classes_])
+        return self
+
+    def predict(self, X):
+        distances = ((X[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=2)
+        return self.classes_[distances.argmin(axis=1)]
+
+
+def _centroid_factory(model_type):
+    return _CentroidModel()
+
+
+def test_make_folds():
+    assert make_folds(100, 40, 20) == [(0, 40, 40, 60), (20, 60, 60, 80), (40, 80, 80, 100)]
+    assert make_folds(100, 40, 20, step=30, anchored=True) == [(0, 40, 40, 60), (0, 70, 70, 90)]
+    assert make_folds(50, 40, 20) == []
+
+
+def test_signal_walk_forward_selects_on_train_and_measures_test():
+    df = _synthetic_bars(12000, seed=4)
+    sequential = run_signal_walk_forward(df, GRID, 4000, 2000, base_params=BASE, workers=1)
+    pooled = run_signal_walk_forward(df, GRID, 4000, 2000, base_params=BASE, workers=2)
+    pd.testing.assert_frame_equal(sequential, pooled)
+    assert len(sequential) == 4
+    assert (sequential['test_from'] == df.index[sequential['test_start']]).all()
+
+    # Référence: setups causaux de chaque point de grille sur tout l'historique, découpés par fold
+    high, low = df['High'].to_numpy(), df['Low'].to_numpy()
+    setups = {tuple(p.items()): scan_setups(df, {**BASE, **p}) for p in expand_grid(GRID)}
+
+    def metrics(point, start, end):
+        table = setups[tuple(point.items())]
+        table = table[(table['position'] >= start) & (table['position'] < end)]
+        return evaluate_setups(table, high[:end], low[:end])
+
+    for fold in sequential.itertuples():
+        train = {tuple(p.items()): metrics(p, fold.train_start, fold.train_end) for p in expand_grid(GRID)}
+        best = max(train, key=lambda k: train[k]['total_r'])
+        assert (fold.zigzag_length, fold.sl_buffer_points) == tuple(v for _, v in best)
+        assert fold.test_total_r == metrics(dict(best), fold.test_start, fold.test_end)['total_r']
+        assert fold.train_trades == train[best]['trades']
+
+    summary = summarize_folds(sequential)
+    assert summary.loc['test_total_r', 'mean'] == sequential['test_total_r'].mean()
+    assert summary.loc['test_total_r', 'folds'] == 4
+
+
+def test_model_walk_forward_and_time_budget():
+    rng = np.random.default_rng(2)
+    labels = rng.choice(['BUY', 'SELL'], 3000)
+    features = rng.normal(size=(3000, 4)) + (labels == 'BUY')[:, None] * 1.5
+    sequential = run_model_walk_forward(features, labels, 1000, 500, model_factory=_centroid_factory, workers=1)
+    pooled = run_model_walk_forward(features, labels, 1000, 500, model_factory=_centroid_factory, workers=2)
+    pd.testing.assert_frame_equal(sequential, pooled)
+    assert len(sequential) == 4
+    assert (sequential['test_accuracy'] > 0.7).all()
+    assert (sequential['test_samples'] == 500).all()
+
+    # Budget épuisé: aucun fold démarré
+    skipped = run_model_walk_forward(features, labels, 1000, 500, model_factory=_centroid_factory,
+                                     workers=1, time_budget=0)
+    assert skipped.empty
+
+
+if __name__ == "__main__":
+    test_make_folds()
+    test_signal_walk_forward_selects_on_train_and_measures_test()
+    test_model_walk_forward_and_time_budget()
+    print("Walk-forward: folds, sélection hors échantillon, pool et budget OK")
+
+    df = _synthetic_bars(260 * 1440)  # ~1 an de M1
+    grid = {'zigzag_length': [5, 9, 14], 'sl_buffer_points': [3.0, 5.0, 8.0]}
+    start = time.perf_counter()
+    results = run_signal_walk_forward(df, grid, 60 * 1440, 20 * 1440, base_params=BASE, workers=None)
+    print(summarize_folds(results, ['test_total_r', 'test_win_rate']).to_string())
+    print(f"{len(results)} folds x {len(expand_grid(grid))} jeux en {time.perf_counter() - start:.1f} s")
+
+# ----- END OF FILE test_walk_forward.py -----
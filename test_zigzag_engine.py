@@ -0,0 +1,140 @@
+# ----- START OF FILE test_zigzag_engine.py -----
+"""
+Test d'équivalence et benchmark du moteur ZigZag vectorisé.
+Compare calculate_zigzag_pivots_fast et le rejeu du ZigZagTracker incrémental à la
+version de référence de signal_utils sur le CSV US30 fourni et sur des données
+synthétiques, puis mesure les temps d'exécution sur 10k, 100k et 1M barres.
+
+Exécution: python test_zigzag_engine.py  (ou pytest test_zigzag_engine.py)
+"""
+
+import os
+import time
+import numpy as np
+import pandas as pd
+
+from src.tools.mt5_csv import load_mt5_csv
+from src.tools.signal_utils import calculate_zigzag_pivots
+from src.tools.zigzag_engine import calculate_zigzag_pivots_fast
+from src.tools.zigzag_tracker import ZigZagTracker
+from src.tools.pivot_series import PivotSeries
+
+CSV_DATA_PATH = os.path.join(os.path.dirname(__file__), "US30.cash_M1_202503281400_202503281800.csv")
+
+
+def _load_us30_csv() -> pd.DataFrame:
+    """Charge l'export MT5 fourni avec les colonnes Open/High/Low/Close (index UTC)."""
+    return load_mt5_csv(CSV_DATA_PATH)[['Open', 'High', 'Low', 'Close']]
+
+
+def _synthetic_bars(n: int, seed: int = 42) -> pd.DataFrame:
+    """Génère une marche aléatoire OHLC M1 (avec prix arrondis pour créer des égalités)."""
+    rng = np.random.default_rng(seed)
+    close = np.round(42000 + np.cumsum(rng.normal(0, 5, n)), 1)
+    open_ = np.concatenate([[close[0]], close[:-1]]) + np.round(rng.normal(0, 1.5, n), 1)
+    high = np.maximum(open_, close) + np.round(rng.exponential(3, n), 1)
+    low = np.minimum(open_, close) - np.round(rng.exponential(3, n), 1)
+    index = pd.date_range("2025-01-01", periods=n, freq="min", tz="UTC")
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close}, index=index)
+
+
+def _assert_same_pivots(expected: list, actual: list):
+    assert len(expected) == len(actual), f"{len(expected)} pivots attendus, {len(actual)} obtenus"
+    for ref, new in zip(expected, actual):
+        assert ref['index'] == new['index'], (ref, new)
+        assert ref['price'] == new['price'], (ref, new)
+        assert ref['type'] == new['type'], (ref, new)
+        assert ref['status'] == new['status'], (ref, new)
+
+
+def test_equivalence_us30_csv():
+    df = _load_us30_csv()
+    for length in (3, 5, 9, 14, 21):
+        _assert_same_pivots(calculate_zigzag_pivots(df, length=length),
+                            calculate_zigzag_pivots_fast(df, length=length))
+
+
+def test_equivalence_synthetic():
+    for seed in range(5):
+        df = _synthetic_bars(3000, seed=seed)
+        for length in (2, 9, 30):
+            _assert_same_pivots(calculate_zigzag_pivots(df, length=length),
+                                calculate_zigzag_pivots_fast(df, length=length))
+
+
+def test_short_input():
+    df = _synthetic_bars(8)
+    assert calculate_zigzag_pivots_fast(df, length=9) == []
+    _assert_same_pivots(calculate_zigzag_pivots(df, length=8), calculate_zigzag_pivots_fast(df, length=8))
+
+
+def test_tracker_replay_matches_batch():
+    for df in (_load_us30_csv(), _synthetic_bars(5000, seed=7)):
+        for length in (3, 9, 21):
+            tracker = ZigZagTracker(length=length)
+            emitted = []
+            for idx, row in df.iterrows():
+                emitted.extend(tracker.update(row))
+            _assert_same_pivots(calculate_zigzag_pivots(df, length=length), emitted)
+            assert emitted == tracker.pivots
+
+
+def test_tracker_update_many_lowercase_bars():
+    df = _synthetic_bars(2000, seed=3)
+    tracker = ZigZagTracker(length=9)
+    tracker.update_many(df.iloc[:1000])
+    for idx, row in df.iloc[1000:].iterrows():
+        tracker.update({'high': row['High'], 'low': row['Low'], 'close': row['Close'], 'time': idx})
+    _assert_same_pivots(calculate_zigzag_pivots(df, length=9), tracker.pivots)
+
+
+def test_pivot_series_dict_view_and_queries():
+    df = _synthetic_bars(5000, seed=4)
+    pivots = calculate_zigzag_pivots_fast(df, length=9)
+    series = PivotSeries.from_ohlc(df, length=9)
+    assert series.to_dicts() == pivots
+    assert [p.to_dict() for p in reversed(series)] == pivots[::-1]
+    assert series[-1]['status'] == pivots[-1]['status'] and series[0].get('missing') is None
+    assert PivotSeries.from_dicts(pivots, df.index).to_dicts() == pivots
+
+    positions = df.index.get_indexer([p['index'] for p in pivots])
+    for pos in range(0, len(df), 37):
+        for pivot_type in ('high', 'low'):
+            expected = [k for k, p in enumerate(pivots) if p['type'] == pivot_type and positions[k] < pos]
+            assert series.last_before(pos, pivot_type) == (expected[-1] if expected else None)
+            label = df.index[pos]
+            assert series.last_before_label(label, pivot_type) == (expected[-1] if expected else None)
+            confirmed = [k for k in range(len(series))
+                         if series[k].type == pivot_type and series.confirmations[k] <= pos]
+            assert series.last_confirmed_before(pos, pivot_type) == (confirmed[-1] if confirmed else None)
+    assert series.find(pivots[3]['index']) == pivots[3]
+    assert series.find(df.index[0]) is None
+
+
+def run_benchmark(sizes=(10_000, 100_000, 1_000_000), length: int = 9, reference_max_bars: int = 10_000):
+    """Affiche les temps du moteur vectorisé (et de la référence sur les petites tailles)."""
+    print(f"{'barres':>10} | {'vectorisé (s)':>14} | {'référence (s)':>14}")
+    for n in sizes:
+        df = _synthetic_bars(n)
+        start = time.perf_counter()
+        calculate_zigzag_pivots_fast(df, length=length)
+        fast_time = time.perf_counter() - start
+        ref_time = "-"
+        if n <= reference_max_bars:
+            start = time.perf_counter()
+            calculate_zigzag_pivots(df, length=length)
+            ref_time = f"{time.perf_counter() - start:.3f}"
+        print(f"{n:>10} | {fast_time:>14.3f} | {ref_time:>14}")
+
+
+if __name__ == "__main__":
+    test_equivalence_us30_csv()
+    test_equivalence_synthetic()
+    test_short_input()
+    test_tracker_replay_matches_batch()
+    test_tracker_update_many_lowercase_bars()
+    test_pivot_series_dict_view_and_queries()
+    print("Équivalence OK (CSV US30 + données synthétiques, batch et incrémental)")
+    run_benchmark()
+
+# ----- END OF FILE test_zigzag_engine.py -----
@@ -4,7 +4,6 @@ import numpy as np
 import time
 import os
 from datetime import datetime, timedelta, timezone
-import pandas_ta as ta
 import math # Importé car utilisé par calculate_position_size
 
 # --- Importer les fonctions ---
@@ -19,6 +18,11 @@ try:
         calculate_position_size,
         SYMBOL_INFO_US30_EUR_SIMULATED # Récupère les infos simulées
     )
+    from src.tools import indicators
+    from src.tools.mt5_csv import load_mt5_csv
+    from src.tools.interest_zones import find_interest_zones
+    from src.tools.pivot_series import PivotSeries
+    from src.tools.candle_patterns import engulfing_masks
     print("Fonctions de signal_utils importées (incluant exécution).")
 except ImportError as e:
     print(f"ERREUR: Import fonctions signal_utils: {e}")
@@ -54,25 +58,13 @@ try:
     if not os.path.exists(CSV_DATA_PATH):
         raise FileNotFoundError(f"Le fichier CSV spécifié n'a pas été trouvé: {CSV_DATA_PATH}")
     print(f"Chargement depuis {CSV_DATA_PATH}...")
-    rates_df = pd.read_csv(
-        CSV_DATA_PATH, sep='\t',
-        parse_dates={'time': ['<DATE>', '<TIME>']}, index_col='time',
-        usecols=['<DATE>', '<TIME>', '<OPEN>', '<HIGH>', '<LOW>', '<CLOSE>']
-    )
-    rates_df.rename(columns={'<OPEN>': 'Open', '<HIGH>': 'High', '<LOW>': 'Low', '<CLOSE>': 'Close'}, inplace=True)
-    try:
-        rates_df.index = rates_df.index.tz_localize('Etc/GMT-1').tz_convert('UTC')
-        # print("Index Datetime localisé (supposé UTC+1) puis converti en UTC.")
-    except Exception as tz_ex:
-        # print(f"Avertissement localisation/conversion Timezone: {tz_ex}. Tentative avec UTC directement.")
-        try: rates_df.index = rates_df.index.tz_localize('UTC')
-        except TypeError:
-             if rates_df.index.tz is not None: rates_df.index = rates_df.index.tz_convert('UTC')
+    rates_df = load_mt5_csv(CSV_DATA_PATH)[['Open', 'High', 'Low', 'Close']]  # Heure serveur UTC+1 -> UTC
     print(f"{len(rates_df)} barres chargées.")
     print("Calcul indicateurs (SMA, RSI)...")
     rates_df.sort_index(ascending=True, inplace=True)
-    rates_df['SMA20'] = rates_df['Close'].rolling(window=SMA_PERIOD).mean()
-    rates_df.ta.rsi(length=RSI_PERIOD, append=True)
+    close_values = rates_df['Close'].to_numpy(dtype=float)
+    rates_df['SMA20'] = indicators.sma(close_values, SMA_PERIOD)
+    rates_df[f'RSI_{RSI_PERIOD}'] = indicators.rsi(close_values, RSI_PERIOD) # Même calcul que pandas_ta.rsi
     rsi_col_name = f'RSI_{RSI_PERIOD}'
     if rsi_col_name not in rates_df.columns and 'RSI_14' in rates_df.columns: rsi_col_name = 'RSI_14'
     if rsi_col_name not in rates_df.columns: raise ValueError(f"Colonne RSI (attendu {f'RSI_{RSI_PERIOD}'} ou 'RSI_14') non trouvée.")
@@ -94,26 +86,15 @@ if data_loaded_successfully:
     try:
         # ... (section calcul pivots et zones inchangée) ...
         print(f"Calcul pivots ZigZag (length={ZIGZAG_LENGTH})...")
-        zigzag_pivots = calculate_zigzag_pivots(rates_df, length=ZIGZAG_LENGTH)
+        # Pivots en tableaux positionnels (vue dict conservée pour les fonctions de signal_utils)
+        zigzag_pivots = PivotSeries.from_dicts(calculate_zigzag_pivots(rates_df, length=ZIGZAG_LENGTH), rates_df.index)
         print(f"Calcul ZigZag terminé. {len(zigzag_pivots)} pivots trouvés.")
-        # print("\nAnalyse pivots pour Zones d'Intérêt (HH/LL):") # Moins verbeux
         if zigzag_pivots:
-            all_zones_found = []
-            for i in range(1, len(zigzag_pivots)):
-                pivot = zigzag_pivots[i]
-                if 'status' in pivot and (pivot['status'] == 'HH' or pivot['status'] == 'LL'):
-                    # print(f"- Pivot {i}: {pivot['index']}, P={pivot['price']:.2f}, T={pivot['type']}, S={pivot['status']}") # Moins verbeux
-                    if pivot['index'] in rates_df.index:
-                        try:
-                            zone_info = find_interest_zone(rates_df, zigzag_pivots, i)
-                            if zone_info:
-                                # zone_lower = min(zone_info['start_price'], zone_info['end_price'])
-                                # zone_upper = max(zone_info['start_price'], zone_info['end_price'])
-                                # print(f"    >>> ZONE TROUVEE ({zone_info['direction']}): [{zone_lower:.2f} - {zone_upper:.2f}] ...") # Moins verbeux
-                                all_zones_found.append(zone_info)
-                                interest_zones[zone_info['direction']] = zone_info # Garder la dernière
-                        except Exception as zie: print(f"    ERREUR find_interest_zone: {zie}")
-                    # else: print(f"    (Pivot {pivot['index']} hors DF)") # Moins verbeux
+            # Toutes les zones HH/LL en une passe (remplace l'appel find_interest_zone par pivot)
+            zones_df = find_interest_zones(rates_df, zigzag_pivots, statuses=('HH', 'LL'))
+            all_zones_found = zones_df.to_dict('records')
+            for zone_info in all_zones_found:
+                interest_zones[zone_info['direction']] = zone_info # Garder la dernière
             print(f"{len(all_zones_found)} zones d'intérêt potentielles trouvées au total.")
         else: print("Aucun pivot trouvé.")
     except Exception as e: print(f"ERREUR calcul ZigZag/Zone: {e}"); import traceback; traceback.print_exc()
@@ -133,15 +114,18 @@ if data_loaded_successfully:
         if active_bull_zone: print(f"Zone Bullish Active pour Simu Finale: [{min(active_bull_zone['start_price'], active_bull_zone['end_price']):.2f} - {max(active_bull_zone['start_price'], active_bull_zone['end_price']):.2f}] (Pivot: {active_bull_zone['preceding_pivot_index']})")
         if active_bear_zone: print(f"Zone Bearish Active pour Simu Finale: [{min(active_bear_zone['start_price'], active_bear_zone['end_price']):.2f} - {max(active_bear_zone['start_price'], active_bear_zone['end_price']):.2f}] (Pivot: {active_bear_zone['preceding_pivot_index']})")
 
+        # Masques d'englobante précalculés pour tout le DataFrame (règle anti-doji de signal_utils)
+        engulfing = engulfing_masks(rates_df, anti_doji='close_pct')
+
         last_bull_pivot = None; rsi_at_bull_pivot = np.nan
         if active_bull_zone:
             pivot_idx = active_bull_zone['preceding_pivot_index']
-            last_bull_pivot = next((p for p in reversed(zigzag_pivots) if p['index'] == pivot_idx), None)
+            last_bull_pivot = zigzag_pivots.find(pivot_idx)
             if last_bull_pivot and pivot_idx in rates_df.index: rsi_at_bull_pivot = rates_df.loc[pivot_idx, rsi_col_name]
         last_bear_pivot = None; rsi_at_bear_pivot = np.nan
         if active_bear_zone:
             pivot_idx = active_bear_zone['preceding_pivot_index']
-            last_bear_pivot = next((p for p in reversed(zigzag_pivots) if p['index'] == pivot_idx), None)
+            last_bear_pivot = zigzag_pivots.find(pivot_idx)
             if last_bear_pivot and pivot_idx in rates_df.index: rsi_at_bear_pivot = rates_df.loc[pivot_idx, rsi_col_name]
 
         # --- Boucle de simulation ---
@@ -155,7 +139,7 @@ if data_loaded_successfully:
             if active_bull_zone and last_bull_pivot and not pd.isna(rsi_at_bull_pivot):
                 divergence_bull_type = check_divergence_in_zone(current_low, current_high, current_rsi, active_bull_zone, last_bull_pivot, rsi_at_bull_pivot)
                 if divergence_bull_type:
-                    is_engulfing = detect_engulfing_pattern(rates_df, idx, 'bullish')
+                    is_engulfing = engulfing.at[idx, 'bullish']
                     if is_engulfing:
                         trades_found += 1 # <<<=== NOUVEAU : Incrémenter compteur
                         print("-" * 60) # <<<=== NOUVEAU : Séparateur
@@ -183,7 +167,7 @@ if data_loaded_successfully:
             if active_bear_zone and last_bear_pivot and not pd.isna(rsi_at_bear_pivot):
                  divergence_bear_type = check_divergence_in_zone(current_low, current_high, current_rsi, active_bear_zone, last_bear_pivot, rsi_at_bear_pivot)
                  if divergence_bear_type:
-                    is_engulfing = detect_engulfing_pattern(rates_df, idx, 'bearish')
+                    is_engulfing = engulfing.at[idx, 'bearish']
                     if is_engulfing:
                         trades_found += 1 # <<<=== NOUVEAU : Incrémenter compteur
                         print("-" * 60) # <<<=== NOUVEAU : Séparateur